@@ -0,0 +1,8 @@
+"""
+Benchmarks für das Divergenzen-Projekt.
+
+Die Skripte werden aus dem Projektordner gestartet, z. B.:
+
+    python -m benchmarks.startup
+    python -m benchmarks.core
+"""
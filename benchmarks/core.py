@@ -0,0 +1,332 @@
+"""
+benchmarks/core.py
+
+Laufzeit der Kernfunktionen auf synthetischen OHLCV-Daten
+(benchmarks/synthetic.py) für 500 bis 100k Bars.
+
+Gemessen werden:
+- compute_rsi_wilder
+- DivergenceDetector.find_divergences
+- build_liquidity_levels
+- LiquidityGrabDetector.analyze
+- find_engulfings / find_fair_value_gaps
+- die drei Chart-Renderer (plot_candles, plot_donchian_chart,
+  save_liquidity_grab_chart_image) mit Agg-Backend
+- dieselben Renderer mit Level-of-Detail (`lod_*`, max_bars=0, also auf
+  Pixelbreite verdichtet) über alle Größen; die Zeit soll kaum mit der
+  Historienlänge wachsen
+
+Ergebnisse landen als JSON (inkl. Git-Commit) in outputs/benchmarks/,
+damit Regressionen zwischen Commits verglichen werden können.
+
+Verwendung:
+    python -m benchmarks.core
+    python -m benchmarks.core --sizes 500,2000 --targets rsi,divergences
+    python -m benchmarks.core --compare outputs/benchmarks/alt.json outputs/benchmarks/neu.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import warnings
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import matplotlib
+
+matplotlib.use("Agg")
+# plot_donchian_chart ruft plt.show(); unter Agg nur eine Warnung
+warnings.filterwarnings("ignore", message=".*non-interactive.*")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+import yaml  # noqa: E402
+
+from benchmarks.synthetic import generate_ohlcv  # noqa: E402
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_SIZES = (500, 2_000, 10_000, 100_000)
+DEFAULT_OUTPUT_DIR = PROJECT_ROOT / "outputs" / "benchmarks"
+
+# Ohne Level-of-Detail landet jede Bar in den Collections der Renderer; die
+# Zeit wächst linear (ca. 0,4 s bei 10k, 3 s bei 100k Bars je Lauf) und misst
+# dann vor allem das Rastern von Agg. Lange Historien decken die lod_*-Fälle
+# ab; render_* bei 100k nur auf Wunsch per --render-max-bars
+RENDER_MAX_BARS = 10_000
+# Wiederholen, bis mindestens so viel Zeit gemessen wurde (max. MAX_RUNS)
+MIN_MEASURE_SECONDS = 1.0
+MAX_RUNS = 7
+# Abweichung, ab der --compare eine Regression meldet
+REGRESSION_THRESHOLD = 1.10
+
+
+def _load_cfg() -> Dict[str, Any]:
+    with open(PROJECT_ROOT / "config" / "config.yaml", "r", encoding="utf-8") as handle:
+        return yaml.safe_load(handle)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        proc = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return proc.stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _time_call(func: Callable[[], Any]) -> Dict[str, float]:
+    samples: List[float] = []
+    while True:
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+        if sum(samples) >= MIN_MEASURE_SECONDS or len(samples) >= MAX_RUNS:
+            break
+    return {
+        "runs": len(samples),
+        "median_ms": round(statistics.median(samples) * 1000.0, 3),
+        "min_ms": round(min(samples) * 1000.0, 3),
+        "max_ms": round(max(samples) * 1000.0, 3),
+    }
+
+
+def _build_targets(cfg: Dict[str, Any], out_dir: Path) -> Dict[str, Dict[str, Any]]:
+    """
+    Name -> {"run": Callable[[df, extras], Any], "max_bars": Optional[int]}
+    """
+    from modules.divergence_detector import DivergenceDetector
+    from modules.liquidityGrabScanner.detector import LiquidityGrabDetector
+    from modules.liquidityGrabScanner.levels import build_liquidity_levels
+    from modules.liquidityGrabScanner.pattern_overlay import (
+        find_engulfings,
+        find_fair_value_gaps,
+    )
+    from modules.liquidityGrabScanner.plotter import save_liquidity_grab_chart_image
+    from modules.rsi_wilder import compute_rsi_wilder
+    from utils.chart.donchian_plotter import plot_donchian_chart
+    from utils.chart.plotter import build_candle_figure
+
+    div_cfg = cfg.get("divergence", {})
+    divergence_detector = DivergenceDetector(
+        rsi_period=div_cfg.get("rsi_period", 14),
+        fractal_periods=div_cfg.get("fractal_periods", 4),
+        max_bars_diff=div_cfg.get("max_bars_diff", 30),
+    )
+    liquidity_detector = LiquidityGrabDetector(cfg, timeframe="H4")
+    lg_cfg = cfg.get("liquidity_grab", {})
+    overlay_cfg = {
+        "show_fvg": True,
+        "show_engulfing": True,
+        "max_fvg_boxes": int(lg_cfg.get("max_fvg_boxes", 4)),
+        "max_engulfings": int(lg_cfg.get("max_engulfings", 6)),
+        "fvg_extend_bars": int(lg_cfg.get("fvg_extend_bars", 5)),
+        "min_fvg_gap_percent": float(lg_cfg.get("min_fvg_gap_percent", 0.03)),
+    }
+
+    def levels(df: pd.DataFrame, _extras=None):
+        return build_liquidity_levels(
+            df=df,
+            pivot_bars=liquidity_detector.pivot_bars,
+            max_reference_age_bars=liquidity_detector.max_reference_age_bars,
+            max_levels_per_side=liquidity_detector.max_levels_per_side,
+            use_equal_levels=liquidity_detector.use_equal_levels,
+            equal_level_threshold_percent=liquidity_detector.equal_level_threshold_percent,
+            equal_level_recent_weight=liquidity_detector.equal_level_recent_weight,
+        )
+
+    def render_candles(df: pd.DataFrame, extras: Dict[str, Any], max_bars=None):
+        # Divergenzen vorab, damit nur der Renderer gemessen wird
+        fig = build_candle_figure(
+            df, title="benchmark", divergences=extras["divergences"], max_bars=max_bars)
+        fig.canvas.draw()
+        plt.close("all")
+
+    def render_donchian(df: pd.DataFrame, _extras=None, max_bars=None):
+        plot_donchian_chart(df, title="benchmark", max_bars=max_bars)
+        fig = plt.gcf()
+        fig.canvas.draw()
+        plt.close("all")
+
+    def render_liquidity(df: pd.DataFrame, extras: Dict[str, Any], max_bars=None):
+        analysis = extras["liquidity_analysis"]
+        save_liquidity_grab_chart_image(
+            df=df,
+            signals=analysis["signals"],
+            levels=analysis["levels"],
+            title="benchmark",
+            file_path=out_dir / "liquidity.png",
+            overlay_cfg=overlay_cfg,
+            max_bars=max_bars,
+        )
+
+    return {
+        "rsi": {"run": lambda df, _: compute_rsi_wilder(df["close"], 14), "max_bars": None},
+        "divergences": {"run": lambda df, _: divergence_detector.find_divergences(df), "max_bars": None},
+        "liquidity_levels": {"run": levels, "max_bars": None},
+        "liquidity_analyze": {"run": lambda df, _: liquidity_detector.analyze(df), "max_bars": None},
+        "engulfings": {"run": lambda df, _: find_engulfings(df), "max_bars": None},
+        "fair_value_gaps": {"run": lambda df, _: find_fair_value_gaps(df), "max_bars": None},
+        "render_candles": {"run": render_candles, "max_bars": RENDER_MAX_BARS},
+        "render_donchian": {"run": render_donchian, "max_bars": RENDER_MAX_BARS},
+        "render_liquidity": {"run": render_liquidity, "max_bars": RENDER_MAX_BARS},
+        "lod_candles": {"run": lambda df, ex: render_candles(df, ex, max_bars=0), "max_bars": None},
+        "lod_donchian": {"run": lambda df, ex: render_donchian(df, ex, max_bars=0), "max_bars": None},
+        "lod_liquidity": {"run": lambda df, ex: render_liquidity(df, ex, max_bars=0), "max_bars": None},
+    }
+
+
+def _is_renderer(name: str) -> bool:
+    return name.startswith(("render_", "lod_"))
+
+
+def _prepare_frame(
+    df: pd.DataFrame,
+    cfg: Dict[str, Any],
+    needs: set,
+) -> tuple[pd.DataFrame, Dict[str, Any]]:
+    """Vorberechnungen der Renderer außerhalb der Messung."""
+    extras: Dict[str, Any] = {}
+    if needs & {"render_donchian", "lod_donchian"}:
+        period = int(cfg.get("donchian", {}).get("period", 20))
+        df["SMA200"] = df["close"].rolling(200).mean()
+        df["don_high"] = df["high"].rolling(period).max()
+        df["don_low"] = df["low"].rolling(period).min()
+    if needs & {"render_candles", "lod_candles"}:
+        from modules.divergence_detector import DivergenceDetector
+
+        extras["divergences"] = DivergenceDetector().find_divergences(
+            df[["open", "high", "low", "close", "volume"]])
+    if needs & {"render_liquidity", "lod_liquidity"}:
+        from modules.liquidityGrabScanner.detector import LiquidityGrabDetector
+
+        extras["liquidity_analysis"] = LiquidityGrabDetector(cfg, timeframe="H4").analyze(df)
+    return df, extras
+
+
+def run_benchmarks(
+    sizes: List[int],
+    targets: Optional[List[str]] = None,
+    seed: int = 42,
+    render_max_bars: int = RENDER_MAX_BARS,
+) -> Dict[str, Any]:
+    cfg = _load_cfg()
+    results: List[Dict[str, Any]] = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        available = _build_targets(cfg, Path(tmp))
+        selected = targets or list(available)
+        unknown = set(selected) - set(available)
+        if unknown:
+            raise ValueError(f"Unbekannte Targets: {', '.join(sorted(unknown))}")
+
+        for bars in sizes:
+            base = generate_ohlcv(bars, seed=seed)
+            # render_* nur bis render_max_bars, lod_* über alle Größen
+            renderers = {
+                name for name in selected
+                if _is_renderer(name) and not (name.startswith("render_") and bars > render_max_bars)
+            }
+
+            frame, extras = _prepare_frame(base.copy(), cfg, renderers)
+
+            for name in selected:
+                spec = available[name]
+                cap = render_max_bars if name.startswith("render_") else spec["max_bars"]
+                if cap is not None and bars > cap:
+                    print(f"  {name:<18} {bars:>7} Bars  übersprungen (> {cap})")
+                    continue
+
+                df = frame if _is_renderer(name) else base
+                stats = _time_call(lambda: spec["run"](df, extras))
+                results.append({"target": name, "bars": bars, **stats})
+                print(
+                    f"  {name:<18} {bars:>7} Bars  {stats['median_ms']:>10.2f} ms "
+                    f"(min {stats['min_ms']:.2f}, {stats['runs']} Läufe)"
+                )
+
+    return {
+        "commit": _git_commit(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "seed": seed,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "matplotlib": matplotlib.__version__,
+        "machine": platform.platform(),
+        "results": results,
+    }
+
+
+def compare_results(old_path: Path, new_path: Path) -> int:
+    """
+    Vergleicht zwei Ergebnisdateien; liefert die Anzahl der Regressionen.
+    """
+    old = json.loads(Path(old_path).read_text(encoding="utf-8"))
+    new = json.loads(Path(new_path).read_text(encoding="utf-8"))
+    old_rows = {(r["target"], r["bars"]): r for r in old["results"]}
+
+    print(f"Vergleich {old.get('commit')} -> {new.get('commit')}")
+    regressions = 0
+    for row in new["results"]:
+        before = old_rows.get((row["target"], row["bars"]))
+        if before is None or not before["median_ms"]:
+            continue
+        ratio = row["median_ms"] / before["median_ms"]
+        marker = ""
+        if ratio > REGRESSION_THRESHOLD:
+            marker = "  <-- langsamer"
+            regressions += 1
+        print(
+            f"  {row['target']:<18} {row['bars']:>7}  "
+            f"{before['median_ms']:>10.2f} -> {row['median_ms']:>10.2f} ms "
+            f"(x{ratio:.2f}){marker}"
+        )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks der Detektoren und Renderer")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES))
+    parser.add_argument("--targets", default=None, help="kommagetrennte Auswahl")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--render-max-bars", type=int, default=RENDER_MAX_BARS)
+    parser.add_argument("--json", dest="json_path", default=None)
+    parser.add_argument("--compare", nargs=2, metavar=("ALT", "NEU"), default=None)
+    args = parser.parse_args()
+
+    if args.compare:
+        regressions = compare_results(*args.compare)
+        raise SystemExit(1 if regressions else 0)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    targets = [t.strip() for t in args.targets.split(",")] if args.targets else None
+
+    print("================ BENCHMARKS ================")
+    report = run_benchmarks(sizes, targets, seed=args.seed,
+                            render_max_bars=args.render_max_bars)
+
+    if args.json_path:
+        out = Path(args.json_path)
+    else:
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        out = DEFAULT_OUTPUT_DIR / f"{report['commit'] or 'nocommit'}_{stamp}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"[INFO] Ergebnis gespeichert: {out}")
+
+
+if __name__ == "__main__":
+    main()
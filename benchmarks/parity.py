@@ -0,0 +1,406 @@
+"""
+benchmarks/parity.py
+
+Paritäts-Harness für die Detektoren: schnellere Implementierungen sind nur
+brauchbar, wenn sie dieselben Signale liefern.
+
+Auf einem festen Korpus (synthetische Frames aus benchmarks/synthetic.py
+plus optional gespeicherte Kursdaten als CSV in benchmarks/golden/frames/)
+werden die Ausgaben von
+
+    find_divergences, build_liquidity_levels, liquidity_analyze
+    (Scanner-Config und breiteres Fenster), find_engulfings,
+    find_fair_value_gaps
+
+als JSON aufgezeichnet (benchmarks/golden/parity.json). Spätere Läufe
+werden Feld für Feld dagegen verglichen; Floats mit einstellbarer Toleranz.
+
+Alternative Implementierungen ("Engines") lassen sich pro Ziel einhängen,
+ohne den Code der Scanner anzufassen:
+
+    python -m benchmarks.parity --record
+    python -m benchmarks.parity
+    python -m benchmarks.parity --engine find_engulfings=mein_paket.fast:find_engulfings
+    python -m benchmarks.parity --rtol 1e-6 --atol 1e-9
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import importlib
+import inspect
+import json
+import math
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from benchmarks.synthetic import generate_ohlcv
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+GOLDEN_DIR = Path(__file__).resolve().parent / "golden"
+GOLDEN_PATH = GOLDEN_DIR / "parity.json"
+STORED_FRAMES_DIR = GOLDEN_DIR / "frames"
+
+# (Seed, Bars, Timeframe) des synthetischen Korpus – nicht ändern, sonst
+# muss die Golden-Datei neu aufgezeichnet werden.
+SYNTHETIC_CORPUS: Tuple[Tuple[int, int, str], ...] = (
+    (1, 400, "H4"),
+    (2, 1500, "H4"),
+    (3, 1000, "D1"),
+    (4, 2500, "H1"),
+)
+
+# Zusätzliches Analyse-Ziel mit breiterem Fenster: die Scanner-Config prüft
+# nur die letzten Bars und Stufe 1, was auf dem Korpus kaum Signale ergibt.
+WIDE_LIQUIDITY_OVERRIDES = {
+    "scan_recent_bars": 200,
+    "included_stages": [1, 2, 3],
+    "show_runs": True,
+    "show_failed_grabs": True,
+    "score_threshold": 0,
+}
+
+DEFAULT_RTOL = 1e-9
+DEFAULT_ATOL = 1e-9
+MAX_REPORTED_DIFFS = 50
+
+
+# ---------------------------------------------------------------------------
+# Korpus
+# ---------------------------------------------------------------------------
+
+
+def _load_stored_frame(path: Path) -> pd.DataFrame:
+    df = pd.read_csv(path, index_col=0, parse_dates=True)
+    df.columns = [str(c).lower() for c in df.columns]
+    df.index.name = "time"
+    return df.sort_index()
+
+
+def load_corpus() -> Dict[str, Tuple[pd.DataFrame, str]]:
+    """
+    Name -> (DataFrame, Timeframe). Gespeicherte Frames heißen
+    <SYMBOL>_<TF>.csv (Spalten time, open, high, low, close[, volume]).
+    """
+    corpus: Dict[str, Tuple[pd.DataFrame, str]] = {}
+    for seed, bars, timeframe in SYNTHETIC_CORPUS:
+        corpus[f"synthetic_s{seed}_{bars}_{timeframe}"] = (
+            generate_ohlcv(bars, seed=seed, timeframe=timeframe),
+            timeframe,
+        )
+
+    if STORED_FRAMES_DIR.is_dir():
+        for path in sorted(STORED_FRAMES_DIR.glob("*.csv")):
+            timeframe = path.stem.rsplit("_", 1)[-1].upper()
+            if timeframe not in ("H1", "H4", "D1"):
+                timeframe = "H4"
+            corpus[f"stored_{path.stem}"] = (_load_stored_frame(path), timeframe)
+
+    return corpus
+
+
+# ---------------------------------------------------------------------------
+# Engines (Standard = aktuelle Implementierung)
+# ---------------------------------------------------------------------------
+
+
+def _load_cfg() -> Dict[str, Any]:
+    with open(PROJECT_ROOT / "config" / "config.yaml", "r", encoding="utf-8") as handle:
+        return yaml.safe_load(handle)
+
+
+def default_engines(cfg: Dict[str, Any]) -> Dict[str, Callable[[pd.DataFrame, str], Any]]:
+    """
+    Ziel -> Callable(df, timeframe). Jede Engine bekommt eine eigene Kopie.
+    """
+    from modules.divergence_detector import DivergenceDetector
+    from modules.liquidityGrabScanner.detector import LiquidityGrabDetector
+    from modules.liquidityGrabScanner.levels import build_liquidity_levels
+    from modules.liquidityGrabScanner.pattern_overlay import (
+        find_engulfings,
+        find_fair_value_gaps,
+    )
+
+    div_cfg = cfg.get("divergence", {})
+    lg_cfg = cfg.get("liquidity_grab", {})
+    min_gap = float(lg_cfg.get("min_fvg_gap_percent", 0.03))
+
+    def divergences(df: pd.DataFrame, _timeframe: str):
+        return DivergenceDetector(
+            rsi_period=div_cfg.get("rsi_period", 14),
+            fractal_periods=div_cfg.get("fractal_periods", 4),
+            max_bars_diff=div_cfg.get("max_bars_diff", 30),
+        ).find_divergences(df)
+
+    def levels(df: pd.DataFrame, timeframe: str):
+        detector = LiquidityGrabDetector(cfg, timeframe=timeframe)
+        return build_liquidity_levels(
+            df=df,
+            pivot_bars=detector.pivot_bars,
+            max_reference_age_bars=detector.max_reference_age_bars,
+            max_levels_per_side=detector.max_levels_per_side,
+            use_equal_levels=detector.use_equal_levels,
+            equal_level_threshold_percent=detector.equal_level_threshold_percent,
+            equal_level_recent_weight=detector.equal_level_recent_weight,
+        )
+
+    wide_cfg = {**cfg, "liquidity_grab": {**lg_cfg, **WIDE_LIQUIDITY_OVERRIDES}}
+
+    def analyze(df: pd.DataFrame, timeframe: str):
+        return LiquidityGrabDetector(cfg, timeframe=timeframe).analyze(df)
+
+    def analyze_wide(df: pd.DataFrame, timeframe: str):
+        return LiquidityGrabDetector(wide_cfg, timeframe=timeframe).analyze(df)
+
+    return {
+        "find_divergences": divergences,
+        "build_liquidity_levels": levels,
+        "liquidity_analyze": analyze,
+        "liquidity_analyze_wide": analyze_wide,
+        "find_engulfings": lambda df, _tf: find_engulfings(df),
+        "find_fair_value_gaps": lambda df, _tf: find_fair_value_gaps(df, min_gap_percent=min_gap),
+    }
+
+
+def load_engine(spec: str) -> Callable[[pd.DataFrame, str], Any]:
+    """
+    "paket.modul:funktion" importieren. Funktionen mit nur einem Parameter
+    (df) werden automatisch um den Timeframe-Parameter ergänzt.
+    """
+    module_name, _, attr = spec.partition(":")
+    if not attr:
+        raise ValueError(f"Engine-Angabe ohne ':' – erwartet modul:funktion, erhalten {spec!r}")
+    func = getattr(importlib.import_module(module_name), attr)
+
+    try:
+        params = inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return func
+    if len(params) == 1:
+        return lambda df, _tf: func(df)
+    return func
+
+
+# ---------------------------------------------------------------------------
+# Normalisierung auf JSON-kompatible Werte
+# ---------------------------------------------------------------------------
+
+
+def _normalize(value: Any) -> Any:
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {f.name: _normalize(getattr(value, f.name)) for f in dataclasses.fields(value)}
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if value is pd.NaT:
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if isinstance(value, (np.bool_, bool)):
+        return bool(value)
+    if isinstance(value, (np.integer,)):
+        return int(value)
+    if isinstance(value, (np.floating, float)):
+        value = float(value)
+        return None if math.isnan(value) else value
+    if value is None or isinstance(value, (int, str)):
+        return value
+    return str(value)
+
+
+def _frame_column(df: Optional[pd.DataFrame], column: str) -> Optional[List[Any]]:
+    if df is None or column not in df.columns:
+        return None
+    return _normalize(df[column].tolist())
+
+
+def normalize_output(target: str, output: Any) -> Any:
+    """
+    Reduziert die Rückgabe eines Ziels auf die vergleichsrelevanten Felder.
+    """
+    if target == "find_divergences":
+        data = output.get("df")
+        return {
+            "bullish": _normalize(output.get("bullish", [])),
+            "bearish": _normalize(output.get("bearish", [])),
+            "rsi": _frame_column(data, "rsi"),
+            "up_fractal_idx": (
+                np.flatnonzero(data["up_fractal"].to_numpy()).tolist()
+                if data is not None and "up_fractal" in data.columns else None
+            ),
+            "down_fractal_idx": (
+                np.flatnonzero(data["down_fractal"].to_numpy()).tolist()
+                if data is not None and "down_fractal" in data.columns else None
+            ),
+        }
+    if target in ("liquidity_analyze", "liquidity_analyze_wide"):
+        return {
+            "levels": _normalize(output.get("levels", [])),
+            "signals": _normalize(output.get("signals", [])),
+        }
+    return _normalize(output)
+
+
+# ---------------------------------------------------------------------------
+# Vergleich
+# ---------------------------------------------------------------------------
+
+
+def diff_values(
+    expected: Any,
+    actual: Any,
+    path: str = "$",
+    rtol: float = DEFAULT_RTOL,
+    atol: float = DEFAULT_ATOL,
+) -> Iterable[str]:
+    """
+    Liefert Abweichungen als lesbare Zeilen "pfad: erwartet != erhalten".
+    """
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        for key in sorted(set(expected) | set(actual)):
+            child = f"{path}.{key}"
+            if key not in actual:
+                yield f"{child}: fehlt"
+            elif key not in expected:
+                yield f"{child}: unerwartet ({_short(actual[key])})"
+            else:
+                yield from diff_values(expected[key], actual[key], child, rtol, atol)
+        return
+
+    if isinstance(expected, list) and isinstance(actual, list):
+        if len(expected) != len(actual):
+            yield f"{path}: Länge {len(expected)} != {len(actual)}"
+        for idx, (exp, act) in enumerate(zip(expected, actual)):
+            yield from diff_values(exp, act, f"{path}[{idx}]", rtol, atol)
+        return
+
+    if (
+        isinstance(expected, float) or isinstance(actual, float)
+    ) and isinstance(expected, (int, float)) and isinstance(actual, (int, float)) \
+            and not isinstance(expected, bool) and not isinstance(actual, bool):
+        if not math.isclose(expected, actual, rel_tol=rtol, abs_tol=atol):
+            yield f"{path}: {expected!r} != {actual!r}"
+        return
+
+    if expected != actual:
+        yield f"{path}: {_short(expected)} != {_short(actual)}"
+
+
+def _short(value: Any, limit: int = 80) -> str:
+    text = repr(value)
+    return text if len(text) <= limit else text[: limit - 3] + "..."
+
+
+# ---------------------------------------------------------------------------
+# Aufzeichnen / Prüfen
+# ---------------------------------------------------------------------------
+
+
+def compute_outputs(
+    engines: Dict[str, Callable[[pd.DataFrame, str], Any]],
+    targets: Optional[List[str]] = None,
+) -> Dict[str, Dict[str, Any]]:
+    corpus = load_corpus()
+    selected = targets or list(engines)
+    outputs: Dict[str, Dict[str, Any]] = {}
+    for frame_name, (df, timeframe) in corpus.items():
+        outputs[frame_name] = {}
+        for target in selected:
+            result = engines[target](df.copy(), timeframe)
+            outputs[frame_name][target] = normalize_output(target, result)
+    return outputs
+
+
+def record_golden(path: Path = GOLDEN_PATH) -> Path:
+    engines = default_engines(_load_cfg())
+    payload = {
+        "corpus": {
+            name: {"bars": len(df), "timeframe": tf}
+            for name, (df, tf) in load_corpus().items()
+        },
+        "outputs": compute_outputs(engines),
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+    return path
+
+
+def check_parity(
+    overrides: Optional[Dict[str, Callable[[pd.DataFrame, str], Any]]] = None,
+    targets: Optional[List[str]] = None,
+    rtol: float = DEFAULT_RTOL,
+    atol: float = DEFAULT_ATOL,
+    path: Path = GOLDEN_PATH,
+) -> Dict[str, List[str]]:
+    """
+    Vergleicht aktuelle (bzw. eingehängte) Engines mit der Golden-Datei.
+    Rückgabe: "frame/ziel" -> Liste der Abweichungen (leer = identisch).
+    """
+    golden = json.loads(Path(path).read_text(encoding="utf-8"))["outputs"]
+    engines = default_engines(_load_cfg())
+    engines.update(overrides or {})
+
+    selected = targets or list(engines)
+    actual = compute_outputs(engines, selected)
+
+    report: Dict[str, List[str]] = {}
+    for frame_name, per_target in actual.items():
+        for target, output in per_target.items():
+            key = f"{frame_name}/{target}"
+            if frame_name not in golden or target not in golden[frame_name]:
+                report[key] = ["keine Golden-Daten (neu aufzeichnen mit --record)"]
+                continue
+            report[key] = list(diff_values(golden[frame_name][target], output, "$", rtol, atol))
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Paritätsprüfung der Detektoren")
+    parser.add_argument("--record", action="store_true",
+                        help="aktuelle Ausgaben als Golden-Datei speichern")
+    parser.add_argument("--engine", action="append", default=[],
+                        metavar="ZIEL=modul:funktion",
+                        help="alternative Implementierung für ein Ziel einhängen")
+    parser.add_argument("--targets", default=None, help="kommagetrennte Auswahl")
+    parser.add_argument("--rtol", type=float, default=DEFAULT_RTOL)
+    parser.add_argument("--atol", type=float, default=DEFAULT_ATOL)
+    parser.add_argument("--golden", default=str(GOLDEN_PATH))
+    args = parser.parse_args()
+
+    if args.record:
+        path = record_golden(Path(args.golden))
+        print(f"[OK] Golden-Datei geschrieben: {path}")
+        return
+
+    overrides = {}
+    for spec in args.engine:
+        target, _, engine_spec = spec.partition("=")
+        overrides[target] = load_engine(engine_spec)
+
+    targets = [t.strip() for t in args.targets.split(",")] if args.targets else None
+    report = check_parity(overrides, targets, args.rtol, args.atol, Path(args.golden))
+
+    failed = 0
+    for key, diffs in report.items():
+        if not diffs:
+            print(f"[OK]     {key}")
+            continue
+        failed += 1
+        print(f"[ABWEICHUNG] {key}: {len(diffs)} Unterschiede")
+        for line in diffs[:MAX_REPORTED_DIFFS]:
+            print(f"    {line}")
+        if len(diffs) > MAX_REPORTED_DIFFS:
+            print(f"    ... {len(diffs) - MAX_REPORTED_DIFFS} weitere")
+
+    print(f"\n{len(report) - failed}/{len(report)} identisch (rtol={args.rtol}, atol={args.atol})")
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,422 @@
+"""
+benchmarks/standin.py
+
+Lokale HTTP-Stand-ins für die OANDA-Candles- und die Yahoo-Chart-API.
+
+Lasttests und Benchmarks für das (parallele) Laden sollen nicht gegen die
+echten Dienste laufen. Die Stand-ins beantworten
+
+    OANDA  GET /v3/instruments/<instrument>/candles?granularity=H4&count=500&price=M
+    Yahoo  GET /v8/finance/chart/<symbol>?interval=1h&period1=...&period2=...
+
+im Antwortformat der echten APIs mit synthetischen Bars
+(benchmarks/synthetic.py, Seed je Symbol, letzte Bar = laufende Bar).
+
+Einstellbar je Server:
+    latency_ms / jitter_ms   Antwortverzögerung
+    error_rate               Anteil Antworten mit HTTP 500
+    rate_limit / burst       Anfragen pro Sekunde (Token-Bucket), darüber HTTP 429
+    dead_symbols             Symbole ohne Daten (Yahoo 404, OANDA 400)
+
+`load_data` nutzt die Stand-ins über den Abschnitt `endpoints` der Config
+(`oanda_api` / `yahoo_chart`).
+
+Verwendung:
+    python -m benchmarks.standin serve --latency-ms 80 --error-rate 0.02 --rate-limit 20
+    python -m benchmarks.standin bench --symbols 40 --threads 1,4,8
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+
+import pandas as pd
+
+from benchmarks.synthetic import generate_ohlcv
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_OANDA_PORT = 8765
+DEFAULT_YAHOO_PORT = 8766
+
+# Historie, die je Symbol erzeugt wird (Tage bis "jetzt")
+HISTORY_DAYS = {1: 730, 4: 730, 24: 3650}
+
+OANDA_GRANULARITY_HOURS = {"H1": 1, "H4": 4, "D": 24}
+YAHOO_INTERVAL_HOURS = {"1h": 1, "4h": 4, "1d": 24}
+
+_OANDA_PATH = re.compile(r"^/v3/instruments/([^/]+)/candles$")
+_YAHOO_PATH = re.compile(r"^/v8/finance/chart/([^/]+)$")
+
+
+@dataclass
+class StandinSettings:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    rate_limit: float = 0.0  # Anfragen pro Sekunde, 0 = unbegrenzt
+    burst: int = 10
+    dead_symbols: Tuple[str, ...] = ()
+    seed: int = 0
+
+
+@dataclass
+class StandinStats:
+    requests: int = 0
+    ok: int = 0
+    errors: int = 0
+    throttled: int = 0
+    not_found: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def count(self, name: str) -> None:
+        with self.lock:
+            self.requests += 1
+            setattr(self, name, getattr(self, name) + 1)
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "requests": self.requests,
+            "ok": self.ok,
+            "errors": self.errors,
+            "throttled": self.throttled,
+            "not_found": self.not_found,
+        }
+
+
+class _TokenBucket:
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.capacity = max(float(burst), 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self) -> bool:
+        if self.rate <= 0:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1.0:
+                return False
+            self.tokens -= 1.0
+            return True
+
+
+@lru_cache(maxsize=256)
+def synthetic_bars(symbol: str, hours: int, now_hour: int) -> pd.DataFrame:
+    """
+    Synthetische Historie für `symbol`, deren letzte Bar die zu `now_hour`
+    (Stunden seit 1970) laufende Bar ist. Gleiches Symbol → gleiche Kurse.
+    """
+    now = pd.Timestamp(now_hour * 3600, unit="s")
+    days = HISTORY_DAYS[hours]
+    start = (now - pd.Timedelta(days=days)).normalize()
+    # Wochenenden fallen weg, daher reichen 5/7 der Kalender-Bars
+    bars = int(days * 24 / hours * 5 / 7) + 48
+    seed = zlib.crc32(symbol.encode("utf-8"))
+    df = generate_ohlcv(bars, seed=seed, timeframe={1: "H1", 4: "H4", 24: "D1"}[hours], start=str(start.date()))
+    return df[df.index <= now]
+
+
+def _current_bars(symbol: str, hours: int) -> pd.DataFrame:
+    return synthetic_bars(symbol, hours, int(time.time() // 3600))
+
+
+def _oanda_candles(instrument: str, query: Dict[str, List[str]]) -> Tuple[int, Dict[str, Any]]:
+    granularity = query.get("granularity", ["S5"])[0]
+    hours = OANDA_GRANULARITY_HOURS.get(granularity)
+    if hours is None:
+        return 400, {"errorMessage": f"Invalid value specified for 'granularity': {granularity}"}
+
+    count = min(int(query.get("count", ["500"])[0]), 5000)
+    df = _current_bars(instrument, hours).tail(count)
+    now = pd.Timestamp.now("UTC").tz_localize(None)
+
+    candles = []
+    for ts, row in zip(df.index, df.itertuples(index=False)):
+        candles.append(
+            {
+                "complete": bool(ts + pd.Timedelta(hours=hours) <= now),
+                "volume": int(row.volume),
+                "time": ts.strftime("%Y-%m-%dT%H:%M:%S.000000000Z"),
+                "mid": {
+                    "o": f"{row.open:.5f}",
+                    "h": f"{row.high:.5f}",
+                    "l": f"{row.low:.5f}",
+                    "c": f"{row.close:.5f}",
+                },
+            }
+        )
+    return 200, {"instrument": instrument, "granularity": granularity, "candles": candles}
+
+
+def _yahoo_chart(symbol: str, query: Dict[str, List[str]]) -> Tuple[int, Dict[str, Any]]:
+    interval = query.get("interval", ["1d"])[0]
+    hours = YAHOO_INTERVAL_HOURS.get(interval)
+    if hours is None:
+        error = {"code": "Bad Request", "description": f"Invalid input - interval={interval} is not supported."}
+        return 400, {"chart": {"result": None, "error": error}}
+
+    df = _current_bars(symbol, hours)
+    index_seconds = ((df.index - pd.Timestamp(0)) // pd.Timedelta(seconds=1)).to_numpy()
+    period1 = int(query.get("period1", ["0"])[0])
+    period2 = int(query.get("period2", [str(int(time.time()))])[0])
+    mask = (index_seconds >= period1) & (index_seconds <= period2)
+    df = df[mask]
+
+    result = {
+        "meta": {
+            "currency": "EUR",
+            "symbol": symbol,
+            "dataGranularity": interval,
+            "regularMarketPrice": float(df["close"].iloc[-1]) if len(df) else None,
+        },
+        "timestamp": [int(ts) for ts in index_seconds[mask]],
+        "indicators": {
+            "quote": [
+                {
+                    "open": df["open"].round(4).tolist(),
+                    "high": df["high"].round(4).tolist(),
+                    "low": df["low"].round(4).tolist(),
+                    "close": df["close"].round(4).tolist(),
+                    "volume": df["volume"].astype(int).tolist(),
+                }
+            ],
+            "adjclose": [{"adjclose": df["close"].round(4).tolist()}],
+        },
+    }
+    return 200, {"chart": {"result": [result], "error": None}}
+
+
+def _make_handler(kind: str, settings: StandinSettings, stats: StandinStats, bucket: _TokenBucket):
+    rng = random.Random(settings.seed)
+    rng_lock = threading.Lock()
+    dead = set(settings.dead_symbols)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+            return
+
+        def _send(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:  # noqa: N802
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+
+            with rng_lock:
+                delay = settings.latency_ms + rng.uniform(-1, 1) * settings.jitter_ms
+                failed = rng.random() < settings.error_rate
+            if delay > 0:
+                time.sleep(delay / 1000)
+
+            if not bucket.take():
+                stats.count("throttled")
+                message = "Rate limit violation. Allowed rate exceeded."
+                self._send(429, {"errorMessage": message}, {"Retry-After": "1"})
+                return
+            if failed:
+                stats.count("errors")
+                self._send(500, {"errorMessage": "Internal Server Error"})
+                return
+
+            if kind == "oanda":
+                if not self.headers.get("Authorization", "").startswith("Bearer "):
+                    stats.count("errors")
+                    self._send(401, {"errorMessage": "Insufficient authorization to perform request."})
+                    return
+                match = _OANDA_PATH.match(url.path)
+            else:
+                match = _YAHOO_PATH.match(url.path)
+
+            if not match:
+                stats.count("not_found")
+                self._send(404, {"errorMessage": f"Unbekannter Pfad: {url.path}"})
+                return
+
+            symbol = unquote(match.group(1))
+            if symbol in dead:
+                stats.count("not_found")
+                if kind == "oanda":
+                    self._send(400, {"errorMessage": f"Invalid value specified for 'instrument': {symbol}"})
+                else:
+                    error = {"code": "Not Found", "description": "No data found, symbol may be delisted"}
+                    self._send(404, {"chart": {"result": None, "error": error}})
+                return
+
+            status, payload = (_oanda_candles if kind == "oanda" else _yahoo_chart)(symbol, query)
+            stats.count("ok" if status == 200 else "errors")
+            self._send(status, payload)
+
+    return Handler
+
+
+class StandinServer:
+    """Ein Stand-in (`kind` = "oanda" oder "yahoo") in einem Hintergrund-Thread."""
+
+    def __init__(
+        self,
+        kind: str,
+        settings: Optional[StandinSettings] = None,
+        host: str = DEFAULT_HOST,
+        port: int = 0,
+    ) -> None:
+        if kind not in ("oanda", "yahoo"):
+            raise ValueError(f"Unbekannter Stand-in: {kind}")
+        self.kind = kind
+        self.settings = settings or StandinSettings()
+        self.stats = StandinStats()
+        bucket = _TokenBucket(self.settings.rate_limit, self.settings.burst)
+        self.httpd = ThreadingHTTPServer((host, port), _make_handler(kind, self.settings, self.stats, bucket))
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StandinServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name=f"standin-{self.kind}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "StandinServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+def endpoints_config(oanda: StandinServer, yahoo: StandinServer) -> Dict[str, Any]:
+    """Config-Abschnitt `endpoints`, der load_data auf die Stand-ins lenkt."""
+    return {"endpoints": {"oanda_api": oanda.url, "yahoo_chart": yahoo.url}}
+
+
+def _settings_from_args(args: argparse.Namespace) -> StandinSettings:
+    return StandinSettings(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        burst=args.burst,
+        dead_symbols=tuple(args.dead or ()),
+        seed=args.seed,
+    )
+
+
+def _serve(args: argparse.Namespace) -> None:
+    settings = _settings_from_args(args)
+    oanda = StandinServer("oanda", settings, args.host, args.oanda_port).start()
+    yahoo = StandinServer("yahoo", settings, args.host, args.yahoo_port).start()
+
+    print(f"[INFO] OANDA-Stand-in: {oanda.url}")
+    print(f"[INFO] Yahoo-Stand-in: {yahoo.url}")
+    print("[INFO] In config/config.yaml eintragen:")
+    print(f"  endpoints:\n    oanda_api: {oanda.url}\n    yahoo_chart: {yahoo.url}")
+    print("[INFO] Beenden mit Strg+C")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        oanda.stop()
+        yahoo.stop()
+        print(f"\n[INFO] OANDA: {oanda.stats.as_dict()}")
+        print(f"[INFO] Yahoo: {yahoo.stats.as_dict()}")
+
+
+def _bench(args: argparse.Namespace) -> None:
+    from utils.daten.data_loader import load_data
+    from utils.daten.sources import configure_data_sources
+
+    settings = _settings_from_args(args)
+    jobs = [(f"SYN{i:03d}.DE", "yfinance") for i in range(args.symbols)]
+    jobs += [(f"SYN_{i:03d}", "oanda") for i in range(args.symbols)]
+
+    with StandinServer("oanda", settings, args.host) as oanda, StandinServer("yahoo", settings, args.host) as yahoo:
+        # keine Einträge der Stand-in-Symbole in der echten Quarantäne-Datei
+        configure_data_sources({**endpoints_config(oanda, yahoo), "quarantine": {"enabled": False}})
+
+        def _load(job: Tuple[str, str]) -> int:
+            symbol, source = job
+            df = load_data(symbol, source, args.timeframe, lookback=args.lookback, oanda_token="standin")
+            return len(df)
+
+        # Synthetische Historien vorab erzeugen, damit nur das Laden gemessen wird
+        for symbol, _source in jobs:
+            _current_bars(symbol, {"H1": 1, "H4": 4, "D1": 24}[args.timeframe])
+
+        print(f"\n{'Threads':>8} {'Sekunden':>10} {'Symbole/s':>10} {'leer':>6}")
+        for threads in args.threads:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                sizes = list(pool.map(_load, jobs))
+            elapsed = time.perf_counter() - started
+            empty = sum(1 for size in sizes if size == 0)
+            print(f"{threads:>8} {elapsed:>10.2f} {len(jobs) / elapsed:>10.1f} {empty:>6}")
+
+        print(f"\n[INFO] OANDA: {oanda.stats.as_dict()}")
+        print(f"[INFO] Yahoo: {yahoo.stats.as_dict()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Lokale Stand-ins für OANDA- und Yahoo-Endpunkte")
+    parser.add_argument("command", choices=["serve", "bench"])
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--oanda-port", type=int, default=DEFAULT_OANDA_PORT)
+    parser.add_argument("--yahoo-port", type=int, default=DEFAULT_YAHOO_PORT)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Anteil HTTP-500-Antworten (0..1)")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Anfragen pro Sekunde, 0 = unbegrenzt")
+    parser.add_argument("--burst", type=int, default=10)
+    parser.add_argument("--dead", action="append", help="Symbol ohne Daten (mehrfach möglich)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--symbols", type=int, default=20, help="bench: Symbole je Quelle")
+    parser.add_argument(
+        "--threads",
+        type=lambda value: [int(v) for v in value.split(",") if v],
+        default=[1, 4, 8],
+        help="bench: Thread-Anzahlen, z. B. 1,4,8",
+    )
+    parser.add_argument("--timeframe", choices=["H1", "H4", "D1"], default="H4")
+    parser.add_argument("--lookback", type=int, default=200)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        _serve(args)
+    else:
+        _bench(args)
+
+
+if __name__ == "__main__":
+    main()
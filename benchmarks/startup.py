@@ -0,0 +1,145 @@
+"""
+benchmarks/startup.py
+
+Misst die Startzeit von main.py bis zur ersten interaktiven Auswahl.
+
+Zwei Messungen:
+1. Wandzeit eines frischen Interpreters, der main importiert, Konfiguration
+   und Märkte lädt und direkt vor dem ersten Prompt endet.
+2. Aufschlüsselung per `python -X importtime`, welche Module am meisten
+   Importzeit kosten.
+
+Verwendung:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --runs 10 --json outputs/startup.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+TARGET_MS = 300.0
+
+# Alles, was main() vor dem ersten questionary-Prompt erledigt
+FIRST_PROMPT_SNIPPET = """
+import main
+cfg = main.load_config()
+markets = main.load_markets(cfg["settings"]["markets_file"])
+main.get_timeframe_choices(cfg)
+"""
+
+
+def _run_to_first_prompt() -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", FIRST_PROMPT_SNIPPET],
+        cwd=PROJECT_ROOT,
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+    return (time.perf_counter() - start) * 1000.0
+
+
+def measure_first_prompt(runs: int = 5) -> Dict[str, float]:
+    """Wandzeit bis zum ersten Prompt in Millisekunden (Median/Min/Max)."""
+    _run_to_first_prompt()  # Bytecode-Cache aufwärmen
+    samples = [_run_to_first_prompt() for _ in range(max(runs, 1))]
+    return {
+        "median_ms": round(statistics.median(samples), 1),
+        "min_ms": round(min(samples), 1),
+        "max_ms": round(max(samples), 1),
+    }
+
+
+def _parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, module = line[len("import time:"):].split("|")
+            rows.append((module.strip(), int(self_us), int(cumulative_us)))
+        except ValueError:
+            continue
+    return rows
+
+
+def measure_importtime(top: int = 15) -> Dict[str, object]:
+    """Importzeit von main laut `-X importtime` inkl. der teuersten Module."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=PROJECT_ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    rows = _parse_importtime(proc.stderr)
+    main_row = next((row for row in rows if row[0] == "main"), None)
+    heaviest = sorted(rows, key=lambda row: row[1], reverse=True)[:top]
+
+    return {
+        "main_cumulative_ms": round(main_row[2] / 1000.0, 1) if main_row else None,
+        "top_self_ms": [
+            {"module": name, "self_ms": round(self_us / 1000.0, 1)}
+            for name, self_us, _ in heaviest
+        ],
+        "heavy_modules_loaded": sorted(
+            {
+                name.split(".")[0]
+                for name, _, _ in rows
+                if name.split(".")[0] in {
+                    "pandas", "numpy", "matplotlib", "yfinance", "oandapyV20"
+                }
+            }
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Startzeit von main.py messen")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", dest="json_path", default=None)
+    args = parser.parse_args()
+
+    first_prompt = measure_first_prompt(args.runs)
+    imports = measure_importtime()
+
+    print("================ STARTZEIT main.py ================")
+    print(
+        f"Bis zum ersten Prompt: {first_prompt['median_ms']:.1f} ms "
+        f"(min {first_prompt['min_ms']:.1f} / max {first_prompt['max_ms']:.1f})"
+    )
+    print(f"Import main (kumuliert): {imports['main_cumulative_ms']} ms")
+    loaded = imports["heavy_modules_loaded"]
+    print(f"Schwere Module beim Start: {', '.join(loaded) if loaded else 'keine'}")
+    print("\nTeuerste Module (self):")
+    for row in imports["top_self_ms"]:
+        print(f"  {row['self_ms']:>8.1f} ms  {row['module']}")
+
+    status = "OK" if first_prompt["median_ms"] <= TARGET_MS else "ZU LANGSAM"
+    print(f"\n[{status}] Ziel: < {TARGET_MS:.0f} ms bis zum ersten Prompt")
+
+    if args.json_path:
+        out = Path(args.json_path)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(
+            json.dumps(
+                {"first_prompt": first_prompt, "importtime": imports,
+                 "target_ms": TARGET_MS},
+                indent=2,
+            ),
+            encoding="utf-8",
+        )
+        print(f"[INFO] Ergebnis gespeichert: {out}")
+
+
+if __name__ == "__main__":
+    main()
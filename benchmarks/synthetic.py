@@ -0,0 +1,122 @@
+"""
+benchmarks/synthetic.py
+
+Reproduzierbare synthetische OHLCV-Daten für Benchmarks und Paritätstests.
+
+Der Generator erzeugt einen Random Walk mit
+- Volatilitäts-Regimen (ruhig / normal / volatil, Markov-Wechsel),
+- Trend-Phasen mit wechselndem Drift,
+- Wochenend-Lücken im Zeitindex inkl. Kurslücken beim Wiedereröffnen,
+- gezielt eingestreuten gleichen Hochs/Tiefs (Equal Highs / Equal Lows),
+  damit build_liquidity_levels und der Liquidity-Grab-Detektor
+  realistische Arbeit bekommen.
+
+Gleicher Seed + gleiche Parameter → identischer DataFrame.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from utils.daten.data_loader import TIMEFRAME_MAP
+
+# Tägliche Volatilität je Regime (Anteil vom Kurs)
+VOL_REGIMES = (0.004, 0.010, 0.025)
+REGIME_SWITCH_PROB = 1 / 200
+TREND_SWITCH_PROB = 1 / 300
+EQUAL_LEVEL_PROB = 0.02
+
+
+def _trading_index(bars: int, hours: int, start: str) -> pd.DatetimeIndex:
+    """Zeitindex ohne Wochenenden (Sa/So), ausgerichtet auf `hours`."""
+    per_day = max(24 // hours, 1)
+    # großzügig erzeugen und Wochenenden entfernen
+    candidates = pd.date_range(
+        start=start,
+        periods=int(bars * 7 / 5) + 2 * per_day * 7,
+        freq=f"{hours}h",
+    )
+    trading = candidates[candidates.dayofweek < 5]
+    return trading[:bars]
+
+
+def _markov_states(rng: np.random.Generator, bars: int, states: int, switch_prob: float) -> np.ndarray:
+    switches = rng.random(bars) < switch_prob
+    jumps = rng.integers(1, states, size=bars)
+    offsets = np.cumsum(np.where(switches, jumps, 0))
+    return offsets % states
+
+
+def generate_ohlcv(
+    bars: int,
+    seed: int = 42,
+    timeframe: str = "H4",
+    start_price: float = 100.0,
+    start: str = "2015-01-05",
+) -> pd.DataFrame:
+    """
+    Erzeugt `bars` Kerzen mit Spalten open/high/low/close/volume und
+    naivem UTC-Zeitindex (wie load_data).
+    """
+    if bars <= 0:
+        return pd.DataFrame(columns=["open", "high", "low", "close", "volume"])
+
+    hours = TIMEFRAME_MAP.get(timeframe.upper(), {}).get("hours", 4)
+    rng = np.random.default_rng(seed)
+    index = _trading_index(bars, hours, start)
+
+    # --- Regime und Drift ---
+    scale = np.sqrt(hours / 24.0)
+    regime = _markov_states(rng, bars, len(VOL_REGIMES), REGIME_SWITCH_PROB)
+    sigma = np.asarray(VOL_REGIMES)[regime] * scale
+
+    trend_state = _markov_states(rng, bars, 3, TREND_SWITCH_PROB)
+    drift = np.array([-0.05, 0.0, 0.05])[trend_state] * sigma
+
+    returns = drift + sigma * rng.standard_t(df=4, size=bars) / np.sqrt(2.0)
+
+    # --- Lücken: erste Kerze nach dem Wochenende öffnet mit Sprung ---
+    gap = np.zeros(bars)
+    if bars > 1:
+        weekend_gap = np.diff(index.values).astype("timedelta64[h]").astype(int) > hours
+        gap[1:] = np.where(weekend_gap, rng.normal(0.0, 2.0, bars - 1) * sigma[1:], 0.0)
+
+    log_close = np.log(start_price) + np.cumsum(returns + gap)
+    close = np.exp(log_close)
+    open_ = np.empty(bars)
+    open_[0] = start_price
+    open_[1:] = close[:-1] * np.exp(gap[1:])
+
+    body_high = np.maximum(open_, close)
+    body_low = np.minimum(open_, close)
+    high = body_high * (1.0 + np.abs(rng.normal(0.0, 0.6, bars)) * sigma)
+    low = body_low * (1.0 - np.abs(rng.normal(0.0, 0.6, bars)) * sigma)
+
+    # --- Equal Highs / Equal Lows: Docht endet exakt auf einem früheren Extrem ---
+    candidates = np.flatnonzero(rng.random(bars) < EQUAL_LEVEL_PROB)
+    lookbacks = rng.integers(5, 40, size=len(candidates))
+    sides = rng.random(len(candidates)) < 0.5
+    for idx, back, use_high in zip(candidates, lookbacks, sides):
+        ref = idx - back
+        if ref < 0:
+            continue
+        if use_high and body_high[idx] <= high[ref] <= body_high[idx] * (1.0 + 3 * sigma[idx]):
+            high[idx] = high[ref]
+        elif not use_high and body_low[idx] * (1.0 - 3 * sigma[idx]) <= low[ref] <= body_low[idx]:
+            low[idx] = low[ref]
+
+    volume = np.round(rng.lognormal(mean=10.0, sigma=0.5, size=bars) * (sigma / sigma.mean()))
+
+    df = pd.DataFrame(
+        {
+            "open": open_,
+            "high": high,
+            "low": low,
+            "close": close,
+            "volume": volume.astype(np.int64),
+        },
+        index=index,
+    )
+    df.index.name = "time"
+    return df
@@ -1,25 +1,70 @@
-import oandapyV20
-import oandapyV20.endpoints.accounts as accounts
-from pytickersymbols import PyTickerSymbols
-import yaml
-
 """
 📄 get_all_markets.py
 
-Erstellt automatisch die Datei `markets.yaml` mit Symbolen aus:
+Aktualisiert die Datei `config/markets.yaml` inkrementell mit Symbolen aus:
 1. 🔐 OANDA (über API)
 2. 📈 Yahoo Finance via pytickersymbols
 
 Yahoo-Ticker erhalten automatisch das richtige Suffix wie `.DE`, `.PA`, `.AS` etc.
+
+Ablauf:
+- Alle Quellen werden parallel abgefragt (OANDA-Request und je Index ein Thread).
+- Das Ergebnis wird mit der vorhandenen Datei verglichen: neue Symbole kommen
+  hinzu, Namen und von Hand gepflegte Märkte/Einträge bleiben erhalten.
+  Symbole, die eine Quelle nicht mehr liefert, bekommen `status: delisted`
+  (werden beim Laden übersprungen, bleiben aber in der Datei).
+- Symbole, für die die Quelle nachweislich keine Daten mehr liefert, bekommen
+  `status: stale`: gesperrt in der Quarantäne (utils/daten/quarantine.py)
+  oder in den letzten `--stale-days` Tagen geladen, aber mit einer letzten
+  Bar, die schon älter als `--stale-days` war (Frische-Index). Symbole
+  aus Märkten, die nur länger nicht gescannt wurden, bleiben unverändert.
+- Die Einträge jeder Gruppe werden sortiert (wie `sort_markets_yaml.py`),
+  die Datei geschrieben und der Markt-Index (utils/daten/universe.py)
+  im selben Lauf neu kompiliert.
+
+Neue Marktgruppen einer Quelle, die in der Datei (noch) fehlen, werden nur
+mit `--new-markets` angelegt.
+
+Verwendung:
+    python config/get_all_markets.py
+    python config/get_all_markets.py --dry-run
+    python config/get_all_markets.py --new-markets --stale-days 21
 """
 
-# Konfiguration laden
-with open("config.yaml", "r", encoding="utf-8") as f:
-    config = yaml.safe_load(f)
+import argparse
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import yaml
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from config.sort_markets_yaml import sort_market_entries  # noqa: E402
+from utils.daten.universe import compile_universe  # noqa: E402
+
+CONFIG_PATH = PROJECT_ROOT / "config" / "config.yaml"
+DEFAULT_MARKETS_PATH = PROJECT_ROOT / "config" / "markets.yaml"
+DEFAULT_STALE_DAYS = 14
+DEFAULT_WORKERS = 8
+
+STATUS_DELISTED = "delisted"
+STATUS_STALE = "stale"
+
+
+def load_config():
+    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f)
 
 
 # 📡 OANDA-Symbole
-def get_oanda_markets():
+def get_oanda_markets(config):
+    import oandapyV20
+    import oandapyV20.endpoints.accounts as accounts
+
     client = oandapyV20.API(access_token=config["oanda"]["access_token"])
     r = accounts.AccountInstruments(accountID=config["oanda"]["account_id"])
     resp = client.request(r)
@@ -57,56 +102,268 @@ YF_SUFFIX = {
 }
 
 
-def get_yf_markets():
-    ts = PyTickerSymbols()
-    indices = YF_SUFFIX.keys()
-    result = {}
+def get_yf_index(ts, index):
+    suffix = YF_SUFFIX[index]
+    entries = []
+
+    for stock in ts.get_stocks_by_index(index):
+        symbol = stock.get("symbol")
+        name = stock.get("name", symbol)
+
+        if not symbol:
+            continue
+
+        # Kein Suffix bei US-Symbolen
+        if suffix and not symbol.endswith(suffix):
+            symbol += suffix
+
+        entries.append({
+            "symbol": symbol,
+            "source": "yfinance",
+            "name": name
+        })
+
+    return entries
+
+
+def fetch_all_sources(config, workers=DEFAULT_WORKERS):
+    """
+    Fragt OANDA und alle Indizes parallel ab. Liefert {Markt: Einträge};
+    Märkte einer fehlgeschlagenen Quelle fehlen (und werden nicht als delisted markiert).
+    """
+    jobs = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        jobs["OANDA"] = pool.submit(get_oanda_markets, config)
 
-    for index in indices:
-        print(f"📥 Lade lokale Daten für {index} ...")
         try:
-            suffix = YF_SUFFIX[index]
-            stocks = ts.get_stocks_by_index(index)
-            result[index] = []
+            from pytickersymbols import PyTickerSymbols
+
+            ts = PyTickerSymbols()
+            for index in YF_SUFFIX:
+                jobs[index] = pool.submit(get_yf_index, ts, index)
+        except ImportError:
+            print("❌ pytickersymbols nicht installiert (pip install pytickersymbols), Indizes übersprungen.")
+
+        fetched = {}
+        for name, job in jobs.items():
+            try:
+                result = job.result()
+            except Exception as e:
+                print(f"❌ Fehler bei {name}: {e}")
+                continue
+
+            if name == "OANDA":
+                fetched.update(result)
+                print(f"✅ OANDA: {sum(len(v) for v in result.values())} Instrumente")
+            else:
+                fetched[name] = result
+                print(f"✅ {name}: {len(result)} Symbole")
+
+    return fetched
+
+
+def load_existing(path):
+    """Vorhandene Datei (None, wenn sie fehlt)."""
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+    return data.get("markets", {}) or {}
+
+
+def merge_markets(existing, fetched, new_markets=False):
+    """
+    Vergleicht die abgefragten Märkte mit der vorhandenen Datei.
+    Liefert (markets, diff) mit diff[Markt] = {"added": [...], "delisted": [...], "relisted": [...]}.
+    """
+    markets = {name: [dict(e) for e in (entries or [])] for name, entries in existing.items()}
+    diff = {}
+
+    for market, entries in fetched.items():
+        if market not in markets:
+            if not new_markets:
+                diff[market] = {"skipped": len(entries)}
+                continue
+            markets[market] = []
+
+        current = markets[market]
+        by_symbol = {e.get("symbol"): e for e in current}
+        listed = {e["symbol"] for e in entries}
+        changes = {"added": [], "delisted": [], "relisted": []}
+
+        for entry in entries:
+            known = by_symbol.get(entry["symbol"])
+            if known is None:
+                current.append(dict(entry))
+                changes["added"].append(entry["symbol"])
+            elif known.get("status") == STATUS_DELISTED:
+                del known["status"]
+                changes["relisted"].append(entry["symbol"])
+
+        # nur Einträge derselben Quelle können delisted sein (von Hand ergänzte bleiben)
+        sources = {e["source"] for e in entries}
+        for known in current:
+            if (
+                known.get("source") in sources
+                and known.get("symbol") not in listed
+                and known.get("status") != STATUS_DELISTED
+            ):
+                known["status"] = STATUS_DELISTED
+                changes["delisted"].append(known.get("symbol"))
+
+        diff[market] = changes
+
+    return markets, diff
+
+
+def probe_stale_symbols(markets, config, stale_days):
+    """
+    Markiert Symbole mit `status: stale`, für die es echte Hinweise auf
+    fehlende Daten gibt (bzw. entfernt die Markierung bei neuen Bars):
+
+    - Quarantäne (Abschnitt `quarantine`): die Quelle hat mindestens
+      `max_failures` Mal in Folge ohne Daten geantwortet.
+    - Frische-Index (Abschnitt `freshness`): das Symbol wurde in den letzten
+      `stale_days` Tagen geladen, die letzte gelieferte Bar war da aber schon
+      älter als `stale_days`.
+
+    Symbole, die länger nicht geladen wurden (Markt nicht gescannt), bleiben
+    unverändert. Liefert die Anzahl stale markierter Symbole.
+    """
+    from datetime import datetime, timedelta, timezone
+
+    from utils.daten.freshness import DEFAULT_FRESHNESS_PATH, FreshnessIndex
+    from utils.daten.quarantine import SymbolQuarantine, quarantine_settings
+
+    quarantine = None
+    settings = quarantine_settings(config)
+    if settings is not None:
+        settings["path"] = PROJECT_ROOT / settings["path"]
+        if settings["path"].exists():
+            quarantine = SymbolQuarantine(**settings)
+
+    freshness_cfg = config.get("freshness", {}) or {}
+    freshness_path = PROJECT_ROOT / freshness_cfg.get("path", DEFAULT_FRESHNESS_PATH)
+    freshness = FreshnessIndex(freshness_path) if freshness_path.exists() else None
+
+    if quarantine is None and freshness is None:
+        print("ℹ️  Weder Quarantäne- noch Frische-Index vorhanden, Prüfung auf stale übersprungen.")
+        return 0
+
+    # naive UTC wie die Zeitstempel in beiden Dateien
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    max_age = timedelta(days=stale_days)
+    stale = 0
+
+    for entries in markets.values():
+        for entry in entries:
+            if entry.get("status") == STATUS_DELISTED or not entry.get("source"):
+                continue
+            source, symbol = entry["source"], entry["symbol"]
+
+            dead = alive = False
+            if quarantine is not None and quarantine.failures(source, symbol) >= quarantine.max_failures:
+                dead = True
+            fetch = freshness.latest_fetch(source, symbol) if freshness is not None else None
+            if fetch is not None and now - fetch[0] <= max_age:
+                fetched_at, last_bar = fetch
+                if fetched_at - last_bar > max_age:
+                    dead = True
+                else:
+                    alive = True
+
+            if dead and not alive:
+                entry["status"] = STATUS_STALE
+                stale += 1
+            elif alive and entry.get("status") == STATUS_STALE:
+                del entry["status"]
+
+    return stale
+
+
+class _IndentDumper(yaml.SafeDumper):
+    """Listen unter ihrem Schlüssel eingerückt, wie in der bestehenden markets.yaml."""
+
+    def increase_indent(self, flow=False, indentless=False):
+        return super().increase_indent(flow, False)
+
+
+def write_markets_yaml(markets, path):
+    text = yaml.dump(
+        {"markets": markets},
+        Dumper=_IndentDumper,
+        allow_unicode=True,
+        sort_keys=False,
+    )
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("# /markets.yaml\n")
+        f.write(text)
+    os.replace(tmp_path, path)
+
 
-            for stock in stocks:
-                symbol = stock.get("symbol")
-                name = stock.get("name", symbol)
+def print_diff(diff, stale):
+    print("\n📋 Änderungen:")
+    for market, changes in diff.items():
+        if "skipped" in changes:
+            print(f"  {market:<26} neu ({changes['skipped']} Symbole), übersprungen (--new-markets)")
+            continue
+        parts = [f"+{len(changes['added'])}", f"-{len(changes['delisted'])}"]
+        if changes["relisted"]:
+            parts.append(f"wieder gelistet {len(changes['relisted'])}")
+        print(f"  {market:<26} {' / '.join(parts)}")
+        for symbol in changes["added"][:10]:
+            print(f"      + {symbol}")
+        for symbol in changes["delisted"][:10]:
+            print(f"      - {symbol}")
+    print(f"  stale (Quelle liefert keine neuen Bars): {stale}")
 
-                if not symbol:
-                    continue
 
-                # Kein Suffix bei US-Symbolen
-                if suffix and not symbol.endswith(suffix):
-                    symbol += suffix
+# 🏗 markets.yaml aktualisieren
+def build_markets_yaml(markets_path=DEFAULT_MARKETS_PATH, stale_days=DEFAULT_STALE_DAYS,
+                       workers=DEFAULT_WORKERS, new_markets=False, dry_run=False):
+    config = load_config()
 
-                result[index].append({
-                    "symbol": symbol,
-                    "source": "yfinance",
-                    "name": name
-                })
+    existing = load_existing(markets_path)
+    if existing is None:
+        print(f"ℹ️  {markets_path} fehlt, wird neu erstellt.")
+        existing = {}
+        new_markets = True
 
-            print(f"✅ {index}: {len(result[index])} Symbole")
-        except Exception as e:
-            print(f"❌ Fehler bei {index}: {e}")
-            result[index] = []
+    print("📡 Lade OANDA-Märkte und Aktien-Indizes (parallel) ...")
+    fetched = fetch_all_sources(config, workers)
 
-    return result
+    markets, diff = merge_markets(existing, fetched, new_markets=new_markets)
+    stale = probe_stale_symbols(markets, config, stale_days)
+    markets = sort_market_entries(markets)
+    print_diff(diff, stale)
 
+    if dry_run:
+        print("\nℹ️  --dry-run: nichts geschrieben.")
+        return
 
-# 🏗 markets.yaml bauen
-def build_markets_yaml():
-    print("📡 Lade OANDA-Märkte ...")
-    markets = get_oanda_markets()
+    write_markets_yaml(markets, markets_path)
+    universe = compile_universe(markets_path, cache_dir=PROJECT_ROOT / "outputs" / "cache")
+    print(f"\n✅ {markets_path} aktualisiert, Markt-Index kompiliert ({universe.size} aktive Einträge).")
 
-    print("📊 Lade Aktien-Indizes von Yahoo Finance (lokal) ...")
-    markets.update(get_yf_markets())
 
-    with open("markets.yaml", "w", encoding="utf-8") as f:
-        yaml.dump(markets, f, allow_unicode=True, sort_keys=False)
+def main():
+    parser = argparse.ArgumentParser(description="markets.yaml inkrementell aktualisieren")
+    parser.add_argument("--markets-file", default=str(DEFAULT_MARKETS_PATH))
+    parser.add_argument("--stale-days", type=int, default=DEFAULT_STALE_DAYS)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--new-markets", action="store_true", help="fehlende Marktgruppen der Quellen anlegen")
+    parser.add_argument("--dry-run", action="store_true", help="nur Änderungen anzeigen")
+    args = parser.parse_args()
 
-    print("\n✅ markets.yaml erfolgreich erstellt.")
+    build_markets_yaml(
+        markets_path=args.markets_file,
+        stale_days=args.stale_days,
+        workers=max(args.workers, 1),
+        new_markets=args.new_markets,
+        dry_run=args.dry_run,
+    )
 
 
 if __name__ == "__main__":
-    build_markets_yaml()
+    main()
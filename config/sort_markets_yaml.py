@@ -21,6 +21,32 @@ import yaml
 import os
 
 
+def sort_market_entries(markets):
+    """Sortiert die Einträge jeder Marktgruppe nach 'name' und entfernt doppelte Symbole."""
+    sorted_markets = {}
+
+    for market_name, entries in markets.items():
+        if not isinstance(entries, list):
+            sorted_markets[market_name] = entries
+            continue
+
+        # Nach 'name' alphabetisch sortieren, falls vorhanden
+        sorted_entries = sorted(entries, key=lambda x: x.get("name", "").lower())
+
+        # Optional: Doppelte Symbole entfernen (nur erstes Vorkommen behalten)
+        seen_symbols = set()
+        unique_entries = []
+        for entry in sorted_entries:
+            symbol = entry.get("symbol")
+            if symbol and symbol not in seen_symbols:
+                unique_entries.append(entry)
+                seen_symbols.add(symbol)
+
+        sorted_markets[market_name] = unique_entries
+
+    return sorted_markets
+
+
 def sort_markets(input_file="config/markets.yaml", output_file="config/markets_sorted.yaml"):
     """Sortiert alle Märkte alphabetisch nach 'name' und speichert als neue YAML-Datei."""
 
@@ -41,28 +67,8 @@ def sort_markets(input_file="config/markets.yaml", output_file="config/markets_s
         print("[FEHLER] Kein 'markets:'-Abschnitt in der Datei gefunden.")
         return
 
-    markets = data["markets"]
-    sorted_markets = {}
-
     # 3️⃣ Jede Marktgruppe (z. B. DAX, MDAX, OANDA_CURRENCY) einzeln sortieren
-    for market_name, entries in markets.items():
-        if not isinstance(entries, list):
-            sorted_markets[market_name] = entries
-            continue
-
-        # Nach 'name' alphabetisch sortieren, falls vorhanden
-        sorted_entries = sorted(entries, key=lambda x: x.get("name", "").lower())
-
-        # Optional: Doppelte Symbole entfernen (nur erstes Vorkommen behalten)
-        seen_symbols = set()
-        unique_entries = []
-        for entry in sorted_entries:
-            symbol = entry.get("symbol")
-            if symbol and symbol not in seen_symbols:
-                unique_entries.append(entry)
-                seen_symbols.add(symbol)
-
-        sorted_markets[market_name] = unique_entries
+    sorted_markets = sort_market_entries(data["markets"])
 
     # 4️⃣ Neues Dictionary zurückschreiben
     data["markets"] = sorted_markets
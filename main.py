@@ -2,26 +2,50 @@
 
 from __future__ import annotations
 
+import argparse
 import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
-import matplotlib
 import questionary
 import yaml
 
-from modules.divergence_detector import DivergenceDetector
-from modules.donchian_scanner import scan_donchian
-from modules.liquidityGrabScanner.scanner import scan_liquidity_grabs
-from modules.rsi_scanner import scan_rsi_range
-from modules.sma_korrekturen_finden import finde_sma_korrekturen
-from utils.chart.plotter import plot_candles
-from utils.daten.data_loader import load_data
-from utils.daten.exporter import export_dataframe_to_txt
+from utils import timing
 
-matplotlib.use("QtAgg")  # alternativ: "TkAgg"
+# Schwere Abhängigkeiten (pandas, matplotlib, yfinance, oandapyV20 und die
+# Scanner-Module) werden erst bei der ersten Verwendung importiert, damit
+# das Programm ohne Verzögerung bis zur ersten Auswahl startet.
+if TYPE_CHECKING:
+    from modules.divergence_detector import DivergenceDetector
+    from utils.daten.universe import MarketUniverse
 
 DEFAULT_TIMEFRAME_CHOICES = ["H1", "H4", "D1"]
+GUI_BACKEND = "QtAgg"  # alternativ: "TkAgg"
+
+# libyaml-Loader ist um ein Vielfaches schneller als der reine Python-Parser
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+_backend_configured = False
+
+
+def use_gui_backend() -> None:
+    """
+    Aktiviert das GUI-Backend von Matplotlib beim ersten Chart.
+    """
+    global _backend_configured
+    if _backend_configured:
+        return
+
+    import matplotlib
+
+    try:
+        matplotlib.use(GUI_BACKEND)
+    except ImportError as exc:
+        print(
+            f"[WARN] Backend {GUI_BACKEND} nicht verfuegbar ({exc}), "
+            f"verwende {matplotlib.get_backend()}."
+        )
+    _backend_configured = True
 
 
 def ensure_export_structure(base_dir: str = "exports") -> None:
@@ -39,7 +63,7 @@ def load_config() -> Optional[Dict[str, Any]]:
     """
     try:
         with open("config/config.yaml", "r", encoding="utf-8") as stream:
-            data = yaml.safe_load(stream)
+            data = yaml.load(stream, Loader=YAML_LOADER)
             return data if isinstance(data, dict) else None
     except FileNotFoundError:
         print("[ERROR] config/config.yaml nicht gefunden.")
@@ -48,30 +72,21 @@ def load_config() -> Optional[Dict[str, Any]]:
     return None
 
 
-def load_markets(path: str) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+def load_markets(path: str) -> Optional["MarketUniverse"]:
     """
-    Lädt die Märkte-Datei und gibt den Bereich 'markets' zurück.
+    Lädt die Märkte-Datei über den kompilierten Markt-Index
+    (utils/daten/universe.py). Das Ergebnis verhält sich wie der Bereich
+    'markets' (Markt -> Liste von Einträgen).
     """
+    from utils.daten.universe import UniverseError, load_universe
+
     try:
-        with open(path, "r", encoding="utf-8") as stream:
-            data = yaml.safe_load(stream)
+        return load_universe(path)
     except FileNotFoundError:
         print(f"[ERROR] Maerkte-Datei {path} nicht gefunden.")
-        return None
-    except yaml.YAMLError as exc:
-        print(f"[ERROR] Konnte Maerkte-Datei nicht einlesen: {exc}")
-        return None
-
-    if not isinstance(data, dict):
-        print(f"[ERROR] Ungueltige Struktur in {path}.")
-        return None
-
-    markets = data.get("markets", {})
-    if not isinstance(markets, dict):
-        print(f"[ERROR] Bereich 'markets' fehlt oder ist ungueltig in {path}.")
-        return None
-
-    return markets
+    except UniverseError as exc:
+        print(f"[ERROR] {exc}")
+    return None
 
 
 def get_timeframe_choices(cfg: Dict[str, Any]) -> List[str]:
@@ -107,6 +122,8 @@ def build_detector(cfg: Dict[str, Any]) -> DivergenceDetector:
     """
     Baut den Divergenz-Detector aus den Konfigurationswerten.
     """
+    from modules.divergence_detector import DivergenceDetector
+
     div_cfg = cfg.get(
         "divergence",
         {"rsi_period": 14, "fractal_periods": 4, "max_bars_diff": 30},
@@ -124,21 +141,15 @@ def export_loaded_data(
     symbol: str,
     source: str,
     timeframe: str,
+    scan_export=None,
 ) -> None:
     """
-    Exportiert geladene Kursdaten als TXT.
-
-    try:
-        export_path = export_dataframe_to_txt(
-            df=raw_df,
-            symbol=symbol,
-            source=source,
-            timeframe=timeframe,
-        )
-        print(f"[INFO] Daten exportiert nach: {export_path}")
-    except Exception as exc:
-        print(f"[WARN] TXT-Export fehlgeschlagen fuer {symbol}: {exc}")
+    Übergibt geladene Kursdaten an den Scan-Export (Abschnitt `data_export`);
+    geschrieben wird gesammelt am Ende des Scans.
     """
+    if scan_export is None:
+        return
+    scan_export.add(source, timeframe, symbol, raw_df)
 
 
 def analyze_symbol(
@@ -147,10 +158,13 @@ def analyze_symbol(
     cfg: Dict[str, Any],
     timeframe: str,
     detector: DivergenceDetector,
+    scan_export=None,
 ) -> Optional[Dict[str, Any]]:
     """
     Lädt Kursdaten, exportiert sie optional und berechnet Divergenzen.
     """
+    from utils.daten.data_loader import load_data
+
     source = symbol_entry.get(
         "source",
         cfg.get("settings", {}).get("default_source", "yfinance"),
@@ -187,6 +201,7 @@ def analyze_symbol(
         symbol=symbol,
         source=source,
         timeframe=timeframe,
+        scan_export=scan_export,
     )
 
     bars_for_analysis = (
@@ -200,7 +215,8 @@ def analyze_symbol(
         f"{len(analysis_df)} Bars fuer Divergenz."
     )
 
-    full_result = detector.find_divergences(raw_df)
+    with timing.stage("detection"):
+        full_result = detector.find_divergences(raw_df)
 
     if analysis_df.empty:
         recent_bullish = []
@@ -300,6 +316,9 @@ def run_single_analysis(
     if not result:
         return
 
+    use_gui_backend()
+    from utils.chart.plotter import plot_candles
+
     plot_candles(
         result["df"],
         title=f"{result['symbol']} [{result['market']}] {timeframe}",
@@ -350,46 +369,190 @@ def _select_timeframe(timeframe_choices: List[str]) -> Optional[str]:
     return timeframe
 
 
+def keep_unreported_divergences(
+    store: Any,
+    results: List[Dict[str, Any]],
+    timeframe: str,
+) -> set:
+    """
+    Delta-Modus: reduziert die jüngsten Divergenzen jedes Ergebnisses auf
+    die noch nicht gemeldeten. Liefert deren Schlüssel; als gemeldet gelten
+    sie erst nach der Anzeige (siehe mark_keys_reported).
+    """
+    from utils.daten.signal_store import divergence_report_key
+
+    all_keys = [
+        divergence_report_key(item["symbol"], timeframe, direction, pair)
+        for item in results
+        for direction in ("bullish", "bearish")
+        for pair in item["recent_divergences"][direction]
+    ]
+    new_keys = store.filter_unreported("divergence", all_keys)
+
+    for item in results:
+        for direction in ("bullish", "bearish"):
+            item["recent_divergences"][direction] = [
+                pair for pair in item["recent_divergences"][direction]
+                if divergence_report_key(item["symbol"], timeframe, direction, pair)
+                in new_keys
+            ]
+            item[direction] = len(item["recent_divergences"][direction])
+
+    print(
+        f"[INFO] Delta-Modus: {len(new_keys)} neue Divergenzen, "
+        f"{len(set(all_keys)) - len(new_keys)} bereits gemeldet."
+    )
+    return new_keys
+
+
+def _select_scan_scope(
+    scanner: str,
+    markets: Dict[str, List[Dict[str, Any]]],
+    timeframe_choices: List[str],
+    resume: bool,
+) -> Optional[tuple]:
+    """
+    Märkte und Timeframe wählen bzw. bei --resume aus dem Checkpoint übernehmen.
+    """
+    from utils.daten.checkpoint import ScanCheckpoint
+
+    saved = ScanCheckpoint.saved_params(scanner) if resume else None
+    if saved:
+        print(
+            f"[INFO] Fortsetzen: {saved['timeframe']} | "
+            f"Märkte: {', '.join(saved['markets'])}"
+        )
+        return saved["markets"], saved["timeframe"]
+
+    selected_markets = _select_markets(markets)
+    if not selected_markets:
+        return None
+
+    timeframe = _select_timeframe(timeframe_choices)
+    if not timeframe:
+        return None
+
+    return selected_markets, timeframe
+
+
+def _compact_analysis(analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Entfernt Kursdaten aus Ergebnissen ohne Treffer (kleiner Checkpoint).
+    """
+    if analysis["bullish"] or analysis["bearish"]:
+        return analysis
+
+    result = analysis["result"]
+    return {
+        **analysis,
+        "df": None,
+        "analysis_df": None,
+        "result": {
+            "df": None,
+            "bullish": result.get("bullish", []),
+            "bearish": result.get("bearish", []),
+        },
+    }
+
+
 def run_divergence_scanner(
     markets: Dict[str, List[Dict[str, Any]]],
     cfg: Dict[str, Any],
     detector: DivergenceDetector,
     timeframe_choices: List[str],
+    resume: bool = False,
 ) -> None:
     """
     Scannt mehrere Märkte nach Divergenzen.
     """
-    selected_markets = _select_markets(markets)
-    if not selected_markets:
-        return
+    from utils.daten.checkpoint import ScanCheckpoint
+    from utils.daten.exporter import open_scan_export
+    from utils.daten.quarantine import active_quarantine
 
-    timeframe = _select_timeframe(timeframe_choices)
-    if not timeframe:
+    scope = _select_scan_scope("divergence", markets, timeframe_choices, resume)
+    if not scope:
         return
+    selected_markets, timeframe = scope
+
+    checkpoint = ScanCheckpoint(
+        "divergence",
+        {"timeframe": timeframe, "markets": list(selected_markets)},
+        resume=resume,
+    )
+
+    timing.start_scan_timer("divergence", timeframe, cfg)
 
     print("\n================ STARTE DIVERGENZ-SCANNER ================")
 
     results: List[Dict[str, Any]] = []
+    scan_export = open_scan_export(cfg)
+    quarantine = active_quarantine()
+    default_source = cfg.get("settings", {}).get("default_source", "yfinance")
 
     for market_key in selected_markets:
         print(f"\n--- Scanne Markt: {market_key} ---")
         for entry in markets.get(market_key, []):
-            analysis = analyze_symbol(
-                symbol_entry=entry,
-                market_key=market_key,
-                cfg=cfg,
-                timeframe=timeframe,
-                detector=detector,
+            checkpoint_key = f"{market_key}|{entry.get('symbol')}"
+            if checkpoint_key in checkpoint:
+                results.append(checkpoint.get(checkpoint_key))
+                continue
+            # gesperrte Symbole ohne Request und ohne Pause überspringen
+            if quarantine is not None and quarantine.should_skip(
+                entry.get("source", default_source), entry.get("symbol")
+            ):
+                continue
+
+            with timing.symbol(checkpoint_key):
+                analysis = analyze_symbol(
+                    symbol_entry=entry,
+                    market_key=market_key,
+                    cfg=cfg,
+                    timeframe=timeframe,
+                    detector=detector,
+                    scan_export=scan_export,
+                )
+                if analysis:
+                    analysis = _compact_analysis(analysis)
+                    results.append(analysis)
+                    checkpoint.record(checkpoint_key, analysis)
+                with timing.stage("sleep"):
+                    time.sleep(0.4)
+
+    if scan_export is not None:
+        with timing.stage("save"):
+            scan_export.close()
+
+    from utils.daten.signal_store import (
+        delta_mode_enabled,
+        mark_keys_reported,
+        open_signal_store,
+    )
+
+    new_keys: set = set()
+    store = open_signal_store(cfg)
+    if store is not None:
+        with store:
+            scan_id = store.start_scan("divergence", timeframe, selected_markets)
+            stored = store.insert_divergences(
+                scan_id,
+                timeframe,
+                (
+                    (item["symbol"], item["name"], item["market"], item["result"])
+                    for item in results
+                ),
             )
-            if analysis:
-                results.append(analysis)
-            time.sleep(0.4)
+            print(f"\n[INFO] {stored} Divergenzen im Signal-Store gespeichert: {store.path}")
+
+            if delta_mode_enabled(cfg):
+                new_keys = keep_unreported_divergences(store, results, timeframe)
 
     found = [item for item in results if item["bullish"] or item["bearish"]]
 
     print("\n================ ERGEBNIS-ZUSAMMENFASSUNG ===============")
     if not found:
+        checkpoint.finish()
         print("Keine Divergenzen in den ausgewählten Märkten gefunden.")
+        timing.finish_scan_timer()
         return
 
     for item in found:
@@ -400,18 +563,59 @@ def run_divergence_scanner(
 
     print("\n[INFO] Öffne Charts nacheinander. Fenster schließen, um fortzufahren...\n")
 
-    for item in found:
-        plot_candles(
-            item["df"],
+    use_gui_backend()
+    from utils.chart.browser import BrowserItem, show_chart_browser
+    from utils.chart.decimate import lod_max_bars
+    from utils.chart.plotter import plot_candles, render_candle_png
+    from utils.chart.report import ReportRow, write_scan_report
+
+    chart_args = [
+        dict(
+            df=item["df"],
             title=f"{item['symbol']} [{item['market']}] {timeframe}",
             name=item["name"],
             symbol=item["symbol"],
             index=item["market"],
             timeframe=timeframe,
             divergences=item["result"],
+            max_bars=lod_max_bars(cfg),
         )
+        for item in found
+    ]
+    browser_items = [
+        BrowserItem(args["title"], render_candle_png, args) for args in chart_args
+    ]
 
+    if not show_chart_browser(browser_items, cfg):
+        for args in chart_args:
+            with timing.symbol(f"{args['index']}|{args['symbol']}"), timing.stage("render"):
+                plot_candles(**args)
+
+    report_path = write_scan_report(
+        "divergenzen",
+        timeframe,
+        [
+            ReportRow(
+                chart,
+                {
+                    "Markt": item["market"],
+                    "Symbol": item["symbol"],
+                    "Name": item["name"],
+                    "Bullish": item["bullish"],
+                    "Bearish": item["bearish"],
+                },
+            )
+            for item, chart in zip(found, browser_items)
+        ],
+        cfg,
+    )
+    if report_path is not None:
+        print(f"[INFO] HTML-Report: {report_path}\n")
+
+    mark_keys_reported(cfg, "divergence", new_keys)
+    checkpoint.finish()
     print("\n[OK] Analyse abgeschlossen.")
+    timing.finish_scan_timer()
 
 
 def run_market_scanner(
@@ -419,9 +623,15 @@ def run_market_scanner(
     cfg: Dict[str, Any],
     detector: DivergenceDetector,
     timeframe_choices: List[str],
+    resume: bool = False,
+    profile: bool = False,
+    trace_memory: bool = False,
 ) -> None:
     """
     Hauptmenü für alle Scanner.
+
+    Mit profile=True läuft der gewählte Scanner unter cProfile
+    (optional mit tracemalloc), siehe utils/profiling.py.
     """
     scan_mode = questionary.select(
         "Was möchtest du scannen?",
@@ -438,47 +648,131 @@ def run_market_scanner(
         print("[INFO] Auswahl abgebrochen.")
         return
 
+    use_gui_backend()
+
+    from utils.profiling import profile_scan
+
+    with profile_scan(scan_mode, enabled=profile, trace_memory=trace_memory):
+        _run_scan_mode(scan_mode, markets, cfg, detector,
+                       timeframe_choices, resume)
+
+
+def _run_scan_mode(
+    scan_mode: str,
+    markets: Dict[str, List[Dict[str, Any]]],
+    cfg: Dict[str, Any],
+    detector: DivergenceDetector,
+    timeframe_choices: List[str],
+    resume: bool,
+) -> None:
+    """
+    Startet den gewählten Scanner.
+    """
     if scan_mode == "divergence":
-        run_divergence_scanner(markets, cfg, detector, timeframe_choices)
+        run_divergence_scanner(markets, cfg, detector,
+                               timeframe_choices, resume=resume)
         return
 
     if scan_mode == "liquidity":
-        scan_liquidity_grabs(markets, cfg, timeframe_choices)
+        from modules.liquidityGrabScanner.scanner import scan_liquidity_grabs
+
+        scan_liquidity_grabs(markets, cfg, timeframe_choices, resume=resume)
         return
 
     if scan_mode == "sma":
-        finde_sma_korrekturen(markets, cfg, timeframe_choices)
+        from modules.sma_korrekturen_finden import finde_sma_korrekturen
+
+        finde_sma_korrekturen(markets, cfg, timeframe_choices, resume=resume)
         return
 
     if scan_mode == "donchian":
-        selected_markets = _select_markets(markets)
-        if not selected_markets:
+        scope = _select_scan_scope(
+            "donchian", markets, timeframe_choices, resume)
+        if not scope:
             return
+        selected_markets, timeframe = scope
 
-        timeframe = _select_timeframe(timeframe_choices)
-        if not timeframe:
-            return
+        from modules.donchian_scanner import scan_donchian
 
-        scan_donchian(selected_markets, markets, cfg, timeframe)
+        scan_donchian(selected_markets, markets, cfg,
+                      timeframe, resume=resume)
         return
 
     if scan_mode == "rsi":
-        scan_rsi_range(markets, cfg, timeframe_choices)
+        from modules.rsi_scanner import scan_rsi_range
+
+        scan_rsi_range(markets, cfg, timeframe_choices, resume=resume)
         return
 
     print("[INFO] Auswahl abgebrochen.")
 
 
-def main() -> None:
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Kommandozeilen-Optionen.
+    """
+    parser = argparse.ArgumentParser(description="Divergenzen-Scanner")
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="unterbrochenen Markt-Scan ab dem letzten Checkpoint fortsetzen",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="gewählten Scanner mit cProfile profilen (outputs/profiles/<timestamp>/)",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="zusätzlich zu --profile Allokationen per tracemalloc aufzeichnen",
+    )
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help="Kursdaten aus dem gespeicherten Dataset statt von Yahoo/OANDA laden (offline)",
+    )
+    parser.add_argument(
+        "--as-of",
+        metavar="ZEITPUNKT",
+        help="mit --replay: Scan so ausführen, als wäre es dieser Zeitpunkt (UTC, z. B. '2024-06-28 22:00')",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="alle Kursdaten neu laden, auch wenn laut Frische-Index keine neue Bar geschlossen hat",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
     """
     Programmeinstieg.
     """
+    args = parse_args(argv)
+
     # ensure_export_structure() # erstellt Ordner für Kursdaten-Export
 
     cfg = load_config()
     if not cfg:
         return
 
+    from utils.daten.sources import configure_data_sources
+
+    if args.replay or args.as_of:
+        replay_cfg = dict(cfg.get("replay") or {})
+        replay_cfg["enabled"] = True
+        if args.as_of:
+            replay_cfg["as_of"] = args.as_of
+        cfg["replay"] = replay_cfg
+    if args.refresh:
+        cfg["freshness"] = {**(cfg.get("freshness") or {}), "enabled": False}
+    try:
+        configure_data_sources(cfg)
+    except ValueError as exc:
+        print(f"[ERROR] Ungueltiger Replay-Zeitpunkt: {exc}")
+        return
+
     markets_path = cfg.get("settings", {}).get("markets_file")
     if not markets_path:
         print("[ERROR] Kein markets_file in der Konfiguration angegeben.")
@@ -490,23 +784,48 @@ def main() -> None:
         return
 
     timeframe_choices = get_timeframe_choices(cfg)
-    detector = build_detector(cfg)
 
     mode = questionary.select(
         "Moechtest du einen Einzelwert analysieren oder Maerkte scannen?",
         choices=[
             questionary.Choice("Einzelnen Wert analysieren", "single"),
             questionary.Choice("Maerkte scannen", "scan"),
+            questionary.Choice("Maerkte beobachten (Watch-Modus)", "watch"),
         ],
     ).ask()
 
     if mode == "single":
+        detector = build_detector(cfg)
         run_single_analysis(markets, cfg, detector, timeframe_choices)
     elif mode == "scan":
-        run_market_scanner(markets, cfg, detector, timeframe_choices)
+        detector = build_detector(cfg)
+        run_market_scanner(
+            markets,
+            cfg,
+            detector,
+            timeframe_choices,
+            resume=args.resume,
+            profile=args.profile or args.trace_memory,
+            trace_memory=args.trace_memory,
+        )
+    elif mode == "watch":
+        from modules.watch_daemon import run_watch_daemon
+
+        run_watch_daemon(markets, cfg, timeframe_choices)
     else:
         print("[INFO] Auswahl abgebrochen.")
 
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    except KeyboardInterrupt:
+        from utils.daten.checkpoint import pending_checkpoints
+
+        if pending_checkpoints():
+            print(
+                "\n[INFO] Abgebrochen. Ein unterbrochener Scan kann mit "
+                "'python main.py --resume' fortgesetzt werden."
+            )
+        else:
+            print("\n[INFO] Abgebrochen.")
@@ -1,5 +1,6 @@
 ﻿# /modules/divergence_detector.py
 import pandas as pd
+from utils import timing
 from .rsi_wilder import compute_rsi_wilder
 
 
@@ -26,10 +27,11 @@ class DivergenceDetector:
         if df is None or df.empty:
             return {"df": df, "bullish": [], "bearish": []}
 
-        data = df.copy()
-        data["rsi"] = compute_rsi_wilder(data["close"], self.rsi_period)
-        data["rsi_hist"] = data["rsi"] - 50
-        data["ema_50"] = data["close"].ewm(span=50, adjust=False).mean()
+        with timing.stage("indicator"):
+            data = df.copy()
+            data["rsi"] = compute_rsi_wilder(data["close"], self.rsi_period)
+            data["rsi_hist"] = data["rsi"] - 50
+            data["ema_50"] = data["close"].ewm(span=50, adjust=False).mean()
 
         n = self.fractal_periods
         if n <= 0:
@@ -1,15 +1,52 @@
 # /modules/donchian_scanner.py
 
+from utils import timing
+from utils.daten.checkpoint import ScanCheckpoint
 from utils.daten.data_loader import load_data
-from utils.chart.donchian_plotter import plot_donchian_chart
-
-def scan_donchian(selected_markets, markets, cfg, timeframe):
+from utils.daten.exporter import open_scan_export
+from utils.chart.browser import BrowserItem, show_chart_browser
+from utils.chart.decimate import lod_max_bars
+from utils.chart.donchian_plotter import plot_donchian_chart, render_donchian_png
+from utils.chart.report import ReportRow, write_scan_report
+
+
+def _classify_setup(last, warn, warn_percent):
+    """Liefert die Setup-Beschreibung der letzten Kerze oder None."""
+    # ===== SHORT SETUPS =====
+    if last["close"] < last["SMA200"]:
+        # Short Entry Setup (Touch Donchian High)
+        if last["high"] >= last["don_high"]:
+            return "SHORT-Setup (Touch Donchian High)"
+        # Short Watchlist
+        if last["close"] >= last["don_high"] * (1 - warn):
+            return f"SHORT-Watchlist (innerhalb {warn_percent}%)"
+
+    # ===== LONG SETUPS =====
+    if last["close"] > last["SMA200"]:
+        # Long Entry Setup (Touch Donchian Low)
+        if last["low"] <= last["don_low"]:
+            return "LONG-Setup (Touch Donchian Low)"
+        # Long Watchlist
+        if last["close"] <= last["don_low"] * (1 + warn):
+            return f"LONG-Watchlist (innerhalb {warn_percent}%)"
+
+    return None
+
+
+def scan_donchian(selected_markets, markets, cfg, timeframe, resume=False):
     source = cfg["settings"]["default_source"]
     sma_period = cfg["SMA"]["langfristig"]
     donchian_period = cfg["donchian"]["period"]
     warn = cfg["donchian"]["warn_distance_percent"] / 100   # z.B. 2% → 0.02
 
     results = []
+    checkpoint = ScanCheckpoint(
+        "donchian", {"timeframe": timeframe, "markets": list(selected_markets)}, resume=resume
+    )
+
+    scan_export = open_scan_export(cfg)
+
+    timing.start_scan_timer("donchian", timeframe, cfg)
 
     print("\n================ STARTE DONCHIAN-SCANNER ===============")
 
@@ -18,43 +55,43 @@ def scan_donchian(selected_markets, markets, cfg, timeframe):
 
         for asset in markets.get(market_key, []):
             symbol = asset["symbol"]
-
-            df = load_data(symbol=symbol, source=source, timeframe=timeframe)
-            if df.empty or len(df) < donchian_period:
+            checkpoint_key = f"{market_key}|{symbol}"
+            if checkpoint_key in checkpoint:
+                hit = checkpoint.get(checkpoint_key)
+                if hit:
+                    results.append(hit)
                 continue
 
-            # Indikatoren
-            df["SMA200"] = df["close"].rolling(sma_period).mean()
-            df["don_high"] = df["high"].rolling(donchian_period).max()
-            df["don_low"] = df["low"].rolling(donchian_period).min()
-
-            last = df.iloc[-1]
-
-            # ===== SHORT SETUPS =====
-            if last["close"] < last["SMA200"]:
-                # Short Entry Setup (Touch Donchian High)
-                if last["high"] >= last["don_high"]:
-                    results.append((symbol, market_key, "SHORT-Setup (Touch Donchian High)", df))
-                    continue
-                # Short Watchlist
-                if last["close"] >= last["don_high"] * (1 - warn):
-                    results.append((symbol, market_key, f"SHORT-Watchlist (innerhalb {cfg['donchian']['warn_distance_percent']}%)", df))
-                    continue
-
-            # ===== LONG SETUPS =====
-            if last["close"] > last["SMA200"]:
-                # Long Entry Setup (Touch Donchian Low)
-                if last["low"] <= last["don_low"]:
-                    results.append((symbol, market_key, "LONG-Setup (Touch Donchian Low)", df))
-                    continue
-                # Long Watchlist
-                if last["close"] <= last["don_low"] * (1 + warn):
-                    results.append((symbol, market_key, f"LONG-Watchlist (innerhalb {cfg['donchian']['warn_distance_percent']}%)", df))
+            with timing.symbol(checkpoint_key):
+                df = load_data(symbol=symbol, source=source, timeframe=timeframe)
+                if df.empty or len(df) < donchian_period:
                     continue
+                if scan_export is not None:
+                    scan_export.add(source, timeframe, symbol, df)
+
+                # Indikatoren
+                with timing.stage("indicator"):
+                    df["SMA200"] = df["close"].rolling(sma_period).mean()
+                    df["don_high"] = df["high"].rolling(donchian_period).max()
+                    df["don_low"] = df["low"].rolling(donchian_period).min()
+
+                with timing.stage("detection"):
+                    msg = _classify_setup(df.iloc[-1], warn, cfg["donchian"]["warn_distance_percent"])
+                if msg:
+                    results.append((symbol, market_key, msg, df))
+                    checkpoint.record(checkpoint_key, results[-1])
+                else:
+                    checkpoint.record(checkpoint_key, None)
+
+    if scan_export is not None:
+        with timing.stage("save"):
+            scan_export.close()
 
     print("\n================ ERGEBNISSE ===============")
     if not results:
+        checkpoint.finish()
         print("Keine Signale gefunden.")
+        timing.finish_scan_timer()
         return
 
     for sym, mk, msg, _ in results:
@@ -62,13 +99,49 @@ def scan_donchian(selected_markets, markets, cfg, timeframe):
 
     print("\n[INFO] Öffne Charts nacheinander. Fenster schließen → nächster Chart.\n")
 
-    for sym, mk, msg, df in results:
-        plot_donchian_chart(
-            df,
+    chart_args = [
+        dict(
+            df=df,
             title=f"{sym} | {mk} | {msg}",
             symbol=sym,
             index=mk,
-            timeframe=timeframe
+            timeframe=timeframe,
+            max_bars=lod_max_bars(cfg),
         )
-
+        for sym, mk, msg, df in results
+    ]
+    browser_items = [
+        BrowserItem(args["title"], render_donchian_png, args) for args in chart_args
+    ]
+
+    if not show_chart_browser(browser_items, cfg):
+        for args in chart_args:
+            with timing.symbol(f"{args['index']}|{args['symbol']}"), timing.stage("render"):
+                plot_donchian_chart(**args)
+
+    report_path = write_scan_report(
+        "donchian",
+        timeframe,
+        [
+            ReportRow(
+                chart,
+                {
+                    "Markt": mk,
+                    "Symbol": sym,
+                    "Setup": msg,
+                    "Close": float(df["close"].iloc[-1]),
+                    "SMA200": float(df["SMA200"].iloc[-1]),
+                    "Donchian High": float(df["don_high"].iloc[-1]),
+                    "Donchian Low": float(df["don_low"].iloc[-1]),
+                },
+            )
+            for (sym, mk, msg, df), chart in zip(results, browser_items)
+        ],
+        cfg,
+    )
+    if report_path is not None:
+        print(f"[INFO] HTML-Report: {report_path}\n")
+
+    checkpoint.finish()
     print("\n[OK] Alle Charts angezeigt.\n")
+    timing.finish_scan_timer()
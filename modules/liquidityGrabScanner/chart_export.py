@@ -0,0 +1,237 @@
+"""
+modules/liquidityGrabScanner/chart_export.py
+
+Paralleler PNG-Export der Liquidity-Grab-Treffer.
+
+Jeder Treffer wird als ChartJob an einen Prozess-Pool übergeben; die Worker
+laufen mit dem Agg-Backend und rendern pro Treffer das FULL- und das
+ZOOM-Bild in den Speicher. Ein Hintergrund-Thread des Hauptprozesses
+schreibt die PNG-Bytes in Fertigstellungsreihenfolge direkt ins ZIP-Archiv
+(ohne erneute Kompression, PNGs sind bereits komprimiert) und optional
+zusätzlich als lose Dateien – unabhängig davon, wie lange die Chart-Fenster
+offen bleiben.
+
+Bei wenigen Treffern oder `export_workers: 1` wird seriell im Hauptprozess
+exportiert, weil der Start der Worker (Import von pandas/matplotlib) sonst
+teurer ist als das Rendern selbst.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+import pandas as pd
+
+# Ab so vielen Treffern lohnt sich der Pool
+MIN_JOBS_FOR_POOL = 3
+MAX_AUTO_WORKERS = 8
+
+
+@dataclass
+class ChartJob:
+    """Alles, was ein Worker zum Rendern von FULL- und ZOOM-Bild braucht."""
+
+    key: str
+    df: pd.DataFrame
+    signals: List[Any]
+    levels: List[Any]
+    title: str
+    full_name: str
+    zoom_name: str
+    zoom_fraction: float
+    min_zoom_bars: int
+    overlay_cfg: Dict[str, Any] = field(default_factory=dict)
+    # Einstellungen aus chart_cache_settings(cfg); None = ohne Cache
+    cache_settings: Dict[str, Any] | None = None
+    # Level-of-Detail aus lod_max_bars(cfg); None = alle Bars zeichnen
+    max_bars: int | None = None
+
+
+def resolve_export_workers(lg_cfg: Dict[str, Any], jobs: int) -> int:
+    """
+    Anzahl Worker aus `liquidity_grab.export_workers`
+    (0 = automatisch: CPU-Kerne - 1, höchstens MAX_AUTO_WORKERS).
+    """
+    configured = int(lg_cfg.get("export_workers", 0) or 0)
+    if configured <= 0:
+        configured = min(max((os.cpu_count() or 1) - 1, 1), MAX_AUTO_WORKERS)
+    return max(1, min(configured, jobs))
+
+
+def _init_worker() -> None:
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+
+def render_chart_job(job: ChartJob) -> List[tuple[str, bytes]]:
+    """Rendert einen Treffer einmal; liefert (Name, PNG-Bytes) für FULL und ZOOM."""
+    from utils.chart.chart_cache import ChartCache
+
+    from .plotter import ChartView, render_liquidity_grab_chart_views
+
+    cache = ChartCache(**job.cache_settings) if job.cache_settings else None
+    rendered = render_liquidity_grab_chart_views(
+        df=job.df,
+        signals=job.signals,
+        levels=job.levels,
+        views=[
+            ChartView(job.full_name, f"{job.title} | FULL"),
+            ChartView(
+                job.zoom_name,
+                f"{job.title} | ZOOM_LAST_THIRD",
+                zoom_last_fraction=job.zoom_fraction,
+                min_zoom_bars=job.min_zoom_bars,
+            ),
+        ],
+        overlay_cfg=job.overlay_cfg,
+        cache=cache,
+        max_bars=job.max_bars,
+    )
+    return [(str(view.file_path), png) for view, png in rendered]
+
+
+class ChartExporter:
+    """
+    Verteilt ChartJobs auf einen Prozess-Pool (spawn, damit kein bereits
+    initialisiertes GUI-Backend in die Worker geforkt wird).
+
+        exporter = ChartExporter(workers=4)
+        exporter.submit(job)
+        ...
+        exporter.archive_to(archive)   # schreibt im Hintergrund
+        ...                            # z. B. Chart-Fenster anzeigen
+        exporter.wait()
+    """
+
+    def __init__(self, workers: int) -> None:
+        self.workers = max(1, int(workers))
+        self._pool: ProcessPoolExecutor | None = None
+        self._pending: List[tuple[ChartJob, Future | None]] = []
+        self._writer: threading.Thread | None = None
+        # FULL-Bild je key, sobald der Job fertig ist (für den Chart-Browser)
+        self._full: Dict[str, Future] = {}
+
+    def submit(self, job: ChartJob) -> None:
+        if self.workers > 1 and self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+
+        future = self._pool.submit(render_chart_job, job) if self._pool else None
+        self._pending.append((job, future))
+        self._full[job.key] = Future()
+
+    def full_image(self, key: str) -> Future | None:
+        """
+        Future mit den PNG-Bytes des FULL-Bilds (None bei Fehler); erfüllt,
+        sobald `results()` den Job abgeholt hat (z. B. durch `archive_to`).
+        """
+        return self._full.get(key)
+
+    def results(self) -> Iterator[tuple[str, List[tuple[str, bytes]]]]:
+        """
+        Liefert (key, [(Name, PNG-Bytes), ...]) in Fertigstellungsreihenfolge. Seriell wird
+        erst hier gerendert; Fehler einzelner Jobs werden gemeldet, nicht geworfen.
+        """
+        jobs = {id(future): job for job, future in self._pending if future is not None}
+        serial = [job for job, future in self._pending if future is None]
+        futures = [future for _job, future in self._pending if future is not None]
+        try:
+            for future in as_completed(futures):
+                yield self._collect(jobs[id(future)], future.result)
+            for job in serial:
+                yield self._collect(job, lambda job=job: render_chart_job(job))
+        finally:
+            self._pending = []
+            self.close()
+
+    def _collect(self, job: ChartJob, render) -> tuple[str, List[tuple[str, bytes]]]:
+        try:
+            images = render()
+        except Exception as exc:
+            print(f"[Fehler] Chart-Export für {job.key} fehlgeschlagen: {exc}")
+            images = []
+        full = self._full.get(job.key)
+        if full is not None and not full.done():
+            full.set_result(dict(images).get(job.full_name))
+        return job.key, images
+
+    def archive_to(self, archive: "ChartArchive") -> None:
+        """
+        Schreibt alle Treffer nach `archive`. Mit Pool in einem Hintergrund-Thread,
+        sobald ein Worker fertig ist; seriell sofort (pyplot rendert nur im
+        Haupt-Thread zuverlässig, und wenige Treffer sind schnell gerendert).
+        """
+        if self._pool is None:
+            self._write(archive)
+            return
+        self._writer = threading.Thread(
+            target=self._write, args=(archive,), name="chart-archive", daemon=True)
+        self._writer.start()
+
+    def _write(self, archive: "ChartArchive") -> None:
+        for _key, images in self.results():
+            for arcname, png in images:
+                archive.add(arcname, png)
+
+    def wait(self) -> None:
+        """Wartet, bis `archive_to` alle Treffer geschrieben hat."""
+        if self._writer is not None:
+            self._writer.join()
+            self._writer = None
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+
+def create_exporter(lg_cfg: Dict[str, Any], jobs: int) -> ChartExporter:
+    workers = resolve_export_workers(lg_cfg, jobs)
+    if jobs < MIN_JOBS_FOR_POOL:
+        workers = 1
+    return ChartExporter(workers)
+
+
+class ChartArchive:
+    """
+    Schreibt gerenderte PNGs direkt in `<scan_dir>/<scan_dir.name>.zip`
+    (ZIP_STORED) und optional zusätzlich als lose Dateien unter `scan_dir`.
+    """
+
+    def __init__(self, scan_dir: Path, write_loose_files: bool = True) -> None:
+        self.scan_dir = Path(scan_dir)
+        self.zip_path = self.scan_dir / f"{self.scan_dir.name}.zip"
+        self.write_loose_files = write_loose_files
+        self.count = 0
+        self.scan_dir.mkdir(parents=True, exist_ok=True)
+
+        import zipfile
+
+        self._zip = zipfile.ZipFile(self.zip_path, "w", compression=zipfile.ZIP_STORED)
+
+    def add(self, name: str, data: bytes) -> None:
+        self._zip.writestr(name, data)
+        if self.write_loose_files:
+            path = self.scan_dir / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+        self.count += 1
+
+    def close(self) -> None:
+        self._zip.close()
+
+    def __enter__(self) -> "ChartArchive":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
@@ -28,6 +28,8 @@ from typing import Any, Dict, List, Literal, Optional, Tuple
 
 import pandas as pd
 
+from utils import timing
+
 from .levels import (
     LiquidityLevel,
     build_liquidity_levels,
@@ -754,21 +756,23 @@ class LiquidityGrabDetector:
         if not required.issubset(df.columns):
             return {"df": df, "levels": [], "signals": []}
 
-        data = df.copy()
-
-        if self.trend_filter == "sma200":
-            sma_col = f"SMA{self.trend_sma_period}"
-            data[sma_col] = data["close"].rolling(self.trend_sma_period).mean()
-
-        levels = build_liquidity_levels(
-            df=data,
-            pivot_bars=self.pivot_bars,
-            max_reference_age_bars=self.max_reference_age_bars,
-            max_levels_per_side=self.max_levels_per_side,
-            use_equal_levels=self.use_equal_levels,
-            equal_level_threshold_percent=self.equal_level_threshold_percent,
-            equal_level_recent_weight=self.equal_level_recent_weight,
-        )
+        with timing.stage("indicator"):
+            data = df.copy()
+
+            if self.trend_filter == "sma200":
+                sma_col = f"SMA{self.trend_sma_period}"
+                data[sma_col] = data["close"].rolling(
+                    self.trend_sma_period).mean()
+
+            levels = build_liquidity_levels(
+                df=data,
+                pivot_bars=self.pivot_bars,
+                max_reference_age_bars=self.max_reference_age_bars,
+                max_levels_per_side=self.max_levels_per_side,
+                use_equal_levels=self.use_equal_levels,
+                equal_level_threshold_percent=self.equal_level_threshold_percent,
+                equal_level_recent_weight=self.equal_level_recent_weight,
+            )
 
         signals: List[LiquiditySignal] = []
         consumed_level_keys = set()
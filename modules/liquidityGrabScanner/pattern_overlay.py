@@ -62,14 +62,15 @@ def find_engulfings(df: pd.DataFrame) -> List[EngulfingPattern]:
 
     patterns: List[EngulfingPattern] = []
 
-    for i in range(1, len(df)):
-        prev = df.iloc[i - 1]
-        curr = df.iloc[i]
+    # Spalten einmal als Float-Listen statt df.iloc je Bar
+    opens = df["open"].to_numpy(dtype=float).tolist()
+    closes = df["close"].to_numpy(dtype=float).tolist()
 
-        prev_open = float(prev["open"])
-        prev_close = float(prev["close"])
-        curr_open = float(curr["open"])
-        curr_close = float(curr["close"])
+    for i in range(1, len(df)):
+        prev_open = opens[i - 1]
+        prev_close = closes[i - 1]
+        curr_open = opens[i]
+        curr_close = closes[i]
 
         prev_body_low = min(prev_open, prev_close)
         prev_body_high = max(prev_open, prev_close)
@@ -131,14 +132,14 @@ def find_fair_value_gaps(
 
     gaps: List[FairValueGap] = []
 
-    for i in range(2, len(df)):
-        c1 = df.iloc[i - 2]
-        c3 = df.iloc[i]
+    highs = df["high"].to_numpy(dtype=float).tolist()
+    lows = df["low"].to_numpy(dtype=float).tolist()
 
-        c1_high = float(c1["high"])
-        c1_low = float(c1["low"])
-        c3_high = float(c3["high"])
-        c3_low = float(c3["low"])
+    for i in range(2, len(df)):
+        c1_high = highs[i - 2]
+        c1_low = lows[i - 2]
+        c3_high = highs[i]
+        c3_low = lows[i]
 
         if c3_low > c1_high:
             gap_bottom = c1_high
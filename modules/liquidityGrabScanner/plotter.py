@@ -4,16 +4,22 @@ modules/liquidityGrabScanner/plotter.py
 
 from __future__ import annotations
 
+import io
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List
+from typing import Any, List
 
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-from matplotlib.patches import Rectangle
 from matplotlib.ticker import FuncFormatter, MaxNLocator
 
+from utils import timing
+from utils.chart.candles import draw_boxes, draw_candles, draw_hlines
+from utils.chart.chart_cache import ChartCache, chart_key
+from utils.chart.decimate import decimate_ohlc, positions_of, resolve_max_bars
+
 from .detector import LiquiditySignal
 from .levels import LiquidityLevel
 from .pattern_overlay import find_engulfings, find_fair_value_gaps
@@ -146,25 +152,47 @@ def _get_overlay_cfg(data: pd.DataFrame) -> dict:
     return {}
 
 
-def _build_x_mapping(data: pd.DataFrame) -> tuple[np.ndarray, dict[pd.Timestamp, int]]:
-    x = np.arange(len(data), dtype=float)
-    pos_by_time = {ts: i for i, ts in enumerate(data.index)}
-    return x, pos_by_time
+def _build_x_mapping(data: pd.DataFrame, positions: np.ndarray | None = None):
+    """
+    x-Werte der gezeichneten Bars plus Funktion Zeitstempel -> x-Position.
+
+    `data` ist die volle Historie; mit `positions` (Decimation.positions)
+    wird die Original-Position auf den Bucket im verdichteten Chart
+    abgebildet, so dass auch Zeitstempel ohne eigenen Bucket ihre Kerze finden.
+    """
+    if positions is None:
+        positions = np.arange(len(data))
+    x = np.arange(int(positions[-1]) + 1 if len(positions) else 0, dtype=float)
+
+    def x_of(ts) -> int | None:
+        found = positions_of(data.index, [ts])
+        return int(positions[found[0]]) if found else None
+
+    return x, x_of
+
 
+def _is_daily(index: pd.DatetimeIndex) -> bool:
+    inferred = pd.infer_freq(index) if len(index) >= 3 else None
+    return bool(inferred and "D" in inferred.upper())
+
+
+def _make_time_formatter(
+    index: pd.DatetimeIndex,
+    visible_bars: int | None = None,
+    daily_index: bool | None = None,
+) -> FuncFormatter:
+    # daily_index vom Original-Index übernehmen, wenn `index` verdichtet ist
+    visible_bars = len(index) if visible_bars is None else visible_bars
+    daily_index = _is_daily(index) if daily_index is None else daily_index
+    daily = visible_bars > 40 and daily_index
 
-def _make_time_formatter(index: pd.DatetimeIndex) -> FuncFormatter:
     def _formatter(value, _pos):
         i = int(round(value))
         if i < 0 or i >= len(index):
             return ""
 
         ts = index[i]
-
-        if len(index) <= 40:
-            return ts.strftime("%d.%m\n%H:%M")
-
-        inferred = pd.infer_freq(index)
-        if inferred and "D" in inferred.upper():
+        if daily:
             return ts.strftime("%d.%m.%Y")
 
         return ts.strftime("%d.%m\n%H:%M")
@@ -172,61 +200,70 @@ def _make_time_formatter(index: pd.DatetimeIndex) -> FuncFormatter:
     return FuncFormatter(_formatter)
 
 
+@dataclass
+class ChartView:
+    """
+    Ein Ausschnitt (FULL oder ZOOM) eines gerenderten Charts.
+    `file_path` ist der Zielpfad bzw. beim Streamen der Name im ZIP-Archiv.
+    """
+
+    file_path: str | Path
+    title: str
+    zoom_last_fraction: float | None = None
+    min_zoom_bars: int = 30
+
+
+@dataclass
+class _RenderedChart:
+    """Figur plus die Artists, die je Ausschnitt ein-/ausgeblendet werden."""
+
+    fig: Any
+    ax: Any
+    data: pd.DataFrame
+    levels: List[LiquidityLevel]
+    sorted_signals: List[LiquiditySignal]
+    signal_artists: list = field(default_factory=list)
+    fvg_spans: list = field(default_factory=list)
+    data_texts: list = field(default_factory=list)
+    level_lines: Any = None
+    full_ylim: tuple[float, float] | None = None
+    # Original-Position -> Position im (ggf. verdichteten) Chart
+    positions: np.ndarray | None = None
+    daily_index: bool = False
+
+
 def _render_chart(
     data: pd.DataFrame,
     signals: List[LiquiditySignal],
     levels: List[LiquidityLevel],
     title: str = "",
+    max_bars: int | None = None,
 ):
+    return _build_chart(data, signals, levels, title, max_bars=max_bars).fig
+
+
+def _build_chart(
+    data: pd.DataFrame,
+    signals: List[LiquiditySignal],
+    levels: List[LiquidityLevel],
+    title: str = "",
+    max_bars: int | None = None,
+    fine_from: int | None = None,
+) -> _RenderedChart:
+    """
+    Baut die Figur. Mit `max_bars` (siehe utils/chart/decimate.py) werden
+    lange Historien verdichtet; Signal-, Referenz-, Follow-Through-, MSS-,
+    FVG- und Engulfing-Bars bleiben als Einzel-Bars erhalten, ab
+    `fine_from` (ZOOM-Beginn) wird feiner verdichtet.
+    """
     _validate_plot_data(data)
 
-    bars_before = len(data)
     sorted_signals = sorted(signals, key=lambda s: (
         s.stage, s.score, s.signal_time), reverse=True)
 
     fig, ax = plt.subplots(figsize=(15, 7.8))
     fig.suptitle(title, fontsize=12, fontweight="bold", y=0.98)
 
-    x, pos_by_time = _build_x_mapping(data)
-
-    bars_after = len(x)
-    if bars_before != bars_after:
-        raise ValueError("Beim Aufbau der Plot-Achse gingen Bars verloren.")
-
-    candle_width = 0.65
-
-    color_up = "#00B050"
-    color_down = "#FF0000"
-
-    for i, (_, row) in enumerate(data.iterrows()):
-        xi = x[i]
-        o = float(row["open"])
-        h = float(row["high"])
-        l = float(row["low"])
-        c = float(row["close"])
-
-        color = color_up if c >= o else color_down
-
-        ax.vlines(xi, l, h, color=color, linewidth=1.0, alpha=0.95, zorder=2)
-
-        rect = Rectangle(
-            (xi - candle_width / 2, min(o, c)),
-            candle_width,
-            max(abs(c - o), 1e-6),
-            facecolor=color,
-            edgecolor="black",
-            linewidth=0.5,
-            alpha=0.95,
-            zorder=3,
-        )
-        ax.add_patch(rect)
-
-    sma_cols = [c for c in data.columns if isinstance(
-        c, str) and c.startswith("SMA")]
-    for col in sma_cols:
-        ax.plot(x, data[col].to_numpy(), linewidth=1.15,
-                alpha=0.9, label=col, zorder=1)
-
     overlay_cfg = _get_overlay_cfg(data)
 
     show_fvg = bool(overlay_cfg.get("show_fvg", True))
@@ -238,57 +275,102 @@ def _render_chart(
     fvg_alpha = float(overlay_cfg.get("fvg_alpha", 0.08))
     engulfing_alpha = float(overlay_cfg.get("engulfing_alpha", 0.55))
 
+    # Muster auf allen Bars suchen, bevor verdichtet wird
+    fvg_list = []
     if show_fvg:
         fvg_list = find_fair_value_gaps(
             data, min_gap_percent=min_fvg_gap_percent)
         fvg_list = fvg_list[-max_fvg_boxes:]
 
-        for fvg in fvg_list:
-            if fvg.end_time not in pos_by_time:
-                continue
+    engulfings = []
+    if show_engulfing:
+        engulfings = find_engulfings(data)
+        engulfings = engulfings[-max_engulfings:]
 
-            left = float(pos_by_time[fvg.end_time])
-            right = left + max(fvg_extend_bars, 1)
-            color = "#00aa55" if fvg.direction == "bullish" else "#cc3333"
-
-            rect = Rectangle(
-                (left, fvg.bottom),
-                width=max(right - left, 0.8),
-                height=max(fvg.top - fvg.bottom, 1e-6),
-                facecolor=color,
-                edgecolor=color,
-                linewidth=0.8,
-                alpha=fvg_alpha,
-                zorder=0.4,
-            )
-            ax.add_patch(rect)
+    daily_index = _is_daily(data.index)
+    full = data
+    lod = None
+    if max_bars is not None:
+        keep_times = [fvg.end_time for fvg in fvg_list]
+        keep_times += [patt.time for patt in engulfings]
+        for signal in sorted_signals:
+            keep_times += [
+                signal.signal_time,
+                signal.reference_time,
+                signal.follow_through_time,
+                signal.mss_time,
+            ]
+        lod = decimate_ohlc(
+            data,
+            resolve_max_bars(max_bars, ax),
+            keep=positions_of(data.index, keep_times),
+            fine_from=fine_from,
+        )
+        data = lod.data
 
-    background_levels = _select_nearest_background_levels(
-        levels, sorted_signals, 4)
-    for lvl in background_levels:
-        ax.axhline(
-            y=float(lvl.price),
-            color=_level_color(lvl),
-            linestyle="--" if lvl.is_equal_pool else ":",
-            linewidth=0.9,
-            alpha=0.20,
-            zorder=0,
+    bars_before = len(data)
+    x, x_of = _build_x_mapping(full, lod.positions if lod is not None else None)
+
+    bars_after = len(x)
+    if bars_before != bars_after:
+        raise ValueError("Beim Aufbau der Plot-Achse gingen Bars verloren.")
+
+    draw_candles(ax, x, data, wick_alpha=0.95, body_alpha=0.95)
+
+    sma_cols = [c for c in data.columns if isinstance(
+        c, str) and c.startswith("SMA")]
+    for col in sma_cols:
+        ax.plot(x, data[col].to_numpy(), linewidth=1.15,
+                alpha=0.9, label=col, zorder=1)
+
+    chart = _RenderedChart(
+        fig=fig,
+        ax=ax,
+        data=data,
+        levels=levels,
+        sorted_signals=sorted_signals,
+        positions=lod.positions if lod is not None and lod.decimated else None,
+        daily_index=daily_index,
+    )
+
+    if fvg_list:
+        fvg_x = [x_of(fvg.end_time) for fvg in fvg_list]
+        fvg_list = [fvg for fvg, xi in zip(fvg_list, fvg_x) if xi is not None]
+        fvg_x = [float(xi) for xi in fvg_x if xi is not None]
+        box_width = max(float(max(fvg_extend_bars, 1)), 0.8)
+        chart.fvg_spans = [
+            (xi, box_width, fvg.bottom, fvg.top)
+            for xi, fvg in zip(fvg_x, fvg_list)
+        ]
+        draw_boxes(
+            ax,
+            left=fvg_x,
+            bottom=[fvg.bottom for fvg in fvg_list],
+            width=[box_width] * len(fvg_list),
+            height=[max(fvg.top - fvg.bottom, 1e-6) for fvg in fvg_list],
+            colors=[
+                "#00aa55" if fvg.direction == "bullish" else "#cc3333"
+                for fvg in fvg_list
+            ],
+            alpha=fvg_alpha,
+            linewidth=0.8,
+            zorder=0.4,
         )
 
+    chart.level_lines = _draw_background_levels(ax, levels, sorted_signals)
+
     y_min = float(data["low"].min())
     y_max = float(data["high"].max())
     y_range = max(y_max - y_min, 1e-6)
 
-    if show_engulfing:
-        engulfings = find_engulfings(data)
-        engulfings = engulfings[-max_engulfings:]
-
+    if engulfings:
         for patt in engulfings:
-            if patt.time not in pos_by_time:
+            xi = x_of(patt.time)
+            if xi is None:
                 continue
 
-            xi = pos_by_time[patt.time]
-            row = data.loc[patt.time]
+            # exakte Werte der Original-Bar, auch wenn sie im Bucket aufgeht
+            row = full.loc[patt.time]
             color = "#00aa55" if patt.direction == "bullish" else "#cc3333"
 
             if patt.direction == "bullish":
@@ -298,7 +380,7 @@ def _render_chart(
                 marker_y = float(row["high"]) + y_range * 0.010
                 va = "bottom"
 
-            ax.text(
+            engulfing_text = ax.text(
                 xi,
                 marker_y,
                 "E",
@@ -316,27 +398,31 @@ def _render_chart(
                     linewidth=0.7,
                 ),
             )
+            # Text wird nicht an der Achse abgeschnitten
+            chart.data_texts.append((float(xi), engulfing_text))
 
     for idx, signal in enumerate(sorted_signals):
-        if signal.signal_time not in pos_by_time:
+        xi = x_of(signal.signal_time)
+        if xi is None:
             continue
 
-        xi = pos_by_time[signal.signal_time]
-        row = data.loc[signal.signal_time]
+        row = full.loc[signal.signal_time]
         sig_color = _signal_color(signal)
+        artists = []
+        y_values = [float(signal.level_price)]
 
-        ax.axhline(
+        artists.append(ax.axhline(
             y=float(signal.level_price),
             color=sig_color,
             linestyle="-",
             linewidth=2.1 if idx == 0 else 1.3,
             alpha=0.78 if idx == 0 else 0.50,
             zorder=1,
-        )
+        ))
 
-        if signal.reference_time in pos_by_time:
-            ref_x = pos_by_time[signal.reference_time]
-            ax.scatter(
+        ref_x = x_of(signal.reference_time)
+        if ref_x is not None:
+            artists.append(ax.scatter(
                 [ref_x],
                 [float(signal.level_price)],
                 s=32,
@@ -346,12 +432,12 @@ def _render_chart(
                 linewidths=1.0,
                 alpha=0.9,
                 zorder=5,
-            )
+            ))
 
-        if signal.follow_through and signal.follow_through_time in pos_by_time:
-            ft_x = pos_by_time[signal.follow_through_time]
-            ft_price = float(data.loc[signal.follow_through_time, "close"])
-            ax.scatter(
+        ft_x = x_of(signal.follow_through_time) if signal.follow_through else None
+        if ft_x is not None:
+            ft_price = float(full.loc[signal.follow_through_time, "close"])
+            artists.append(ax.scatter(
                 [ft_x],
                 [ft_price],
                 s=48,
@@ -359,12 +445,12 @@ def _render_chart(
                 color=sig_color,
                 alpha=0.85,
                 zorder=6,
-            )
+            ))
 
-        if signal.mss_confirmed and signal.mss_time in pos_by_time:
-            mss_x = pos_by_time[signal.mss_time]
-            mss_price = float(data.loc[signal.mss_time, "close"])
-            ax.scatter(
+        mss_x = x_of(signal.mss_time) if signal.mss_confirmed else None
+        if mss_x is not None:
+            mss_price = float(full.loc[signal.mss_time, "close"])
+            artists.append(ax.scatter(
                 [mss_x],
                 [mss_price],
                 s=65,
@@ -372,17 +458,18 @@ def _render_chart(
                 color=sig_color,
                 alpha=0.88,
                 zorder=6,
-            )
+            ))
 
             if signal.mss_level is not None:
-                ax.axhline(
+                y_values.append(float(signal.mss_level))
+                artists.append(ax.axhline(
                     y=float(signal.mss_level),
                     color=sig_color,
                     linestyle="--",
                     linewidth=1.0,
                     alpha=0.35,
                     zorder=1,
-                )
+                ))
 
         if signal.direction == "bullish":
             sweep_extreme = float(row["low"])
@@ -397,7 +484,7 @@ def _render_chart(
             text_y = 0.98
             text_va = "top"
 
-        ax.vlines(
+        artists.append(ax.vlines(
             xi,
             ymin=min(float(signal.level_price), sweep_extreme),
             ymax=max(float(signal.level_price), sweep_extreme),
@@ -405,7 +492,9 @@ def _render_chart(
             linewidth=2.1 if idx == 0 else 1.4,
             alpha=0.82,
             zorder=4,
-        )
+        ))
+
+        y_values.append(marker_y)
 
         marker_size = 110 if idx == 0 else 72
         if signal.stage == 2:
@@ -413,14 +502,14 @@ def _render_chart(
         if signal.stage == 3:
             marker_size += 20
 
-        ax.scatter(
+        artists.append(ax.scatter(
             [xi],
             [marker_y],
             color=sig_color,
             marker=marker,
             s=marker_size,
             zorder=6,
-        )
+        ))
 
         if idx == 0:
             direction_text = "BULL" if signal.direction == "bullish" else "BEAR"
@@ -447,7 +536,7 @@ def _render_chart(
                 f"{' | '.join(flags) if flags else 'raw'}"
             )
 
-            ax.text(
+            artists.append(ax.text(
                 0.015,
                 text_y,
                 label,
@@ -463,13 +552,15 @@ def _render_chart(
                     alpha=0.90,
                 ),
                 zorder=7,
-            )
+            ))
+
+        chart.signal_artists.append((signal, xi, artists, y_values))
 
     ax.set_ylabel("Preis")
     ax.grid(True, linestyle=":", alpha=0.28)
 
     ax.xaxis.set_major_locator(MaxNLocator(nbins=10, integer=True))
-    ax.xaxis.set_major_formatter(_make_time_formatter(data.index))
+    ax.xaxis.set_major_formatter(_make_time_formatter(data.index, daily_index=daily_index))
 
     handles, labels = ax.get_legend_handles_labels()
     if handles:
@@ -478,54 +569,249 @@ def _render_chart(
     ax.set_xlim(-0.5, len(data) - 0.5 + 1.5)
 
     plt.tight_layout()
-    return fig
+    chart.full_ylim = ax.get_ylim()
+    return chart
 
 
-def save_liquidity_grab_chart_image(
+def _draw_background_levels(
+    ax,
+    levels: List[LiquidityLevel],
+    sorted_signals: List[LiquiditySignal],
+):
+    background_levels = _select_nearest_background_levels(
+        levels, sorted_signals, 4)
+    return draw_hlines(
+        ax,
+        ys=[float(lvl.price) for lvl in background_levels],
+        colors=[_level_color(lvl) for lvl in background_levels],
+        linestyles=["--" if lvl.is_equal_pool else ":" for lvl in background_levels],
+        linewidths=0.9,
+        alpha=0.20,
+        zorder=0,
+    )
+
+
+def _apply_view(chart: _RenderedChart, start_idx: int, title: str) -> None:
+    """
+    Stellt die Figur auf den Ausschnitt ab Bar `start_idx` um: x/y-Grenzen,
+    Zeitachse, Titel sowie nur die Signale (und Hintergrund-Levels), deren
+    Signal-Bar im Ausschnitt liegt.
+    """
+    data = chart.data
+    ax = chart.ax
+    total = len(data)
+    if chart.positions is not None:
+        start_idx = int(chart.positions[start_idx])
+    visible_signals = []
+    y_values: List[float] = []
+    for signal, signal_x, artists, signal_y in chart.signal_artists:
+        visible = signal_x >= start_idx
+        for artist in artists:
+            artist.set_visible(visible)
+        if visible:
+            visible_signals.append(signal)
+            y_values.extend(signal_y)
+
+    for x_pos, text in chart.data_texts:
+        text.set_visible(x_pos >= start_idx)
+
+    if chart.level_lines is not None:
+        chart.level_lines.remove()
+    chart.level_lines = _draw_background_levels(ax, chart.levels, visible_signals)
+
+    ax.set_xlim(start_idx - 0.5, total - 0.5 + 1.5)
+    ax.xaxis.set_major_formatter(
+        _make_time_formatter(
+            data.index, visible_bars=total - start_idx, daily_index=chart.daily_index))
+    chart.fig.suptitle(title, fontsize=12, fontweight="bold", y=0.98)
+
+    if start_idx == 0 and chart.full_ylim is not None:
+        ax.set_ylim(chart.full_ylim)
+        return
+
+    # y-Grenzen wie Autoskalierung, aber nur über den sichtbaren Bereich
+    subset = data.iloc[start_idx:]
+    y_values.extend([float(subset["low"].min()), float(subset["high"].max())])
+    for col in subset.columns:
+        if isinstance(col, str) and col.startswith("SMA"):
+            values = subset[col].dropna()
+            if not values.empty:
+                y_values.extend([float(values.min()), float(values.max())])
+    for left, width, bottom, top in chart.fvg_spans:
+        if left + width >= start_idx:
+            y_values.extend([float(bottom), float(top)])
+    if chart.level_lines is not None:
+        y_values.extend(float(seg[0][1]) for seg in chart.level_lines.get_segments())
+
+    y_low, y_high = min(y_values), max(y_values)
+    margin = max(y_high - y_low, 1e-6) * plt.rcParams["axes.ymargin"]
+    ax.set_ylim(y_low - margin, y_high + margin)
+
+
+def render_liquidity_grab_chart_views(
     df: pd.DataFrame,
     signals: List[LiquiditySignal],
     levels: List[LiquidityLevel],
-    title: str,
-    file_path: str | Path,
-    zoom_last_fraction: float | None = None,
-    min_zoom_bars: int = 30,
+    views: List[ChartView],
     overlay_cfg: dict | None = None,
-) -> Path | None:
+    cache: ChartCache | None = None,
+    max_bars: int | None = None,
+) -> List[tuple[ChartView, bytes]]:
+    """
+    Rendert den Chart einmal und erzeugt daraus mehrere Ausschnitte
+    (z. B. FULL und ZOOM), indem nur Achsengrenzen, Titel und sichtbare
+    Annotationen umgestellt werden. Liefert je Ausschnitt die PNG-Bytes.
+
+    Mit `cache` werden unveränderte Ausschnitte (gleiche Daten, Signale,
+    Levels, Overlays, Titel) aus dem Chart-Cache genommen; sind alle
+    Ausschnitte vorhanden, wird der Chart gar nicht aufgebaut.
+    """
     required = {"open", "high", "low", "close"}
     if df is None or df.empty or not required.issubset(df.columns):
         print("[Fehler] Keine gültigen OHLC-Daten zum Speichern vorhanden.")
-        return None
+        return []
 
     data = _prepare_data(df)
     try:
         _validate_plot_data(data)
     except ValueError as exc:
         print(f"[Fehler] {exc}")
-        return None
+        return []
 
-    if zoom_last_fraction is not None:
-        data = _build_subset_for_zoom(
+    overlay_cfg = overlay_cfg or {}
+    data.attrs["overlay_cfg"] = overlay_cfg
+    visible_signals = _filter_signals_for_visible_range(data, signals)
+
+    start_indices = []
+    for view in views:
+        start_idx = 0
+        if view.zoom_last_fraction is not None:
+            subset = _build_subset_for_zoom(
+                data=data,
+                signals=visible_signals,
+                zoom_fraction=view.zoom_last_fraction,
+                min_bars=view.min_zoom_bars,
+            )
+            start_idx = len(data) - len(subset)
+        start_indices.append(start_idx)
+
+    cached: dict[int, bytes] = {}
+    keys: dict[int, str] = {}
+    if cache is not None:
+        for pos, (view, start_idx) in enumerate(zip(views, start_indices)):
+            keys[pos] = chart_key(
+                "liquidity",
+                data,
+                signals=visible_signals,
+                levels=levels,
+                overlay_cfg=overlay_cfg,
+                title=view.title,
+                start_idx=start_idx,
+                max_bars=max_bars,
+                dpi=180,
+            )
+            png = cache.get(keys[pos])
+            if png is not None:
+                cached[pos] = png
+
+    if len(cached) == len(views):
+        return [(view, cached[pos]) for pos, view in enumerate(views)]
+
+    with timing.stage("render"):
+        chart = _build_chart(
             data=data,
-            signals=signals,
-            zoom_fraction=zoom_last_fraction,
-            min_bars=min_zoom_bars,
+            signals=visible_signals,
+            levels=levels,
+            title=views[0].title if views else "",
+            max_bars=max_bars,
+            fine_from=min((idx for idx in start_indices if idx > 0), default=None),
         )
 
-    data.attrs["overlay_cfg"] = overlay_cfg or {}
-    visible_signals = _filter_signals_for_visible_range(data, signals)
+    rendered: List[tuple[ChartView, bytes]] = []
+    try:
+        for pos, (view, start_idx) in enumerate(zip(views, start_indices)):
+            if pos in cached:
+                rendered.append((view, cached[pos]))
+                continue
 
-    fig = _render_chart(
-        data=data,
-        signals=visible_signals,
+            with timing.stage("render"):
+                _apply_view(chart, start_idx, view.title)
+
+            buffer = io.BytesIO()
+            with timing.stage("save"):
+                chart.fig.savefig(buffer, format="png", dpi=180, bbox_inches="tight")
+            png = buffer.getvalue()
+            if cache is not None:
+                cache.put(keys[pos], png)
+            rendered.append((view, png))
+    finally:
+        plt.close(chart.fig)
+
+    return rendered
+
+
+def export_liquidity_grab_chart_views(
+    df: pd.DataFrame,
+    signals: List[LiquiditySignal],
+    levels: List[LiquidityLevel],
+    views: List[ChartView],
+    overlay_cfg: dict | None = None,
+    max_bars: int | None = None,
+) -> List[Path]:
+    """Wie render_liquidity_grab_chart_views, schreibt die Bilder aber nach `view.file_path`."""
+    saved: List[Path] = []
+    for view, png in render_liquidity_grab_chart_views(
+            df, signals, levels, views, overlay_cfg, max_bars=max_bars):
+        file_path = Path(view.file_path)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        with timing.stage("save"):
+            file_path.write_bytes(png)
+        saved.append(file_path)
+    return saved
+
+
+def render_liquidity_grab_chart_png(
+    df: pd.DataFrame,
+    signals: List[LiquiditySignal],
+    levels: List[LiquidityLevel],
+    title: str,
+    overlay_cfg: dict | None = None,
+    cache: ChartCache | None = None,
+    max_bars: int | None = None,
+) -> bytes | None:
+    """PNG-Bytes des vollen Charts (z. B. für den Chart-Browser)."""
+    rendered = render_liquidity_grab_chart_views(
+        df=df,
+        signals=signals,
         levels=levels,
-        title=title,
+        views=[ChartView("chart.png", title)],
+        overlay_cfg=overlay_cfg,
+        cache=cache,
+        max_bars=max_bars,
     )
+    return rendered[0][1] if rendered else None
 
-    file_path = Path(file_path)
-    file_path.parent.mkdir(parents=True, exist_ok=True)
-    fig.savefig(file_path, dpi=180, bbox_inches="tight")
-    plt.close(fig)
-    return file_path
+
+def save_liquidity_grab_chart_image(
+    df: pd.DataFrame,
+    signals: List[LiquiditySignal],
+    levels: List[LiquidityLevel],
+    title: str,
+    file_path: str | Path,
+    zoom_last_fraction: float | None = None,
+    min_zoom_bars: int = 30,
+    overlay_cfg: dict | None = None,
+    max_bars: int | None = None,
+) -> Path | None:
+    saved = export_liquidity_grab_chart_views(
+        df=df,
+        signals=signals,
+        levels=levels,
+        views=[ChartView(file_path, title, zoom_last_fraction, min_zoom_bars)],
+        overlay_cfg=overlay_cfg,
+        max_bars=max_bars,
+    )
+    return saved[0] if saved else None
 
 
 def plot_liquidity_grab_chart(
@@ -534,6 +820,7 @@ def plot_liquidity_grab_chart(
     levels: List[LiquidityLevel],
     title: str = "",
     overlay_cfg: dict | None = None,
+    max_bars: int | None = None,
 ):
     required = {"open", "high", "low", "close"}
     if df is None or df.empty or not required.issubset(df.columns):
@@ -550,12 +837,14 @@ def plot_liquidity_grab_chart(
     data.attrs["overlay_cfg"] = overlay_cfg or {}
     visible_signals = _filter_signals_for_visible_range(data, signals)
 
-    fig = _render_chart(
-        data=data,
-        signals=visible_signals,
-        levels=levels,
-        title=title,
-    )
+    with timing.stage("render"):
+        fig = _render_chart(
+            data=data,
+            signals=visible_signals,
+            levels=levels,
+            title=title,
+            max_bars=max_bars,
+        )
 
     backend_name = plt.get_backend().lower()
     is_gui_backend = any(token in backend_name for token in (
@@ -566,11 +855,12 @@ def plot_liquidity_grab_chart(
         return
 
     try:
-        plt.show(block=False)
-        plt.pause(0.001)
+        with timing.stage("display"):
+            plt.show(block=False)
+            plt.pause(0.001)
 
-        while plt.fignum_exists(fig.number):
-            plt.pause(0.1)
+            while plt.fignum_exists(fig.number):
+                plt.pause(0.1)
     finally:
         if plt.fignum_exists(fig.number):
             plt.close(fig)
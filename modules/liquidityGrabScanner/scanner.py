@@ -5,16 +5,29 @@ modules/liquidityGrabScanner/scanner.py
 from __future__ import annotations
 
 import os
-import zipfile
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Tuple
 
 import questionary
 
+from utils import timing
+from utils.chart.browser import BrowserItem, show_chart_browser
+from utils.chart.chart_cache import chart_cache_settings, open_chart_cache
+from utils.chart.decimate import lod_max_bars
+from utils.chart.report import ReportRow, write_scan_report
+from utils.daten.checkpoint import ScanCheckpoint
 from utils.daten.data_loader import load_data
+from utils.daten.exporter import open_scan_export
+from utils.daten.signal_store import (
+    delta_mode_enabled,
+    liquidity_report_key,
+    mark_keys_reported,
+    open_signal_store,
+)
+from .chart_export import ChartArchive, ChartJob, create_exporter
 from .detector import LiquidityGrabDetector
-from .plotter import plot_liquidity_grab_chart, save_liquidity_grab_chart_image
+from .plotter import plot_liquidity_grab_chart, render_liquidity_grab_chart_png
 
 
 def _resolve_oanda_token(cfg: Dict[str, Any]) -> str | None:
@@ -37,60 +50,107 @@ def _sanitize_filename(text: str) -> str:
     return result.replace(" ", "_")
 
 
-def _create_output_paths(base_root: str = "outputs/liquidity_grab_scans") -> tuple[Path, Path, Path]:
+def _create_scan_dir(base_root: str = "outputs/liquidity_grab_scans") -> Path:
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     scan_dir = Path(base_root) / timestamp
-    full_dir = scan_dir / "full"
-    zoom_dir = scan_dir / "zoom"
-
-    full_dir.mkdir(parents=True, exist_ok=True)
-    zoom_dir.mkdir(parents=True, exist_ok=True)
-
-    return scan_dir, full_dir, zoom_dir
+    scan_dir.mkdir(parents=True, exist_ok=True)
+    return scan_dir
+
+
+def _chart_title(
+    symbol: str,
+    name: str,
+    market_key: str,
+    timeframe: str,
+    payload: Dict[str, Any],
+) -> str:
+    best = payload["signals"][0]
+    return (
+        f"{name} ({symbol}) [{market_key}] {timeframe} | "
+        f"Liquidity Grab | {best.stage_label}"
+    )
 
 
-def _zip_scan_folder(scan_dir: Path) -> Path:
-    zip_path = scan_dir / f"{scan_dir.name}.zip"
+def _keep_unreported_signals(
+    store,
+    results: List[Tuple[str, str, str, Dict[str, Any]]],
+    timeframe: str,
+) -> Tuple[List[Tuple[str, str, str, Dict[str, Any]]], set]:
+    """
+    Delta-Modus: behält nur Signale, die in früheren Läufen noch nicht
+    gemeldet wurden. Liefert (Treffer, neue Schlüssel); als gemeldet gelten
+    die Schlüssel erst nach Anzeige/Export (siehe mark_keys_reported).
+    """
+    all_keys = [
+        liquidity_report_key(symbol, timeframe, signal)
+        for symbol, _name, _market_key, payload in results
+        for signal in payload["signals"]
+    ]
+    new_keys = store.filter_unreported("liquidity", all_keys)
 
-    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
-        for file_path in scan_dir.rglob("*"):
-            if file_path.is_file() and file_path != zip_path:
-                zf.write(file_path, arcname=file_path.relative_to(scan_dir))
+    filtered = []
+    for symbol, name, market_key, payload in results:
+        new_signals = [
+            signal for signal in payload["signals"]
+            if liquidity_report_key(symbol, timeframe, signal) in new_keys
+        ]
+        if new_signals:
+            filtered.append(
+                (symbol, name, market_key, {**payload, "signals": new_signals}))
 
-    return zip_path
+    print(
+        f"[INFO] Delta-Modus: {len(new_keys)} neue Signale, "
+        f"{len(set(all_keys)) - len(new_keys)} bereits gemeldet."
+    )
+    return filtered, new_keys
 
 
 def scan_liquidity_grabs(
     markets: Dict[str, List[Dict[str, Any]]],
     cfg: Dict[str, Any],
     timeframe_choices: List[str],
+    resume: bool = False,
 ) -> None:
     lg_cfg = cfg.get("liquidity_grab", {}) if isinstance(cfg, dict) else {}
 
-    market_choices = [
-        questionary.Choice(title=key, value=key, checked=True)
-        for key in markets.keys()
-    ]
+    saved = ScanCheckpoint.saved_params("liquidity") if resume else None
 
-    selected_markets = questionary.checkbox(
-        "Märkte für Liquidity-Grab-Scan auswählen:",
-        choices=market_choices,
-        validate=lambda sel: bool(
-            sel) or "Bitte mindestens einen Markt wählen.",
-    ).ask()
-
-    if not selected_markets:
-        print("[INFO] Keine Märkte ausgewählt.")
-        return
-
-    timeframe = questionary.select(
-        "Bitte Timeframe auswählen:",
-        choices=timeframe_choices,
-    ).ask()
-
-    if not timeframe:
-        print("[INFO] Auswahl abgebrochen.")
-        return
+    if saved:
+        selected_markets = saved["markets"]
+        timeframe = saved["timeframe"]
+        print(
+            f"[INFO] Fortsetzen: {timeframe} | Märkte: {', '.join(selected_markets)}")
+    else:
+        market_choices = [
+            questionary.Choice(title=key, value=key, checked=True)
+            for key in markets.keys()
+        ]
+
+        selected_markets = questionary.checkbox(
+            "Märkte für Liquidity-Grab-Scan auswählen:",
+            choices=market_choices,
+            validate=lambda sel: bool(
+                sel) or "Bitte mindestens einen Markt wählen.",
+        ).ask()
+
+        if not selected_markets:
+            print("[INFO] Keine Märkte ausgewählt.")
+            return
+
+        timeframe = questionary.select(
+            "Bitte Timeframe auswählen:",
+            choices=timeframe_choices,
+        ).ask()
+
+        if not timeframe:
+            print("[INFO] Auswahl abgebrochen.")
+            return
+
+    checkpoint = ScanCheckpoint(
+        "liquidity",
+        {"timeframe": timeframe, "markets": list(selected_markets)},
+        resume=resume,
+    )
 
     detector = LiquidityGrabDetector(cfg, timeframe=timeframe)
 
@@ -100,6 +160,7 @@ def scan_liquidity_grabs(
     oanda_token = _resolve_oanda_token(cfg)
 
     save_chart_images = bool(lg_cfg.get("save_chart_images", True))
+    save_loose_files = bool(lg_cfg.get("save_loose_files", True))
     show_chart_windows = bool(lg_cfg.get("show_chart_windows", True))
     zoom_fraction = float(lg_cfg.get("save_zoom_fraction", 1 / 3))
     min_zoom_bars = int(lg_cfg.get("save_zoom_min_bars", 30))
@@ -116,11 +177,11 @@ def scan_liquidity_grabs(
     }
 
     scan_dir = None
-    full_dir = None
-    zoom_dir = None
 
     if save_chart_images:
-        scan_dir, full_dir, zoom_dir = _create_output_paths()
+        scan_dir = _create_scan_dir()
+
+    timing.start_scan_timer("liquidity", timeframe, cfg)
 
     print("\n================ STARTE LIQUIDITY-GRAB-SCANNER ================")
     print(
@@ -135,6 +196,7 @@ def scan_liquidity_grabs(
     print()
 
     results: List[Tuple[str, str, str, Dict[str, Any]]] = []
+    scan_export = open_scan_export(cfg)
 
     for market_key in selected_markets:
         entries = markets.get(market_key, [])
@@ -153,48 +215,59 @@ def scan_liquidity_grabs(
                 cfg.get("settings", {}).get("default_source", "yfinance"),
             )
 
-            print(
-                f"[{market_key}] {i:>3}/{total} {symbol:<14} lade Daten...".ljust(
-                    100),
-                end="\r",
-                flush=True,
-            )
-
-            df = load_data(
-                symbol=symbol,
-                source=source,
-                timeframe=timeframe,
-                lookback=lookback_bars,
-                oanda_token=oanda_token,
-            )
-
-            if df is None or df.empty:
-                print(
-                    f"[{market_key}] {i:>3}/{total} {symbol:<14} keine Daten".ljust(
-                        100),
-                    end="\r",
-                    flush=True,
-                )
+            checkpoint_key = f"{market_key}|{symbol}"
+            if checkpoint_key in checkpoint:
+                restored = checkpoint.get(checkpoint_key)
+                if restored is not None:
+                    results.append(restored)
                 continue
 
-            analysis = detector.analyze(df)
-            signals = analysis.get("signals", [])
-            levels = analysis.get("levels", [])
-
-            if not signals:
+            with timing.symbol(checkpoint_key):
                 print(
-                    f"[{market_key}] {i:>3}/{total} {symbol:<14} keine Signale".ljust(
+                    f"[{market_key}] {i:>3}/{total} {symbol:<14} lade Daten...".ljust(
                         100),
                     end="\r",
                     flush=True,
                 )
-                continue
 
-            if not allow_multiple:
-                signals = signals[:1]
+                df = load_data(
+                    symbol=symbol,
+                    source=source,
+                    timeframe=timeframe,
+                    lookback=lookback_bars,
+                    oanda_token=oanda_token,
+                )
 
-            results.append(
-                (
+                if df is None or df.empty:
+                    print(
+                        f"[{market_key}] {i:>3}/{total} {symbol:<14} keine Daten".ljust(
+                            100),
+                        end="\r",
+                        flush=True,
+                    )
+                    continue
+                if scan_export is not None:
+                    scan_export.add(source, timeframe, symbol, df)
+
+                with timing.stage("detection"):
+                    analysis = detector.analyze(df)
+                signals = analysis.get("signals", [])
+                levels = analysis.get("levels", [])
+
+                if not signals:
+                    checkpoint.record(checkpoint_key, None)
+                    print(
+                        f"[{market_key}] {i:>3}/{total} {symbol:<14} keine Signale".ljust(
+                            100),
+                        end="\r",
+                        flush=True,
+                    )
+                    continue
+
+                if not allow_multiple:
+                    signals = signals[:1]
+
+                result = (
                     symbol,
                     name,
                     market_key,
@@ -204,20 +277,44 @@ def scan_liquidity_grabs(
                         "levels": levels,
                     },
                 )
-            )
+                results.append(result)
+                checkpoint.record(checkpoint_key, result)
 
-            best_signal = signals[0]
-            print(
-                f"[{market_key}] {i:>3}/{total} {symbol:<14} "
-                f"STUFE {best_signal.stage} | {best_signal.direction.upper()} "
-                f"{best_signal.signal_type.upper()} | score={best_signal.score:.0f}".ljust(
-                    120),
-                end="\r",
-                flush=True,
-            )
+                best_signal = signals[0]
+                print(
+                    f"[{market_key}] {i:>3}/{total} {symbol:<14} "
+                    f"STUFE {best_signal.stage} | {best_signal.direction.upper()} "
+                    f"{best_signal.signal_type.upper()} | score={best_signal.score:.0f}".ljust(
+                        120),
+                    end="\r",
+                    flush=True,
+                )
 
         print()
 
+    if scan_export is not None:
+        with timing.stage("save"):
+            scan_export.close()
+
+    new_keys: set = set()
+    store = open_signal_store(cfg)
+    if store is not None:
+        with store:
+            scan_id = store.start_scan("liquidity", timeframe, selected_markets)
+            stored = store.insert_liquidity_signals(
+                scan_id,
+                timeframe,
+                (
+                    (symbol, name, market_key, signal)
+                    for symbol, name, market_key, payload in results
+                    for signal in payload["signals"]
+                ),
+            )
+            print(f"[INFO] {stored} Signale im Signal-Store gespeichert: {store.path}")
+
+            if delta_mode_enabled(cfg):
+                results, new_keys = _keep_unreported_signals(store, results, timeframe)
+
     best_per_symbol = {}
 
     for symbol, name, market_key, payload in results:
@@ -238,7 +335,9 @@ def scan_liquidity_grabs(
     results = list(best_per_symbol.values())
 
     if not results:
+        checkpoint.finish()
         print("\n[INFO] Keine Liquidity-Grabs in den ausgewählten Märkten gefunden.")
+        timing.finish_scan_timer()
         return
 
     results.sort(
@@ -265,61 +364,117 @@ def scan_liquidity_grabs(
     print()
 
     saved_count = 0
+    exporter = None
+    archive = None
 
-    for symbol, name, market_key, payload in results:
-        df = payload["df"]
-        signals = payload["signals"]
-        levels = payload["levels"]
-
-        best = signals[0]
-        title = (
-            f"{name} ({symbol}) [{market_key}] {timeframe} | "
-            f"Liquidity Grab | {best.stage_label}"
-        )
-        base_filename = _sanitize_filename(
-            f"{market_key}_{symbol}_{timeframe}")
-
-        if save_chart_images and full_dir and zoom_dir:
-            full_path = full_dir / f"{base_filename}_full.png"
-            zoom_path = zoom_dir / f"{base_filename}_zoom.png"
-
-            saved1 = save_liquidity_grab_chart_image(
-                df=df,
-                signals=signals,
-                levels=levels,
-                title=f"{title} | FULL",
-                file_path=full_path,
-                zoom_last_fraction=None,
-                overlay_cfg=overlay_cfg,
-            )
-            if saved1:
-                saved_count += 1
-
-            saved2 = save_liquidity_grab_chart_image(
-                df=df,
-                signals=signals,
-                levels=levels,
-                title=f"{title} | ZOOM_LAST_THIRD",
-                file_path=zoom_path,
-                zoom_last_fraction=zoom_fraction,
-                min_zoom_bars=min_zoom_bars,
-                overlay_cfg=overlay_cfg,
+    if save_chart_images and scan_dir is not None:
+        exporter = create_exporter(lg_cfg, len(results))
+        cache_settings = chart_cache_settings(cfg)
+        if exporter.workers > 1:
+            print(f"[INFO] Chart-Export mit {exporter.workers} Prozessen...")
+
+        for symbol, name, market_key, payload in results:
+            base_filename = _sanitize_filename(
+                f"{market_key}_{symbol}_{timeframe}")
+            exporter.submit(
+                ChartJob(
+                    key=f"{market_key}|{symbol}",
+                    df=payload["df"],
+                    signals=payload["signals"],
+                    levels=payload["levels"],
+                    title=_chart_title(symbol, name, market_key, timeframe, payload),
+                    full_name=f"full/{base_filename}_full.png",
+                    zoom_name=f"zoom/{base_filename}_zoom.png",
+                    zoom_fraction=zoom_fraction,
+                    min_zoom_bars=min_zoom_bars,
+                    overlay_cfg=overlay_cfg,
+                    cache_settings=cache_settings,
+                    max_bars=lod_max_bars(cfg),
+                )
             )
-            if saved2:
-                saved_count += 1
-
-        if show_chart_windows:
-            plot_liquidity_grab_chart(
-                df=df,
-                signals=signals,
-                levels=levels,
-                title=title,
+
+        # PNG-Bytes direkt ins ZIP, sobald ein Treffer fertig gerendert ist –
+        # auch während die Chart-Fenster noch offen sind
+        archive = ChartArchive(scan_dir, write_loose_files=save_loose_files)
+        exporter.archive_to(archive)
+
+    # das FULL-Bild des Exports wird übernommen (kein zweites Rendern); ohne
+    # Export gleicher Titel wie dessen FULL-Bild -> gemeinsamer Cache-Eintrag
+    browser_items = [
+        BrowserItem(
+            _chart_title(symbol, name, market_key, timeframe, payload),
+            render_liquidity_grab_chart_png,
+            dict(
+                df=payload["df"],
+                signals=payload["signals"],
+                levels=payload["levels"],
+                title=f"{_chart_title(symbol, name, market_key, timeframe, payload)} | FULL",
                 overlay_cfg=overlay_cfg,
+                max_bars=lod_max_bars(cfg),
+            ),
+            ready=exporter.full_image(f"{market_key}|{symbol}") if exporter else None,
+        )
+        for symbol, name, market_key, payload in results
+    ]
+
+    # Fenster im Hauptprozess, während die Worker exportieren
+    try:
+        if show_chart_windows and not show_chart_browser(browser_items, cfg):
+            for symbol, name, market_key, payload in results:
+                title = _chart_title(symbol, name, market_key, timeframe, payload)
+                with timing.symbol(f"{market_key}|{symbol}"):
+                    plot_liquidity_grab_chart(
+                        df=payload["df"],
+                        signals=payload["signals"],
+                        levels=payload["levels"],
+                        title=title,
+                        overlay_cfg=overlay_cfg,
+                        max_bars=lod_max_bars(cfg),
+                    )
+    finally:
+        if exporter is not None:
+            with timing.stage("save"):
+                exporter.wait()
+                archive.close()
+
+    report_rows = []
+    for (symbol, name, market_key, payload), chart in zip(results, browser_items):
+        best = payload["signals"][0]
+        report_rows.append(
+            ReportRow(
+                chart,
+                {
+                    "Markt": market_key,
+                    "Symbol": symbol,
+                    "Name": name,
+                    "Stufe": best.stage,
+                    "Richtung": best.direction,
+                    "Typ": best.signal_type,
+                    "Score": float(best.score),
+                    "Sweep %": float(best.sweep_percent),
+                    "Wick": float(best.wick_ratio),
+                    "Trend": best.trend,
+                    "Mit Trend": bool(best.with_trend),
+                    "Level": float(best.level_price),
+                    "Signale": len(payload["signals"]),
+                },
             )
+        )
+    report_path = write_scan_report("liquidity_grabs", timeframe, report_rows, cfg)
+    if report_path is not None:
+        print(f"[INFO] HTML-Report: {report_path}\n")
 
     zip_path = None
-    if save_chart_images and scan_dir is not None:
-        zip_path = _zip_scan_folder(scan_dir)
+    if archive is not None:
+        saved_count = archive.count
+        zip_path = archive.zip_path
+
+        cache = open_chart_cache(cfg)
+        if cache is not None:
+            cache.prune()
+
+    mark_keys_reported(cfg, "liquidity", new_keys)
+    checkpoint.finish()
 
     print("\n[OK] Liquidity-Grab-Scan abgeschlossen.")
     if save_chart_images and scan_dir is not None:
@@ -327,4 +482,5 @@ def scan_liquidity_grabs(
         print(f"[INFO] Gespeicherte Bilder: {saved_count}")
     if zip_path is not None:
         print(f"[INFO] ZIP-Datei: {zip_path}")
+    timing.finish_scan_timer()
     print()
@@ -4,21 +4,55 @@ from typing import Any, Dict, List, Tuple
 import pandas as pd
 import questionary
 
+from utils import timing
+from utils.daten.checkpoint import ScanCheckpoint
 from utils.daten.data_loader import load_data
+from utils.daten.exporter import open_scan_export
 from modules.rsi_wilder import compute_rsi_wilder
-from utils.chart.plotter import plot_candles
+from utils.chart.browser import BrowserItem, show_chart_browser
+from utils.chart.decimate import lod_max_bars
+from utils.chart.plotter import plot_candles, render_candle_png
+from utils.chart.report import ReportRow, write_scan_report
+
+
+def _classify(
+    rsi: float,
+    df: pd.DataFrame,
+    symbol: str,
+    name: str,
+    market_key: str,
+    lower: float,
+    upper: float,
+    in_range: List[Tuple[str, str, str, float]],
+    below: List[Tuple[str, str, str, float, pd.DataFrame]],
+    above: List[Tuple[str, str, str, float, pd.DataFrame]],
+) -> None:
+    """
+    Ordnet einen RSI-Wert der Range-Liste oder den Ausreißern zu.
+    """
+    # Range-Liste (wie bisher)
+    if lower <= rsi <= upper:
+        in_range.append((symbol, name, market_key, rsi))
+
+    # Ausreißer sammeln (für Plot)
+    if rsi < lower:
+        below.append((symbol, name, market_key, rsi, df))
+    elif rsi > upper:
+        above.append((symbol, name, market_key, rsi, df))
 
 
 def scan_rsi_range(
     markets: Dict[str, List[Dict[str, Any]]],
     cfg: Dict[str, Any],
     timeframe_choices: List[str],
+    resume: bool = False,
 ) -> None:
     """
     Scannt ausgewählte Märkte:
     - zeigt am Ende Werte, deren RSI im Bereich [lower, upper] liegt (Range-Liste)
     - plottet nach dem Durchlauf nur Ausreißer: RSI < lower oder RSI > upper
     - zeigt beim Scan Fortschritt (Symbol + RSI), damit man sieht, dass was passiert
+    - resume=True setzt einen unterbrochenen Scan am Checkpoint fort
     """
 
     # --- Config lesen (mit Defaults) ---
@@ -32,28 +66,49 @@ def scan_rsi_range(
         print(f"[ERROR] rsi_scanner.lower ({lower}) muss kleiner sein als upper ({upper}).")
         return
 
-    # --- Märkte wählen ---
-    market_choices = [
-        questionary.Choice(title=key, value=key, checked=True) for key in markets.keys()
-    ]
-    selected_markets = questionary.checkbox(
-        "Märkte für RSI-Scan auswählen:",
-        choices=market_choices,
-        validate=lambda sel: bool(sel) or "Bitte mindestens einen Markt wählen.",
-    ).ask()
-
-    if not selected_markets:
-        print("[INFO] Keine Märkte ausgewählt.")
-        return
-
-    # --- Timeframe wählen ---
-    timeframe = questionary.select(
-        "Bitte Timeframe auswählen:", choices=timeframe_choices
-    ).ask()
-
-    if not timeframe:
-        print("[INFO] Auswahl abgebrochen.")
-        return
+    saved = ScanCheckpoint.saved_params("rsi") if resume else None
+    if saved:
+        selected_markets = saved["markets"]
+        timeframe = saved["timeframe"]
+        print(f"[INFO] Fortsetzen: {timeframe} | Märkte: {', '.join(selected_markets)}")
+    else:
+        # --- Märkte wählen ---
+        market_choices = [
+            questionary.Choice(title=key, value=key, checked=True) for key in markets.keys()
+        ]
+        selected_markets = questionary.checkbox(
+            "Märkte für RSI-Scan auswählen:",
+            choices=market_choices,
+            validate=lambda sel: bool(sel) or "Bitte mindestens einen Markt wählen.",
+        ).ask()
+
+        if not selected_markets:
+            print("[INFO] Keine Märkte ausgewählt.")
+            return
+
+        # --- Timeframe wählen ---
+        timeframe = questionary.select(
+            "Bitte Timeframe auswählen:", choices=timeframe_choices
+        ).ask()
+
+        if not timeframe:
+            print("[INFO] Auswahl abgebrochen.")
+            return
+
+    # RSI-Parameter gehören zum Checkpoint: geänderte Grenzen → neuer Scan
+    checkpoint = ScanCheckpoint(
+        "rsi",
+        {
+            "timeframe": timeframe,
+            "markets": list(selected_markets),
+            "period": period,
+            "lower": lower,
+            "upper": upper,
+        },
+        resume=resume,
+    )
+
+    timing.start_scan_timer("rsi", timeframe, cfg)
 
     print("\n================ STARTE RSI-SCANNER ================")
     print(f"[INFO] RSI period={period}, lower={lower}, upper={upper}, timeframe={timeframe}\n")
@@ -66,6 +121,7 @@ def scan_rsi_range(
     above: List[Tuple[str, str, str, float, pd.DataFrame]] = []  # + df
 
     oanda_token = cfg.get("oanda", {}).get("access_token")
+    scan_export = open_scan_export(cfg)
 
     for market_key in selected_markets:
         entries = markets.get(market_key, [])
@@ -78,56 +134,71 @@ def scan_rsi_range(
                 continue
 
             name = entry.get("name", symbol)
-            source = entry.get("source", cfg.get("settings", {}).get("default_source", "yfinance"))
-
-            # genug Bars laden, damit RSI stabil ist
-            lookback = max(default_lookback, period * 4)
-
-            df = load_data(
-                symbol=symbol,
-                source=source,
-                timeframe=timeframe,
-                lookback=lookback,
-                oanda_token=oanda_token,
-            )
-
-            if df is None or df.empty or "close" not in df.columns:
-                # Fortschritt trotzdem anzeigen
-                print(f"[{market_key}] {i:>3}/{total} {symbol:<12} -> keine Daten".ljust(80), end="\r", flush=True)
+            checkpoint_key = f"{market_key}|{symbol}"
+            if checkpoint_key in checkpoint:
+                done = checkpoint.get(checkpoint_key)
+                if done:
+                    _classify(done[0], done[1], symbol, name, market_key,
+                              lower, upper, in_range, below, above)
                 continue
 
-            df = df.copy()
-            df["rsi"] = compute_rsi_wilder(df["close"], period)
-
-            last_rsi = df["rsi"].iloc[-1]
-            if pd.isna(last_rsi):
-                print(f"[{market_key}] {i:>3}/{total} {symbol:<12} -> RSI NaN".ljust(80), end="\r", flush=True)
-                continue
-
-            last_rsi_f = float(last_rsi)
-
-            # Live-Fortschritt (damit man sieht, dass es läuft)
-            print(
-                f"[{market_key}] {i:>3}/{total} {symbol:<12} RSI={last_rsi_f:>6.2f}  {name}".ljust(120),
-                end="\r",
-                flush=True,
-            )
-
-            # Range-Liste (wie bisher)
-            if lower <= last_rsi_f <= upper:
-                in_range.append((symbol, name, market_key, last_rsi_f))
-
-            # Ausreißer sammeln (für Plot)
-            if last_rsi_f < lower:
-                below.append((symbol, name, market_key, last_rsi_f, df))
-            elif last_rsi_f > upper:
-                above.append((symbol, name, market_key, last_rsi_f, df))
-
-            time.sleep(0.12)
+            with timing.symbol(checkpoint_key):
+                source = entry.get("source", cfg.get("settings", {}).get("default_source", "yfinance"))
+
+                # genug Bars laden, damit RSI stabil ist
+                lookback = max(default_lookback, period * 4)
+
+                df = load_data(
+                    symbol=symbol,
+                    source=source,
+                    timeframe=timeframe,
+                    lookback=lookback,
+                    oanda_token=oanda_token,
+                )
+
+                if df is None or df.empty or "close" not in df.columns:
+                    # Fortschritt trotzdem anzeigen
+                    print(f"[{market_key}] {i:>3}/{total} {symbol:<12} -> keine Daten".ljust(80), end="\r", flush=True)
+                    continue
+                if scan_export is not None:
+                    scan_export.add(source, timeframe, symbol, df)
+
+                with timing.stage("indicator"):
+                    df = df.copy()
+                    df["rsi"] = compute_rsi_wilder(df["close"], period)
+
+                last_rsi = df["rsi"].iloc[-1]
+                if pd.isna(last_rsi):
+                    print(f"[{market_key}] {i:>3}/{total} {symbol:<12} -> RSI NaN".ljust(80), end="\r", flush=True)
+                    checkpoint.record(checkpoint_key, None)
+                    continue
+
+                last_rsi_f = float(last_rsi)
+
+                # Live-Fortschritt (damit man sieht, dass es läuft)
+                print(
+                    f"[{market_key}] {i:>3}/{total} {symbol:<12} RSI={last_rsi_f:>6.2f}  {name}".ljust(120),
+                    end="\r",
+                    flush=True,
+                )
+
+                with timing.stage("detection"):
+                    _classify(last_rsi_f, df, symbol, name, market_key,
+                              lower, upper, in_range, below, above)
+                # Kursdaten nur für Ausreißer sichern (werden später geplottet)
+                is_outlier = not (lower <= last_rsi_f <= upper)
+                checkpoint.record(checkpoint_key, (last_rsi_f, df if is_outlier else None))
+
+                with timing.stage("sleep"):
+                    time.sleep(0.12)
 
         # Zeilenumbruch nach Markt, damit die \r-Zeile nicht „hängen bleibt“
         print()
 
+    if scan_export is not None:
+        with timing.stage("save"):
+            scan_export.close()
+
     # ----------- Terminal-Ausgabe (Range) -----------
     print("\n================ ERGEBNISSE (RSI im Bereich) ================")
     if not in_range:
@@ -143,7 +214,9 @@ def scan_rsi_range(
     print(f"RSI > {upper}: {len(above)}")
 
     if not below and not above:
+        checkpoint.finish()
         print("\n[OK] Keine Ausreißer – daher keine Charts geöffnet.\n")
+        timing.finish_scan_timer()
         return
 
     print("\n[INFO] Öffne Charts nacheinander (Fenster schließen → nächster Chart)...\n")
@@ -152,9 +225,9 @@ def scan_rsi_range(
     below.sort(key=lambda x: x[3])          # am stärksten „unten“ zuerst
     above.sort(key=lambda x: -x[3])         # am stärksten „oben“ zuerst
 
-    for sym, name, mk, rsi, df in below:
-        plot_candles(
-            df,
+    chart_args = [
+        dict(
+            df=df,
             title=f"{sym} | {mk} | RSI {rsi:.2f} < {lower}",
             name=name,
             symbol=sym,
@@ -164,11 +237,12 @@ def scan_rsi_range(
             rsi_lower=lower,
             rsi_upper=upper,
             rsi_period=period,
+            max_bars=lod_max_bars(cfg),
         )
-
-    for sym, name, mk, rsi, df in above:
-        plot_candles(
-            df,
+        for sym, name, mk, rsi, df in below
+    ] + [
+        dict(
+            df=df,
             title=f"{sym} | {mk} | RSI {rsi:.2f} > {upper}",
             name=name,
             symbol=sym,
@@ -178,6 +252,42 @@ def scan_rsi_range(
             rsi_lower=lower,
             rsi_upper=upper,
             rsi_period=period,
+            max_bars=lod_max_bars(cfg),
         )
+        for sym, name, mk, rsi, df in above
+    ]
 
+    browser_items = [
+        BrowserItem(args["title"], render_candle_png, args) for args in chart_args
+    ]
+
+    if not show_chart_browser(browser_items, cfg):
+        for args in chart_args:
+            with timing.symbol(f"{args['index']}|{args['symbol']}"), timing.stage("render"):
+                plot_candles(**args)
+
+    outliers = [(entry, f"< {lower}") for entry in below] + [(entry, f"> {upper}") for entry in above]
+    report_path = write_scan_report(
+        "rsi",
+        timeframe,
+        [
+            ReportRow(
+                chart,
+                {
+                    "Markt": mk,
+                    "Symbol": sym,
+                    "Name": name,
+                    "RSI": float(rsi),
+                    "Zone": zone,
+                },
+            )
+            for ((sym, name, mk, rsi, _df), zone), chart in zip(outliers, browser_items)
+        ],
+        cfg,
+    )
+    if report_path is not None:
+        print(f"[INFO] HTML-Report: {report_path}\n")
+
+    checkpoint.finish()
     print("\n[OK] RSI-Scan abgeschlossen.\n")
+    timing.finish_scan_timer()
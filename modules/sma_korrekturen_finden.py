@@ -1,15 +1,20 @@
 # /modules/sma_korrekturen_finden.py
 import time
 import pandas as pd
-from utils.chart.plotter import plot_candles
+from utils import timing
+from utils.chart.browser import BrowserItem, show_chart_browser
+from utils.chart.decimate import lod_max_bars
+from utils.chart.plotter import plot_candles, render_candle_png
+from utils.chart.report import ReportRow, write_scan_report
+from utils.daten.checkpoint import ScanCheckpoint
 from utils.daten.data_loader import load_data
+from utils.daten.exporter import open_scan_export
 from modules.divergence_detector import DivergenceDetector
 
 
-def finde_sma_korrekturen(markets, cfg, timeframe_choices):
+def _select_scope(markets, timeframe_choices):
     """
-    Scannt ausgewählte Märkte und findet Werte, bei denen
-    der Schlusskurs über dem SMA200, aber unter dem SMA20 liegt.
+    Märkte und Timeframe interaktiv wählen.
     """
 
     import questionary
@@ -26,7 +31,7 @@ def finde_sma_korrekturen(markets, cfg, timeframe_choices):
 
     if not selected_markets:
         print("[INFO] Keine Märkte ausgewählt.")
-        return
+        return None, None
 
     timeframe = questionary.select(
         "Bitte Timeframe auswählen:", choices=timeframe_choices
@@ -34,7 +39,33 @@ def finde_sma_korrekturen(markets, cfg, timeframe_choices):
 
     if not timeframe:
         print("[INFO] Auswahl abgebrochen.")
-        return
+        return None, None
+
+    return selected_markets, timeframe
+
+
+def finde_sma_korrekturen(markets, cfg, timeframe_choices, resume=False):
+    """
+    Scannt ausgewählte Märkte und findet Werte, bei denen
+    der Schlusskurs über dem SMA200, aber unter dem SMA20 liegt.
+    Mit resume=True wird ein unterbrochener Scan am Checkpoint fortgesetzt.
+    """
+
+    saved = ScanCheckpoint.saved_params("sma") if resume else None
+    if saved:
+        selected_markets = saved["markets"]
+        timeframe = saved["timeframe"]
+        print(f"[INFO] Fortsetzen: {timeframe} | Märkte: {', '.join(selected_markets)}")
+    else:
+        selected_markets, timeframe = _select_scope(markets, timeframe_choices)
+        if not selected_markets or not timeframe:
+            return
+
+    checkpoint = ScanCheckpoint(
+        "sma", {"timeframe": timeframe, "markets": list(selected_markets)}, resume=resume
+    )
+
+    timing.start_scan_timer("sma", timeframe, cfg)
 
     print("\n================ STARTE SMA-KORREKTUR-SCANNER ================")
 
@@ -53,46 +84,69 @@ def finde_sma_korrekturen(markets, cfg, timeframe_choices):
         fractal_periods=div_cfg.get("fractal_periods", 4),
         max_bars_diff=div_cfg.get("max_bars_diff", 30),
     )
+    scan_export = open_scan_export(cfg)
     for market_key in selected_markets:
         print(f"\n--- Scanne Markt: {market_key} ---")
         for entry in markets.get(market_key, []):
             symbol = entry.get("symbol")
             name = entry.get("name", symbol)
-            source = entry.get(
-                "source", cfg.get("settings", {}).get(
-                    "default_source", "yfinance")
-            )
-            oanda_token = cfg.get("oanda", {}).get("access_token")
-            lookback = cfg.get("auswertung", {}).get("maximal_bars", 200)
-
-            df = load_data(symbol, source, timeframe, lookback, oanda_token)
-            if df.empty:
+            checkpoint_key = f"{market_key}|{symbol}"
+            if checkpoint_key in checkpoint:
+                hit = checkpoint.get(checkpoint_key)
+                if hit:
+                    results.append(hit)
                 continue
 
-            # Berechne SMAs anhand der konfigurierten Perioden
-            df[f"SMA{kurzfristig}"] = df["close"].rolling(
-                window=kurzfristig).mean()
-            df[f"SMA{langfristig}"] = df["close"].rolling(
-                window=langfristig).mean()
-
-            if len(df) < max(langfristig, kurzfristig):
-                continue
-
-            last = df.iloc[-1]
-            sma_long_col = f"SMA{langfristig}"
-            sma_short_col = f"SMA{kurzfristig}"
-            if (
-                last["close"] > last[sma_long_col]
-                and last["close"] < last[sma_short_col]
-            ):
-                print(
-                    f"[TREFFER] {name} ({symbol}) erfüllt SMA-Korrektur-Bedingung.")
-                results.append((name, symbol, market_key, df))
-
-            time.sleep(0.3)
+            with timing.symbol(checkpoint_key):
+                source = entry.get(
+                    "source", cfg.get("settings", {}).get(
+                        "default_source", "yfinance")
+                )
+                oanda_token = cfg.get("oanda", {}).get("access_token")
+                lookback = cfg.get("auswertung", {}).get("maximal_bars", 200)
+
+                df = load_data(symbol, source, timeframe, lookback, oanda_token)
+                if df.empty:
+                    continue
+                if scan_export is not None:
+                    scan_export.add(source, timeframe, symbol, df)
+
+                # Berechne SMAs anhand der konfigurierten Perioden
+                with timing.stage("indicator"):
+                    df[f"SMA{kurzfristig}"] = df["close"].rolling(
+                        window=kurzfristig).mean()
+                    df[f"SMA{langfristig}"] = df["close"].rolling(
+                        window=langfristig).mean()
+
+                if len(df) < max(langfristig, kurzfristig):
+                    checkpoint.record(checkpoint_key, None)
+                    continue
+
+                last = df.iloc[-1]
+                sma_long_col = f"SMA{langfristig}"
+                sma_short_col = f"SMA{kurzfristig}"
+                if (
+                    last["close"] > last[sma_long_col]
+                    and last["close"] < last[sma_short_col]
+                ):
+                    print(
+                        f"[TREFFER] {name} ({symbol}) erfüllt SMA-Korrektur-Bedingung.")
+                    results.append((name, symbol, market_key, df))
+                    checkpoint.record(checkpoint_key, results[-1])
+                else:
+                    checkpoint.record(checkpoint_key, None)
+
+                with timing.stage("sleep"):
+                    time.sleep(0.3)
+
+    if scan_export is not None:
+        with timing.stage("save"):
+            scan_export.close()
 
     if not results:
+        checkpoint.finish()
         print("\n[INFO] Keine SMA-Korrektur-Werte gefunden.")
+        timing.finish_scan_timer()
         return
 
     print("\n================ TREFFER-ZUSAMMENFASSUNG ===============")
@@ -100,17 +154,55 @@ def finde_sma_korrekturen(markets, cfg, timeframe_choices):
         print(f"- {name} ({symbol}) | {market_key}")
 
     print("\n[INFO] Öffne Charts nacheinander. Fenster schließen, um fortzufahren...\n")
+    chart_args = []
     for name, symbol, market_key, df in results:
         # Berechne Divergenzen für das gesamte DataFrame und übergebe sie an den Plot
-        div_result = detector.find_divergences(df)
-        plot_candles(
-            df,
-            title=f"{symbol} [{market_key}] {timeframe}",
-            name=name,
-            symbol=symbol,
-            index=market_key,
-            timeframe=timeframe,
-            divergences=div_result,
+        with timing.symbol(f"{market_key}|{symbol}"), timing.stage("detection"):
+            div_result = detector.find_divergences(df)
+        chart_args.append(
+            dict(
+                df=df,
+                title=f"{symbol} [{market_key}] {timeframe}",
+                name=name,
+                symbol=symbol,
+                index=market_key,
+                timeframe=timeframe,
+                divergences=div_result,
+                max_bars=lod_max_bars(cfg),
+            )
+        )
+
+    browser_items = [
+        BrowserItem(args["title"], render_candle_png, args) for args in chart_args
+    ]
+
+    if not show_chart_browser(browser_items, cfg):
+        for args in chart_args:
+            with timing.symbol(f"{args['index']}|{args['symbol']}"), timing.stage("render"):
+                plot_candles(**args)
+
+    report_rows = []
+    for (name, symbol, market_key, df), chart, args in zip(results, browser_items, chart_args):
+        last = df.iloc[-1]
+        report_rows.append(
+            ReportRow(
+                chart,
+                {
+                    "Markt": market_key,
+                    "Symbol": symbol,
+                    "Name": name,
+                    "Close": float(last["close"]),
+                    f"SMA{kurzfristig}": float(last[f"SMA{kurzfristig}"]),
+                    f"SMA{langfristig}": float(last[f"SMA{langfristig}"]),
+                    "Bullish": len(args["divergences"].get("bullish", [])),
+                    "Bearish": len(args["divergences"].get("bearish", [])),
+                },
+            )
         )
+    report_path = write_scan_report("sma_korrekturen", timeframe, report_rows, cfg)
+    if report_path is not None:
+        print(f"[INFO] HTML-Report: {report_path}\n")
 
+    checkpoint.finish()
     print("\n[OK] SMA-Korrektur-Scan abgeschlossen.")
+    timing.finish_scan_timer()
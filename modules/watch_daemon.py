@@ -0,0 +1,478 @@
+# /modules/watch_daemon.py
+"""
+Watch-Modus für H1/H4/D1-Überwachung.
+
+Das Programm bleibt im Speicher, hält Kurshistorie und Detektor-Zustände
+warm und wartet auf den nächsten Bar-Schluss je Timeframe. Nach einem
+Schluss wird pro Symbol nur die neu abgeschlossene Bar geladen und nur für
+betroffene Symbole/Timeframes werden die Detektoren erneut ausgeführt –
+auf dem Ende der Historie (so viele Bars, wie der Detektor zurückblickt),
+nicht auf dem ganzen Frame. Gemeldet werden ausschließlich Signale, die
+vorher noch nicht bekannt waren; bekannte Signale, die vor diesem Fenster
+liegen, werden vergessen (sie können nicht erneut auftreten).
+"""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Set, Tuple
+
+import pandas as pd
+import questionary
+
+from modules.divergence_detector import DivergenceDetector
+from modules.liquidityGrabScanner.detector import LiquidityGrabDetector
+from utils.daten.bar_cache import BarCache, CacheKey
+from utils.daten.data_loader import (
+    drop_incomplete_bars,
+    load_data,
+    load_recent_bars,
+    next_bar_close,
+)
+from utils.daten.signal_store import open_signal_store
+
+# Bars, die RSI/EMA50 zum Einschwingen brauchen, bevor Divergenzen im
+# ausgewerteten Ende zählen
+INDICATOR_WARMUP_BARS = 200
+
+DETECTOR_CHOICES = {
+    "liquidity": "Liquidity Grabs",
+    "divergence": "Divergenzen",
+}
+
+
+@dataclass
+class WatchedSymbol:
+    symbol: str
+    name: str
+    market: str
+    source: str
+    known_signals: Dict[str, Set[Tuple]] = field(default_factory=dict)
+
+
+@dataclass
+class PendingClose:
+    close_time: datetime
+    deadline: datetime
+    waiting: List[WatchedSymbol]
+
+
+def _liquidity_key(sig) -> Tuple:
+    # Stufen-Upgrade (z. B. 1 -> 2) gilt als neues Signal
+    return (sig.direction, round(float(sig.level_price), 8), sig.signal_time, sig.stage)
+
+
+def _divergence_keys(result: Dict[str, Any]) -> Set[Tuple]:
+    keys = set()
+    for direction in ("bullish", "bearish"):
+        for start, end in result.get(direction, []):
+            keys.add((direction, start, end))
+    return keys
+
+
+def _prune_known(keys: Set[Tuple], cutoff) -> Set[Tuple]:
+    # Schlüssel enthalten an Position 2 den Signal- bzw. Endzeitpunkt
+    return {key for key in keys if key[2] >= cutoff}
+
+
+def _liquidity_window(detector: LiquidityGrabDetector, lookback: int) -> int:
+    """Bars, die der Liquidity-Detektor für die letzten Bars mindestens braucht."""
+    needed = (
+        detector.max_reference_age_bars
+        + detector.scan_recent_bars
+        + 2 * detector.pivot_bars
+        + 1
+    )
+    if detector.trend_filter == "sma200":
+        needed = max(needed, detector.trend_sma_period + detector.scan_recent_bars)
+    return max(lookback, needed)
+
+
+class WatchDaemon:
+    """
+    Hält Bar-Cache und Detektoren im Speicher und scannt bei Bar-Schluss.
+    """
+
+    def __init__(
+        self,
+        entries: List[WatchedSymbol],
+        cfg: Dict[str, Any],
+        timeframes: List[str],
+        detectors: List[str],
+    ):
+        watch_cfg = cfg.get("watch", {}) if isinstance(cfg, dict) else {}
+
+        self.entries = entries
+        self.timeframes = [tf.upper() for tf in timeframes]
+        self.detectors = detectors
+        self.cache = BarCache()
+
+        self.close_delay = timedelta(
+            seconds=float(watch_cfg.get("close_delay_seconds", 3)))
+        self.poll_seconds = float(watch_cfg.get("poll_seconds", 10))
+        self.max_wait = timedelta(
+            seconds=float(watch_cfg.get("max_wait_seconds", 180)))
+        self.fetch_workers = max(int(watch_cfg.get("fetch_workers", 8)), 1)
+
+        self.oanda_token = cfg.get("oanda", {}).get("access_token")
+        self.lookback = int(
+            cfg.get("liquidity_grab", {}).get("lookback_bars", 260))
+
+        self.liquidity_detectors = {
+            tf: LiquidityGrabDetector(cfg, timeframe=tf) for tf in self.timeframes
+        }
+
+        div_cfg = cfg.get(
+            "divergence", {"rsi_period": 14,
+                           "fractal_periods": 4, "max_bars_diff": 30}
+        )
+        self.divergence_detector = DivergenceDetector(
+            rsi_period=div_cfg.get("rsi_period", 14),
+            fractal_periods=div_cfg.get("fractal_periods", 4),
+            max_bars_diff=div_cfg.get("max_bars_diff", 30),
+        )
+
+        # Länge des Endes, das nach einem Bar-Schluss neu ausgewertet wird
+        self.liquidity_tail = {
+            tf: _liquidity_window(detector, self.lookback)
+            for tf, detector in self.liquidity_detectors.items()
+        }
+        self.divergence_tail = (
+            INDICATOR_WARMUP_BARS
+            + self.divergence_detector.max_bars_diff
+            + 2 * self.divergence_detector.fractal_periods
+            + 2
+        )
+
+        self.store = open_signal_store(cfg)
+        self.scan_id = None
+        if self.store is not None:
+            self.scan_id = self.store.start_scan(
+                "watch",
+                ",".join(self.timeframes),
+                sorted({watched.market for watched in entries}),
+            )
+
+    def _cache_key(self, watched: WatchedSymbol, timeframe: str) -> CacheKey:
+        return self.cache.key(watched.source, watched.symbol, timeframe)
+
+    def _state_key(self, detector: str, timeframe: str) -> str:
+        return f"{detector}:{timeframe}"
+
+    def _run_detectors(
+        self,
+        watched: WatchedSymbol,
+        timeframe: str,
+        report: bool,
+    ) -> List[str]:
+        """
+        Führt die gewählten Detektoren auf den gecachten Bars aus und liefert
+        Meldungen für neu hinzugekommene Signale.
+        """
+        df = self.cache.get(self._cache_key(watched, timeframe))
+        if df is None or df.empty:
+            return []
+
+        alerts: List[str] = []
+        prefix = f"{watched.symbol:<12} | {watched.market:<16} | {timeframe}"
+
+        if "liquidity" in self.detectors:
+            state_key = self._state_key("liquidity", timeframe)
+            frame = df.tail(self.liquidity_tail[timeframe]) if report else df
+            analysis = self.liquidity_detectors[timeframe].analyze(frame)
+            signals = analysis.get("signals", [])
+            current = {_liquidity_key(sig) for sig in signals}
+            known = _prune_known(watched.known_signals.get(state_key, set()), frame.index[0])
+
+            if report:
+                new_signals = [
+                    sig for sig in signals if _liquidity_key(sig) not in known]
+                if new_signals and self.store is not None:
+                    self.store.insert_liquidity_signals(
+                        self.scan_id,
+                        timeframe,
+                        ((watched.symbol, watched.name, watched.market, sig)
+                         for sig in new_signals),
+                    )
+
+                for sig in new_signals:
+                    alerts.append(
+                        f"{prefix} | Liquidity STUFE {sig.stage} | "
+                        f"{sig.direction.upper()} {sig.signal_type.upper()} | "
+                        f"Score={sig.score:.0f} | Level={sig.level_price:.5f} | "
+                        f"{sig.signal_time}"
+                    )
+
+            watched.known_signals[state_key] = known | current
+
+        if "divergence" in self.detectors:
+            state_key = self._state_key("divergence", timeframe)
+            frame = df.tail(self.divergence_tail) if report else df
+            result = self.divergence_detector.find_divergences(frame)
+            current = _divergence_keys(result)
+            known = watched.known_signals.get(state_key, set())
+            if report:
+                # vor dem Einschwingen der Indikatoren nichts melden
+                cutoff = frame.index[min(INDICATOR_WARMUP_BARS, len(frame) - 1)]
+                current = _prune_known(current, cutoff)
+                known = _prune_known(known, cutoff)
+
+            if report:
+                new_pairs = sorted(current - known, key=lambda k: k[2])
+                if new_pairs and self.store is not None:
+                    new_result = {"bullish": [], "bearish": []}
+                    for direction, start, end in new_pairs:
+                        new_result[direction].append((start, end))
+                    self.store.insert_divergences(
+                        self.scan_id,
+                        timeframe,
+                        [(watched.symbol, watched.name, watched.market, new_result)],
+                    )
+
+                for direction, start, end in new_pairs:
+                    alerts.append(
+                        f"{prefix} | {direction.capitalize()} Divergenz | "
+                        f"{start} -> {end}"
+                    )
+
+            watched.known_signals[state_key] = known | current
+
+        return alerts
+
+    def warm_up(self) -> None:
+        """
+        Lädt die komplette Historie einmalig und merkt sich bestehende Signale,
+        damit diese später nicht als neu gemeldet werden.
+        """
+        for timeframe in self.timeframes:
+            total = len(self.entries)
+            print(f"--- Lade Historie {timeframe} ({total} Werte) ---")
+
+            for i, watched in enumerate(self.entries, start=1):
+                print(
+                    f"[{timeframe}] {i:>3}/{total} {watched.symbol:<14} lade Daten...".ljust(
+                        100),
+                    end="\r",
+                    flush=True,
+                )
+                df = load_data(
+                    symbol=watched.symbol,
+                    source=watched.source,
+                    timeframe=timeframe,
+                    lookback=self.lookback,
+                    oanda_token=self.oanda_token,
+                )
+                df = drop_incomplete_bars(df, timeframe)
+                if df is None or df.empty:
+                    continue
+
+                self.cache.put(self._cache_key(watched, timeframe), df)
+                self._run_detectors(watched, timeframe, report=False)
+
+            print()
+
+        print(f"[INFO] Cache aufgewärmt: {len(self.cache)} Zeitreihen im Speicher.")
+
+    def _fetch_new_bars(self, watched: WatchedSymbol, timeframe: str, since) -> pd.DataFrame:
+        return load_recent_bars(
+            symbol=watched.symbol,
+            source=watched.source,
+            timeframe=timeframe,
+            since=since,
+            oanda_token=self.oanda_token,
+        )
+
+    def _poll_pending(self, timeframe: str, pending: PendingClose) -> None:
+        """
+        Lädt die neue Bar aller wartenden Symbole parallel (`fetch_workers`)
+        und wertet jedes Symbol aus, sobald seine Antwort da ist.
+        """
+        still_waiting: List[WatchedSymbol] = []
+        jobs = []
+        for watched in pending.waiting:
+            since = self.cache.last_time(self._cache_key(watched, timeframe))
+            if since is not None:
+                jobs.append((watched, since))
+
+        def _process(watched: WatchedSymbol, new_bars: pd.DataFrame) -> None:
+            # Cache und Detektoren nur im Haupt-Thread
+            if not self.cache.merge(self._cache_key(watched, timeframe), new_bars):
+                still_waiting.append(watched)
+                return
+
+            latency = (datetime.utcnow() - pending.close_time).total_seconds()
+            for alert in self._run_detectors(watched, timeframe, report=True):
+                print(f"[ALARM] {alert} (+{latency:.1f}s nach Schluss)")
+
+        if self.fetch_workers <= 1 or len(jobs) <= 1:
+            for watched, since in jobs:
+                _process(watched, self._fetch_new_bars(watched, timeframe, since))
+        else:
+            with ThreadPoolExecutor(
+                max_workers=min(self.fetch_workers, len(jobs)),
+                thread_name_prefix="watch-fetch",
+            ) as pool:
+                futures = {
+                    pool.submit(self._fetch_new_bars, watched, timeframe, since): watched
+                    for watched, since in jobs
+                }
+                for future in as_completed(futures):
+                    watched = futures[future]
+                    try:
+                        new_bars = future.result()
+                    except Exception as exc:
+                        print(f"[WARN] {watched.symbol} ({timeframe}): Laden fehlgeschlagen: {exc}")
+                        still_waiting.append(watched)
+                        continue
+                    _process(watched, new_bars)
+
+        pending.waiting = still_waiting
+
+    def run(self) -> None:
+        """
+        Hauptschleife: wartet auf Bar-Schlüsse und verarbeitet sie.
+        """
+        self.warm_up()
+
+        next_close = {tf: next_bar_close(tf) for tf in self.timeframes}
+        pending: Dict[str, PendingClose] = {}
+
+        for tf in self.timeframes:
+            print(f"[INFO] Nächster {tf}-Schluss: {next_close[tf]:%Y-%m-%d %H:%M} UTC")
+
+        while True:
+            now = datetime.utcnow()
+
+            for tf in self.timeframes:
+                if now < next_close[tf] + self.close_delay:
+                    continue
+
+                if tf in pending and pending[tf].waiting:
+                    print(
+                        f"[WARN] {tf}: {len(pending[tf].waiting)} Symbole ohne neue Bar "
+                        f"seit {pending[tf].close_time:%H:%M} UTC."
+                    )
+
+                pending[tf] = PendingClose(
+                    close_time=next_close[tf],
+                    deadline=next_close[tf] + self.max_wait,
+                    waiting=[
+                        watched for watched in self.entries
+                        if self._cache_key(watched, tf) in self.cache
+                    ],
+                )
+                next_close[tf] = next_bar_close(tf, now)
+                print(
+                    f"\n[INFO] {tf}-Bar geschlossen um "
+                    f"{pending[tf].close_time:%Y-%m-%d %H:%M} UTC, prüfe "
+                    f"{len(pending[tf].waiting)} Symbole..."
+                )
+
+            for tf, item in list(pending.items()):
+                self._poll_pending(tf, item)
+
+                if not item.waiting:
+                    print(f"[OK] {tf}: alle Symbole aktualisiert.")
+                    del pending[tf]
+                elif datetime.utcnow() >= item.deadline:
+                    print(
+                        f"[WARN] {tf}: keine neue Bar fuer {len(item.waiting)} Symbole "
+                        f"(z. B. Markt geschlossen)."
+                    )
+                    del pending[tf]
+
+            wake_up = min(next_close[tf] for tf in self.timeframes) + self.close_delay
+            sleep_for = (wake_up - datetime.utcnow()).total_seconds()
+            if pending:
+                sleep_for = min(sleep_for, self.poll_seconds)
+
+            time.sleep(max(sleep_for, 0.5))
+
+
+def run_watch_daemon(
+    markets: Dict[str, List[Dict[str, Any]]],
+    cfg: Dict[str, Any],
+    timeframe_choices: List[str],
+) -> None:
+    """
+    Interaktiver Einstieg in den Watch-Modus.
+    """
+    watch_cfg = cfg.get("watch", {}) if isinstance(cfg, dict) else {}
+
+    selected_markets = questionary.checkbox(
+        "Märkte zum Beobachten auswählen:",
+        choices=[
+            questionary.Choice(title=key, value=key, checked=False)
+            for key in markets.keys()
+        ],
+        validate=lambda sel: bool(
+            sel) or "Bitte mindestens einen Markt wählen.",
+    ).ask()
+    if not selected_markets:
+        print("[INFO] Auswahl abgebrochen.")
+        return
+
+    default_tfs = [str(tf).upper() for tf in watch_cfg.get("timeframes", ["H1", "H4"])]
+    timeframes = questionary.checkbox(
+        "Timeframes beobachten:",
+        choices=[
+            questionary.Choice(title=tf, value=tf, checked=tf in default_tfs)
+            for tf in timeframe_choices
+        ],
+        validate=lambda sel: bool(
+            sel) or "Bitte mindestens einen Timeframe wählen.",
+    ).ask()
+    if not timeframes:
+        print("[INFO] Auswahl abgebrochen.")
+        return
+
+    default_detectors = list(watch_cfg.get("detectors", list(DETECTOR_CHOICES)))
+    detectors = questionary.checkbox(
+        "Welche Detektoren sollen laufen?",
+        choices=[
+            questionary.Choice(title=title, value=key,
+                               checked=key in default_detectors)
+            for key, title in DETECTOR_CHOICES.items()
+        ],
+        validate=lambda sel: bool(
+            sel) or "Bitte mindestens einen Detektor wählen.",
+    ).ask()
+    if not detectors:
+        print("[INFO] Auswahl abgebrochen.")
+        return
+
+    default_source = cfg.get("settings", {}).get("default_source", "yfinance")
+    entries: List[WatchedSymbol] = []
+    for market_key in selected_markets:
+        for entry in markets.get(market_key, []):
+            symbol = entry.get("symbol")
+            if not symbol:
+                continue
+            entries.append(
+                WatchedSymbol(
+                    symbol=symbol,
+                    name=entry.get("name", symbol),
+                    market=market_key,
+                    source=entry.get("source", default_source),
+                )
+            )
+
+    print("\n================ STARTE WATCH-MODUS ================")
+    print(
+        f"[INFO] {len(entries)} Symbole | Timeframes={', '.join(timeframes)} | "
+        f"Detektoren={', '.join(detectors)}"
+    )
+    print("[INFO] Beenden mit Strg+C.\n")
+
+    daemon = WatchDaemon(entries, cfg, timeframes, detectors)
+
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        print("\n[OK] Watch-Modus beendet.")
+    finally:
+        if daemon.store is not None:
+            daemon.store.close()
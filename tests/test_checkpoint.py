@@ -0,0 +1,42 @@
+"""Checkpoints: Fortsetzen, Parameterwechsel, abgeschnittener Datensatz."""
+
+from utils.daten.checkpoint import ScanCheckpoint, pending_checkpoints
+
+PARAMS = {"timeframe": "D1", "markets": ["DAX"]}
+
+
+def test_resume_restores_completed_symbols(tmp_path):
+    checkpoint = ScanCheckpoint("liquidity", PARAMS, base_dir=tmp_path)
+    checkpoint.record("SAP.DE", {"hits": 2})
+    checkpoint.record("BMW.DE", None)
+
+    resumed = ScanCheckpoint("liquidity", PARAMS, resume=True, base_dir=tmp_path)
+    assert "SAP.DE" in resumed and "BMW.DE" in resumed
+    assert resumed.get("SAP.DE") == {"hits": 2}
+    assert resumed.get("BMW.DE") is None
+    assert ScanCheckpoint.saved_params("liquidity", base_dir=tmp_path) == PARAMS
+
+
+def test_other_params_start_fresh(tmp_path):
+    ScanCheckpoint("liquidity", PARAMS, base_dir=tmp_path).record("SAP.DE", 1)
+    resumed = ScanCheckpoint("liquidity", {**PARAMS, "timeframe": "H4"}, resume=True, base_dir=tmp_path)
+    assert resumed.completed == {}
+
+
+def test_truncated_last_record_keeps_earlier_ones(tmp_path):
+    checkpoint = ScanCheckpoint("liquidity", PARAMS, base_dir=tmp_path)
+    checkpoint.record("SAP.DE", 1)
+    checkpoint.record("BMW.DE", 2)
+    data = checkpoint.path.read_bytes()
+    checkpoint.path.write_bytes(data[:-3])
+
+    resumed = ScanCheckpoint("liquidity", PARAMS, resume=True, base_dir=tmp_path)
+    assert resumed.completed == {"SAP.DE": 1}
+
+
+def test_finish_removes_checkpoint(tmp_path):
+    checkpoint = ScanCheckpoint("divergence", PARAMS, base_dir=tmp_path)
+    assert pending_checkpoints(tmp_path) == ["divergence"]
+    checkpoint.finish()
+    assert pending_checkpoints(tmp_path) == []
+    assert ScanCheckpoint.saved_params("divergence", base_dir=tmp_path) is None
@@ -0,0 +1,142 @@
+"""Level-of-Detail: OHLC-Verdichtung, Keep-Bars, feiner Ausschnitt, Positionen."""
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.chart.decimate import KEEP_SHARE, decimate_ohlc, positions_of
+
+
+def _frame(n):
+    rng = np.random.default_rng(7)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame(
+        {
+            "open": close + rng.normal(0, 0.5, n),
+            "high": close + 2 + rng.random(n),
+            "low": close - 2 - rng.random(n),
+            "close": close,
+            "volume": rng.integers(1, 100, n).astype(float),
+            "SMA20": close * 1.01,
+        },
+        index=pd.date_range("2020-01-01", periods=n, freq="h"),
+    )
+
+
+def test_short_history_unchanged():
+    data = _frame(50)
+    lod = decimate_ohlc(data, max_bars=100)
+    assert lod.data is data and not lod.decimated
+    assert list(lod.positions) == list(range(50))
+    assert decimate_ohlc(data, max_bars=None).data is data
+
+
+def test_buckets_are_ohlc_faithful():
+    data = _frame(1000)
+    lod = decimate_ohlc(data, max_bars=100)
+    assert lod.decimated and len(lod.data) == 100
+
+    bucket = data.iloc[0:10]
+    first = lod.data.iloc[0]
+    assert lod.data.index[0] == data.index[0]
+    assert first["open"] == bucket["open"].iloc[0]
+    assert first["high"] == bucket["high"].max()
+    assert first["low"] == bucket["low"].min()
+    assert first["close"] == bucket["close"].iloc[-1]
+    assert first["volume"] == bucket["volume"].sum()
+    assert first["SMA20"] == bucket["SMA20"].iloc[-1]
+
+
+def test_positions_map_every_bar_to_its_bucket():
+    data = _frame(1000)
+    lod = decimate_ohlc(data, max_bars=100)
+    assert len(lod.positions) == 1000
+    assert np.all(np.diff(lod.positions) >= 0)
+    assert lod.position(0) == 0 and lod.position(9) == 0 and lod.position(10) == 1
+    assert lod.position(999) == len(lod.data) - 1
+    # jede Bar liegt im Bucket, der bei oder vor ihr beginnt
+    starts = lod.data.index[lod.positions]
+    assert np.all(starts <= data.index)
+
+
+def test_keep_bars_stay_single():
+    data = _frame(1000)
+    keep = [5, 123, 998]
+    lod = decimate_ohlc(data, max_bars=100, keep=keep)
+    for pos in keep:
+        row = lod.data.iloc[lod.position(pos)]
+        assert lod.data.index[lod.position(pos)] == data.index[pos]
+        assert row["high"] == data["high"].iloc[pos]
+        assert row["low"] == data["low"].iloc[pos]
+        # der Bucket danach beginnt direkt mit der nächsten Bar
+        if pos + 1 < len(data):
+            assert lod.position(pos + 1) == lod.position(pos) + 1
+
+
+def test_keep_share_bounds_candles():
+    data = _frame(5000)
+    keep = list(range(0, 5000, 100))  # 50 Keep-Bars, mehr als KEEP_SHARE erlaubt
+    lod = decimate_ohlc(data, max_bars=120, keep=keep)
+    assert len(lod.data) <= 120 + 2 * int(120 * KEEP_SHARE)
+    kept = [pos for pos in keep if lod.data.index[lod.position(pos)] == data.index[pos]]
+    assert kept[-int(120 * KEEP_SHARE):] == keep[-int(120 * KEEP_SHARE):]
+    # ältere Keep-Bars sind trotzdem über positions erreichbar
+    assert all(0 <= lod.position(pos) < len(lod.data) for pos in keep)
+
+
+def test_fine_from_uses_finer_buckets():
+    data = _frame(2000)
+    lod = decimate_ohlc(data, max_bars=100, fine_from=1900)
+    coarse = lod.position(1899) - lod.position(0) + 1
+    fine = len(lod.data) - lod.position(1900)
+    assert coarse <= 100
+    assert fine == 100  # 100 Bars ab fine_from, je eine Kerze
+    assert lod.data.index[lod.position(1900)] == data.index[1900]
+
+
+def test_positions_of_skips_missing():
+    index = pd.date_range("2024-01-01", periods=5, freq="D")
+    assert positions_of(index, [index[3], None, pd.Timestamp("1999-01-01"), index[0]]) == [3, 0]
+    assert positions_of(index, []) == []
+
+
+def test_liquidity_chart_draws_signals_outside_keep_buckets():
+    from modules.liquidityGrabScanner import plotter
+    from modules.liquidityGrabScanner.detector import LiquiditySignal
+
+    data = _frame(5000)
+    signal_positions = list(range(100, 5000, 100))  # 49 Signale
+    signals = [
+        LiquiditySignal(
+            signal_time=data.index[pos], signal_index=pos, direction="bullish",
+            signal_type="grab", level_side="low", level_price=float(data["low"].iloc[pos]),
+            reference_time=data.index[pos - 50], reference_index=pos - 50,
+            sweep_percent=0.1, reclaimed=True, confirmed=False, close_position=0.5,
+            wick_ratio=0.5, score=50.0, reason="", level_touches=1, equal_pool=False,
+            trend="up", with_trend=True, stage=1, stage_label="STUFE 1",
+            follow_through=False, follow_through_time=None, follow_through_index=None,
+            mss_confirmed=False, mss_time=None, mss_index=None, mss_level=None,
+        )
+        for pos in signal_positions
+    ]
+
+    chart = plotter._build_chart(data, signals, [], max_bars=120)
+    try:
+        assert chart.positions is not None
+        assert len(chart.signal_artists) == len(signals)
+        drawn = sorted(signal_x for _signal, signal_x, _artists, _y in chart.signal_artists)
+        assert drawn == sorted(int(chart.positions[pos]) for pos in signal_positions)
+    finally:
+        plotter.plt.close(chart.fig)
+
+    views = [
+        plotter.ChartView("full.png", "FULL"),
+        plotter.ChartView("zoom.png", "ZOOM", zoom_last_fraction=0.1),
+    ]
+    rendered = plotter.render_liquidity_grab_chart_views(data, signals, [], views, max_bars=120)
+    assert [view.title for view, _png in rendered] == ["FULL", "ZOOM"]
+    assert all(png.startswith(b"\x89PNG") for _view, png in rendered)
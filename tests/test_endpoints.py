@@ -0,0 +1,37 @@
+"""Eigene Endpunkte: Laden über die lokalen Stand-ins, ohne oandapyV20-Zustand zu ändern."""
+
+import copy
+
+import pytest
+
+from benchmarks.standin import StandinServer
+from utils.daten import data_loader, sources
+
+
+@pytest.fixture
+def oanda():
+    with StandinServer("oanda") as server:
+        yield server
+
+
+def test_oanda_fetch_uses_configured_base_url(oanda, monkeypatch):
+    from oandapyV20.oandapyV20 import TRADING_ENVIRONMENTS
+
+    before = copy.deepcopy(TRADING_ENVIRONMENTS)
+    monkeypatch.setattr(sources, "_ENDPOINTS", {"oanda_api": oanda.url + "/"})
+
+    df = data_loader.fetch_oanda_data("EUR_USD", "H4", 10, 50, "token")
+
+    assert len(df) >= 50
+    assert list(df.columns) == ["open", "high", "low", "close", "volume"]
+    assert oanda.stats.as_dict()["ok"] == 1
+    assert TRADING_ENVIRONMENTS == before
+
+
+def test_yahoo_chart_endpoint(monkeypatch):
+    with StandinServer("yahoo") as yahoo:
+        monkeypatch.setattr(sources, "_ENDPOINTS", {"yahoo_chart": yahoo.url})
+        df = data_loader.fetch_yfinance_data("SAP.DE", "1d", 60)
+
+    assert not df.empty
+    assert df.index.is_monotonic_increasing
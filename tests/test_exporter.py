@@ -0,0 +1,56 @@
+"""Bar-Dataset: Anhängen, Doppelte, Kompaktieren (CSV, parquet mit pyarrow)."""
+
+import pandas as pd
+import pytest
+
+from utils.daten.exporter import BarDataset, pyarrow_available
+
+FORMATS = ["csv", pytest.param("parquet", marks=pytest.mark.skipif(
+    not pyarrow_available(), reason="pyarrow nicht installiert"))]
+
+
+def _bars(start, periods, close=1.0):
+    index = pd.date_range(start, periods=periods, freq="D")
+    return pd.DataFrame(
+        {"open": close, "high": close, "low": close, "close": close, "volume": 10.0},
+        index=index,
+    )
+
+
+@pytest.fixture(params=FORMATS)
+def dataset(request, tmp_path):
+    return BarDataset(tmp_path / "bars", fmt=request.param)
+
+
+def test_append_writes_only_newer_bars(dataset):
+    assert dataset.append("yfinance", "D1", "SAP.DE", _bars("2026-10-01", 5)) == 5
+    assert dataset.append("yfinance", "D1", "SAP.DE", _bars("2026-10-01", 5)) == 0
+    assert dataset.append("yfinance", "D1", "SAP.DE", _bars("2026-10-03", 5)) == 2
+    assert dataset.last_time("yfinance", "D1", "SAP.DE") == pd.Timestamp("2026-10-07")
+
+
+def test_last_stored_bar_is_replaced_by_newer_export(dataset):
+    dataset.append("yfinance", "D1", "SAP.DE", _bars("2026-10-01", 3, close=1.0))
+    dataset.append("yfinance", "D1", "SAP.DE", _bars("2026-10-03", 2, close=2.0))
+
+    bars = dataset.load_bars("yfinance", "D1", "SAP.DE")
+    assert len(bars) == 4
+    assert not bars.index.duplicated().any()
+    assert list(bars["close"]) == [1.0, 1.0, 2.0, 2.0]
+
+
+def test_compact_merges_parts(dataset):
+    dataset.append("yfinance", "D1", "SAP.DE", _bars("2026-10-01", 3))
+    dataset.append("yfinance", "D1", "SAP.DE", _bars("2026-10-03", 3))
+    before = dataset.load_bars("yfinance", "D1", "SAP.DE")
+
+    assert dataset.compact() == 1
+    part_dir = dataset.partition_dir("yfinance", "D1", "SAP.DE")
+    assert len(dataset._parts(part_dir)) == 1
+    pd.testing.assert_frame_equal(dataset.load_bars("yfinance", "D1", "SAP.DE"), before)
+
+
+def test_symbols_with_special_characters(dataset):
+    dataset.append("yfinance", "D1", "^GDAXI", _bars("2026-10-01", 2))
+    assert dataset.last_time("yfinance", "D1", "^GDAXI") == pd.Timestamp("2026-10-02")
+    assert dataset.last_time("yfinance", "D1", "SAP.DE") is None
@@ -0,0 +1,104 @@
+"""Frische-Index: Handelskalender, Auslieferung aus dem Dataset, Hinweise."""
+
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from utils.daten import data_loader, freshness
+from utils.daten.freshness import FreshnessIndex
+from utils.daten.trading_calendar import FX, FX_YAHOO, XETRA, next_bar_close
+
+
+@pytest.mark.parametrize("after, expected", [
+    ("2026-10-14 12:00", "2026-10-15 00:00"),  # Mittwoch
+    ("2026-10-14 21:30", "2026-10-15 00:00"),  # nach dem NY-Schluss
+    ("2026-10-16 12:00", "2026-10-16 21:00"),  # Freitag: Sitzungsschluss
+    ("2026-10-17 12:00", "2026-10-19 00:00"),  # Samstag
+    ("2026-10-18 22:00", "2026-10-19 00:00"),  # Sonntag nach Wiedereröffnung
+])
+def test_yahoo_fx_daily_closes_on_utc_midnight(after, expected):
+    assert next_bar_close(FX_YAHOO, 24, datetime.fromisoformat(after)) == datetime.fromisoformat(expected)
+
+
+def test_yahoo_fx_h4_stays_on_utc_grid_midweek():
+    assert next_bar_close(FX_YAHOO, 4, datetime(2026, 10, 14, 20, 0)) == datetime(2026, 10, 15, 0, 0)
+
+
+def test_oanda_fx_daily_closes_with_new_york_session():
+    assert next_bar_close(FX, 24, datetime(2026, 10, 14, 12, 0)) == datetime(2026, 10, 14, 21, 0)
+
+
+def test_xetra_daily_closes_at_session_end():
+    # 17:30 Berlin = 15:30 UTC (Sommerzeit)
+    assert next_bar_close(XETRA, 24, datetime(2026, 10, 14, 0, 0)) == datetime(2026, 10, 14, 15, 30)
+
+
+def _bars(*starts):
+    index = pd.DatetimeIndex([pd.Timestamp(start) for start in starts])
+    return pd.DataFrame({"close": range(len(index))}, index=index, dtype=float)
+
+
+def test_drop_incomplete_bars_uses_calendar_close():
+    df = _bars("2026-10-13", "2026-10-14")
+    before_close = data_loader.drop_incomplete_bars(
+        df, "D1", now=datetime(2026, 10, 14, 12, 0), source="yfinance", symbol="SAP.DE")
+    after_close = data_loader.drop_incomplete_bars(
+        df, "D1", now=datetime(2026, 10, 14, 16, 0), source="yfinance", symbol="SAP.DE")
+    assert list(before_close.index) == [pd.Timestamp("2026-10-13")]
+    assert len(after_close) == 2
+
+
+class FakeDataset:
+    def __init__(self, df):
+        self.df = df
+
+    def last_time(self, source, timeframe, symbol):
+        return self.df.index[-1]
+
+    def load_bars(self, source, timeframe, symbol):
+        return self.df
+
+
+@pytest.fixture
+def index(tmp_path):
+    return FreshnessIndex(tmp_path / "freshness.json", grace_minutes=15, dataset_dir=tmp_path)
+
+
+def _serve(monkeypatch, index, df, fetched_at):
+    monkeypatch.setattr(data_loader, "_open_dataset", lambda _dir: FakeDataset(df))
+    index.record_fetch("yfinance", "SAP.DE", "D1", 24, df.index[-1].to_pydatetime(), fetched_at=fetched_at)
+    monkeypatch.setattr(freshness, "_now", lambda: fetched_at)
+    return data_loader.load_fresh_bars(index, "SAP.DE", "yfinance", "D1", days=30, min_bars=10)
+
+
+def test_forming_bar_is_not_served(monkeypatch, index):
+    df = _bars("2026-10-13", "2026-10-14")
+    served = _serve(monkeypatch, index, df, datetime(2026, 10, 14, 12, 0))
+    assert list(served.index) == [pd.Timestamp("2026-10-13")]
+
+
+def test_closed_bar_is_served(monkeypatch, index):
+    df = _bars("2026-10-13", "2026-10-14")
+    served = _serve(monkeypatch, index, df, datetime(2026, 10, 14, 18, 0))
+    assert len(served) == 2
+
+
+def test_fetched_at_round_trip(index):
+    assert index.fetched_at("yfinance", "SAP.DE", "D1") is None
+    index.record_fetch("yfinance", "SAP.DE", "D1", 24, datetime(2026, 10, 13), fetched_at=datetime(2026, 10, 14, 18))
+    assert index.fetched_at("yfinance", "SAP.DE", "d1") == datetime(2026, 10, 14, 18)
+
+
+def test_warns_once_without_data_export(monkeypatch, capsys):
+    monkeypatch.setattr(freshness, "_WARNED_NO_EXPORT", False)
+    cfg = {"freshness": {"enabled": True}, "data_export": {"enabled": False}}
+    assert freshness.configure_freshness(cfg) is None
+    assert freshness.configure_freshness(cfg) is None
+    assert capsys.readouterr().out.count("data_export.enabled") == 1
+
+
+def test_no_warning_when_freshness_disabled(monkeypatch, capsys):
+    monkeypatch.setattr(freshness, "_WARNED_NO_EXPORT", False)
+    freshness.configure_freshness({"freshness": {"enabled": False}})
+    assert "[WARN]" not in capsys.readouterr().out
@@ -0,0 +1,85 @@
+"""markets.yaml-Aktualisierung: stale nur bei echten Hinweisen auf fehlende Daten."""
+
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from config import get_all_markets
+from config.get_all_markets import STATUS_STALE, probe_stale_symbols
+
+NOW = datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+
+
+def _write(path, records):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(records), encoding="utf-8")
+
+
+def _fetch(fetched_days_ago, last_bar_days_ago):
+    return {
+        "fetched_at": (NOW - timedelta(days=fetched_days_ago)).isoformat(),
+        "last_bar": (NOW - timedelta(days=last_bar_days_ago)).isoformat(),
+        "due": NOW.isoformat(),
+    }
+
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_all_markets, "PROJECT_ROOT", tmp_path)
+    return tmp_path
+
+
+CONFIG = {"quarantine": {"max_failures": 3}}
+
+
+def _markets(*symbols, status=None):
+    entries = [{"symbol": symbol, "source": "yfinance"} for symbol in symbols]
+    if status:
+        for entry in entries:
+            entry["status"] = status
+    return {"DAX": entries}
+
+
+def test_not_scanned_recently_is_not_stale(root):
+    _write(root / "outputs/freshness.json", {"yfinance|SAP.DE|D1": _fetch(30, 31)})
+    markets = _markets("SAP.DE")
+    assert probe_stale_symbols(markets, CONFIG, stale_days=14) == 0
+    assert "status" not in markets["DAX"][0]
+
+
+def test_recent_fetch_with_old_bars_is_stale(root):
+    _write(root / "outputs/freshness.json", {
+        "yfinance|OLD.DE|D1": _fetch(1, 40),
+        "yfinance|SAP.DE|D1": _fetch(1, 2),
+    })
+    markets = _markets("OLD.DE", "SAP.DE")
+    assert probe_stale_symbols(markets, CONFIG, stale_days=14) == 1
+    assert markets["DAX"][0]["status"] == STATUS_STALE
+    assert "status" not in markets["DAX"][1]
+
+
+def test_quarantine_strikes_mark_stale(root):
+    _write(root / "outputs/quarantine.json", {
+        "yfinance|GONE.DE": {"failures": 3},
+        "yfinance|FLAKY.DE": {"failures": 1},
+    })
+    markets = _markets("GONE.DE", "FLAKY.DE")
+    assert probe_stale_symbols(markets, CONFIG, stale_days=14) == 1
+    assert markets["DAX"][0]["status"] == STATUS_STALE
+    assert "status" not in markets["DAX"][1]
+
+
+def test_fresh_bars_clear_stale_mark(root):
+    _write(root / "outputs/freshness.json", {"yfinance|SAP.DE|H4": _fetch(0, 0)})
+    markets = _markets("SAP.DE", "BMW.DE", status=STATUS_STALE)
+    assert probe_stale_symbols(markets, CONFIG, stale_days=14) == 0
+    assert "status" not in markets["DAX"][0]
+    # ohne Hinweise bleibt die bisherige Markierung
+    assert markets["DAX"][1]["status"] == STATUS_STALE
+
+
+def test_without_index_files_nothing_changes(root, capsys):
+    markets = _markets("SAP.DE")
+    assert probe_stale_symbols(markets, CONFIG, stale_days=14) == 0
+    assert "übersprungen" in capsys.readouterr().out
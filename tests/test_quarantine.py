@@ -0,0 +1,138 @@
+"""Quarantäne: Zähler, Sperrfrist und Einordnung der yfinance-Fehler."""
+
+import json
+
+import pandas as pd
+import pytest
+
+from utils.daten import data_loader, quarantine
+from utils.daten.quarantine import SymbolQuarantine
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Aktive Quarantäne in tmp_path (3 Fehlversuche, 72 h Sperre)."""
+    active = SymbolQuarantine(tmp_path / "quarantine.json", max_failures=3, cooloff_hours=72)
+    monkeypatch.setattr(quarantine, "_ACTIVE", active)
+    return active
+
+
+def _failures(store, symbol="XYZ.DE"):
+    if not store.path.exists():
+        return 0
+    records = json.loads(store.path.read_text(encoding="utf-8"))
+    return records.get(f"yfinance|{symbol}", {}).get("failures", 0)
+
+
+def _stub_history(monkeypatch, result):
+    """Ersetzt yf.Ticker(...).history durch `result` (Exception oder DataFrame)."""
+    import yfinance
+
+    class FakeTicker:
+        def __init__(self, symbol):
+            self.symbol = symbol
+
+        def history(self, **_kwargs):
+            if isinstance(result, BaseException):
+                raise result
+            return result
+
+    monkeypatch.setattr(yfinance, "Ticker", FakeTicker)
+
+
+def test_sperre_nach_max_failures_und_reset_bei_erfolg(store):
+    for _ in range(2):
+        store.record_empty("yfinance", "XYZ.DE")
+    assert not store.should_skip("yfinance", "XYZ.DE")
+
+    store.record_empty("yfinance", "XYZ.DE")
+    assert store.should_skip("yfinance", "XYZ.DE")
+    assert [row["symbol"] for row in store.quarantined()] == ["XYZ.DE"]
+
+    store.record_success("yfinance", "XYZ.DE")
+    assert not store.should_skip("yfinance", "XYZ.DE")
+    assert _failures(store) == 0
+
+
+def test_release_gibt_symbol_frei(store):
+    for _ in range(3):
+        store.record_empty("yfinance", "XYZ.DE")
+    assert store.release("XYZ.DE") == 1
+    assert not store.should_skip("yfinance", "XYZ.DE")
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        ConnectionError("Failed to establish a new connection"),
+        TimeoutError("Read timed out"),
+        pytest.param("rate_limit", id="YFRateLimitError"),
+    ],
+)
+def test_ausfall_zaehlt_nicht(store, monkeypatch, error):
+    if error == "rate_limit":
+        from yfinance.exceptions import YFRateLimitError
+
+        error = YFRateLimitError()
+    store.record_empty("yfinance", "XYZ.DE")
+    _stub_history(monkeypatch, error)
+
+    df = data_loader.load_data("XYZ.DE", "yfinance", "D1")
+
+    assert df.empty
+    assert _failures(store) == 1
+
+
+def test_leere_antwort_ohne_fehler_zaehlt_nicht(store, monkeypatch):
+    _stub_history(monkeypatch, pd.DataFrame())
+
+    assert data_loader.load_data("XYZ.DE", "yfinance", "D1").empty
+    assert _failures(store) == 0
+
+
+@pytest.mark.parametrize("kind", ["prices", "tz"])
+def test_possibly_delisted_zaehlt(store, monkeypatch, kind):
+    from yfinance.exceptions import YFPricesMissingError, YFTzMissingError
+
+    error = YFPricesMissingError("XYZ.DE", "") if kind == "prices" else YFTzMissingError("XYZ.DE")
+    _stub_history(monkeypatch, error)
+
+    assert data_loader.load_data("XYZ.DE", "yfinance", "D1").empty
+    assert _failures(store) == 1
+
+
+def test_daten_setzen_zaehler_zurueck(store, monkeypatch):
+    store.record_empty("yfinance", "XYZ.DE")
+    index = pd.date_range("2024-01-01", periods=3, freq="D", tz="UTC")
+    frame = pd.DataFrame(
+        {"Open": 1.0, "High": 2.0, "Low": 0.5, "Close": 1.5, "Volume": 10}, index=index)
+    _stub_history(monkeypatch, frame)
+
+    df = data_loader.load_data("XYZ.DE", "yfinance", "D1")
+
+    assert list(df.columns) == ["open", "high", "low", "close", "volume"]
+    assert len(df) == 3
+    assert _failures(store) == 0
+
+
+def test_altes_yfinance_ohne_exceptions(store, monkeypatch):
+    """Ohne yf.config/yfinance.exceptions: kein Absturz, nur "possibly delisted" zählt."""
+    import sys
+    from types import SimpleNamespace
+
+    class OldTicker:
+        def __init__(self, symbol):
+            self.symbol = symbol
+
+        def history(self, **_kwargs):
+            raise RuntimeError(f"{self.symbol}: possibly delisted; no price data found")
+
+    monkeypatch.setitem(sys.modules, "yfinance", SimpleNamespace(Ticker=OldTicker))
+    monkeypatch.setitem(sys.modules, "yfinance.exceptions", None)
+    data_loader._yfinance.cache_clear()
+    try:
+        assert data_loader._yfinance()[1] == ()
+        assert data_loader.load_data("XYZ.DE", "yfinance", "D1").empty
+    finally:
+        data_loader._yfinance.cache_clear()
+    assert _failures(store) == 1
@@ -0,0 +1,64 @@
+"""Signal-Historie: Upsert der Liquidity-Signale und Delta-Modus."""
+
+import pytest
+
+from utils.daten.signal_store import SignalStore, divergence_report_key
+
+
+@pytest.fixture
+def store(tmp_path):
+    with SignalStore(tmp_path / "signals.sqlite") as signal_store:
+        yield signal_store
+
+
+def _signal(stage, score=1.0):
+    return {
+        "signal_time": "2026-10-14 00:00:00",
+        "direction": "bullish",
+        "level_price": 101.5,
+        "stage": stage,
+        "score": score,
+    }
+
+
+def test_liquidity_signal_is_updated_not_duplicated(store):
+    row = ("SAP.DE", "SAP", "DAX", _signal(1))
+    first = store.start_scan("liquidity", "D1", ["DAX"])
+    assert store.insert_liquidity_signals(first, "D1", [row]) == 1
+
+    # erneuter Scan ohne Änderung: nichts geschrieben
+    second = store.start_scan("liquidity", "D1", ["DAX"])
+    assert store.insert_liquidity_signals(second, "D1", [row]) == 0
+
+    upgraded = ("SAP.DE", "SAP", "DAX", _signal(3, score=2.5))
+    assert store.insert_liquidity_signals(second, "D1", [upgraded]) == 1
+
+    rows = store.conn.execute("SELECT stage, score, scan_id FROM liquidity_signals").fetchall()
+    assert [tuple(row) for row in rows] == [(3, 2.5, second)]
+
+
+def test_divergences_are_stored_once(store):
+    scan_id = store.start_scan("divergence", "D1")
+    result = {"bullish": [("2026-10-01", "2026-10-14")], "bearish": [("2026-10-02", "2026-10-09")]}
+    assert store.insert_divergences(scan_id, "D1", [("SAP.DE", "SAP", "DAX", result)]) == 2
+    assert store.insert_divergences(scan_id, "D1", [("SAP.DE", "SAP", "DAX", result)]) == 0
+    assert store.conn.execute("SELECT COUNT(*) FROM divergences").fetchone()[0] == 2
+
+
+def test_filter_unreported_returns_only_new_keys(store):
+    old = divergence_report_key("SAP.DE", "d1", "bullish", ("2026-10-01", "2026-10-14"))
+    new = divergence_report_key("BMW.DE", "d1", "bearish", ("2026-10-02", "2026-10-15"))
+    store.mark_reported("divergence", [old])
+
+    assert store.filter_unreported("divergence", [old, new]) == {new}
+    # gemeldete Schlüssel gelten nur für ihren Scanner
+    assert store.filter_unreported("liquidity", [old, new]) == {old, new}
+    assert store.filter_unreported("divergence", []) == set()
+
+
+def test_mark_reported_is_idempotent(store):
+    key = divergence_report_key("SAP.DE", "D1", "bullish", ("2026-10-01", "2026-10-14"))
+    store.mark_reported("divergence", [key])
+    store.mark_reported("divergence", [key])
+    assert store.conn.execute("SELECT COUNT(*) FROM reported_keys").fetchone()[0] == 1
+    assert store.filter_unreported("divergence", [key]) == set()
@@ -0,0 +1,110 @@
+"""Zeitmessung: verschachtelte Stufen, Perzentile, JSON-/CSV-Report."""
+
+import csv
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from utils import timing
+from utils.timing import ScanTimer, _percentile
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Manuell gestellte Uhr statt time.perf_counter."""
+    state = SimpleNamespace(now=0.0)
+    monkeypatch.setattr(timing, "time", SimpleNamespace(perf_counter=lambda: state.now))
+    return state
+
+
+def test_nested_stages_count_only_their_own_time(clock):
+    timer = ScanTimer("test")
+    with timer.symbol("SAP.DE"):
+        with timer.stage("detection"):
+            clock.now += 1.0
+            with timer.stage("indicator"):
+                clock.now += 3.0
+            clock.now += 2.0
+        with timer.stage("fetch"):
+            clock.now += 0.5
+
+    stages = timer.summary()["stages"]
+    assert stages["detection"]["total_ms"] == 3000.0
+    assert stages["indicator"]["total_ms"] == 3000.0
+    assert stages["fetch"]["total_ms"] == 500.0
+    assert timer.per_symbol["SAP.DE"] == {"detection": 3.0, "indicator": 3.0, "fetch": 0.5}
+
+
+def test_percentiles_interpolate_linearly():
+    values = [float(v) for v in range(1, 101)]
+    assert _percentile(values, 50) == pytest.approx(50.5)
+    assert _percentile(values, 95) == pytest.approx(95.05)
+    assert _percentile([], 95) == 0.0
+    assert _percentile([4.0], 50) == 4.0
+
+
+def test_summary_latency_and_throughput_exclude_display(clock):
+    timer = ScanTimer("test")
+    for idx, seconds in enumerate([0.1, 0.2, 0.3, 0.4]):
+        with timer.symbol(f"S{idx}"), timer.stage("fetch"):
+            clock.now += seconds
+    with timer.stage("display"):
+        clock.now += 10.0
+
+    summary = timer.summary()
+    assert summary["symbols"] == 4
+    assert summary["active_seconds"] == pytest.approx(1.0)
+    assert summary["symbols_per_second"] == pytest.approx(4.0)
+    assert summary["symbol_latency_ms"]["p50"] == pytest.approx(250.0)
+    assert summary["symbol_latency_ms"]["p95"] == pytest.approx(385.0)
+    assert summary["symbol_latency_ms"]["max"] == pytest.approx(400.0)
+
+
+def test_report_files(clock, tmp_path):
+    timer = ScanTimer("liquidity", "D1", output_dir=tmp_path)
+    with timer.symbol("SAP.DE"):
+        with timer.stage("fetch"):
+            clock.now += 0.25
+        with timer.stage("render"):
+            clock.now += 0.5
+    timer.count("hits", 2)
+
+    json_path = timer.write_report()
+    report = json.loads(json_path.read_text(encoding="utf-8"))
+    assert json_path.parent == tmp_path and json_path.name.startswith("liquidity_")
+    assert report["timeframe"] == "D1"
+    assert report["counters"] == {"hits": 2}
+    assert report["per_symbol_ms"] == {"SAP.DE": {"fetch": 250.0, "render": 500.0}}
+
+    with open(json_path.with_suffix(".csv"), newline="", encoding="utf-8") as handle:
+        rows = list(csv.reader(handle))
+    assert rows[0] == ["symbol", "total_ms", "fetch_ms", "render_ms"]
+    assert rows[1] == ["SAP.DE", "750.0", "250.0", "500.0"]
+
+
+def test_module_stage_is_noop_without_timer_but_runs_hooks(monkeypatch):
+    monkeypatch.setattr(timing, "_ACTIVE", None)
+    monkeypatch.setattr(timing, "_STAGE_HOOKS", [])
+    monkeypatch.setattr(timing, "_FINISH_HOOKS", [])
+    seen = []
+    timing.add_stage_hook(seen.append)
+    timing.add_finish_hook(lambda: seen.append("finish"))
+
+    with timing.stage("fetch"):
+        pass
+    assert timing.finish_scan_timer() is None
+    assert seen == ["fetch", "finish"]
+
+
+def test_finish_writes_report_of_active_timer(monkeypatch, tmp_path, capsys):
+    monkeypatch.setattr(timing, "_FINISH_HOOKS", [])
+    timer = timing.start_scan_timer("test", "H4", {"timing": {"output_dir": str(tmp_path)}})
+    with timing.symbol("SAP.DE"), timing.stage("fetch"):
+        pass
+    path = timing.finish_scan_timer()
+
+    assert timer is not None and timing.active_timer() is None
+    assert path.exists() and path.with_suffix(".csv").exists()
+    assert "LAUFZEITEN" in capsys.readouterr().out
+    assert timing.start_scan_timer("test", cfg={"timing": {"enabled": False}}) is None
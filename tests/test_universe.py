@@ -0,0 +1,75 @@
+"""Markt-Index: Kompilieren, Abfragen, Binär-Cache."""
+
+import os
+
+import pytest
+
+from utils.daten import universe as universe_module
+from utils.daten.universe import UniverseError, cache_path_for, compile_universe, load_universe
+
+MARKETS_YAML = """\
+markets:
+  DAX:
+    - symbol: SAP.DE
+      name: SAP
+    - symbol: BMW.DE
+      status: delisted
+  FOREX:
+    - symbol: EUR_USD
+      source: oanda
+    - symbol: SAP.DE
+      sector: Software
+"""
+
+
+@pytest.fixture
+def markets_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(universe_module, "_LOADED", {})
+    path = tmp_path / "markets.yaml"
+    path.write_text(MARKETS_YAML, encoding="utf-8")
+    return path
+
+
+def test_compile_skips_delisted_and_keeps_extras(markets_file, tmp_path):
+    universe = compile_universe(markets_file, tmp_path / "cache")
+    assert list(universe) == ["DAX", "FOREX"]
+    assert universe["DAX"] == [{"symbol": "SAP.DE", "name": "SAP"}]
+    assert universe["FOREX"][1] == {"symbol": "SAP.DE", "sector": "Software"}
+    assert not universe.has_symbol("BMW.DE")
+    assert universe.markets_of("SAP.DE") == ["DAX", "FOREX"]
+    assert universe.symbols_of(source="oanda") == ["EUR_USD"]
+    assert universe.symbols_of("DAX") == ["SAP.DE"]
+
+
+def test_load_uses_cache_without_parsing(markets_file, tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    expected = compile_universe(markets_file, cache_dir).to_dict()
+    monkeypatch.setattr(universe_module, "_LOADED", {})
+
+    def fail(*_args):
+        raise AssertionError("YAML erneut geparst")
+
+    monkeypatch.setattr(universe_module, "_parse_yaml", fail)
+    assert load_universe(markets_file, cache_dir).to_dict() == expected
+
+    # nur der Zeitstempel ändert sich: Hash stimmt, weiterhin kein Parsen
+    stat = markets_file.stat()
+    os.utime(markets_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert load_universe(markets_file, cache_dir, reload=True).to_dict() == expected
+
+
+def test_changed_file_is_recompiled(markets_file, tmp_path):
+    cache_dir = tmp_path / "cache"
+    compile_universe(markets_file, cache_dir)
+    markets_file.write_text(MARKETS_YAML + "  US:\n    - symbol: AAPL\n", encoding="utf-8")
+    universe = load_universe(markets_file, cache_dir, reload=True)
+    assert universe.symbols_of("US") == ["AAPL"]
+    assert cache_path_for(markets_file, cache_dir).exists()
+
+
+def test_invalid_structure_raises(tmp_path, monkeypatch):
+    monkeypatch.setattr(universe_module, "_LOADED", {})
+    path = tmp_path / "markets.yaml"
+    path.write_text("markets: [1, 2]\n", encoding="utf-8")
+    with pytest.raises(UniverseError):
+        load_universe(path, tmp_path / "cache")
@@ -0,0 +1,57 @@
+"""Watch-Modus: paralleles Nachladen nach einem Bar-Schluss."""
+
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from modules import watch_daemon
+from modules.watch_daemon import PendingClose, WatchDaemon, WatchedSymbol
+
+
+def _bars(start, periods):
+    index = pd.date_range(start, periods=periods, freq="h")
+    return pd.DataFrame(
+        {"open": 1.0, "high": 1.0, "low": 1.0, "close": 1.0, "volume": 1.0}, index=index)
+
+
+@pytest.fixture
+def daemon(monkeypatch):
+    monkeypatch.setattr(watch_daemon, "open_signal_store", lambda _cfg: None)
+    entries = [WatchedSymbol(f"S{idx}", f"S{idx}", "TEST", "yfinance") for idx in range(6)]
+    watch = WatchDaemon(entries, {"watch": {"fetch_workers": 6}}, ["H1"], ["liquidity"])
+    for watched in entries:
+        watch.cache.put(watch._cache_key(watched, "H1"), _bars("2026-10-01", 10))
+    monkeypatch.setattr(watch, "_run_detectors", lambda watched, tf, report: [])
+    return watch
+
+
+def test_poll_fetches_concurrently_and_merges(daemon, monkeypatch):
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def fake_load(symbol, source, timeframe, since, oanda_token=None):
+        with lock:
+            active.append(symbol)
+            peak.append(len(active))
+        time.sleep(0.05)
+        with lock:
+            active.remove(symbol)
+        if symbol == "S0":
+            return pd.DataFrame()  # Bar noch nicht da
+        if symbol == "S1":
+            raise ConnectionError("Netz weg")
+        return _bars(since + pd.Timedelta(hours=1), 1)
+
+    monkeypatch.setattr(watch_daemon, "load_recent_bars", fake_load)
+    pending = PendingClose(datetime.utcnow(), datetime.utcnow(), list(daemon.entries))
+    daemon._poll_pending("H1", pending)
+
+    assert max(peak) > 1
+    assert sorted(watched.symbol for watched in pending.waiting) == ["S0", "S1"]
+    for watched in daemon.entries[2:]:
+        df = daemon.cache.get(daemon._cache_key(watched, "H1"))
+        assert df.index[-1] == pd.Timestamp("2026-10-01 10:00")
@@ -0,0 +1,280 @@
+# /utils/chart/browser.py
+"""
+Chart-Browser für Scan-Treffer.
+
+Statt für jeden Treffer ein blockierendes Matplotlib-Fenster zu öffnen
+(`while plt.fignum_exists(...): plt.pause(0.1)`), zeigt ein einziges
+Qt-Fenster die Charts als Bilder mit Vor/Zurück-Navigation
+(Pfeiltasten, Leertaste, Esc zum Schließen).
+
+Rendert bereits ein anderer Pool denselben Treffer (Chart-Export des
+Liquidity-Scanners), übernimmt der Browser dessen Ergebnis (`BrowserItem.ready`)
+statt ihn erneut zu rendern. Alle übrigen Charts werden in einem Prozess-Pool
+(Agg-Backend) vorgerendert, der erst beim ersten solchen Treffer startet:
+beim Anzeigen von Treffer i laufen bereits die nächsten `prefetch` Treffer,
+so dass das Blättern ohne Wartezeit geht. Über den Chart-Cache
+(utils/chart/chart_cache.py) sind bereits gerenderte Bilder sofort da.
+
+Ohne Qt-Backend oder mit `chart_browser.enabled: false` liefert
+`show_chart_browser` False; die Scanner fallen dann auf die bisherigen
+Einzelfenster zurück.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from utils import timing
+from utils.chart.chart_cache import chart_cache_settings
+
+DEFAULT_PREFETCH = 4
+DEFAULT_WORKERS = 2
+
+
+@dataclass
+class BrowserItem:
+    """
+    Ein Treffer im Browser. `render(**kwargs)` muss eine Modul-Funktion sein
+    (picklebar für den Prozess-Pool) und PNG-Bytes oder None liefern.
+    `ready` ist optional ein bereits laufender Auftrag, dessen Ergebnis
+    (PNG-Bytes oder None) statt `render` verwendet wird.
+    """
+
+    title: str
+    render: Callable[..., Optional[bytes]]
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    ready: Optional[Future] = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Futures sind nicht picklebar und gehören zum Hauptprozess
+        return {**self.__dict__, "ready": None}
+
+
+def browser_settings(cfg: Dict[str, Any]) -> Optional[Dict[str, int]]:
+    browser_cfg = cfg.get("chart_browser", {}) if isinstance(cfg, dict) else {}
+    if not bool(browser_cfg.get("enabled", True)):
+        return None
+    return {
+        "prefetch": max(int(browser_cfg.get("prefetch", DEFAULT_PREFETCH)), 0),
+        "workers": max(int(browser_cfg.get("workers", DEFAULT_WORKERS)), 1),
+    }
+
+
+def _init_worker() -> None:
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+
+def render_item(item: BrowserItem, cache_settings: Optional[Dict[str, Any]]) -> Optional[bytes]:
+    """Rendert einen Treffer (auch im Worker-Prozess), optional über den Chart-Cache."""
+    kwargs = dict(item.kwargs)
+    if cache_settings:
+        from utils.chart.chart_cache import ChartCache
+
+        kwargs["cache"] = ChartCache(**cache_settings)
+    return item.render(**kwargs)
+
+
+class _Prerenderer:
+    """
+    Hält für jeden Treffer höchstens einen Render-Auftrag; Treffer mit
+    `ready` brauchen keinen, der Pool startet erst bei Bedarf.
+    """
+
+    def __init__(
+        self,
+        items: List[BrowserItem],
+        workers: int,
+        prefetch: int,
+        cache_settings: Optional[Dict[str, Any]],
+    ) -> None:
+        self.items = items
+        self.prefetch = prefetch
+        self.cache_settings = cache_settings
+        self.workers = workers
+        self.futures: Dict[int, Future] = {
+            idx: item.ready for idx, item in enumerate(items) if item.ready is not None
+        }
+        self.pool: Optional[ProcessPoolExecutor] = None
+
+    def request(self, current: int) -> None:
+        """Aktuellen Treffer zuerst, dann die nächsten `prefetch` und den vorherigen."""
+        wanted = [current]
+        wanted.extend(range(current + 1, min(current + 1 + self.prefetch, len(self.items))))
+        if current > 0:
+            wanted.append(current - 1)
+
+        for idx in wanted:
+            if idx not in self.futures:
+                if self.pool is None:
+                    self.pool = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_init_worker,
+                    )
+                self.futures[idx] = self.pool.submit(
+                    render_item, self.items[idx], self.cache_settings)
+
+    def result(self, idx: int) -> tuple[bool, Optional[bytes]]:
+        """(fertig, PNG-Bytes); Fehler werden gemeldet und als leeres Bild behandelt."""
+        future = self.futures.get(idx)
+        if future is None or not future.done():
+            return False, None
+        try:
+            return True, future.result()
+        except Exception as exc:
+            print(f"[Fehler] Chart konnte nicht gerendert werden ({self.items[idx].title}): {exc}")
+            return True, None
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _qt_enum(owner: Any, group: str, name: str) -> Any:
+    """Enum-Wert für Qt5 (flach) und Qt6 (gruppiert)."""
+    return getattr(getattr(owner, group, owner), name)
+
+
+def _build_window(QtCore, QtGui, QtWidgets, items, prerenderer, loop):
+    keep_aspect = _qt_enum(QtCore.Qt, "AspectRatioMode", "KeepAspectRatio")
+    smooth = _qt_enum(QtCore.Qt, "TransformationMode", "SmoothTransformation")
+    align_center = _qt_enum(QtCore.Qt, "AlignmentFlag", "AlignCenter")
+
+    class ChartBrowserWindow(QtWidgets.QWidget):
+        def __init__(self) -> None:
+            super().__init__()
+            self.index = 0
+            self.pixmap = None
+            self.setWindowTitle("Scan-Treffer")
+            self.resize(1400, 820)
+
+            self.status = QtWidgets.QLabel()
+            self.image = QtWidgets.QLabel("Rendere Chart...")
+            self.image.setAlignment(align_center)
+            self.image.setMinimumSize(400, 300)
+
+            self.prev_button = QtWidgets.QPushButton("◀ Zurück")
+            self.prev_button.setShortcut(QtGui.QKeySequence("Left"))
+            self.prev_button.clicked.connect(lambda: self.show_item(self.index - 1))
+            self.next_button = QtWidgets.QPushButton("Weiter ▶")
+            self.next_button.setShortcut(QtGui.QKeySequence("Right"))
+            self.next_button.clicked.connect(lambda: self.show_item(self.index + 1))
+            close_button = QtWidgets.QPushButton("Schließen")
+            close_button.setShortcut(QtGui.QKeySequence("Esc"))
+            close_button.clicked.connect(self.close)
+
+            buttons = QtWidgets.QHBoxLayout()
+            buttons.addWidget(self.prev_button)
+            buttons.addWidget(self.status, 1)
+            buttons.addWidget(self.next_button)
+            buttons.addWidget(close_button)
+
+            layout = QtWidgets.QVBoxLayout(self)
+            layout.addWidget(self.image, 1)
+            layout.addLayout(buttons)
+
+            # Leertaste blättert ebenfalls weiter
+            shortcut_cls = getattr(QtWidgets, "QShortcut", None) or QtGui.QShortcut
+            space = shortcut_cls(QtGui.QKeySequence("Space"), self)
+            space.activated.connect(lambda: self.show_item(self.index + 1))
+
+            # wartet auf noch laufende Render-Aufträge des aktuellen Treffers
+            self.poll = QtCore.QTimer(self)
+            self.poll.setInterval(100)
+            self.poll.timeout.connect(self.refresh)
+
+            self.show_item(0)
+
+        def show_item(self, idx: int) -> None:
+            if not 0 <= idx < len(items):
+                return
+            self.index = idx
+            self.pixmap = None
+            self.prev_button.setEnabled(idx > 0)
+            self.next_button.setEnabled(idx < len(items) - 1)
+            self.status.setText(f"{idx + 1} / {len(items)}  |  {items[idx].title}")
+            prerenderer.request(idx)
+            self.refresh()
+
+        def refresh(self) -> None:
+            done, png = prerenderer.result(self.index)
+            if not done:
+                self.image.setText("Rendere Chart...")
+                self.poll.start()
+                return
+
+            self.poll.stop()
+            if not png:
+                self.image.setText("Kein Chart verfügbar.")
+                return
+
+            pixmap = QtGui.QPixmap()
+            pixmap.loadFromData(png, "PNG")
+            self.pixmap = pixmap
+            self._update_scaled()
+
+        def _update_scaled(self) -> None:
+            if self.pixmap is not None:
+                self.image.setPixmap(
+                    self.pixmap.scaled(self.image.size(), keep_aspect, smooth))
+
+        def resizeEvent(self, event) -> None:
+            super().resizeEvent(event)
+            self._update_scaled()
+
+        def closeEvent(self, event) -> None:
+            self.poll.stop()
+            loop.quit()
+            super().closeEvent(event)
+
+    return ChartBrowserWindow()
+
+
+def show_chart_browser(items: List[BrowserItem], cfg: Dict[str, Any]) -> bool:
+    """
+    Zeigt die Treffer im Chart-Browser und kehrt nach dem Schließen zurück.
+    Liefert False, wenn der Browser nicht verfügbar oder deaktiviert ist.
+    """
+    settings = browser_settings(cfg)
+    if settings is None:
+        return False
+
+    import matplotlib.pyplot as plt
+
+    if "qt" not in plt.get_backend().lower():
+        return False
+
+    if not items:
+        return True
+
+    try:
+        from matplotlib.backends.qt_compat import QtCore, QtGui, QtWidgets
+    except ImportError:
+        return False
+
+    # bleibt bis zum Ende referenziert, sonst räumt Qt die Anwendung ab
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+    prerenderer = _Prerenderer(
+        items,
+        workers=settings["workers"],
+        prefetch=settings["prefetch"],
+        cache_settings=chart_cache_settings(cfg),
+    )
+    try:
+        loop = QtCore.QEventLoop()
+        window = _build_window(QtCore, QtGui, QtWidgets, items, prerenderer, loop)
+        window.show()
+        with timing.stage("display"):
+            loop.exec() if hasattr(loop, "exec") else loop.exec_()
+    finally:
+        prerenderer.close()
+        window = None
+
+    app.processEvents()
+    return True
@@ -0,0 +1,165 @@
+# /utils/chart/candles.py
+"""
+Gemeinsamer Kerzen-Kern für alle Chart-Plotter.
+
+Statt pro Bar einen vlines-Aufruf und einen Rectangle-Patch anzulegen,
+werden Dochte und Körper als je eine Matplotlib-Collection gezeichnet.
+Farben und Körperhöhen werden mit numpy für alle Bars auf einmal berechnet.
+Dazu kommen gebündelte Helfer für Boxen (z. B. FVGs) und horizontale
+Linien über die volle Achsenbreite (z. B. Liquidity-Levels).
+"""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+from matplotlib.collections import LineCollection, PolyCollection
+
+COLOR_UP = "#00B050"
+COLOR_DOWN = "#FF0000"
+
+
+def _rectangles(
+    left: np.ndarray,
+    bottom: np.ndarray,
+    width: np.ndarray,
+    height: np.ndarray,
+) -> np.ndarray:
+    """Eckpunkte (n, 4, 2) achsenparalleler Rechtecke."""
+    right = left + width
+    top = bottom + height
+    return np.stack(
+        [
+            np.column_stack([left, bottom]),
+            np.column_stack([left, top]),
+            np.column_stack([right, top]),
+            np.column_stack([right, bottom]),
+        ],
+        axis=1,
+    )
+
+
+def draw_candles(
+    ax,
+    x: np.ndarray,
+    data: pd.DataFrame,
+    width: float = 0.65,
+    wick_width: float = 1.0,
+    wick_alpha: float | None = None,
+    body_alpha: float | None = None,
+    min_body_ratio: float = 0.0,
+    color_up: str = COLOR_UP,
+    color_down: str = COLOR_DOWN,
+) -> tuple[LineCollection, PolyCollection]:
+    """
+    Zeichnet alle Kerzen aus `data` (open/high/low/close) an den Positionen `x`.
+
+    `min_body_ratio` legt eine Mindest-Körperhöhe relativ zur Kerzenspanne
+    fest, damit Doji sichtbar bleiben; absolut gilt immer mindestens 1e-6.
+    Liefert die Collections (Dochte, Körper).
+    """
+    x = np.asarray(x, dtype=float)
+    o = data["open"].to_numpy(dtype=float)
+    h = data["high"].to_numpy(dtype=float)
+    l = data["low"].to_numpy(dtype=float)
+    c = data["close"].to_numpy(dtype=float)
+
+    colors = np.where(c >= o, color_up, color_down)
+
+    # Dochte: ein Segment (x, low) -> (x, high) pro Bar
+    wick_segments = np.stack(
+        [np.column_stack([x, l]), np.column_stack([x, h])], axis=1
+    )
+    wicks = LineCollection(
+        wick_segments,
+        colors=colors,
+        linewidths=wick_width,
+        alpha=wick_alpha,
+        zorder=2,
+    )
+    ax.add_collection(wicks)
+
+    min_height = np.maximum((h - l) * min_body_ratio, 1e-6)
+    body_height = np.maximum(np.abs(c - o), min_height)
+    bodies = PolyCollection(
+        _rectangles(x - width / 2, np.minimum(o, c), np.full_like(x, width), body_height),
+        facecolors=colors,
+        edgecolors="black",
+        linewidths=0.5,
+        alpha=body_alpha,
+        zorder=3,
+    )
+    ax.add_collection(bodies)
+
+    return wicks, bodies
+
+
+def draw_boxes(
+    ax,
+    left: Sequence[float],
+    bottom: Sequence[float],
+    width: Sequence[float],
+    height: Sequence[float],
+    colors: Sequence[str],
+    alpha: float | None = None,
+    linewidth: float = 0.8,
+    zorder: float = 0.4,
+) -> PolyCollection | None:
+    """Zeichnet gleichartige Rechtecke (Füllung und Rand in `colors`) als eine Collection."""
+    if len(left) == 0:
+        return None
+
+    boxes = PolyCollection(
+        _rectangles(
+            np.asarray(left, dtype=float),
+            np.asarray(bottom, dtype=float),
+            np.asarray(width, dtype=float),
+            np.asarray(height, dtype=float),
+        ),
+        facecolors=list(colors),
+        edgecolors=list(colors),
+        linewidths=linewidth,
+        alpha=alpha,
+        zorder=zorder,
+    )
+    ax.add_collection(boxes)
+    return boxes
+
+
+def draw_hlines(
+    ax,
+    ys: Sequence[float],
+    colors: Sequence[str],
+    linestyles: Sequence[str] | str = "-",
+    linewidths: Sequence[float] | float = 1.0,
+    alpha: float | None = None,
+    zorder: float = 1,
+) -> LineCollection | None:
+    """
+    Horizontale Linien über die volle Achsenbreite (wie axhline), gebündelt
+    in einer Collection. x läuft in Achsen-, y in Datenkoordinaten.
+    """
+    if len(ys) == 0:
+        return None
+
+    ys = np.asarray(ys, dtype=float)
+    segments = np.stack(
+        [
+            np.column_stack([np.zeros_like(ys), ys]),
+            np.column_stack([np.ones_like(ys), ys]),
+        ],
+        axis=1,
+    )
+    lines = LineCollection(
+        segments,
+        colors=list(colors),
+        linestyles=linestyles,
+        linewidths=linewidths,
+        alpha=alpha,
+        zorder=zorder,
+        transform=ax.get_yaxis_transform(),
+    )
+    ax.add_collection(lines)
+    return lines
@@ -0,0 +1,218 @@
+# /utils/chart/chart_cache.py
+"""
+Inhaltsbasierter Cache für gerenderte Chart-PNGs.
+
+Wiederholte Scans (Wochenende, zwischen zwei Bar-Schlüssen) liefern für
+dieselben Symbole denselben DataFrame und dieselben Signale. Der Schlüssel
+ist daher ein SHA-256 über
+- die geplotteten OHLC-Daten (Zeitindex + Werte, inkl. SMA-Spalten),
+- Signale / Levels / Divergenzen,
+- Overlay-Konfiguration, Titel und Render-Parameter (Ausschnitt, dpi),
+- den Quelltext der Render-Module (RENDER_MODULES), damit Änderungen an
+  Layout, Farben oder LOD alte PNGs automatisch ungültig machen.
+
+Bei einem Treffer wird das vorhandene PNG wiederverwendet, ohne den Chart
+neu aufzubauen. Einträge liegen als `<dir>/<ab>/<hash>.png`; geschrieben wird
+atomar (temporäre Datei + replace), damit parallele Export-Worker sich nicht
+gegenseitig halbe Dateien liefern.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import os
+from datetime import date, datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CACHE_DIR = "outputs/chart_cache"
+DEFAULT_MAX_ENTRIES = 2000
+
+# Manuell erhöhen, wenn sich das Bild ändert, ohne dass sich der Quelltext
+# der RENDER_MODULES ändert (z. B. neue matplotlib-Version mit anderem Stil)
+RENDER_VERSION = 2
+
+# Module, deren Quelltext das gerenderte Bild bestimmt (relativ zum Repo)
+RENDER_MODULES = (
+    "utils/chart/plotter.py",
+    "utils/chart/candles.py",
+    "utils/chart/decimate.py",
+    "utils/chart/donchian_plotter.py",
+    "modules/liquidityGrabScanner/plotter.py",
+    "modules/liquidityGrabScanner/pattern_overlay.py",
+)
+
+_REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+@lru_cache(maxsize=1)
+def render_fingerprint() -> str:
+    """RENDER_VERSION plus Kurz-Hash über den Quelltext der RENDER_MODULES."""
+    h = hashlib.sha256()
+    for name in RENDER_MODULES:
+        h.update(name.encode("utf-8"))
+        try:
+            h.update((_REPO_ROOT / name).read_bytes())
+        except OSError:
+            h.update(b"missing")
+    return f"v{RENDER_VERSION}-{h.hexdigest()[:12]}"
+
+
+def _feed(h: Any, value: Any) -> None:
+    """Schreibt `value` deterministisch und typgetreu in den Hash."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        h.update(f"{type(value).__name__}:{value!r};".encode("utf-8"))
+    elif isinstance(value, (pd.Timestamp, datetime, date)):
+        h.update(f"ts:{pd.Timestamp(value).value};".encode("utf-8"))
+    elif isinstance(value, np.generic):
+        _feed(h, value.item())
+    elif isinstance(value, pd.DataFrame):
+        h.update(b"df:")
+        h.update(np.asarray(value.index.asi8 if isinstance(value.index, pd.DatetimeIndex)
+                            else value.index.astype(str)).tobytes())
+        for col in value.columns:
+            h.update(f"{col}:".encode("utf-8"))
+            h.update(np.ascontiguousarray(value[col].to_numpy(dtype=float)).tobytes())
+        h.update(b";")
+    elif dataclasses.is_dataclass(value) and not isinstance(value, type):
+        h.update(f"{type(value).__name__}(".encode("utf-8"))
+        for item in dataclasses.fields(value):
+            h.update(f"{item.name}=".encode("utf-8"))
+            _feed(h, getattr(value, item.name))
+        h.update(b")")
+    elif isinstance(value, dict):
+        h.update(b"{")
+        for key in sorted(value, key=str):
+            _feed(h, str(key))
+            _feed(h, value[key])
+        h.update(b"}")
+    elif isinstance(value, (list, tuple)):
+        h.update(b"[")
+        for item in value:
+            _feed(h, item)
+        h.update(b"]")
+    else:
+        h.update(f"{type(value).__name__}:{value!r};".encode("utf-8"))
+
+
+def chart_key(kind: str, data: pd.DataFrame, **payload: Any) -> str:
+    """
+    Hash für einen Chart der Art `kind` (z. B. "liquidity", "candles").
+    Von `data` gehen nur numerische Spalten ein; `payload` enthält Signale,
+    Levels, Divergenzen, Overlay-Konfiguration, Titel usw.
+    """
+    h = hashlib.sha256()
+    _feed(h, f"{kind}/{render_fingerprint()}")
+    numeric = data.select_dtypes(include="number") if data is not None else pd.DataFrame()
+    _feed(h, numeric)
+    _feed(h, payload)
+    return h.hexdigest()
+
+
+class ChartCache:
+    """
+    PNG-Ablage nach Inhalts-Hash.
+
+        cache = ChartCache("outputs/chart_cache")
+        png = cache.get_or_render(key, lambda: render_png(...))
+    """
+
+    def __init__(
+        self,
+        base_dir: str | Path = DEFAULT_CACHE_DIR,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        self.base_dir = Path(base_dir)
+        self.max_entries = int(max_entries)
+        self.hits = 0
+        self.misses = 0
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, key: str) -> Path:
+        return self.base_dir / key[:2] / f"{key}.png"
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self.path_for(key)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        try:
+            # Zugriffszeit für das Aufräumen (älteste zuerst) auffrischen
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def put(self, key: str, png: bytes) -> Path:
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(png)
+        os.replace(tmp_path, path)
+        return path
+
+    def get_or_render(self, key: str, render: Callable[[], bytes]) -> bytes:
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        png = render()
+        self.put(key, png)
+        return png
+
+    def prune(self) -> int:
+        """Entfernt die am längsten ungenutzten Einträge über `max_entries`."""
+        if self.max_entries <= 0:
+            return 0
+
+        entries = list(self.base_dir.glob("*/*.png"))
+        excess = len(entries) - self.max_entries
+        if excess <= 0:
+            return 0
+
+        entries.sort(key=lambda p: p.stat().st_mtime)
+        removed = 0
+        for path in entries[:excess]:
+            try:
+                path.unlink()
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+
+def chart_cache_settings(cfg: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Picklebare Einstellungen des Caches (für Export-Worker) oder None,
+    wenn der Cache in der Konfiguration deaktiviert ist.
+    """
+    cache_cfg = cfg.get("chart_cache", {}) if isinstance(cfg, dict) else {}
+    if not bool(cache_cfg.get("enabled", True)):
+        return None
+    return {
+        "base_dir": str(cache_cfg.get("dir", DEFAULT_CACHE_DIR)),
+        "max_entries": int(cache_cfg.get("max_entries", DEFAULT_MAX_ENTRIES)),
+    }
+
+
+def open_chart_cache(cfg: Dict[str, Any]) -> Optional[ChartCache]:
+    """
+    Öffnet den Chart-Cache, falls er in der Konfiguration aktiviert ist.
+    """
+    settings = chart_cache_settings(cfg)
+    if settings is None:
+        return None
+
+    try:
+        return ChartCache(**settings)
+    except OSError as exc:
+        print(f"[WARN] Chart-Cache nicht verfuegbar: {exc}")
+        return None
@@ -0,0 +1,147 @@
+# /utils/chart/decimate.py
+"""
+Level-of-Detail für lange Historien.
+
+Hat ein Chart mehr Bars als die Kursachse Pixel breit ist, werden
+aufeinanderfolgende Bars zu Buckets zusammengefasst (OHLC-treu: erstes
+Open, höchstes High, tiefstes Low, letztes Close, Volumen summiert; übrige
+Spalten wie SMA/RSI mit dem Wert der letzten Bar). Der Bucket trägt den
+Zeitstempel seiner ersten Bar.
+
+Bars in `keep` (Signal-, Divergenz-, Referenz-Bars ...) bilden einen
+eigenen Bucket und bleiben damit samt Zeitstempel exakt erhalten. Dafür
+wird höchstens `KEEP_SHARE` von `max_bars` verwendet (die jüngsten
+Keep-Bars); ältere landen in ihrem normalen Bucket. Die Plotter ordnen
+Zeitstempel deshalb immer über die Original-Position und
+`Decimation.positions` zu, nie über den Index der verdichteten Daten.
+Ab `fine_from` (z. B. Beginn des ZOOM-Ausschnitts) wird mit eigener,
+feinerer Bucket-Größe verdichtet, damit auch der Ausschnitt höchstens
+`max_bars` Kerzen hat.
+
+Die Anzahl gezeichneter Kerzen ist damit unabhängig von der Historienlänge
+auf etwa `max_bars * (1 + KEEP_SHARE)` begrenzt – auch wenn die Zahl der
+Signale mit der Historie wächst. Das Verdichten selbst ist reines numpy
+(linear, ohne Python-Schleife); dieser Anteil und die Indikatoren auf der
+vollen Historie wachsen weiter mit der Zahl der Bars.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+# Mindestbreite, falls die Achsenbreite (noch) nicht bestimmbar ist
+MIN_AUTO_BARS = 200
+
+# Anteil von max_bars, der höchstens für exakt erhaltene Keep-Bars draufgeht
+KEEP_SHARE = 0.25
+
+
+@dataclass
+class Decimation:
+    """Verdichtete Daten plus Zuordnung Original-Position -> Bucket-Position."""
+
+    data: pd.DataFrame
+    positions: np.ndarray
+
+    @property
+    def decimated(self) -> bool:
+        return len(self.data) < len(self.positions)
+
+    def position(self, original_index: int) -> int:
+        return int(self.positions[original_index])
+
+
+def lod_max_bars(cfg: Dict[str, Any]) -> Optional[int]:
+    """
+    `max_bars` für die Plotter aus Abschnitt `chart_lod`:
+    None = aus (alle Bars zeichnen), 0 = Pixelbreite der Kursachse, sonst fester Wert.
+    """
+    lod_cfg = cfg.get("chart_lod", {}) if isinstance(cfg, dict) else {}
+    if not bool(lod_cfg.get("enabled", True)):
+        return None
+    return max(int(lod_cfg.get("max_bars", 0) or 0), 0)
+
+
+def resolve_max_bars(max_bars: Optional[int], ax) -> Optional[int]:
+    """Löst `max_bars=0` (automatisch) in die aktuelle Pixelbreite von `ax` auf."""
+    if max_bars is None:
+        return None
+    if max_bars > 0:
+        return int(max_bars)
+    width = ax.get_window_extent().width
+    return max(int(width), MIN_AUTO_BARS)
+
+
+def _bucket_starts(
+    n: int,
+    max_bars: int,
+    keep: np.ndarray,
+    fine_from: Optional[int],
+) -> np.ndarray:
+    fine_from = n if fine_from is None else min(max(int(fine_from), 0), n)
+
+    edges = [np.arange(0, fine_from, max(math.ceil(n / max_bars), 1))]
+    if fine_from < n:
+        edges.append(np.arange(fine_from, n, max(math.ceil((n - fine_from) / max_bars), 1)))
+
+    # eigene Buckets für Bars, die exakt erhalten bleiben müssen
+    edges.append(keep)
+    edges.append(keep + 1)
+
+    starts = np.unique(np.concatenate(edges))
+    return starts[starts < n]
+
+
+def decimate_ohlc(
+    data: pd.DataFrame,
+    max_bars: Optional[int],
+    keep: Iterable[int] = (),
+    fine_from: Optional[int] = None,
+) -> Decimation:
+    """
+    Verdichtet `data` (open/high/low/close, optional volume) auf etwa
+    `max_bars` Kerzen; `keep` sind Positionen, die als Einzel-Bar erhalten
+    bleiben. Ohne `max_bars` oder bei kurzer Historie bleibt `data` unverändert.
+    """
+    n = len(data)
+    identity = Decimation(data=data, positions=np.arange(n))
+    if not max_bars or n <= max_bars:
+        return identity
+
+    keep_arr = np.asarray(sorted(set(int(k) for k in keep)), dtype=np.int64)
+    keep_arr = keep_arr[(keep_arr >= 0) & (keep_arr < n)]
+    keep_arr = keep_arr[-max(int(max_bars * KEEP_SHARE), 1):]
+
+    starts = _bucket_starts(n, int(max_bars), keep_arr, fine_from)
+    if len(starts) >= n:
+        return identity
+
+    lasts = np.append(starts[1:], n) - 1
+
+    # übrige Spalten (SMA, RSI, Donchian ...) wie das Close: Wert der letzten Bar
+    out = data.iloc[lasts].copy()
+    out.index = data.index[starts]
+    out["open"] = data["open"].to_numpy(dtype=float)[starts]
+    out["high"] = np.fmax.reduceat(data["high"].to_numpy(dtype=float), starts)
+    out["low"] = np.fmin.reduceat(data["low"].to_numpy(dtype=float), starts)
+    if "volume" in data.columns:
+        volume = np.nan_to_num(data["volume"].to_numpy(dtype=float))
+        out["volume"] = np.add.reduceat(volume, starts)
+    out.attrs = dict(data.attrs)
+
+    positions = np.searchsorted(starts, np.arange(n), side="right") - 1
+    return Decimation(data=out, positions=positions)
+
+
+def positions_of(index: pd.DatetimeIndex, times: Iterable[Any]) -> list[int]:
+    """Positionen der vorhandenen Zeitstempel `times` in `index` (fehlende werden übersprungen)."""
+    wanted = pd.DatetimeIndex([t for t in times if t is not None and not pd.isna(t)])
+    if wanted.empty:
+        return []
+    locs = index.get_indexer(wanted)
+    return [int(loc) for loc in locs if loc >= 0]
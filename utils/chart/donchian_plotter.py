@@ -2,12 +2,18 @@
 
 from __future__ import annotations
 
+import io
+
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-from matplotlib.patches import Rectangle
 from matplotlib.ticker import FuncFormatter, MaxNLocator
 
+from utils import timing
+from utils.chart.candles import draw_candles
+from utils.chart.chart_cache import ChartCache, chart_key
+from utils.chart.decimate import decimate_ohlc, resolve_max_bars
+
 
 def _prepare_data(df: pd.DataFrame) -> pd.DataFrame:
     data = df.copy()
@@ -43,16 +49,22 @@ def _validate_data(data: pd.DataFrame) -> None:
         raise ValueError("Zeitindex ist nicht aufsteigend sortiert.")
 
 
-def _make_time_formatter(index: pd.DatetimeIndex) -> FuncFormatter:
+def _is_daily(index: pd.DatetimeIndex) -> bool:
+    inferred = pd.infer_freq(index) if len(index) >= 3 else None
+    return bool(inferred and "D" in inferred.upper())
+
+
+def _make_time_formatter(index: pd.DatetimeIndex, daily: bool | None = None) -> FuncFormatter:
+    # Frequenz einmal bestimmen (bei verdichteten Daten vom Original-Index)
+    daily = _is_daily(index) if daily is None else daily
+
     def _formatter(value, _pos):
         i = int(round(value))
         if i < 0 or i >= len(index):
             return ""
 
         ts = index[i]
-
-        inferred = pd.infer_freq(index)
-        if inferred and "D" in inferred.upper():
+        if daily:
             return ts.strftime("%d.%m.%Y")
 
         return ts.strftime("%d.%m\n%H:%M")
@@ -60,20 +72,34 @@ def _make_time_formatter(index: pd.DatetimeIndex) -> FuncFormatter:
     return FuncFormatter(_formatter)
 
 
-def plot_donchian_chart(
+def build_donchian_figure(
     df: pd.DataFrame,
     title: str = "",
     symbol: str | None = None,
     index: str | None = None,
     timeframe: str | None = None,
-) -> None:
+    max_bars: int | None = None,
+):
+    """
+    Baut die Donchian-Figur ohne sie anzuzeigen; None bei ungültigen Daten.
+    `max_bars` wie bei build_candle_figure (die Entry-Bar bleibt erhalten).
+    """
     data = _prepare_data(df)
 
     try:
         _validate_data(data)
     except ValueError as exc:
         print(f"[Fehler] {exc}")
-        return
+        return None
+
+    # === Plot vorbereiten ===
+    fig, ax = plt.subplots(figsize=(14, 7))
+    fig.suptitle(title, fontsize=12, fontweight="bold")
+
+    # === Level-of-Detail (letzte Bar = mögliche Entry-Bar bleibt einzeln) ===
+    daily = _is_daily(data.index)
+    if max_bars is not None:
+        data = decimate_ohlc(data, resolve_max_bars(max_bars, ax), keep=[len(data) - 1]).data
 
     bars_before = len(data)
 
@@ -82,7 +108,8 @@ def plot_donchian_chart(
 
     if len(x) != bars_before:
         print("[Fehler] Inkonsistente Bar-Anzahl im Plotter.")
-        return
+        plt.close(fig)
+        return None
 
     # === ENTRY SIGNAL ERKENNEN ===
     entry_index = None
@@ -101,35 +128,8 @@ def plot_donchian_chart(
             entry_index = len(data) - 1
             entry_color = "#00B050"
 
-    # === Plot vorbereiten ===
-    fig, ax = plt.subplots(figsize=(14, 7))
-    fig.suptitle(title, fontsize=12, fontweight="bold")
-
-    candle_width = 0.7
-
     # === Kerzen zeichnen ===
-    for i, (_, row) in enumerate(data.iterrows()):
-        xi = x[i]
-        o = float(row["open"])
-        c = float(row["close"])
-        h = float(row["high"])
-        l = float(row["low"])
-
-        color = "#00B050" if c >= o else "#FF0000"
-
-        ax.vlines(xi, l, h, color=color, linewidth=1)
-
-        body_height = max(abs(c - o), 1e-6)
-        rect = Rectangle(
-            (xi - candle_width / 2, min(o, c)),
-            candle_width,
-            body_height,
-            facecolor=color,
-            edgecolor="black",
-            linewidth=0.5,
-            zorder=3,
-        )
-        ax.add_patch(rect)
+    draw_candles(ax, x, data, width=0.7)
 
     # === SMA200 ===
     if "SMA200" in data.columns:
@@ -195,7 +195,63 @@ def plot_donchian_chart(
 
     # Echte Zeitlabels auf kompakter Achse
     ax.xaxis.set_major_locator(MaxNLocator(nbins=10, integer=True))
-    ax.xaxis.set_major_formatter(_make_time_formatter(data.index))
+    ax.xaxis.set_major_formatter(_make_time_formatter(data.index, daily))
 
     plt.tight_layout()
-    plt.show()
+    return fig
+
+
+def render_donchian_png(
+    df: pd.DataFrame,
+    title: str = "",
+    symbol: str | None = None,
+    index: str | None = None,
+    timeframe: str | None = None,
+    max_bars: int | None = None,
+    dpi: int = 120,
+    cache: ChartCache | None = None,
+) -> bytes | None:
+    """Rendert den Donchian-Chart als PNG-Bytes (ohne Fenster), optional über den Chart-Cache."""
+    options = dict(
+        title=title, symbol=symbol, index=index, timeframe=timeframe, max_bars=max_bars)
+
+    key = None
+    if cache is not None and df is not None:
+        key = chart_key("donchian", df, dpi=dpi, **options)
+        png = cache.get(key)
+        if png is not None:
+            return png
+
+    with timing.stage("render"):
+        fig = build_donchian_figure(df, **options)
+    if fig is None:
+        return None
+
+    buffer = io.BytesIO()
+    try:
+        with timing.stage("save"):
+            fig.savefig(buffer, format="png", dpi=dpi)
+    finally:
+        plt.close(fig)
+
+    png = buffer.getvalue()
+    if key is not None:
+        cache.put(key, png)
+    return png
+
+
+def plot_donchian_chart(
+    df: pd.DataFrame,
+    title: str = "",
+    symbol: str | None = None,
+    index: str | None = None,
+    timeframe: str | None = None,
+    max_bars: int | None = None,
+) -> None:
+    fig = build_donchian_figure(
+        df, title=title, symbol=symbol, index=index, timeframe=timeframe, max_bars=max_bars)
+    if fig is None:
+        return
+
+    with timing.stage("display"):
+        plt.show()
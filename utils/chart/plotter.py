@@ -1,14 +1,20 @@
 # /utils/chart/plotter.py
 from __future__ import annotations
 
+import io
+
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-from matplotlib.patches import Rectangle
+from matplotlib.collections import LineCollection
 from matplotlib.ticker import FuncFormatter, MaxNLocator
 
 from modules.rsi_wilder import compute_rsi_wilder
+from utils import timing
+from utils.chart.candles import draw_candles
+from utils.chart.chart_cache import ChartCache, chart_key
+from utils.chart.decimate import decimate_ohlc, positions_of, resolve_max_bars
 
 # Verhindert, dass Matplotlib neue/aktualisierte Fenster nach vorne holt
 try:
@@ -62,16 +68,22 @@ def _normalize_sma_column_names(data: pd.DataFrame) -> pd.DataFrame:
     return data
 
 
-def _make_time_formatter(index: pd.DatetimeIndex) -> FuncFormatter:
+def _is_daily(index: pd.DatetimeIndex) -> bool:
+    inferred = pd.infer_freq(index) if len(index) >= 3 else None
+    return bool(inferred and "D" in inferred.upper())
+
+
+def _make_time_formatter(index: pd.DatetimeIndex, daily: bool | None = None) -> FuncFormatter:
+    # Frequenz einmal bestimmen (bei verdichteten Daten vom Original-Index)
+    daily = _is_daily(index) if daily is None else daily
+
     def _formatter(value, _pos):
         i = int(round(value))
         if i < 0 or i >= len(index):
             return ""
 
         ts = index[i]
-        inferred = pd.infer_freq(index)
-
-        if inferred and "D" in inferred.upper():
+        if daily:
             return ts.strftime("%d.%m.%Y")
 
         return ts.strftime("%d.%m\n%H:%M")
@@ -79,7 +91,7 @@ def _make_time_formatter(index: pd.DatetimeIndex) -> FuncFormatter:
     return FuncFormatter(_formatter)
 
 
-def plot_candles(
+def build_candle_figure(
     df: pd.DataFrame,
     title: str = "",
     name: str | None = None,
@@ -90,7 +102,16 @@ def plot_candles(
     rsi_lower: float = 30.0,
     rsi_upper: float = 70.0,
     rsi_period: int = 14,
+    max_bars: int | None = None,
 ):
+    """
+    Baut die Chart-Figur (Kerzen, Divergenzen, RSI, SMAs) ohne sie anzuzeigen.
+    Liefert None, wenn die Daten nicht plotbar sind.
+
+    `max_bars` (siehe utils/chart/decimate.py): None zeichnet alle Bars,
+    0 verdichtet auf die Pixelbreite der Kursachse, sonst auf höchstens
+    so viele Kerzen; Divergenz-Bars bleiben dabei exakt erhalten.
+    """
     # -----------------------------------------------------------
     # Datenvorbereitung
     # -----------------------------------------------------------
@@ -99,9 +120,7 @@ def plot_candles(
         _validate_data(data)
     except ValueError as exc:
         print(f"[Fehler] {exc}")
-        return
-
-    bars_before = len(data)
+        return None
 
     if "rsi" not in data.columns:
         data["rsi"] = compute_rsi_wilder(data["close"], period=int(rsi_period))
@@ -124,16 +143,6 @@ def plot_candles(
         parts.append(f"[{tf_text}]")
     full_title = " ".join(parts) if parts else title or "Chart"
 
-    # -----------------------------------------------------------
-    # Kompakte X-Achse ohne Zeitlücken
-    # -----------------------------------------------------------
-    x = np.arange(len(data), dtype=float)
-    pos_by_time = {ts: i for i, ts in enumerate(data.index)}
-
-    if len(x) != bars_before:
-        print("[Fehler] Beim Erstellen der Plot-Achse gingen Bars verloren.")
-        return
-
     # -----------------------------------------------------------
     # Plot-Struktur
     # -----------------------------------------------------------
@@ -147,40 +156,41 @@ def plot_candles(
     fig.suptitle(full_title, fontsize=12, fontweight="bold", y=0.98)
 
     # -----------------------------------------------------------
-    # Candlestick-Darstellung
+    # Level-of-Detail (RSI/SMAs sind bereits auf allen Bars berechnet)
     # -----------------------------------------------------------
-    candle_width = 0.65
-    color_up = "#00B050"
-    color_down = "#FF0000"
-
-    for i, (_, row) in enumerate(data.iterrows()):
-        xi = x[i]
-        o = float(row["open"])
-        c = float(row["close"])
-        h = float(row["high"])
-        l = float(row["low"])
-
-        color = color_up if c >= o else color_down
-
-        ax1.vlines(xi, l, h, color=color, linewidth=1, alpha=0.9)
-
-        body_bottom = min(o, c)
-        body_height = abs(c - o)
-
-        if body_height < (h - l) * 0.002:
-            body_height = max((h - l) * 0.002, 1e-6)
-
-        rect = Rectangle(
-            (xi - candle_width / 2, body_bottom),
-            candle_width,
-            body_height,
-            facecolor=color,
-            edgecolor="black",
-            linewidth=0.5,
-            alpha=0.95,
-            zorder=3,
+    daily = _is_daily(data.index)
+    full = data
+    positions = np.arange(len(full))
+    if max_bars is not None:
+        divergence_times = [
+            ts
+            for direction in ("bullish", "bearish")
+            for pair in (divergences or {}).get(direction, [])
+            for ts in pair
+        ]
+        lod = decimate_ohlc(
+            data,
+            resolve_max_bars(max_bars, ax1),
+            keep=positions_of(data.index, divergence_times),
         )
-        ax1.add_patch(rect)
+        data, positions = lod.data, lod.positions
+
+    bars_before = len(data)
+
+    # -----------------------------------------------------------
+    # Kompakte X-Achse ohne Zeitlücken
+    # -----------------------------------------------------------
+    x = np.arange(len(data), dtype=float)
+
+    if len(x) != bars_before:
+        print("[Fehler] Beim Erstellen der Plot-Achse gingen Bars verloren.")
+        plt.close(fig)
+        return None
+
+    # -----------------------------------------------------------
+    # Candlestick-Darstellung
+    # -----------------------------------------------------------
+    draw_candles(ax1, x, data, wick_alpha=0.9, body_alpha=0.95, min_body_ratio=0.002)
 
     # -----------------------------------------------------------
     # Divergenzen: Preis UND RSI
@@ -190,60 +200,45 @@ def plot_candles(
         y_range = max(y_range, 1e-6)
         offset_price = y_range * 0.01
         offset_rsi = 2.0
-
-        for i1, i2 in divergences.get("bullish", []):
-            if i1 in pos_by_time and i2 in pos_by_time:
-                x1 = pos_by_time[i1]
-                x2 = pos_by_time[i2]
-
-                ax1.plot(
-                    [x1, x2],
-                    [
-                        float(data.loc[i1, "low"]) - offset_price,
-                        float(data.loc[i2, "low"]) - offset_price,
-                    ],
-                    color="green",
-                    linewidth=2,
-                    alpha=0.9,
-                )
-
-                ax2.plot(
-                    [x1, x2],
-                    [
-                        float(data.loc[i1, "rsi"]) - offset_rsi,
-                        float(data.loc[i2, "rsi"]) - offset_rsi,
-                    ],
-                    color="green",
-                    linewidth=2,
-                    alpha=0.9,
-                )
-
-        for i1, i2 in divergences.get("bearish", []):
-            if i1 in pos_by_time and i2 in pos_by_time:
-                x1 = pos_by_time[i1]
-                x2 = pos_by_time[i2]
-
-                ax1.plot(
-                    [x1, x2],
-                    [
-                        float(data.loc[i1, "high"]) + offset_price,
-                        float(data.loc[i2, "high"]) + offset_price,
-                    ],
-                    color="red",
-                    linewidth=2,
+        rsi_values = full["rsi"].to_numpy(dtype=float)
+
+        # je Richtung und Achse eine Collection statt einer Linie pro Divergenz;
+        # Werte aus den Original-Bars, x aus der LOD-Zuordnung (Bucket der Bar)
+        for direction, color, price_col, sign in (
+            ("bullish", "green", "low", -1.0),
+            ("bearish", "red", "high", 1.0),
+        ):
+            pairs = divergences.get(direction, [])
+            if not pairs:
+                continue
+            first = full.index.get_indexer(pd.DatetimeIndex([pair[0] for pair in pairs]))
+            second = full.index.get_indexer(pd.DatetimeIndex([pair[1] for pair in pairs]))
+            found = (first >= 0) & (second >= 0)
+            if not found.any():
+                continue
+            first, second = first[found], second[found]
+            x1 = positions[first].astype(float)
+            x2 = positions[second].astype(float)
+            prices = full[price_col].to_numpy(dtype=float)
+
+            price_segments = np.stack([
+                np.column_stack([x1, prices[first] + sign * offset_price]),
+                np.column_stack([x2, prices[second] + sign * offset_price]),
+            ], axis=1)
+            rsi_segments = np.stack([
+                np.column_stack([x1, rsi_values[first] + sign * offset_rsi]),
+                np.column_stack([x2, rsi_values[second] + sign * offset_rsi]),
+            ], axis=1)
+
+            for ax, segments in ((ax1, price_segments), (ax2, rsi_segments)):
+                ax.add_collection(LineCollection(
+                    segments,
+                    colors=color,
+                    linewidths=2,
                     alpha=0.9,
-                )
-
-                ax2.plot(
-                    [x1, x2],
-                    [
-                        float(data.loc[i1, "rsi"]) + offset_rsi,
-                        float(data.loc[i2, "rsi"]) + offset_rsi,
-                    ],
-                    color="red",
-                    linewidth=2,
-                    alpha=0.9,
-                )
+                    capstyle="projecting",
+                    joinstyle="round",
+                ))
 
     # -----------------------------------------------------------
     # RSI-Darstellung
@@ -293,16 +288,105 @@ def plot_candles(
     ax1.set_ylabel("Kurs", fontsize=9)
 
     ax1.xaxis.set_major_locator(MaxNLocator(nbins=10, integer=True))
-    ax1.xaxis.set_major_formatter(_make_time_formatter(data.index))
+    ax1.xaxis.set_major_formatter(_make_time_formatter(data.index, daily))
 
     ax2.xaxis.set_major_locator(MaxNLocator(nbins=10, integer=True))
-    ax2.xaxis.set_major_formatter(_make_time_formatter(data.index))
+    ax2.xaxis.set_major_formatter(_make_time_formatter(data.index, daily))
 
     # rechts etwas Platz, ohne Zeitlücken zurückzubringen
     ax1.set_xlim(-0.5, len(data) - 0.5 + 2.0)
     ax2.set_xlim(ax1.get_xlim())
 
     plt.tight_layout()
+    return fig
+
+
+def render_candle_png(
+    df: pd.DataFrame,
+    title: str = "",
+    name: str | None = None,
+    symbol: str | None = None,
+    index: str | None = None,
+    timeframe: str | None = None,
+    divergences: dict | None = None,
+    rsi_lower: float = 30.0,
+    rsi_upper: float = 70.0,
+    rsi_period: int = 14,
+    max_bars: int | None = None,
+    dpi: int = 120,
+    cache: ChartCache | None = None,
+) -> bytes | None:
+    """
+    Rendert den Chart von plot_candles als PNG-Bytes (ohne Fenster).
+    Mit `cache` wird ein unverändertes Bild wiederverwendet, ohne die
+    Figur aufzubauen.
+    """
+    options = dict(
+        title=title,
+        name=name,
+        symbol=symbol,
+        index=index,
+        timeframe=timeframe,
+        divergences=divergences,
+        rsi_lower=rsi_lower,
+        rsi_upper=rsi_upper,
+        rsi_period=rsi_period,
+        max_bars=max_bars,
+    )
+
+    key = None
+    if cache is not None and df is not None:
+        key = chart_key("candles", df, dpi=dpi, **options)
+        png = cache.get(key)
+        if png is not None:
+            return png
+
+    with timing.stage("render"):
+        fig = build_candle_figure(df, **options)
+    if fig is None:
+        return None
+
+    buffer = io.BytesIO()
+    try:
+        with timing.stage("save"):
+            fig.savefig(buffer, format="png", dpi=dpi)
+    finally:
+        plt.close(fig)
+
+    png = buffer.getvalue()
+    if key is not None:
+        cache.put(key, png)
+    return png
+
+
+def plot_candles(
+    df: pd.DataFrame,
+    title: str = "",
+    name: str | None = None,
+    symbol: str | None = None,
+    index: str | None = None,
+    timeframe: str | None = None,
+    divergences: dict | None = None,
+    rsi_lower: float = 30.0,
+    rsi_upper: float = 70.0,
+    rsi_period: int = 14,
+    max_bars: int | None = None,
+):
+    fig = build_candle_figure(
+        df,
+        title=title,
+        name=name,
+        symbol=symbol,
+        index=index,
+        timeframe=timeframe,
+        divergences=divergences,
+        rsi_lower=rsi_lower,
+        rsi_upper=rsi_upper,
+        rsi_period=rsi_period,
+        max_bars=max_bars,
+    )
+    if fig is None:
+        return
 
     backend_name = plt.get_backend().lower()
     is_gui_backend = any(
@@ -337,11 +421,12 @@ def plot_candles(
             except Exception:
                 pass
 
-        plt.show(block=False)
-        plt.pause(0.001)
+        with timing.stage("display"):
+            plt.show(block=False)
+            plt.pause(0.001)
 
-        while plt.fignum_exists(fig.number):
-            plt.pause(0.1)
+            while plt.fignum_exists(fig.number):
+                plt.pause(0.1)
 
     except Exception as exc:
         print(f"Fehler beim Anzeigen des Charts: {exc}")
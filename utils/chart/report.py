@@ -0,0 +1,341 @@
+# /utils/chart/report.py
+"""
+Statischer HTML-Report je Scan.
+
+Aus den Trefferlisten der Scanner entsteht ein Ordner
+
+    outputs/reports/<scanner>_<timeframe>_<timestamp>/
+        index.html          Tabelle (sortierbar per Klick auf die Spalte)
+        images/<n>_thumb.png
+        images/<n>_full.png
+
+Die HTML-Datei kommt ohne externe Skripte/Stylesheets aus. Vorschaubilder
+werden erst beim Scrollen geladen (`loading="lazy"`), das große Bild erst
+beim Anklicken (Overlay, Pfeiltasten blättern, Esc schließt).
+
+Der Report ist optional (`report.enabled`, Standard aus) und entsteht erst
+nach der Anzeige: Bilder, die dort schon vorliegen, werden übernommen –
+die FULL-Bilder des Chart-Exports (`BrowserItem.ready`) direkt, alles, was
+der Chart-Browser gezeigt hat, über den Chart-Cache. Nur die übrigen
+Treffer werden mit denselben `BrowserItem`s in einem Prozess-Pool
+(Agg-Backend) gerendert; es läuft also nie parallel zu Export oder Browser.
+"""
+
+from __future__ import annotations
+
+import html
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from utils import timing
+from utils.chart.browser import BrowserItem, render_item
+from utils.chart.chart_cache import chart_cache_settings
+
+DEFAULT_REPORT_DIR = "outputs/reports"
+DEFAULT_THUMB_WIDTH = 360
+# Ab so vielen Treffern lohnt sich der Pool
+MIN_ROWS_FOR_POOL = 3
+MAX_AUTO_WORKERS = 8
+
+
+@dataclass
+class ReportRow:
+    """Ein Treffer: Chart (wie im Browser) und Tabellenspalten (Name -> Wert)."""
+
+    chart: BrowserItem
+    fields: Dict[str, Any] = field(default_factory=dict)
+
+
+def report_settings(cfg: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    report_cfg = cfg.get("report", {}) if isinstance(cfg, dict) else {}
+    if not bool(report_cfg.get("enabled", False)):
+        return None
+
+    workers = int(report_cfg.get("workers", 0) or 0)
+    if workers <= 0:
+        workers = min(max((os.cpu_count() or 1) - 1, 1), MAX_AUTO_WORKERS)
+    return {
+        "dir": str(report_cfg.get("dir", DEFAULT_REPORT_DIR)),
+        "workers": workers,
+        "thumb_width": max(int(report_cfg.get("thumb_width", DEFAULT_THUMB_WIDTH)), 64),
+    }
+
+
+def _init_worker() -> None:
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+
+def _thumbnail(png: bytes, thumb_width: int) -> bytes:
+    """Vorschaubild per Pillow verkleinert."""
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(png))
+    height = max(int(image.height * thumb_width / image.width), 1)
+    thumb = image.convert("RGB").resize((thumb_width, height), Image.LANCZOS)
+    buffer = io.BytesIO()
+    thumb.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+def render_report_images(
+    item: BrowserItem,
+    cache_settings: Optional[Dict[str, Any]],
+    thumb_width: int,
+) -> tuple[Optional[bytes], Optional[bytes]]:
+    """(Vollbild, Vorschaubild) als PNG-Bytes."""
+    png = render_item(item, cache_settings)
+    if not png:
+        return None, None
+    return png, _thumbnail(png, thumb_width)
+
+
+def _ready_png(item: BrowserItem) -> Optional[bytes]:
+    """Bereits fertiges Bild aus `item.ready` (z. B. Chart-Export), sonst None."""
+    if item.ready is None or not item.ready.done():
+        return None
+    try:
+        return item.ready.result()
+    except Exception:
+        return None
+
+
+def _render_all(
+    rows: List[ReportRow],
+    workers: int,
+    cache_settings: Optional[Dict[str, Any]],
+    thumb_width: int,
+) -> List[tuple[Optional[bytes], Optional[bytes]]]:
+    """Rendert alle Treffer; Fehler einzelner Charts werden gemeldet, nicht geworfen."""
+    images: List[tuple[Optional[bytes], Optional[bytes]]] = [(None, None)] * len(rows)
+
+    missing = []
+    for idx, row in enumerate(rows):
+        png = _ready_png(row.chart)
+        if png:
+            images[idx] = (png, _thumbnail(png, thumb_width))
+        else:
+            missing.append(idx)
+
+    if workers <= 1 or len(missing) < MIN_ROWS_FOR_POOL:
+        for idx in missing:
+            try:
+                images[idx] = render_report_images(rows[idx].chart, cache_settings, thumb_width)
+            except Exception as exc:
+                print(f"[Fehler] Report-Chart für {rows[idx].chart.title} fehlgeschlagen: {exc}")
+        return images
+
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(missing)),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+    ) as pool:
+        futures = {
+            idx: pool.submit(render_report_images, rows[idx].chart, cache_settings, thumb_width)
+            for idx in missing
+        }
+        for idx, future in futures.items():
+            try:
+                images[idx] = future.result()
+            except Exception as exc:
+                print(f"[Fehler] Report-Chart für {rows[idx].chart.title} fehlgeschlagen: {exc}")
+    return images
+
+
+def _format_value(value: Any) -> tuple[str, str]:
+    """(Anzeige, Sortierwert) einer Zelle."""
+    if value is None:
+        return "", ""
+    if isinstance(value, bool):
+        return ("ja" if value else "nein"), str(int(value))
+    if isinstance(value, float):
+        shown = f"{value:.5f}".rstrip("0").rstrip(".")
+        return shown, repr(value)
+    if isinstance(value, int):
+        return str(value), str(value)
+    return str(value), str(value)
+
+
+_STYLE = """
+body { font-family: sans-serif; margin: 16px; background: #fafafa; color: #222; }
+h1 { font-size: 20px; margin: 0 0 4px 0; }
+p.meta { color: #666; margin: 0 0 12px 0; }
+table { border-collapse: collapse; background: #fff; }
+th, td { border: 1px solid #ddd; padding: 4px 8px; text-align: left; vertical-align: middle; }
+th { background: #eee; cursor: pointer; user-select: none; white-space: nowrap; }
+th.asc::after { content: " \\25B2"; }
+th.desc::after { content: " \\25BC"; }
+td.num { text-align: right; font-variant-numeric: tabular-nums; }
+td.thumb img { display: block; cursor: zoom-in; }
+tr:hover td { background: #f3f7ff; }
+#overlay { display: none; position: fixed; inset: 0; background: rgba(0,0,0,0.85);
+           align-items: center; justify-content: center; flex-direction: column; }
+#overlay.open { display: flex; }
+#overlay img { max-width: 96vw; max-height: 90vh; background: #fff; }
+#overlay div { color: #fff; margin-top: 8px; }
+"""
+
+_SCRIPT = """
+const table = document.getElementById("hits");
+const body = table.tBodies[0];
+table.querySelectorAll("th[data-col]").forEach((th) => {
+  th.addEventListener("click", () => {
+    const col = Number(th.dataset.col);
+    const asc = !th.classList.contains("asc");
+    table.querySelectorAll("th").forEach((h) => h.classList.remove("asc", "desc"));
+    th.classList.add(asc ? "asc" : "desc");
+    const rows = Array.from(body.rows);
+    const numeric = rows.every((r) => {
+      const v = r.cells[col].dataset.v;
+      return v === "" || !isNaN(Number(v));
+    });
+    rows.sort((a, b) => {
+      const x = a.cells[col].dataset.v, y = b.cells[col].dataset.v;
+      const cmp = numeric ? (Number(x || -Infinity) - Number(y || -Infinity))
+                          : x.localeCompare(y);
+      return asc ? cmp : -cmp;
+    });
+    rows.forEach((r) => body.appendChild(r));
+  });
+});
+
+const overlay = document.getElementById("overlay");
+const big = overlay.querySelector("img");
+const caption = overlay.querySelector("div");
+let current = null;
+function openRow(row) {
+  if (!row || !row.dataset.full) return;
+  current = row;
+  big.src = row.dataset.full;
+  caption.textContent = row.dataset.title;
+  overlay.classList.add("open");
+}
+function step(delta) {
+  let row = current;
+  do { row = delta > 0 ? row.nextElementSibling : row.previousElementSibling; }
+  while (row && !row.dataset.full);
+  if (row) openRow(row);
+}
+body.addEventListener("click", (e) => {
+  if (e.target.tagName === "IMG") openRow(e.target.closest("tr"));
+});
+overlay.addEventListener("click", () => overlay.classList.remove("open"));
+document.addEventListener("keydown", (e) => {
+  if (!overlay.classList.contains("open")) return;
+  if (e.key === "Escape") overlay.classList.remove("open");
+  if (e.key === "ArrowRight" || e.key === " ") { e.preventDefault(); step(1); }
+  if (e.key === "ArrowLeft") step(-1);
+});
+"""
+
+
+def _build_html(
+    heading: str,
+    meta: str,
+    columns: List[str],
+    rows: List[ReportRow],
+    image_names: List[tuple[Optional[str], Optional[str]]],
+    thumb_width: int,
+) -> str:
+    esc = html.escape
+    head_cells = ['<th data-col="0">#</th>', "<th>Chart</th>"]
+    head_cells += [
+        f'<th data-col="{col_idx}">{esc(col)}</th>'
+        for col_idx, col in enumerate(columns, start=2)
+    ]
+
+    body_rows = []
+    for number, (row, (full_name, thumb_name)) in enumerate(zip(rows, image_names), start=1):
+        if thumb_name:
+            thumb = (
+                f'<img src="images/{esc(thumb_name)}" loading="lazy" '
+                f'alt="{esc(row.chart.title)}" width="{thumb_width}">'
+            )
+        else:
+            thumb = "kein Chart"
+
+        cells = [f'<td class="num" data-v="{number}">{number}</td>', f'<td class="thumb">{thumb}</td>']
+        for col in columns:
+            value = row.fields.get(col)
+            shown, sort_value = _format_value(value)
+            css = ' class="num"' if isinstance(value, (int, float)) and not isinstance(value, bool) else ""
+            cells.append(f'<td{css} data-v="{esc(sort_value)}">{esc(shown)}</td>')
+
+        full_attr = f' data-full="images/{esc(full_name)}"' if full_name else ""
+        body_rows.append(
+            f'<tr data-title="{esc(row.chart.title)}"{full_attr}>' + "".join(cells) + "</tr>"
+        )
+
+    return (
+        "<!DOCTYPE html>\n"
+        '<html lang="de">\n<head>\n<meta charset="utf-8">\n'
+        f"<title>{esc(heading)}</title>\n<style>{_STYLE}</style>\n</head>\n<body>\n"
+        f"<h1>{esc(heading)}</h1>\n<p class=\"meta\">{esc(meta)}</p>\n"
+        '<table id="hits">\n<thead><tr>' + "".join(head_cells) + "</tr></thead>\n<tbody>\n"
+        + "\n".join(body_rows)
+        + "\n</tbody>\n</table>\n"
+        '<div id="overlay"><img alt=""><div></div></div>\n'
+        f"<script>{_SCRIPT}</script>\n</body>\n</html>\n"
+    )
+
+
+def write_scan_report(
+    scanner: str,
+    timeframe: str,
+    rows: List[ReportRow],
+    cfg: Dict[str, Any],
+) -> Optional[Path]:
+    """
+    Schreibt den HTML-Report für `rows` und liefert den Pfad der index.html
+    (None, wenn deaktiviert oder keine Treffer).
+    """
+    settings = report_settings(cfg)
+    if settings is None or not rows:
+        return None
+
+    columns: List[str] = []
+    for row in rows:
+        for col in row.fields:
+            if col not in columns:
+                columns.append(col)
+
+    timestamp = datetime.now()
+    report_dir = Path(settings["dir"]) / f"{scanner}_{timeframe}_{timestamp.strftime('%Y%m%d_%H%M%S')}"
+    image_dir = report_dir / "images"
+    image_dir.mkdir(parents=True, exist_ok=True)
+
+    print(f"[INFO] Erstelle HTML-Report ({len(rows)} Charts)...")
+    with timing.stage("render"):
+        images = _render_all(
+            rows,
+            workers=settings["workers"],
+            cache_settings=chart_cache_settings(cfg),
+            thumb_width=settings["thumb_width"],
+        )
+
+    image_names: List[tuple[Optional[str], Optional[str]]] = []
+    with timing.stage("save"):
+        for number, (full_png, thumb_png) in enumerate(images, start=1):
+            if not full_png:
+                image_names.append((None, None))
+                continue
+            full_name, thumb_name = f"{number:04d}_full.png", f"{number:04d}_thumb.png"
+            (image_dir / full_name).write_bytes(full_png)
+            (image_dir / thumb_name).write_bytes(thumb_png)
+            image_names.append((full_name, thumb_name))
+
+        heading = f"{scanner} | {timeframe} | {len(rows)} Treffer"
+        meta = f"Erstellt {timestamp.strftime('%Y-%m-%d %H:%M:%S')}"
+        page = _build_html(heading, meta, columns, rows, image_names, settings["thumb_width"])
+
+        index_path = report_dir / "index.html"
+        index_path.write_text(page, encoding="utf-8")
+
+    return index_path
@@ -0,0 +1,62 @@
+# /utils/daten/bar_cache.py
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+CacheKey = Tuple[str, str, str]  # (source, symbol, timeframe)
+
+
+class BarCache:
+    """In-memory bar store keyed by (source, symbol, timeframe).
+
+    Keeps the history window of each symbol warm so that only newly closed
+    bars have to be downloaded and appended.
+    """
+
+    def __init__(self) -> None:
+        self._frames: Dict[CacheKey, pd.DataFrame] = {}
+        self._max_bars: Dict[CacheKey, int] = {}
+
+    @staticmethod
+    def key(source: str, symbol: str, timeframe: str) -> CacheKey:
+        return (source, symbol, timeframe.upper())
+
+    def __contains__(self, key: CacheKey) -> bool:
+        return key in self._frames
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def get(self, key: CacheKey) -> Optional[pd.DataFrame]:
+        return self._frames.get(key)
+
+    def put(self, key: CacheKey, df: pd.DataFrame) -> None:
+        """Store a full history; its length becomes the window size."""
+        self._frames[key] = df.sort_index()
+        self._max_bars[key] = len(df)
+
+    def last_time(self, key: CacheKey) -> Optional[pd.Timestamp]:
+        df = self._frames.get(key)
+        if df is None or df.empty:
+            return None
+        return df.index[-1]
+
+    def merge(self, key: CacheKey, new_bars: pd.DataFrame) -> int:
+        """Append new bars, keep the window size and return the number of new bars."""
+        if new_bars is None or new_bars.empty:
+            return 0
+
+        current = self._frames.get(key)
+        if current is None or current.empty:
+            self.put(key, new_bars)
+            return len(new_bars)
+
+        fresh = new_bars[new_bars.index > current.index[-1]]
+        if fresh.empty:
+            return 0
+
+        merged = pd.concat([current, fresh[current.columns]])
+        merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+        max_bars = self._max_bars.get(key, len(merged))
+        self._frames[key] = merged.tail(max_bars)
+        return len(fresh)
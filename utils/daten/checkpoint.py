@@ -0,0 +1,128 @@
+# /utils/daten/checkpoint.py
+"""
+Checkpoints für lange Markt-Scans.
+
+Nach jedem abgeschlossenen Symbol wird ein kompakter Datensatz (Schlüssel +
+serialisiertes Ergebnis) an eine Datei angehängt. Wird der Scan durch
+Strg+C, Netzwerkfehler oder ein geschlossenes Fenster unterbrochen, setzt
+`python main.py --resume` an dieser Stelle fort, ohne erledigte Symbole
+erneut zu laden oder zu analysieren.
+
+Dateiaufbau (pickle-Stream):
+    1. Kopf: {"scanner": ..., "params": {...}}
+    2. je Symbol: (key, payload)
+"""
+
+from __future__ import annotations
+
+import pickle
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+DEFAULT_CHECKPOINT_DIR = "outputs/checkpoints"
+
+
+def _read_records(path: Path) -> tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+    header = None
+    completed: Dict[str, Any] = {}
+
+    try:
+        with open(path, "rb") as stream:
+            header = pickle.load(stream)
+            while True:
+                try:
+                    key, payload = pickle.load(stream)
+                except EOFError:
+                    break
+                completed[key] = payload
+    except FileNotFoundError:
+        return None, {}
+    except (EOFError, pickle.UnpicklingError, ValueError, TypeError):
+        # Abgebrochener letzter Datensatz: alles davor bleibt gültig
+        pass
+
+    if not isinstance(header, dict):
+        return None, {}
+    return header, completed
+
+
+class ScanCheckpoint:
+    """
+    Append-only Checkpoint eines Scanners.
+    """
+
+    def __init__(
+        self,
+        scanner: str,
+        params: Dict[str, Any],
+        resume: bool = False,
+        base_dir: str | Path = DEFAULT_CHECKPOINT_DIR,
+    ):
+        self.scanner = scanner
+        self.params = params
+        self.path = Path(base_dir) / f"{scanner}.ckpt"
+        self.completed: Dict[str, Any] = {}
+
+        if resume:
+            header, completed = _read_records(self.path)
+            if header and header.get("params") == params:
+                self.completed = completed
+                print(
+                    f"[INFO] Checkpoint gefunden: {len(completed)} Symbole bereits "
+                    f"erledigt, setze Scan fort."
+                )
+            elif header:
+                print("[WARN] Checkpoint passt nicht zur Auswahl, starte neu.")
+
+        # Datei kompakt neu schreiben (ohne evtl. abgeschnittenen Rest)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "wb") as stream:
+            pickle.dump({"scanner": scanner, "params": params},
+                        stream, protocol=pickle.HIGHEST_PROTOCOL)
+            for key, payload in self.completed.items():
+                pickle.dump((key, payload), stream,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def saved_params(
+        scanner: str,
+        base_dir: str | Path = DEFAULT_CHECKPOINT_DIR,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Liefert die Scan-Parameter eines vorhandenen Checkpoints (für --resume).
+        """
+        header, _ = _read_records(Path(base_dir) / f"{scanner}.ckpt")
+        if not header:
+            return None
+        return header.get("params")
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.completed
+
+    def get(self, key: str) -> Any:
+        return self.completed.get(key)
+
+    def record(self, key: str, payload: Any) -> None:
+        """
+        Hängt das Ergebnis eines Symbols an (payload=None: keine Treffer).
+        """
+        self.completed[key] = payload
+        with open(self.path, "ab") as stream:
+            pickle.dump((key, payload), stream,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+
+    def finish(self) -> None:
+        """
+        Scan vollständig abgeschlossen: Checkpoint entfernen.
+        """
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def pending_checkpoints(base_dir: str | Path = DEFAULT_CHECKPOINT_DIR) -> List[str]:
+    """
+    Scanner mit unterbrochenem Scan (vorhandene Checkpoint-Datei).
+    """
+    return sorted(path.stem for path in Path(base_dir).glob("*.ckpt"))
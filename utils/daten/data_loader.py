@@ -1,11 +1,19 @@
 # /utils/daten/data_loader.py
 import datetime
+import threading
+from functools import lru_cache
+from pathlib import Path
 from typing import Optional
 
-import oandapyV20
-import oandapyV20.endpoints.instruments as instruments
 import pandas as pd
-import yfinance as yf
+
+from utils import timing
+from utils.daten.freshness import active_freshness
+from utils.daten.quarantine import active_quarantine
+from utils.daten.sources import REPLAY_SOURCE, active_replay, oanda_api_url, yahoo_chart_url
+
+# yfinance und oandapyV20 werden erst im jeweiligen Fetch importiert,
+# damit nur die tatsaechlich genutzte Datenquelle Startzeit kostet.
 
 # Supported timeframes (H4 and D1 only)
 TIMEFRAME_MAP = {
@@ -21,6 +29,20 @@ LOOKBACK_DAYS = {
     "D1": 335,
 }
 
+# Set by the fetchers when the source answered but had no bars for the symbol
+# (as opposed to a network/API error); read by load_data for the quarantine
+_fetch_state = threading.local()
+
+
+def _no_data(message: str) -> pd.DataFrame:
+    print(message)
+    _fetch_state.no_data = True
+    return pd.DataFrame()
+
+
+# Reference point for bar alignment (bars close on full multiples of "hours")
+_EPOCH = datetime.datetime(1970, 1, 1)
+
 # Hard limits imposed by yfinance per interval (in days)
 YF_MAX_LOOKBACK_DAYS = {
     "1h": 90,
@@ -29,6 +51,32 @@ YF_MAX_LOOKBACK_DAYS = {
 }
 
 
+@lru_cache(maxsize=None)
+def _yfinance():
+    """Import yfinance once and let Ticker.history raise its errors.
+
+    yf.download swallows network/rate-limit errors and returns an empty
+    frame, which looks exactly like a delisted symbol. With exceptions
+    enabled (yfinance >= 1.0), Ticker.history raises YFPricesMissingError /
+    YFTzMissingError ("possibly delisted") only when Yahoo answered without
+    data. Older releases lack both; there errors stay hidden, an empty frame
+    then counts as no evidence and only "possibly delisted" messages strike.
+    Returns (yfinance module, tuple of no-data exception types).
+    """
+
+    import yfinance as yf
+
+    debug = getattr(getattr(yf, "config", None), "debug", None)
+    if debug is not None and hasattr(debug, "hide_exceptions"):
+        debug.hide_exceptions = False
+
+    try:
+        from yfinance.exceptions import YFPricesMissingError, YFTzMissingError
+    except ImportError:
+        return yf, ()
+    return yf, (YFPricesMissingError, YFTzMissingError)
+
+
 def fetch_yfinance_data(symbol: str, interval: str, days: int) -> pd.DataFrame:
     """Download price data from Yahoo Finance for the selected interval."""
 
@@ -42,41 +90,128 @@ def fetch_yfinance_data(symbol: str, interval: str, days: int) -> pd.DataFrame:
 
     start_date = datetime.datetime.utcnow() - datetime.timedelta(days=days)
 
+    chart_url = yahoo_chart_url()
+    if chart_url:
+        return fetch_yahoo_chart(symbol, interval, start_date, chart_url)
+
+    yf, missing_data_errors = _yfinance()
+
     try:
-        df = yf.download(
-            symbol,
-            interval=interval,
-            start=start_date.strftime("%Y-%m-%d"),
-            auto_adjust=True,
-            progress=False,
-            group_by="ticker",
-        )
+        with timing.stage("fetch"):
+            df = yf.Ticker(symbol).history(
+                interval=interval,
+                start=start_date.strftime("%Y-%m-%d"),
+                auto_adjust=True,
+                actions=False,
+            )
+    except missing_data_errors as exc:
+        return _no_data(f"[Warnung] Keine Yahoo-Daten fuer {symbol}: {exc}")
     except Exception as exc:
+        if "possibly delisted" in str(exc):
+            return _no_data(f"[Warnung] Keine Yahoo-Daten fuer {symbol}: {exc}")
         print(f"[Fehler] Fehler bei yfinance ({symbol}): {exc}")
         return pd.DataFrame()
 
     if df.empty:
+        # no error from Yahoo, so no evidence that the symbol is gone
         print(f"[Warnung] Keine Yahoo-Daten fuer {symbol}.")
         return pd.DataFrame()
 
-    if isinstance(df.columns, pd.MultiIndex):
-        df = df.droplevel(0, axis=1)
+    with timing.stage("parse"):
+        if isinstance(df.columns, pd.MultiIndex):
+            df = df.droplevel(0, axis=1)
 
-    df = df.rename(
-        columns={
-            "Open": "open",
-            "High": "high",
-            "Low": "low",
-            "Close": "close",
-            "Adj Close": "close",
-            "Volume": "volume",
-        }
-    )
+        df = df.rename(
+            columns={
+                "Open": "open",
+                "High": "high",
+                "Low": "low",
+                "Close": "close",
+                "Adj Close": "close",
+                "Volume": "volume",
+            }
+        )
+
+        df = df[["open", "high", "low", "close", "volume"]]
+        df.index = pd.to_datetime(df.index, utc=True).tz_convert(None)
+        df.index.name = "time"
+        return df.sort_index()
+
+
+def fetch_yahoo_chart(
+    symbol: str,
+    interval: str,
+    start_date: datetime.datetime,
+    base_url: str,
+) -> pd.DataFrame:
+    """Download bars directly from a Yahoo chart endpoint (`/v8/finance/chart`).
+
+    Used when `endpoints.yahoo_chart` is configured, e.g. for the local
+    stand-in server. Prices are adjusted like `yf.download(auto_adjust=True)`.
+    """
 
-    df = df[["open", "high", "low", "close", "volume"]]
-    df.index = pd.to_datetime(df.index, utc=True).tz_convert(None)
-    df.index.name = "time"
-    return df.sort_index()
+    import requests
+
+    params = {
+        "interval": interval,
+        "period1": int((start_date - _EPOCH).total_seconds()),
+        "period2": int((datetime.datetime.utcnow() - _EPOCH).total_seconds()),
+    }
+    url = f"{base_url}/v8/finance/chart/{requests.utils.quote(symbol, safe='')}"
+
+    try:
+        with timing.stage("fetch"):
+            response = requests.get(url, params=params, timeout=30)
+        if response.status_code == 404:
+            return _no_data(f"[Warnung] Keine Yahoo-Daten fuer {symbol}.")
+        response.raise_for_status()
+        payload = response.json()
+    except Exception as exc:
+        print(f"[Fehler] Fehler bei Yahoo-Chart-API ({symbol}): {exc}")
+        return pd.DataFrame()
+
+    with timing.stage("parse"):
+        result = (payload.get("chart", {}).get("result") or [None])[0]
+        if not result or not result.get("timestamp"):
+            return _no_data(f"[Warnung] Keine Yahoo-Daten fuer {symbol}.")
+
+        quote = result["indicators"]["quote"][0]
+        df = pd.DataFrame(
+            {col: pd.to_numeric(quote.get(col), errors="coerce") for col in ("open", "high", "low", "close", "volume")},
+            index=pd.to_datetime(result["timestamp"], unit="s"),
+        )
+
+        adjclose = (result["indicators"].get("adjclose") or [{}])[0].get("adjclose")
+        if adjclose is not None:
+            ratio = pd.to_numeric(pd.Series(adjclose, index=df.index), errors="coerce") / df["close"]
+            df[["open", "high", "low"]] = df[["open", "high", "low"]].mul(ratio, axis=0)
+            df["close"] = df["close"] * ratio
+
+        df = df.dropna(subset=["open", "high", "low", "close"])
+        df.index.name = "time"
+        return df.sort_index()
+
+
+def _rebase_oanda_client(client, api_url: str) -> None:
+    """Send the requests of this oandapyV20 client to `api_url` (e.g. a stand-in).
+
+    oandapyV20 only knows its built-in practice/live hosts. Instead of adding
+    an environment to its module-level table, a transport adapter on the
+    client's own requests session rewrites the practice host to `api_url`.
+    """
+
+    from oandapyV20.oandapyV20 import TRADING_ENVIRONMENTS
+    from requests.adapters import HTTPAdapter
+
+    practice_url = TRADING_ENVIRONMENTS[client.environment]["api"]
+    target_url = api_url.rstrip("/")
+
+    class _RebaseAdapter(HTTPAdapter):
+        def send(self, request, **kwargs):
+            request.url = target_url + request.url[len(practice_url):]
+            return super().send(request, **kwargs)
+
+    client.client.mount(practice_url, _RebaseAdapter())
 
 
 def fetch_oanda_data(
@@ -102,37 +237,169 @@ def fetch_oanda_data(
     bars_per_day = max(int(24 / hours), 1)
     bars = max(int(days * bars_per_day), min_bars)
 
+    import oandapyV20
+    import oandapyV20.endpoints.instruments as instruments
+
     client = oandapyV20.API(access_token=access_token)
+    api_url = oanda_api_url()
+    if api_url:
+        _rebase_oanda_client(client, api_url)
     params = {"granularity": granularity, "count": bars + 10, "price": "M"}
 
     try:
         request = instruments.InstrumentsCandles(instrument=symbol, params=params)
-        candles = client.request(request).get("candles", [])
+        with timing.stage("fetch"):
+            candles = client.request(request).get("candles", [])
     except Exception as exc:
+        if getattr(exc, "code", None) in (400, 404):
+            # unbekanntes bzw. nicht mehr handelbares Instrument
+            return _no_data(f"[Warnung] Keine OANDA-Daten fuer {symbol}: {exc}")
         print(f"[Fehler] Fehler bei OANDA ({symbol}): {exc}")
         return pd.DataFrame()
 
-    rows = []
-    for candle in candles:
-        if not candle.get("complete"):
-            continue
-        rows.append(
-            {
-                "time": pd.to_datetime(candle["time"], utc=True).tz_convert(None),
-                "open": float(candle["mid"]["o"]),
-                "high": float(candle["mid"]["h"]),
-                "low": float(candle["mid"]["l"]),
-                "close": float(candle["mid"]["c"]),
-                "volume": int(candle["volume"]),
-            }
-        )
+    with timing.stage("parse"):
+        rows = []
+        for candle in candles:
+            if not candle.get("complete"):
+                continue
+            rows.append(
+                {
+                    "time": pd.to_datetime(candle["time"], utc=True).tz_convert(None),
+                    "open": float(candle["mid"]["o"]),
+                    "high": float(candle["mid"]["h"]),
+                    "low": float(candle["mid"]["l"]),
+                    "close": float(candle["mid"]["c"]),
+                    "volume": int(candle["volume"]),
+                }
+            )
+
+        if not rows:
+            return _no_data(f"[Warnung] Keine OANDA-Daten fuer {symbol}.")
+
+        df = pd.DataFrame(rows).set_index("time").sort_index()
+        return df.tail(bars)
+
+
+# Geöffnete Bar-Datasets (Replay, Frische-Cache) je (Verzeichnis, Format)
+_datasets = {}
 
-    if not rows:
-        print(f"[Warnung] Keine OANDA-Daten fuer {symbol}.")
+
+def _open_dataset(base_dir, fmt=None):
+    """Open the export dataset under `base_dir`; None while nothing was written yet."""
+    from utils.daten.exporter import BarDataset, detect_format
+
+    key = (str(base_dir), fmt)
+    if key not in _datasets:
+        base_dir = Path(base_dir)
+        fmt = fmt or (detect_format(base_dir) if base_dir.is_dir() else None)
+        if fmt is None:
+            return None
+        try:
+            _datasets[key] = BarDataset(base_dir, fmt=fmt)
+        except ImportError as exc:
+            # parquet/feather dataset without pyarrow: warn once, then load as usual
+            print(f"[Warnung] Kursdaten-Dataset {base_dir} nicht lesbar: {exc}")
+            _datasets[key] = None
+    return _datasets[key]
+
+
+def _replay_dataset(settings):
+    dataset = _open_dataset(settings["dir"], settings.get("format"))
+    if dataset is None:
+        print(f"[Warnung] Kein Replay-Dataset unter {settings['dir']} gefunden.")
+    return dataset
+
+
+def _bars_window(df: pd.DataFrame, days: int, min_bars: int, window_end: pd.Timestamp) -> pd.DataFrame:
+    """History window of `days` ending at `window_end`, at least `min_bars` bars."""
+    window = df[df.index >= window_end - pd.Timedelta(days=days)]
+    if len(window) < min_bars:
+        window = df.tail(min_bars)
+    return window
+
+
+def fetch_replay_data(
+    symbol: str,
+    source: str,
+    timeframe: str,
+    days: int,
+    min_bars: int = 0,
+    as_of: Optional[datetime.datetime] = None,
+) -> pd.DataFrame:
+    """Serve stored bars from the export dataset instead of downloading them.
+
+    With `as_of` only bars that had closed by then are returned, so a scan
+    sees the market as it was at that time. The window of `days` (at least
+    `min_bars` bars) ends at `as_of` or at the last stored bar.
+    """
+
+    settings = active_replay()
+    dataset = _replay_dataset(settings)
+    if dataset is None:
         return pd.DataFrame()
 
-    df = pd.DataFrame(rows).set_index("time").sort_index()
-    return df.tail(bars)
+    if source == REPLAY_SOURCE:
+        stored_sources = dataset.partition_sources(timeframe, symbol)
+        if not stored_sources:
+            print(f"[Warnung] Keine Replay-Daten fuer {symbol} ({timeframe}).")
+            return pd.DataFrame()
+        source = stored_sources[0]
+
+    as_of = as_of or settings.get("as_of")
+    hours = TIMEFRAME_MAP[timeframe]["hours"]
+    # nur Bars, deren Schluss (Start + Timeframe) bis as_of erreicht war
+    end = pd.Timestamp(as_of) - pd.Timedelta(hours=hours) if as_of else None
+
+    with timing.stage("fetch"):
+        df = dataset.load_bars(source, timeframe, symbol, end=end)
+
+    if df.empty:
+        print(f"[Warnung] Keine Replay-Daten fuer {symbol} ({source}, {timeframe}).")
+        return pd.DataFrame()
+
+    window_end = pd.Timestamp(as_of) if as_of else df.index[-1]
+    return _bars_window(df, days, min_bars, window_end)
+
+
+def load_fresh_bars(
+    freshness,
+    symbol: str,
+    source: str,
+    timeframe: str,
+    days: int,
+    min_bars: int = 0,
+) -> Optional[pd.DataFrame]:
+    """Serve bars from the export dataset while no new bar can have closed.
+
+    Returns None when the series has to be downloaded: the freshness index
+    has no current record, or the dataset does not (yet) hold the bars of
+    the last download. A trailing bar that was still forming at download
+    time is left out, as no newer state of it exists before the next close.
+    """
+
+    last_bar = freshness.fresh_until(source, symbol, timeframe)
+    if last_bar is None:
+        return None
+
+    dataset = _open_dataset(freshness.dataset_dir)
+    if dataset is None:
+        return None
+    stored = dataset.last_time(source, timeframe, symbol)
+    if stored is None or stored < pd.Timestamp(last_bar):
+        return None
+
+    with timing.stage("fetch"):
+        df = dataset.load_bars(source, timeframe, symbol)
+    # the last bar may have been saved while it was still forming; it is only
+    # final if it had closed when it was downloaded
+    df = drop_incomplete_bars(
+        df, timeframe, now=freshness.fetched_at(source, symbol, timeframe),
+        source=source, symbol=symbol)
+    if df.empty:
+        return None
+
+    freshness.record_served()
+    return _bars_window(df, days, min_bars, pd.Timestamp(datetime.datetime.utcnow()))
 
 
 def load_data(
@@ -153,13 +420,129 @@ def load_data(
     if days_to_fetch is None:
         days_to_fetch = 180
 
+    if source == REPLAY_SOURCE or active_replay()["enabled"]:
+        # OANDA liefert mindestens `lookback` Bars, Yahoo nur das Tagesfenster
+        min_bars = lookback if source == "oanda" else 0
+        df = fetch_replay_data(symbol, source, timeframe, days_to_fetch, min_bars)
+        return df.sort_index() if not df.empty else df
+
+    if source not in ("yfinance", "oanda"):
+        print(f"[Warnung] Unbekannte Datenquelle: {source}")
+        return pd.DataFrame()
+
+    quarantine = active_quarantine()
+    if quarantine is not None and quarantine.should_skip(source, symbol):
+        return pd.DataFrame()
+
+    freshness = active_freshness()
+    if freshness is not None:
+        # OANDA liefert mindestens `lookback` Bars, Yahoo nur das Tagesfenster
+        min_bars = lookback if source == "oanda" else 0
+        cached = load_fresh_bars(freshness, symbol, source, timeframe, days_to_fetch, min_bars)
+        if cached is not None:
+            return cached
+
+    _fetch_state.no_data = False
     if source == "yfinance":
         interval = TIMEFRAME_MAP[timeframe]["yfinance"]
         df = fetch_yfinance_data(symbol, interval, days_to_fetch)
-    elif source == "oanda":
+    else:
         df = fetch_oanda_data(symbol, timeframe, days_to_fetch, lookback, oanda_token)
+
+    if quarantine is not None:
+        if not df.empty:
+            quarantine.record_success(source, symbol)
+        elif _fetch_state.no_data:
+            quarantine.record_empty(source, symbol)
+
+    if df.empty:
+        return df
+    df = df.sort_index()
+    if freshness is not None:
+        hours = TIMEFRAME_MAP[timeframe]["hours"]
+        freshness.record_fetch(source, symbol, timeframe, hours, pd.Timestamp(df.index[-1]).to_pydatetime())
+    return df
+
+
+def next_bar_close(
+    timeframe: str,
+    now: Optional[datetime.datetime] = None,
+) -> datetime.datetime:
+    """Return the next bar close (naive UTC) for the timeframe.
+
+    Bars are assumed to close on full multiples of the timeframe hours
+    counted from midnight UTC (H1: every hour, H4: 00/04/08..., D1: 00:00).
+    """
+
+    timeframe = timeframe.upper()
+    hours = TIMEFRAME_MAP[timeframe]["hours"]
+    now = now or datetime.datetime.utcnow()
+
+    step = hours * 3600
+    elapsed = int((now - _EPOCH).total_seconds())
+    return _EPOCH + datetime.timedelta(seconds=(elapsed // step + 1) * step)
+
+
+def load_recent_bars(
+    symbol: str,
+    source: str,
+    timeframe: str,
+    since: pd.Timestamp,
+    oanda_token: Optional[str] = None,
+) -> pd.DataFrame:
+    """Load only the bars that closed after `since` (used by the watch mode)."""
+
+    timeframe = timeframe.upper()
+    if timeframe not in TIMEFRAME_MAP:
+        print(f"[Warnung] Ungueltiger Timeframe: {timeframe} (nur H1, H4 und D1 erlaubt).")
+        return pd.DataFrame()
+
+    hours = TIMEFRAME_MAP[timeframe]["hours"]
+    now = pd.Timestamp(datetime.datetime.utcnow())
+    since = pd.Timestamp(since)
+    missing_bars = max(int((now - since) / pd.Timedelta(hours=hours)), 1)
+
+    if source == "yfinance":
+        interval = TIMEFRAME_MAP[timeframe]["yfinance"]
+        days = max(int((now - since) / pd.Timedelta(days=1)) + 2, 2)
+        df = fetch_yfinance_data(symbol, interval, days)
+    elif source == "oanda":
+        df = fetch_oanda_data(symbol, timeframe, 0, missing_bars + 2, oanda_token)
     else:
         print(f"[Warnung] Unbekannte Datenquelle: {source}")
         return pd.DataFrame()
 
-    return df.sort_index() if not df.empty else df
+    df = drop_incomplete_bars(df, timeframe)
+    if df.empty:
+        return df
+
+    return df[df.index > since].sort_index()
+
+
+def drop_incomplete_bars(
+    df: pd.DataFrame,
+    timeframe: str,
+    now: Optional[datetime.datetime] = None,
+    source: Optional[str] = None,
+    symbol: Optional[str] = None,
+) -> pd.DataFrame:
+    """Remove the still running bar (its close lies after `now`, default: the current time).
+
+    With `source` and `symbol` the close of the last bar follows the market's
+    trading calendar (a daily XETRA bar closes at 17:30 Berlin, not at the
+    next midnight), see utils/daten/trading_calendar.py.
+    """
+
+    if df is None or df.empty:
+        return df
+
+    hours = TIMEFRAME_MAP[timeframe.upper()]["hours"]
+    now = pd.Timestamp(now or datetime.datetime.utcnow())
+    if symbol is None:
+        return df[df.index + pd.Timedelta(hours=hours) <= now]
+
+    from utils.daten.trading_calendar import calendar_for, next_bar_close
+
+    last_close = next_bar_close(
+        calendar_for(source or "", symbol), hours, pd.Timestamp(df.index[-1]).to_pydatetime())
+    return df if pd.Timestamp(last_close) <= now else df.iloc[:-1]
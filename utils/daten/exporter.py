@@ -1,9 +1,58 @@
 # /utils/daten/exporter.py
+"""
+Export geladener Kursdaten.
 
+`BarDataset` legt alle Bars eines Scans als ein partitioniertes Dataset ab
+(Hive-Layout, lesbar mit pyarrow/pandas/DuckDB/Polars):
+
+    outputs/datasets/bars/
+        source=yfinance/timeframe=D1/symbol=SAP.DE/part-<von>-<bis>.parquet
+        source=oanda/timeframe=H4/symbol=EUR_USD/part-....parquet
+
+Formate: `parquet` und `feather` (benötigen pyarrow) sowie `csv` (nur
+pandas). Jede Partition merkt sich ihre letzte Bar; `append` schreibt nur
+neuere Bars als zusätzliche Part-Datei (samt der bisher letzten, die beim
+vorigen Export noch offen gewesen sein kann), `compact` fasst die Parts
+wieder zusammen. Beim Lesen werden Quelle/Timeframe/Symbol/Zeitraum als Filter
+an pyarrow übergeben (Partition-Pruning plus Row-Group-Statistiken), bei
+CSV werden nur die passenden Partitionen gelesen.
+
+Der Scan-Export (`ScanExport`) sammelt die Frames während des Scans und
+schreibt sie am Ende parallel (pyarrow gibt beim Komprimieren/Schreiben den
+GIL frei).
+
+Abfrage über die Kommandozeile:
+
+    python -m utils.daten.exporter read --source yfinance --timeframe D1 --symbol SAP.DE --since 2024-01-01
+    python -m utils.daten.exporter compact
+
+`export_dataframe_to_txt` bleibt für einzelne, menschenlesbare Dumps erhalten.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote, unquote
+
 import pandas as pd
 
+DEFAULT_DATASET_DIR = "outputs/datasets/bars"
+DEFAULT_FORMAT = "parquet"
+DEFAULT_WORKERS = 4
+
+FORMATS = ("parquet", "feather", "csv")
+EXTENSIONS = {"parquet": ".parquet", "feather": ".feather", "csv": ".csv"}
+PARTITION_KEYS = ("source", "timeframe", "symbol")
+BAR_COLUMNS = ("open", "high", "low", "close", "volume")
+STATE_FILE = "_state.json"
+
+PartitionKey = Tuple[str, str, str]  # (source, timeframe, symbol)
+
 
 def export_dataframe_to_txt(
     df: pd.DataFrame,
@@ -42,4 +91,444 @@ def export_dataframe_to_txt(
         f.write(export_df.to_string())
         f.write("\n")
 
-    return file_path
\ No newline at end of file
+    return file_path
+
+
+def pyarrow_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _bars_table(df: pd.DataFrame) -> pd.DataFrame:
+    """Bars als flache Tabelle mit Spalte `time` (naiv, UTC) und float64-OHLCV."""
+    data = df.copy()
+    if not isinstance(data.index, pd.DatetimeIndex):
+        data.index = pd.to_datetime(data.index, errors="coerce")
+    if getattr(data.index, "tz", None) is not None:
+        data.index = data.index.tz_convert("UTC").tz_localize(None)
+    data = data[~data.index.isna()]
+    data = data[~data.index.duplicated(keep="last")].sort_index()
+
+    columns = [col for col in BAR_COLUMNS if col in data.columns]
+    table = data[columns].astype("float64")
+    table.index = data.index.astype("datetime64[ns]")
+    table.index.name = "time"
+    return table.reset_index()
+
+
+def _naive_utc(value: Any) -> Optional[pd.Timestamp]:
+    """Zeitfilter wie die gespeicherte Spalte `time`: naiv in UTC."""
+    if value is None:
+        return None
+    ts = pd.Timestamp(value)
+    return ts.tz_convert("UTC").tz_localize(None) if ts.tzinfo is not None else ts
+
+
+class BarDataset:
+    """
+    Partitioniertes Bar-Dataset (source/timeframe/symbol).
+
+        dataset = BarDataset("outputs/datasets/bars", fmt="parquet")
+        dataset.append("yfinance", "D1", "SAP.DE", df)
+        df = dataset.read(symbols=["SAP.DE"], start="2024-01-01")
+    """
+
+    def __init__(self, base_dir: str | Path = DEFAULT_DATASET_DIR, fmt: str = DEFAULT_FORMAT) -> None:
+        fmt = fmt.lower()
+        if fmt not in FORMATS:
+            raise ValueError(f"Unbekanntes Export-Format: {fmt} (erlaubt: {', '.join(FORMATS)})")
+        if fmt != "csv" and not pyarrow_available():
+            raise ImportError(f"Format {fmt} benötigt pyarrow (pip install pyarrow).")
+
+        self.base_dir = Path(base_dir)
+        self.fmt = fmt
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # Pfade / Zustand
+    # ------------------------------------------------------------------
+    def partition_dir(self, source: str, timeframe: str, symbol: str) -> Path:
+        # Werte URI-kodiert, damit "/", ":" oder "^" im Symbol gültige Ordner ergeben
+        return (
+            self.base_dir
+            / f"source={quote(str(source), safe='')}"
+            / f"timeframe={quote(str(timeframe).upper(), safe='')}"
+            / f"symbol={quote(str(symbol), safe='')}"
+        )
+
+    def _parts(self, part_dir: Path) -> List[Path]:
+        return sorted(part_dir.glob(f"part-*{EXTENSIONS[self.fmt]}"))
+
+    def last_time(self, source: str, timeframe: str, symbol: str) -> Optional[pd.Timestamp]:
+        """Zeit der letzten gespeicherten Bar der Partition (None = leer)."""
+        part_dir = self.partition_dir(source, timeframe, symbol)
+        if not self._parts(part_dir):
+            return None
+        try:
+            state = json.loads((part_dir / STATE_FILE).read_text(encoding="utf-8"))
+            return pd.Timestamp(state["last_time"])
+        except (OSError, ValueError, KeyError):
+            pass
+
+        # ohne (gültige) Zustandsdatei aus den Daten selbst bestimmen
+        frame = self._read_files(self._parts(part_dir), columns=["time"])
+        return None if frame.empty else pd.Timestamp(frame["time"].max())
+
+    # ------------------------------------------------------------------
+    # Schreiben
+    # ------------------------------------------------------------------
+    def _write_file(self, table: pd.DataFrame, path: Path) -> None:
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        if self.fmt == "csv":
+            table.to_csv(tmp_path, index=False, date_format="%Y-%m-%dT%H:%M:%S")
+        else:
+            import pyarrow as pa
+
+            arrow_table = pa.Table.from_pandas(table, preserve_index=False)
+            if self.fmt == "parquet":
+                import pyarrow.parquet as pq
+
+                pq.write_table(arrow_table, tmp_path, compression="zstd")
+            else:
+                import pyarrow.feather as feather
+
+                feather.write_feather(arrow_table, tmp_path, compression="zstd")
+        os.replace(tmp_path, path)
+
+    def append(self, source: str, timeframe: str, symbol: str, df: pd.DataFrame) -> int:
+        """
+        Hängt die Bars von `df` an, die neuer als die letzte gespeicherte Bar
+        sind; liefert die Anzahl neu geschriebener Bars.
+        """
+        if df is None or df.empty:
+            return 0
+
+        table = _bars_table(df)
+        last = self.last_time(source, timeframe, symbol)
+        if last is not None:
+            new_bars = int((table["time"] > last).sum())
+            if not new_bars:
+                return 0
+            # die zuletzt gespeicherte Bar wird mit überschrieben: beim letzten
+            # Export war sie evtl. noch nicht geschlossen (beim Lesen gewinnt der neuere Part)
+            table = table[table["time"] >= last]
+        else:
+            new_bars = len(table)
+        if table.empty:
+            return 0
+
+        part_dir = self.partition_dir(source, timeframe, symbol)
+        part_dir.mkdir(parents=True, exist_ok=True)
+        first_ts = table["time"].iloc[0].strftime("%Y%m%dT%H%M%S")
+        last_ts = table["time"].iloc[-1].strftime("%Y%m%dT%H%M%S")
+        self._write_file(table, part_dir / f"part-{first_ts}-{last_ts}{EXTENSIONS[self.fmt]}")
+
+        (part_dir / STATE_FILE).write_text(
+            json.dumps({"last_time": table["time"].iloc[-1].isoformat()}),
+            encoding="utf-8",
+        )
+        return new_bars
+
+    def append_many(
+        self,
+        frames: Iterable[Tuple[PartitionKey, pd.DataFrame]],
+        workers: int = DEFAULT_WORKERS,
+    ) -> Dict[PartitionKey, int]:
+        """Schreibt mehrere Partitionen parallel; Fehler einzelner Partitionen werden gemeldet."""
+        frames = list(frames)
+
+        def _append(item: Tuple[PartitionKey, pd.DataFrame]) -> int:
+            (source, timeframe, symbol), df = item
+            try:
+                return self.append(source, timeframe, symbol, df)
+            except Exception as exc:
+                print(f"[WARN] Export fehlgeschlagen fuer {symbol} ({source}, {timeframe}): {exc}")
+                return 0
+
+        if workers <= 1 or len(frames) <= 1:
+            counts = [_append(item) for item in frames]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                counts = list(pool.map(_append, frames))
+
+        return {key: count for (key, _df), count in zip(frames, counts)}
+
+    def compact(self) -> int:
+        """Fasst die Parts jeder Partition zu einer Datei zusammen; liefert die Anzahl Partitionen."""
+        compacted = 0
+        for state_path in self.base_dir.glob(f"source=*/timeframe=*/symbol=*/{STATE_FILE}"):
+            part_dir = state_path.parent
+            parts = self._parts(part_dir)
+            if len(parts) <= 1:
+                continue
+
+            table = self._read_files(parts)
+            table = table.drop_duplicates("time", keep="last").sort_values("time")
+            first_ts = table["time"].iloc[0].strftime("%Y%m%dT%H%M%S")
+            last_ts = table["time"].iloc[-1].strftime("%Y%m%dT%H%M%S")
+            target = part_dir / f"part-{first_ts}-{last_ts}{EXTENSIONS[self.fmt]}"
+            self._write_file(table.reset_index(drop=True), target)
+            for part in parts:
+                if part != target:
+                    part.unlink()
+            compacted += 1
+        return compacted
+
+    # ------------------------------------------------------------------
+    # Lesen
+    # ------------------------------------------------------------------
+    def _read_files(self, paths: List[Path], columns: Optional[List[str]] = None) -> pd.DataFrame:
+        frames = []
+        for path in paths:
+            if self.fmt == "csv":
+                frame = pd.read_csv(path, usecols=columns, parse_dates=["time"])
+            elif self.fmt == "parquet":
+                frame = pd.read_parquet(path, columns=columns)
+            else:
+                frame = pd.read_feather(path, columns=columns)
+            frames.append(frame)
+        if not frames:
+            return pd.DataFrame(columns=columns or ["time", *BAR_COLUMNS])
+        return pd.concat(frames, ignore_index=True)
+
+    def read(
+        self,
+        sources: Optional[List[str]] = None,
+        timeframes: Optional[List[str]] = None,
+        symbols: Optional[List[str]] = None,
+        start: Any = None,
+        end: Any = None,
+        columns: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
+        """
+        Liest Bars als flache Tabelle (time, OHLCV, source, timeframe, symbol).
+        Alle Filter sind optional; `start`/`end` sind inklusiv.
+        """
+        timeframes = [tf.upper() for tf in timeframes] if timeframes else None
+        start = _naive_utc(start)
+        end = _naive_utc(end)
+
+        if self.fmt == "csv":
+            frame = self._read_csv_partitions(sources, timeframes, symbols)
+            if start is not None:
+                frame = frame[frame["time"] >= start]
+            if end is not None:
+                frame = frame[frame["time"] <= end]
+        else:
+            frame = self._read_arrow(sources, timeframes, symbols, start, end)
+
+        keys = ["source", "timeframe", "symbol", "time"]
+        frame = frame.sort_values(keys, kind="stable").drop_duplicates(keys, keep="last").reset_index(drop=True)
+        if columns:
+            frame = frame[[col for col in columns if col in frame.columns]]
+        return frame
+
+    def _read_arrow(self, sources, timeframes, symbols, start, end) -> pd.DataFrame:
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        partitioning = ds.partitioning(
+            pa.schema([(key, pa.string()) for key in PARTITION_KEYS]),
+            flavor="hive",
+        )
+        dataset = ds.dataset(
+            self.base_dir,
+            format="parquet" if self.fmt == "parquet" else "feather",
+            partitioning=partitioning,
+            exclude_invalid_files=True,
+            ignore_prefixes=[".", "_"],
+        )
+
+        expr = None
+        for field_name, values in (("source", sources), ("timeframe", timeframes), ("symbol", symbols)):
+            if values:
+                cond = ds.field(field_name).isin([str(v) for v in values])
+                expr = cond if expr is None else expr & cond
+        if start is not None:
+            cond = ds.field("time") >= pa.scalar(start.to_pydatetime(), type=pa.timestamp("ns"))
+            expr = cond if expr is None else expr & cond
+        if end is not None:
+            cond = ds.field("time") <= pa.scalar(end.to_pydatetime(), type=pa.timestamp("ns"))
+            expr = cond if expr is None else expr & cond
+
+        return dataset.to_table(filter=expr).to_pandas()
+
+    def _read_csv_partitions(self, sources, timeframes, symbols) -> pd.DataFrame:
+        frames = []
+        for part_dir in self.base_dir.glob("source=*/timeframe=*/symbol=*"):
+            values = {
+                key: unquote(part.name.split("=", 1)[1])
+                for key, part in zip(PARTITION_KEYS, (part_dir.parent.parent, part_dir.parent, part_dir))
+            }
+            if sources and values["source"] not in sources:
+                continue
+            if timeframes and values["timeframe"] not in timeframes:
+                continue
+            if symbols and values["symbol"] not in symbols:
+                continue
+
+            frame = self._read_files(self._parts(part_dir))
+            for key in PARTITION_KEYS:
+                frame[key] = values[key]
+            frames.append(frame)
+
+        if not frames:
+            return pd.DataFrame(columns=["time", *BAR_COLUMNS, *PARTITION_KEYS])
+        return pd.concat(frames, ignore_index=True)
+
+    def partition_sources(self, timeframe: str, symbol: str) -> List[str]:
+        """Quellen, unter denen `symbol` im Timeframe gespeichert ist."""
+        pattern = (
+            f"source=*/timeframe={quote(str(timeframe).upper(), safe='')}"
+            f"/symbol={quote(str(symbol), safe='')}"
+        )
+        return sorted(
+            unquote(part_dir.parent.parent.name.split("=", 1)[1])
+            for part_dir in self.base_dir.glob(pattern)
+            if self._parts(part_dir)
+        )
+
+    def load_bars(
+        self,
+        source: str,
+        timeframe: str,
+        symbol: str,
+        start: Any = None,
+        end: Any = None,
+    ) -> pd.DataFrame:
+        """
+        Bars einer Partition im Format von load_data (Index `time`, OHLCV-Spalten).
+        Liest die Part-Dateien der Partition direkt, ohne das Dataset zu durchsuchen.
+        """
+        frame = self._read_files(self._parts(self.partition_dir(source, timeframe, symbol)))
+        if frame.empty:
+            return pd.DataFrame(columns=list(BAR_COLUMNS))
+
+        start = _naive_utc(start)
+        end = _naive_utc(end)
+        if start is not None:
+            frame = frame[frame["time"] >= start]
+        if end is not None:
+            frame = frame[frame["time"] <= end]
+
+        frame = frame.drop_duplicates("time", keep="last").set_index("time").sort_index()
+        return frame[[col for col in BAR_COLUMNS if col in frame.columns]]
+
+
+class ScanExport:
+    """
+    Sammelt die Kursdaten eines Scans und schreibt sie am Ende gemeinsam
+    (parallel je Partition) ins Dataset.
+    """
+
+    def __init__(self, dataset: BarDataset, workers: int = DEFAULT_WORKERS) -> None:
+        self.dataset = dataset
+        self.workers = max(int(workers), 1)
+        self._frames: Dict[PartitionKey, pd.DataFrame] = {}
+
+    def add(self, source: str, timeframe: str, symbol: str, df: pd.DataFrame) -> None:
+        if df is None or df.empty:
+            return
+        # nur OHLCV kopieren; Scanner hängen danach Indikator-Spalten an
+        columns = [col for col in BAR_COLUMNS if col in df.columns]
+        self._frames[(source, timeframe.upper(), symbol)] = df[columns].copy()
+
+    def close(self) -> int:
+        """Schreibt alle gesammelten Frames; liefert die Anzahl neuer Bars."""
+        if not self._frames:
+            return 0
+        counts = self.dataset.append_many(self._frames.items(), workers=self.workers)
+        written = sum(counts.values())
+        print(
+            f"[INFO] Kursdaten-Export: {written} neue Bars aus {len(counts)} Symbolen "
+            f"nach {self.dataset.base_dir} ({self.dataset.fmt})"
+        )
+        self._frames = {}
+        return written
+
+
+def open_bar_dataset(cfg: Dict[str, Any]) -> Optional[BarDataset]:
+    """Öffnet das Bar-Dataset aus Abschnitt `data_export`; ohne pyarrow mit CSV."""
+    export_cfg = cfg.get("data_export", {}) if isinstance(cfg, dict) else {}
+    fmt = str(export_cfg.get("format", DEFAULT_FORMAT)).lower()
+    if fmt != "csv" and not pyarrow_available():
+        print(
+            f"[WARN] data_export.format: {fmt} benötigt pyarrow (pip install pyarrow); "
+            f"Kursdaten-Export läuft stattdessen als CSV."
+        )
+        fmt = "csv"
+
+    try:
+        return BarDataset(export_cfg.get("dir", DEFAULT_DATASET_DIR), fmt=fmt)
+    except (OSError, ValueError) as exc:
+        print(f"[WARN] Kursdaten-Export nicht verfuegbar: {exc}")
+        return None
+
+
+def open_scan_export(cfg: Dict[str, Any]) -> Optional[ScanExport]:
+    """ScanExport, falls `data_export.enabled` gesetzt ist."""
+    export_cfg = cfg.get("data_export", {}) if isinstance(cfg, dict) else {}
+    if not bool(export_cfg.get("enabled", False)):
+        return None
+
+    dataset = open_bar_dataset(cfg)
+    if dataset is None:
+        return None
+    return ScanExport(dataset, workers=int(export_cfg.get("workers", DEFAULT_WORKERS)))
+
+
+def detect_format(base_dir: Path) -> Optional[str]:
+    for part in base_dir.glob("source=*/timeframe=*/symbol=*/part-*"):
+        for fmt, ext in EXTENSIONS.items():
+            if part.suffix == ext:
+                return fmt
+    return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Kursdaten-Dataset lesen/kompaktieren")
+    parser.add_argument("command", choices=["read", "compact"])
+    parser.add_argument("--dir", default=DEFAULT_DATASET_DIR)
+    parser.add_argument("--format", choices=FORMATS, help="Standard: aus den vorhandenen Dateien")
+    parser.add_argument("--source", action="append")
+    parser.add_argument("--timeframe", action="append")
+    parser.add_argument("--symbol", action="append")
+    parser.add_argument("--since", help="inklusive, z. B. 2024-01-01")
+    parser.add_argument("--until", help="inklusive")
+    parser.add_argument("--limit", type=int, default=20, help="angezeigte Zeilen")
+    args = parser.parse_args()
+
+    if not Path(args.dir).exists():
+        print(f"[ERROR] Dataset {args.dir} nicht gefunden.")
+        return
+
+    fmt = args.format or detect_format(Path(args.dir))
+    if fmt is None:
+        print(f"[ERROR] Keine Part-Dateien in {args.dir} gefunden.")
+        return
+
+    dataset = BarDataset(args.dir, fmt=fmt)
+    if args.command == "compact":
+        print(f"[OK] {dataset.compact()} Partitionen zusammengefasst.")
+        return
+
+    frame = dataset.read(
+        sources=args.source,
+        timeframes=args.timeframe,
+        symbols=args.symbol,
+        start=args.since,
+        end=args.until,
+    )
+    if frame.empty:
+        print("Keine Bars gefunden.")
+        return
+
+    print(frame.tail(args.limit).to_string(index=False))
+    print(f"\n{len(frame)} Bars aus {frame['symbol'].nunique()} Symbolen")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+utils/daten/freshness.py
+
+Frische-Index je (Quelle, Symbol, Timeframe).
+
+Nach jedem Download merkt sich der Index die letzte gelieferte Bar und den
+nächsten erwarteten Bar-Schluss laut Handelskalender des Marktes
+(utils/daten/trading_calendar.py). Bis dieser Schluss erreicht ist, kann
+keine neue vollständige Bar existieren: `load_data` liefert die Bars dann
+direkt aus dem Kursdaten-Dataset (Abschnitt `data_export`), statt sie erneut
+herunterzuladen – z. B. am Wochenende oder zwischen zwei H4-Schlüssen.
+
+Datenquellen liefern Bars mit Verzögerung (Yahoo bis ~15 Minuten). Daher
+gilt ein Schluss erst `grace_minutes` danach als erreicht, und ein Download
+kurz nach einem Schluss zählt noch als vor diesem Schluss.
+
+Der Index liegt als JSON in `outputs/freshness.json`:
+
+    {"yfinance|SAP.DE|H4": {"fetched_at": "...", "last_bar": "...", "due": "..."}}
+
+und wird am Ende jedes Scans gespeichert.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+DEFAULT_FRESHNESS_PATH = "outputs/freshness.json"
+DEFAULT_GRACE_MINUTES = 15
+DEFAULT_DATASET_DIR = "outputs/datasets/bars"
+
+_ACTIVE: Optional["FreshnessIndex"] = None
+
+# Hinweis "Frische-Index ohne Kursdaten-Export" nur einmal je Prozess
+_WARNED_NO_EXPORT = False
+
+
+def _now() -> datetime:
+    # naive UTC wie die gespeicherten Zeitstempel und die Bar-Zeiten
+    return datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+
+
+def _key(source: str, symbol: str, timeframe: str) -> str:
+    return f"{source}|{symbol}|{timeframe.upper()}"
+
+
+class FreshnessIndex:
+    """Letzter Download und nächster erwarteter Bar-Schluss je Zeitreihe."""
+
+    def __init__(
+        self,
+        path: str | Path = DEFAULT_FRESHNESS_PATH,
+        grace_minutes: float = DEFAULT_GRACE_MINUTES,
+        dataset_dir: str | Path = DEFAULT_DATASET_DIR,
+    ) -> None:
+        self.path = Path(path)
+        self.grace = timedelta(minutes=float(grace_minutes))
+        self.dataset_dir = Path(dataset_dir)
+        self._lock = threading.Lock()
+        self._records: Dict[str, Dict[str, str]] = self._load()
+        self._dirty = False
+
+        # Zähler seit dem letzten Bericht
+        self.served = 0
+        self.fetched = 0
+
+    def _load(self) -> Dict[str, Dict[str, str]]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as exc:
+            print(f"[WARN] Frische-Index {self.path} unlesbar, beginne leer: {exc}")
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = json.dumps(self._records, indent=1, sort_keys=True)
+            self._dirty = False
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(payload, encoding="utf-8")
+            os.replace(tmp_path, self.path)
+        except OSError as exc:
+            print(f"[WARN] Frische-Index konnte nicht gespeichert werden: {exc}")
+
+    # ------------------------------------------------------------------
+    # Abfragen / Erfassen
+    # ------------------------------------------------------------------
+    def fresh_until(self, source: str, symbol: str, timeframe: str) -> Optional[datetime]:
+        """
+        Letzte Bar des letzten Downloads, falls seitdem kein Bar-Schluss fällig
+        war (die Zeitreihe darf aus dem Dataset kommen); sonst None.
+        """
+        record = self._records.get(_key(source, symbol, timeframe))
+        if not record or datetime.fromisoformat(record["due"]) <= _now():
+            return None
+        return datetime.fromisoformat(record["last_bar"])
+
+    def fetched_at(self, source: str, symbol: str, timeframe: str) -> Optional[datetime]:
+        """Zeitpunkt des letzten Downloads (None = noch nie geladen)."""
+        record = self._records.get(_key(source, symbol, timeframe))
+        return datetime.fromisoformat(record["fetched_at"]) if record else None
+
+    def latest_fetch(self, source: str, symbol: str) -> Optional[tuple[datetime, datetime]]:
+        """(Download-Zeit, letzte Bar) des jüngsten Downloads über alle Timeframes."""
+        prefix = f"{source}|{symbol}|"
+        latest = None
+        for key, record in self._records.items():
+            if not key.startswith(prefix):
+                continue
+            fetch = (datetime.fromisoformat(record["fetched_at"]), datetime.fromisoformat(record["last_bar"]))
+            if latest is None or fetch > latest:
+                latest = fetch
+        return latest
+
+    def record_fetch(
+        self,
+        source: str,
+        symbol: str,
+        timeframe: str,
+        hours: int,
+        last_bar: datetime,
+        fetched_at: Optional[datetime] = None,
+    ) -> datetime:
+        """Download erfassen; liefert den Zeitpunkt, ab dem wieder geladen wird."""
+        # erst beim ersten Download importiert (zoneinfo/dataclasses kosten Startzeit)
+        from utils.daten.trading_calendar import calendar_for, next_bar_close
+
+        fetched_at = fetched_at or _now()
+        calendar = calendar_for(source, symbol)
+        due = next_bar_close(calendar, hours, fetched_at - self.grace) + self.grace
+        with self._lock:
+            self._records[_key(source, symbol, timeframe)] = {
+                "fetched_at": fetched_at.isoformat(),
+                "last_bar": last_bar.isoformat(),
+                "due": due.isoformat(),
+                "calendar": calendar.name if calendar else "24/7",
+            }
+            self._dirty = True
+            self.fetched += 1
+        return due
+
+    def record_served(self) -> None:
+        with self._lock:
+            self.served += 1
+
+    # ------------------------------------------------------------------
+    # Bericht
+    # ------------------------------------------------------------------
+    def report(self) -> None:
+        """Speichert den Index und meldet, wie viele Downloads gespart wurden."""
+        self.save()
+        with self._lock:
+            served, fetched = self.served, self.fetched
+            self.served = self.fetched = 0
+        if served:
+            print(
+                f"[INFO] Frische-Index: {served} Zeitreihen aus dem Cache "
+                f"(kein neuer Bar-Schluss), {fetched} geladen."
+            )
+
+
+def freshness_settings(cfg: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Einstellungen aus Abschnitt `freshness`; None, wenn abgeschaltet oder
+    kein Kursdaten-Export läuft (ohne ihn gibt es keinen Cache).
+    """
+    if not isinstance(cfg, dict):
+        return None
+    freshness_cfg = cfg.get("freshness", {}) or {}
+    export_cfg = cfg.get("data_export", {}) or {}
+    if not bool(freshness_cfg.get("enabled", True)) or not bool(export_cfg.get("enabled", False)):
+        return None
+    return {
+        "path": str(freshness_cfg.get("path", DEFAULT_FRESHNESS_PATH)),
+        "grace_minutes": float(freshness_cfg.get("grace_minutes", DEFAULT_GRACE_MINUTES)),
+        "dataset_dir": str(export_cfg.get("dir", DEFAULT_DATASET_DIR)),
+    }
+
+
+def _warn_without_export(cfg: Dict[str, Any], settings: Optional[Dict[str, Any]]) -> None:
+    """Einmaliger Hinweis, wenn `freshness` an ist, aber ohne Dataset nichts bewirkt."""
+    global _WARNED_NO_EXPORT
+    if settings is not None or _WARNED_NO_EXPORT or not isinstance(cfg, dict):
+        return
+    freshness_cfg = cfg.get("freshness", {}) or {}
+    if bool(freshness_cfg.get("enabled", True)):
+        _WARNED_NO_EXPORT = True
+        print(
+            "[WARN] Frische-Index aktiv, aber data_export.enabled ist aus: "
+            "ohne Kursdaten-Dataset wird jede Zeitreihe neu geladen."
+        )
+
+
+def configure_freshness(cfg: Dict[str, Any]) -> Optional[FreshnessIndex]:
+    """Aktiviert den Frische-Index; gespeichert wird am Ende jedes Scans."""
+    global _ACTIVE
+    from utils import timing
+
+    if _ACTIVE is not None:
+        timing.remove_finish_hook(_ACTIVE.report)
+
+    settings = freshness_settings(cfg)
+    _warn_without_export(cfg, settings)
+    _ACTIVE = FreshnessIndex(**settings) if settings else None
+    if _ACTIVE is not None:
+        timing.add_finish_hook(_ACTIVE.report)
+    return _ACTIVE
+
+
+def active_freshness() -> Optional[FreshnessIndex]:
+    return _ACTIVE
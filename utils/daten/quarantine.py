@@ -0,0 +1,247 @@
+"""
+utils/daten/quarantine.py
+
+Quarantäne für Symbole ohne Daten.
+
+Liefert eine Quelle für ein Symbol wiederholt keine Bars ("Keine
+Yahoo-Daten", unbekanntes OANDA-Instrument), wird es nach `max_failures`
+leeren Antworten in Folge für `cooloff_hours` übersprungen, statt bei jedem
+Scan erneut angefragt zu werden (samt Pause zwischen den Requests). Nach
+Ablauf der Frist wird es einmal erneut versucht; ein Treffer setzt den
+Zähler zurück.
+
+Netzwerk- und API-Fehler (Timeouts, HTTP 5xx, Rate-Limits) zählen nicht,
+sonst würde ein Ausfall der Quelle alle Symbole sperren.
+
+Der Zustand liegt als JSON in `outputs/quarantine.json`:
+
+    {"yfinance|XYZ.DE": {"failures": 4, "last_failure": "...",
+                         "last_success": "...", "until": "..."}}
+
+Am Ende jedes Scans wird die Liste der gesperrten Symbole ausgegeben.
+
+Verwendung:
+    python -m utils.daten.quarantine                 gesperrte Symbole anzeigen
+    python -m utils.daten.quarantine --release XYZ.DE  Symbol sofort freigeben
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+DEFAULT_QUARANTINE_PATH = "outputs/quarantine.json"
+DEFAULT_MAX_FAILURES = 3
+DEFAULT_COOLOFF_HOURS = 72
+
+_ACTIVE: Optional["SymbolQuarantine"] = None
+
+
+def _now() -> datetime:
+    return datetime.utcnow().replace(microsecond=0)
+
+
+def _key(source: str, symbol: str) -> str:
+    return f"{source}|{symbol}"
+
+
+class SymbolQuarantine:
+    """Fehlerzähler und Sperrfristen je (Quelle, Symbol)."""
+
+    def __init__(
+        self,
+        path: str | Path = DEFAULT_QUARANTINE_PATH,
+        max_failures: int = DEFAULT_MAX_FAILURES,
+        cooloff_hours: float = DEFAULT_COOLOFF_HOURS,
+    ) -> None:
+        self.path = Path(path)
+        self.max_failures = max(int(max_failures), 1)
+        self.cooloff = timedelta(hours=float(cooloff_hours))
+        self._lock = threading.Lock()
+        self._records: Dict[str, Dict[str, Any]] = self._load()
+
+        # Ereignisse seit dem letzten Bericht (für die Ausgabe am Scan-Ende)
+        self._skipped: Set[str] = set()
+        self._added: Set[str] = set()
+        self._released: Set[str] = set()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as exc:
+            print(f"[WARN] Quarantäne-Datei {self.path} unlesbar, beginne leer: {exc}")
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _save(self) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(self._records, indent=1, sort_keys=True), encoding="utf-8")
+            os.replace(tmp_path, self.path)
+        except OSError as exc:
+            print(f"[WARN] Quarantäne-Datei konnte nicht gespeichert werden: {exc}")
+
+    # ------------------------------------------------------------------
+    # Abfragen / Erfassen
+    # ------------------------------------------------------------------
+    def blocked_until(self, source: str, symbol: str) -> Optional[datetime]:
+        """Ende der Sperrfrist oder None, wenn das Symbol geladen werden darf."""
+        record = self._records.get(_key(source, symbol))
+        if not record or not record.get("until"):
+            return None
+        until = datetime.fromisoformat(record["until"])
+        return until if until > _now() else None
+
+    def failures(self, source: str, symbol: str) -> int:
+        """Leere Antworten in Folge (0 = zuletzt Daten geliefert oder nie erfasst)."""
+        record = self._records.get(_key(source, symbol))
+        return int(record.get("failures", 0)) if record else 0
+
+    def should_skip(self, source: str, symbol: str) -> bool:
+        """True, wenn das Symbol gesperrt ist (wird für den Bericht vermerkt)."""
+        if self.blocked_until(source, symbol) is None:
+            return False
+        with self._lock:
+            self._skipped.add(_key(source, symbol))
+        return True
+
+    def record_empty(self, source: str, symbol: str) -> None:
+        """Die Quelle hat für das Symbol keine Daten geliefert."""
+        key = _key(source, symbol)
+        now = _now()
+        with self._lock:
+            record = self._records.setdefault(key, {"failures": 0})
+            record["failures"] = int(record.get("failures", 0)) + 1
+            record["last_failure"] = now.isoformat()
+            if record["failures"] >= self.max_failures:
+                record["until"] = (now + self.cooloff).isoformat()
+                self._added.add(key)
+            self._save()
+
+    def record_success(self, source: str, symbol: str) -> None:
+        key = _key(source, symbol)
+        with self._lock:
+            record = self._records.get(key)
+            if record is None:
+                return  # nie fehlgeschlagen: nichts zu speichern
+            if record.get("until"):
+                self._released.add(key)
+            self._records[key] = {"failures": 0, "last_success": _now().isoformat()}
+            self._save()
+
+    def release(self, symbol: str) -> int:
+        """Gibt `symbol` (alle Quellen) sofort frei; liefert die Anzahl Einträge."""
+        with self._lock:
+            keys = [key for key in self._records if key.split("|", 1)[1] == symbol]
+            for key in keys:
+                del self._records[key]
+            if keys:
+                self._save()
+        return len(keys)
+
+    def quarantined(self) -> List[Dict[str, Any]]:
+        """Aktuell gesperrte Symbole, nach Ende der Sperrfrist sortiert."""
+        rows = []
+        for key, record in list(self._records.items()):
+            source, symbol = key.split("|", 1)
+            until = self.blocked_until(source, symbol)
+            if until is not None:
+                rows.append({**record, "source": source, "symbol": symbol, "until": until})
+        return sorted(rows, key=lambda row: row["until"])
+
+    # ------------------------------------------------------------------
+    # Bericht
+    # ------------------------------------------------------------------
+    def report(self) -> None:
+        """Gibt die Quarantäne-Liste aus und setzt die Scan-Ereignisse zurück."""
+        with self._lock:
+            skipped, added, released = self._skipped, self._added, self._released
+            self._skipped, self._added, self._released = set(), set(), set()
+
+        rows = self.quarantined()
+        if not rows and not released:
+            return
+
+        print("\n================ QUARANTÄNE ================")
+        print(
+            f"{len(rows)} Symbole gesperrt | in diesem Scan übersprungen: {len(skipped)} | "
+            f"neu gesperrt: {len(added)} | wieder freigegeben: {len(released)}"
+        )
+        for row in rows:
+            key = _key(row["source"], row["symbol"])
+            marker = "neu" if key in added else ("übersprungen" if key in skipped else "")
+            last_success = row.get("last_success") or "nie"
+            print(
+                f"  {row['symbol']:<16} {row['source']:<9} {row['failures']:>3}x leer | "
+                f"bis {row['until']:%Y-%m-%d %H:%M} | letzter Erfolg: {last_success} {marker}"
+            )
+        for key in sorted(released):
+            print(f"  {key.split('|', 1)[1]:<16} wieder freigegeben")
+        print(f"[INFO] Quarantäne-Datei: {self.path}")
+
+
+def quarantine_settings(cfg: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    quarantine_cfg = cfg.get("quarantine", {}) if isinstance(cfg, dict) else {}
+    quarantine_cfg = quarantine_cfg or {}
+    if not bool(quarantine_cfg.get("enabled", True)):
+        return None
+    return {
+        "path": str(quarantine_cfg.get("path", DEFAULT_QUARANTINE_PATH)),
+        "max_failures": int(quarantine_cfg.get("max_failures", DEFAULT_MAX_FAILURES)),
+        "cooloff_hours": float(quarantine_cfg.get("cooloff_hours", DEFAULT_COOLOFF_HOURS)),
+    }
+
+
+def configure_quarantine(cfg: Dict[str, Any]) -> Optional[SymbolQuarantine]:
+    """Aktiviert die Quarantäne aus Abschnitt `quarantine`; Bericht am Ende jedes Scans."""
+    global _ACTIVE
+    from utils import timing
+
+    if _ACTIVE is not None:
+        timing.remove_finish_hook(_ACTIVE.report)
+
+    settings = quarantine_settings(cfg)
+    _ACTIVE = SymbolQuarantine(**settings) if settings else None
+    if _ACTIVE is not None:
+        timing.add_finish_hook(_ACTIVE.report)
+    return _ACTIVE
+
+
+def active_quarantine() -> Optional[SymbolQuarantine]:
+    return _ACTIVE
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Quarantäne für Symbole ohne Daten")
+    parser.add_argument("--path", default=DEFAULT_QUARANTINE_PATH)
+    parser.add_argument("--release", metavar="SYMBOL", action="append", help="Symbol freigeben")
+    args = parser.parse_args()
+
+    registry = SymbolQuarantine(args.path)
+    for symbol in args.release or []:
+        released = registry.release(symbol)
+        print(f"[OK] {symbol} freigegeben." if released else f"[INFO] {symbol} war nicht erfasst.")
+    if args.release:
+        return
+
+    rows = registry.quarantined()
+    if not rows:
+        print("Keine Symbole in Quarantäne.")
+        return
+    for row in rows:
+        print(
+            f"{row['symbol']:<16} {row['source']:<9} {row['failures']:>3}x leer | "
+            f"bis {row['until']:%Y-%m-%d %H:%M} | letzter Erfolg: {row.get('last_success') or 'nie'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
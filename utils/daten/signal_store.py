@@ -0,0 +1,549 @@
+# /utils/daten/signal_store.py
+"""
+Persistente Signal-Historie (SQLite).
+
+Speichert Liquidity-Grab-Signale (`LiquiditySignal.to_dict()`) und
+Divergenz-Paare je Scan, damit Abfragen wie "alle bullishen Stufe-3-Grabs
+im DAX der letzten 30 Tage" ohne erneuten Scan möglich sind.
+
+Zusätzlich merkt sich der Store, welche Signale bereits gemeldet wurden
+(Delta-Modus), damit wiederholte Scans nur neue Treffer anzeigen.
+
+Abfrage über die Kommandozeile:
+
+    python -m utils.daten.signal_store liquidity --market DAX --stage 3 --direction bullish --days 30
+    python -m utils.daten.signal_store divergences --symbol SAP.DE --timeframe D1
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_STORE_PATH = "outputs/signals.sqlite"
+
+# Spalten aus LiquiditySignal.to_dict() in Tabellenreihenfolge
+LIQUIDITY_FIELDS = (
+    "signal_time",
+    "signal_index",
+    "direction",
+    "signal_type",
+    "level_side",
+    "level_price",
+    "reference_time",
+    "reference_index",
+    "sweep_percent",
+    "reclaimed",
+    "confirmed",
+    "close_position",
+    "wick_ratio",
+    "score",
+    "reason",
+    "level_touches",
+    "equal_pool",
+    "trend",
+    "with_trend",
+    "stage",
+    "stage_label",
+    "follow_through",
+    "follow_through_time",
+    "follow_through_index",
+    "mss_confirmed",
+    "mss_time",
+    "mss_index",
+    "mss_level",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    scanner TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    markets TEXT,
+    started_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS liquidity_signals (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    scan_id INTEGER REFERENCES scans(id),
+    symbol TEXT NOT NULL,
+    name TEXT,
+    market TEXT,
+    timeframe TEXT NOT NULL,
+    signal_time TEXT NOT NULL,
+    signal_index INTEGER,
+    direction TEXT NOT NULL,
+    signal_type TEXT,
+    level_side TEXT,
+    level_price REAL NOT NULL,
+    reference_time TEXT,
+    reference_index INTEGER,
+    sweep_percent REAL,
+    reclaimed INTEGER,
+    confirmed INTEGER,
+    close_position REAL,
+    wick_ratio REAL,
+    score REAL,
+    reason TEXT,
+    level_touches INTEGER,
+    equal_pool INTEGER,
+    trend TEXT,
+    with_trend INTEGER,
+    stage INTEGER NOT NULL,
+    stage_label TEXT,
+    follow_through INTEGER,
+    follow_through_time TEXT,
+    follow_through_index INTEGER,
+    mss_confirmed INTEGER,
+    mss_time TEXT,
+    mss_index INTEGER,
+    mss_level REAL,
+    UNIQUE (symbol, timeframe, direction, level_price, signal_time)
+);
+
+CREATE INDEX IF NOT EXISTS idx_liquidity_lookup
+    ON liquidity_signals (symbol, timeframe, signal_time, stage);
+CREATE INDEX IF NOT EXISTS idx_liquidity_market
+    ON liquidity_signals (market, signal_time);
+
+CREATE TABLE IF NOT EXISTS divergences (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    scan_id INTEGER REFERENCES scans(id),
+    symbol TEXT NOT NULL,
+    name TEXT,
+    market TEXT,
+    timeframe TEXT NOT NULL,
+    direction TEXT NOT NULL,
+    start_time TEXT NOT NULL,
+    end_time TEXT NOT NULL,
+    UNIQUE (symbol, timeframe, direction, start_time, end_time)
+);
+
+CREATE INDEX IF NOT EXISTS idx_divergence_lookup
+    ON divergences (symbol, timeframe, end_time);
+CREATE INDEX IF NOT EXISTS idx_divergence_market
+    ON divergences (market, end_time);
+
+CREATE TABLE IF NOT EXISTS reported_keys (
+    scanner TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    direction TEXT NOT NULL,
+    level TEXT NOT NULL,
+    signal_time TEXT NOT NULL,
+    reported_at TEXT NOT NULL,
+    PRIMARY KEY (scanner, symbol, timeframe, direction, level, signal_time)
+) WITHOUT ROWID;
+"""
+
+# (symbol, timeframe, direction, level, signal_time)
+ReportKey = Tuple[str, str, str, str, str]
+
+
+def _to_db_value(value: Any) -> Any:
+    """
+    Zeitstempel als sortierbarer ISO-Text (naiv UTC, sekundengenau, wie die
+    bestehenden Einträge mit Leerzeichen als Trenner), Bools als 0/1.
+    """
+    if value is None or value != value:  # None, NaN, NaT
+        return None
+    if isinstance(value, bool):
+        return int(value)
+    if getattr(getattr(value, "dtype", None), "kind", None) == "M":  # numpy.datetime64
+        value = value.astype("datetime64[us]").item()
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        return value.isoformat(sep=" ", timespec="seconds")
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if hasattr(value, "item"):  # numpy-Skalare
+        return value.item()
+    return value
+
+
+def liquidity_report_key(symbol: str, timeframe: str, signal: Any) -> ReportKey:
+    return (
+        symbol,
+        timeframe.upper(),
+        signal.direction,
+        f"{float(signal.level_price):.8f}",
+        _to_db_value(signal.signal_time),
+    )
+
+
+def divergence_report_key(
+    symbol: str,
+    timeframe: str,
+    direction: str,
+    pair: Tuple[Any, Any],
+) -> ReportKey:
+    # Bei Divergenzen übernimmt der erste Pivot die Rolle des Levels
+    start, end = pair
+    return (symbol, timeframe.upper(), direction, _to_db_value(start), _to_db_value(end))
+
+
+class SignalStore:
+    """
+    Dünne Hülle um eine SQLite-Datei mit Bulk-Inserts je Scan.
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_STORE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(_SCHEMA)
+
+    def __enter__(self) -> "SignalStore":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    # ------------------------------------------------------------------
+    # Schreiben
+    # ------------------------------------------------------------------
+    def start_scan(
+        self,
+        scanner: str,
+        timeframe: str,
+        markets: Iterable[str] = (),
+    ) -> int:
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO scans (scanner, timeframe, markets, started_at) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    scanner,
+                    timeframe,
+                    ",".join(markets),
+                    datetime.datetime.now().isoformat(timespec="seconds"),
+                ),
+            )
+        return int(cursor.lastrowid)
+
+    def insert_liquidity_signals(
+        self,
+        scan_id: int,
+        timeframe: str,
+        rows: Iterable[Tuple[str, str, str, Any]],
+    ) -> int:
+        """
+        rows: (symbol, name, market, LiquiditySignal)
+
+        Bereits bekannte Signale (gleiches Symbol/Timeframe/Richtung/Level/Zeit)
+        werden aktualisiert, z. B. wenn ein Setup eine höhere Stufe erreicht.
+        Liefert die Anzahl neuer bzw. geänderter Zeilen.
+        """
+        columns = ("scan_id", "symbol", "name", "market",
+                   "timeframe") + LIQUIDITY_FIELDS
+        updated = [
+            col for col in columns
+            if col not in ("symbol", "timeframe", "direction", "level_price", "signal_time")
+        ]
+        updates = ", ".join(f"{col} = excluded.{col}" for col in updated)
+        # unveränderte Signale nicht neu schreiben (und nicht mitzählen)
+        changed = " OR ".join(
+            f"liquidity_signals.{col} IS NOT excluded.{col}"
+            for col in updated
+            if col != "scan_id"
+        )
+        sql = (
+            f"INSERT INTO liquidity_signals ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' for _ in columns)}) "
+            "ON CONFLICT (symbol, timeframe, direction, level_price, signal_time) "
+            f"DO UPDATE SET {updates} WHERE {changed}"
+        )
+
+        params = []
+        for symbol, name, market, signal in rows:
+            data = signal.to_dict() if hasattr(signal, "to_dict") else dict(signal)
+            params.append(
+                (scan_id, symbol, name, market, timeframe)
+                + tuple(_to_db_value(data.get(field)) for field in LIQUIDITY_FIELDS)
+            )
+
+        with self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(sql, params)
+        return self.conn.total_changes - before
+
+    def insert_divergences(
+        self,
+        scan_id: int,
+        timeframe: str,
+        rows: Iterable[Tuple[str, str, str, Dict[str, Any]]],
+    ) -> int:
+        """
+        rows: (symbol, name, market, {"bullish": [(t1, t2), ...], "bearish": [...]})
+
+        Liefert die Anzahl neu gespeicherter Divergenzen (bekannte werden übersprungen).
+        """
+        params = []
+        for symbol, name, market, result in rows:
+            for direction in ("bullish", "bearish"):
+                for start, end in result.get(direction, []):
+                    params.append(
+                        (
+                            scan_id,
+                            symbol,
+                            name,
+                            market,
+                            timeframe,
+                            direction,
+                            _to_db_value(start),
+                            _to_db_value(end),
+                        )
+                    )
+
+        with self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO divergences "
+                "(scan_id, symbol, name, market, timeframe, direction, start_time, end_time) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                params,
+            )
+        return self.conn.total_changes - before
+
+    # ------------------------------------------------------------------
+    # Delta-Modus
+    # ------------------------------------------------------------------
+    def filter_unreported(self, scanner: str, keys: Iterable[ReportKey]) -> set:
+        """
+        Liefert die Teilmenge der Schlüssel, die noch nie gemeldet wurden
+        (eine Abfrage über eine temporäre Tabelle statt eines SELECT je Schlüssel).
+        """
+        wanted = {tuple(key) for key in keys}
+        if not wanted:
+            return set()
+
+        with self.conn:
+            self.conn.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS wanted_keys "
+                "(symbol TEXT, timeframe TEXT, direction TEXT, level TEXT, signal_time TEXT)"
+            )
+            self.conn.execute("DELETE FROM wanted_keys")
+            self.conn.executemany("INSERT INTO wanted_keys VALUES (?, ?, ?, ?, ?)", wanted)
+            reported = self.conn.execute(
+                "SELECT w.symbol, w.timeframe, w.direction, w.level, w.signal_time "
+                "FROM wanted_keys w JOIN reported_keys r "
+                "ON r.scanner = ? AND r.symbol = w.symbol AND r.timeframe = w.timeframe "
+                "AND r.direction = w.direction AND r.level = w.level "
+                "AND r.signal_time = w.signal_time",
+                (scanner,),
+            ).fetchall()
+            self.conn.execute("DELETE FROM wanted_keys")
+        return wanted - {tuple(row) for row in reported}
+
+    def mark_reported(self, scanner: str, keys: Iterable[ReportKey]) -> None:
+        reported_at = datetime.datetime.now().isoformat(timespec="seconds")
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO reported_keys "
+                "(scanner, symbol, timeframe, direction, level, signal_time, reported_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(scanner,) + tuple(key) + (reported_at,) for key in keys],
+            )
+
+    # ------------------------------------------------------------------
+    # Lesen
+    # ------------------------------------------------------------------
+    def _query(
+        self,
+        table: str,
+        time_column: str,
+        filters: Dict[str, Any],
+        since: Optional[datetime.datetime],
+        min_stage: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        clauses = []
+        params: List[Any] = []
+
+        for column, value in filters.items():
+            if value is None:
+                continue
+            clauses.append(f"{column} = ?")
+            params.append(value)
+
+        if since is not None:
+            clauses.append(f"{time_column} >= ?")
+            params.append(_to_db_value(since))
+
+        if min_stage is not None:
+            clauses.append("stage >= ?")
+            params.append(int(min_stage))
+
+        sql = f"SELECT * FROM {table}"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY {time_column} DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def query_liquidity_signals(
+        self,
+        symbol: Optional[str] = None,
+        market: Optional[str] = None,
+        timeframe: Optional[str] = None,
+        direction: Optional[str] = None,
+        stage: Optional[int] = None,
+        min_stage: Optional[int] = None,
+        since: Optional[datetime.datetime] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        return self._query(
+            "liquidity_signals",
+            "signal_time",
+            {
+                "symbol": symbol,
+                "market": market,
+                "timeframe": timeframe.upper() if timeframe else None,
+                "direction": direction,
+                "stage": stage,
+            },
+            since=since,
+            min_stage=min_stage,
+            limit=limit,
+        )
+
+    def query_divergences(
+        self,
+        symbol: Optional[str] = None,
+        market: Optional[str] = None,
+        timeframe: Optional[str] = None,
+        direction: Optional[str] = None,
+        since: Optional[datetime.datetime] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        return self._query(
+            "divergences",
+            "end_time",
+            {
+                "symbol": symbol,
+                "market": market,
+                "timeframe": timeframe.upper() if timeframe else None,
+                "direction": direction,
+            },
+            since=since,
+            limit=limit,
+        )
+
+
+def open_signal_store(cfg: Dict[str, Any]) -> Optional[SignalStore]:
+    """
+    Öffnet den Signal-Store, falls er in der Konfiguration aktiviert ist.
+    """
+    store_cfg = cfg.get("signal_store", {}) if isinstance(cfg, dict) else {}
+    if not bool(store_cfg.get("enabled", True)):
+        return None
+
+    try:
+        return SignalStore(store_cfg.get("path", DEFAULT_STORE_PATH))
+    except sqlite3.Error as exc:
+        print(f"[WARN] Signal-Store nicht verfuegbar: {exc}")
+        return None
+
+
+def mark_keys_reported(cfg: Dict[str, Any], scanner: str, keys: Iterable[ReportKey]) -> None:
+    """
+    Delta-Modus: merkt `keys` als gemeldet. Die Scanner rufen das erst auf,
+    nachdem die Treffer angezeigt bzw. exportiert wurden; bricht ein Lauf
+    vorher ab, erscheinen die Signale beim nächsten Scan erneut.
+    """
+    keys = list(keys)
+    if not keys:
+        return
+    store = open_signal_store(cfg)
+    if store is not None:
+        with store:
+            store.mark_reported(scanner, keys)
+
+
+def delta_mode_enabled(cfg: Dict[str, Any]) -> bool:
+    store_cfg = cfg.get("signal_store", {}) if isinstance(cfg, dict) else {}
+    return bool(store_cfg.get("enabled", True)) and bool(store_cfg.get("delta_mode", False))
+
+
+def _print_rows(rows: List[Dict[str, Any]], columns: List[str]) -> None:
+    if not rows:
+        print("Keine Einträge gefunden.")
+        return
+
+    widths = {
+        col: max(len(col), *(len(str(row.get(col, ""))) for row in rows))
+        for col in columns
+    }
+    print(" | ".join(col.ljust(widths[col]) for col in columns))
+    print("-+-".join("-" * widths[col] for col in columns))
+    for row in rows:
+        print(" | ".join(str(row.get(col, "")).ljust(widths[col]) for col in columns))
+    print(f"\n{len(rows)} Einträge")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Signal-Historie abfragen")
+    parser.add_argument("table", choices=["liquidity", "divergences"])
+    parser.add_argument("--db", default=DEFAULT_STORE_PATH)
+    parser.add_argument("--symbol")
+    parser.add_argument("--market")
+    parser.add_argument("--timeframe")
+    parser.add_argument("--direction", choices=["bullish", "bearish"])
+    parser.add_argument("--stage", type=int)
+    parser.add_argument("--min-stage", type=int)
+    parser.add_argument("--days", type=int, help="nur die letzten N Tage")
+    parser.add_argument("--limit", type=int, default=200)
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        print(f"[ERROR] Signal-Store {args.db} nicht gefunden.")
+        return
+
+    since = None
+    if args.days:
+        since = datetime.datetime.utcnow() - datetime.timedelta(days=args.days)
+
+    with SignalStore(args.db) as store:
+        if args.table == "liquidity":
+            rows = store.query_liquidity_signals(
+                symbol=args.symbol,
+                market=args.market,
+                timeframe=args.timeframe,
+                direction=args.direction,
+                stage=args.stage,
+                min_stage=args.min_stage,
+                since=since,
+                limit=args.limit,
+            )
+            _print_rows(
+                rows,
+                ["signal_time", "symbol", "market", "timeframe", "stage",
+                 "direction", "signal_type", "score", "sweep_percent", "level_price"],
+            )
+        else:
+            rows = store.query_divergences(
+                symbol=args.symbol,
+                market=args.market,
+                timeframe=args.timeframe,
+                direction=args.direction,
+                since=since,
+                limit=args.limit,
+            )
+            _print_rows(
+                rows,
+                ["end_time", "start_time", "symbol", "market", "timeframe", "direction"],
+            )
+
+
+if __name__ == "__main__":
+    main()
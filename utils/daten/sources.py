@@ -0,0 +1,118 @@
+"""
+utils/daten/sources.py
+
+Einstellungen der Datenquellen für `load_data`.
+
+`configure_data_sources(cfg)` wird einmal beim Programmstart aufgerufen und
+merkt sich die Abschnitte der Config, die beeinflussen, woher Kursdaten
+kommen. Das Modul importiert bewusst weder pandas noch die Datenquellen,
+damit der Aufruf die Startzeit nicht erhöht.
+
+Replay (Abschnitt `replay`):
+    Statt Yahoo/OANDA liefert `load_data` die Bars aus dem Kursdaten-Dataset
+    (utils/daten/exporter.py). Mit `as_of` wird der Scan so ausgeführt, als
+    wäre es dieser Zeitpunkt: es gibt nur Bars, die bis dahin geschlossen
+    waren, und das Historienfenster endet dort.
+
+Endpunkte (Abschnitt `endpoints`):
+    Basis-URLs für die OANDA-REST-API und die Yahoo-Chart-API, z. B. die
+    lokalen Stand-in-Server aus benchmarks/standin.py für Lasttests. Leer
+    bzw. null = die echten Dienste (OANDA practice, yfinance).
+
+Quarantäne (Abschnitt `quarantine`):
+    Symbole ohne Daten werden nach mehreren leeren Antworten eine Zeit lang
+    übersprungen (utils/daten/quarantine.py).
+
+Frische-Index (Abschnitt `freshness`):
+    Solange laut Handelskalender keine neue Bar geschlossen haben kann,
+    kommen die Bars aus dem Kursdaten-Dataset statt aus einem neuen
+    Download (utils/daten/freshness.py).
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+REPLAY_SOURCE = "replay"
+DEFAULT_REPLAY_DIR = "outputs/datasets/bars"
+
+_REPLAY: Optional[Dict[str, Any]] = None
+_ENDPOINTS: Dict[str, Optional[str]] = {"oanda_api": None, "yahoo_chart": None}
+
+
+def _parse_as_of(value: Any) -> Optional[datetime]:
+    """as_of als naive UTC-Zeit (Strings im ISO-Format, z. B. "2024-06-28 22:00")."""
+    if value in (None, ""):
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        parsed = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def replay_settings(cfg: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Replay-Einstellungen aus Abschnitt `replay`. `enabled: true` leitet alle
+    Quellen auf das Dataset um; explizit `source: replay` geht immer.
+    """
+    replay_cfg = cfg.get("replay", {}) if isinstance(cfg, dict) else {}
+    replay_cfg = replay_cfg or {}
+    return {
+        "enabled": bool(replay_cfg.get("enabled", False)),
+        "dir": str(replay_cfg.get("dir", DEFAULT_REPLAY_DIR)),
+        "format": replay_cfg.get("format"),
+        "as_of": _parse_as_of(replay_cfg.get("as_of")),
+    }
+
+
+def endpoint_settings(cfg: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    """Basis-URLs aus Abschnitt `endpoints` (ohne abschließenden Schrägstrich)."""
+    endpoints_cfg = cfg.get("endpoints", {}) if isinstance(cfg, dict) else {}
+    endpoints_cfg = endpoints_cfg or {}
+    return {
+        name: (str(endpoints_cfg[name]).rstrip("/") if endpoints_cfg.get(name) else None)
+        for name in ("oanda_api", "yahoo_chart")
+    }
+
+
+def configure_data_sources(cfg: Dict[str, Any]) -> None:
+    """Übernimmt die Datenquellen-Einstellungen aus der Config."""
+    global _REPLAY, _ENDPOINTS
+    _REPLAY = replay_settings(cfg)
+    _ENDPOINTS = endpoint_settings(cfg)
+
+    for name, url in _ENDPOINTS.items():
+        if url:
+            print(f"[INFO] Endpunkt {name}: {url}")
+
+    from utils.daten.freshness import configure_freshness
+    from utils.daten.quarantine import configure_quarantine
+
+    configure_quarantine(cfg)
+    configure_freshness(cfg)
+
+    if _REPLAY["enabled"]:
+        as_of = _REPLAY["as_of"]
+        when = f" (Stand {as_of:%Y-%m-%d %H:%M} UTC)" if as_of else ""
+        print(f"[INFO] Replay-Modus: Kursdaten aus {_REPLAY['dir']}{when}, kein Netzwerkzugriff.")
+
+
+def active_replay() -> Dict[str, Any]:
+    """Aktuelle Replay-Einstellungen (Standardwerte, falls nicht konfiguriert)."""
+    if _REPLAY is None:
+        return replay_settings({})
+    return _REPLAY
+
+
+def oanda_api_url() -> Optional[str]:
+    """Basis-URL der OANDA-REST-API (None = OANDA practice)."""
+    return _ENDPOINTS.get("oanda_api")
+
+
+def yahoo_chart_url() -> Optional[str]:
+    """Basis-URL der Yahoo-Chart-API (None = Download über yfinance)."""
+    return _ENDPOINTS.get("yahoo_chart")
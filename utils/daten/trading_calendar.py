@@ -0,0 +1,169 @@
+"""
+utils/daten/trading_calendar.py
+
+Handelszeiten je Markt, um den nächsten Bar-Schluss eines Symbols zu
+bestimmen (für den Frische-Index in utils/daten/freshness.py).
+
+Kalender:
+    FX       24/5: So 17:00 bis Fr 17:00 New York (OANDA, Yahoo `=X`)
+    XETRA    09:00–17:30 Europe/Berlin (`.DE`, ^GDAXI)
+    EURONEXT 09:00–17:30 Europe/Paris (`.PA`, `.AS`, `.BR`, ^FCHI, ^AEX, ^STOXX50E)
+    LSE      08:00–16:30 Europe/London (`.L`, ^FTSE)
+    BME      09:00–17:30 Europe/Madrid (`.MC`, ^IBEX)
+    SIX      09:00–17:30 Europe/Zurich (^SSMI)
+    US       09:30–16:00 America/New_York (Yahoo ohne Suffix, ^GSPC, ^DJI, ...)
+
+Bars beginnen mit der Sitzung (H1/H4: Sitzungsbeginn + n Stunden, die
+letzte Bar endet mit dem Sitzungsschluss; D1: Sitzungsschluss). Yahoo-FX
+zählt die Bars ab Mitternacht UTC: unter der Woche schließen sie nur auf
+dem UTC-Raster (D1 immer um 00:00 UTC), vor dem Wochenende zusätzlich
+mit dem Sitzungsschluss am Freitag. Feiertage werden nicht berücksichtigt:
+an einem Feiertag wird einfach zu den üblichen Zeiten erneut geladen.
+
+Symbole ohne bekannten Kalender (z. B. ^STI, Futures, Krypto) gelten als
+durchgehend gehandelt; ihre Bars schließen auf vollen Vielfachen des
+Timeframes (UTC).
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta, timezone
+from functools import lru_cache
+from typing import List, Optional
+from zoneinfo import ZoneInfo
+
+_EPOCH = datetime(1970, 1, 1)
+
+# Suchfenster für den nächsten Schluss (überbrückt Wochenende + Brückentag)
+_SEARCH_DAYS = 8
+
+
+@dataclass(frozen=True)
+class TradingCalendar:
+    """Handelszeiten Mo–Fr in der Zeitzone `tz`."""
+
+    name: str
+    tz: str
+    open: time
+    close: time
+    # Sitzung beginnt am Vortag (FX: Montag-Sitzung ab Sonntag 17:00)
+    overnight: bool = False
+    # Bars ab Mitternacht UTC statt ab Sitzungsbeginn (Yahoo-FX)
+    utc_grid: bool = False
+
+    def sessions(self, day) -> List[tuple]:
+        """(Beginn, Schluss) als naive UTC-Zeiten für den lokalen Handelstag `day`."""
+        if day.weekday() >= 5:
+            return []
+        zone = _zone(self.tz)
+        start_day = day - timedelta(days=1) if self.overnight else day
+        start = datetime.combine(start_day, self.open, tzinfo=zone)
+        end = datetime.combine(day, self.close, tzinfo=zone)
+        return [(_naive_utc(start), _naive_utc(end))]
+
+    def bar_closes(self, day, hours: int) -> List[datetime]:
+        """Alle Bar-Schlüsse des Handelstags `day` für Bars von `hours` Stunden."""
+        step = timedelta(hours=hours)
+        closes = []
+        for start, end in self.sessions(day):
+            if self.utc_grid:
+                point = _EPOCH + step * ((start - _EPOCH) // step + 1)
+            else:
+                point = start + step
+            while point < end:
+                closes.append(point)
+                point += step
+            # Auf dem UTC-Raster läuft die Bar über das Sitzungsende hinaus,
+            # solange die nächste Sitzung direkt anschließt (FX unter der Woche);
+            # abgeschnitten wird sie nur vor einer Handelspause (Wochenende).
+            if not self.utc_grid or point == end or not self._continues(day, end):
+                closes.append(end)
+        return closes
+
+    def _continues(self, day, end: datetime) -> bool:
+        """True, wenn die Sitzung des Folgetags genau bei `end` beginnt."""
+        following = self.sessions(day + timedelta(days=1))
+        return bool(following) and following[0][0] == end
+
+
+@lru_cache(maxsize=None)
+def _zone(name: str) -> ZoneInfo:
+    return ZoneInfo(name)
+
+
+def _naive_utc(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+FX = TradingCalendar("FX", "America/New_York", time(17, 0), time(17, 0), overnight=True)
+FX_YAHOO = TradingCalendar("FX", "America/New_York", time(17, 0), time(17, 0), overnight=True, utc_grid=True)
+XETRA = TradingCalendar("XETRA", "Europe/Berlin", time(9, 0), time(17, 30))
+EURONEXT = TradingCalendar("EURONEXT", "Europe/Paris", time(9, 0), time(17, 30))
+LSE = TradingCalendar("LSE", "Europe/London", time(8, 0), time(16, 30))
+BME = TradingCalendar("BME", "Europe/Madrid", time(9, 0), time(17, 30))
+SIX = TradingCalendar("SIX", "Europe/Zurich", time(9, 0), time(17, 30))
+US = TradingCalendar("US", "America/New_York", time(9, 30), time(16, 0))
+
+# Yahoo-Suffix -> Börse (wie YF_SUFFIX in config/get_all_markets.py)
+SUFFIX_CALENDARS = {
+    ".DE": XETRA,
+    ".PA": EURONEXT,
+    ".AS": EURONEXT,
+    ".BR": EURONEXT,
+    ".L": LSE,
+    ".MC": BME,
+    ".SW": SIX,
+}
+
+INDEX_CALENDARS = {
+    "^GDAXI": XETRA,
+    "^FCHI": EURONEXT,
+    "^AEX": EURONEXT,
+    "^STOXX50E": EURONEXT,
+    "^FTSE": LSE,
+    "^IBEX": BME,
+    "^SSMI": SIX,
+    "^GSPC": US,
+    "^DJI": US,
+    "^NDX": US,
+    "^IXIC": US,
+    "^RUT": US,
+}
+
+CRYPTO_QUOTES = ("-USD", "-EUR", "-USDT")
+
+
+def calendar_for(source: str, symbol: str) -> Optional[TradingCalendar]:
+    """Kalender des Symbols; None = unbekannt (durchgehend gehandelt)."""
+    if source == "oanda":
+        return FX
+    if symbol.endswith("=X"):
+        return FX_YAHOO
+    if symbol.startswith("^"):
+        return INDEX_CALENDARS.get(symbol)
+    if "=" in symbol or symbol.endswith(CRYPTO_QUOTES):
+        return None  # Futures (GC=F) und Krypto (BTC-USD) laufen durch
+    dot = symbol.rfind(".")
+    if dot > 0:
+        return SUFFIX_CALENDARS.get(symbol[dot:])
+    return US
+
+
+def next_bar_close(
+    calendar: Optional[TradingCalendar],
+    hours: int,
+    after: datetime,
+) -> datetime:
+    """Erster Bar-Schluss (naive UTC) nach `after` im Kalender."""
+    step = timedelta(hours=hours)
+    if calendar is None:
+        return _EPOCH + step * ((after - _EPOCH) // step + 1)
+
+    local_day = after.replace(tzinfo=timezone.utc).astimezone(_zone(calendar.tz)).date()
+    for offset in range(_SEARCH_DAYS + 1):
+        closes = [point for point in calendar.bar_closes(local_day + timedelta(days=offset), hours) if point > after]
+        if closes:
+            return min(closes)
+    # kein Handelstag im Suchfenster (sollte nicht vorkommen)
+    return after + step
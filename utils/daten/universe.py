@@ -0,0 +1,374 @@
+"""
+utils/daten/universe.py
+
+Kompilierter Markt-Index ("Universe") aus config/markets.yaml.
+
+Statt die YAML-Datei bei jedem Start zu parsen und verschachtelte Listen
+von Dicts zu erzeugen, wird sie einmal in flache Spalten übersetzt
+
+    symbols   Tupel der (internierten) Symbole
+    names     Tupel der Namen ("" = kein Name)
+    sources   array("H") mit Index in `source_names`
+    markets   array("H") mit Index in `market_names`; Einträge eines Marktes
+              liegen zusammenhängend (`market_slices`)
+
+und als Binär-Cache (marshal) unter outputs/cache/ abgelegt. Der Cache
+merkt sich Größe, mtime und SHA-1 der YAML-Datei: stimmen Größe und mtime,
+wird er direkt verwendet; sonst entscheidet der Hash, ob neu kompiliert
+werden muss (z. B. nach `git checkout` mit identischem Inhalt nicht).
+
+`MarketUniverse` ist zugleich ein Mapping Markt -> Liste von Einträgen
+(wie bisher `markets` aus load_markets), so dass die Scanner unverändert
+damit arbeiten; zusätzlich gibt es schnelle Abfragen nach Symbol, Markt
+und Quelle. Einträge mit `status: delisted` (config/get_all_markets.py)
+werden nicht aufgenommen. Nur Standardbibliothek (plus yaml zum Kompilieren).
+
+Verwendung:
+    python -m utils.daten.universe                 Index neu kompilieren + Übersicht
+    python -m utils.daten.universe --symbol SAP.DE Einträge eines Symbols
+"""
+
+from __future__ import annotations
+
+import argparse
+import marshal
+import os
+import sys
+from array import array
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_CACHE_DIR = "outputs/cache"
+# bei Formatänderungen erhöhen, alte Caches werden dann neu kompiliert
+FORMAT_VERSION = 2
+
+_ENTRY_KEYS = ("symbol", "source", "name")
+
+# je Pfad einmal geladenes Universe (gemeinsam für alle Scanner)
+_LOADED: Dict[str, "MarketUniverse"] = {}
+
+
+class UniverseError(ValueError):
+    """Die Märkte-Datei fehlt oder hat eine ungültige Struktur."""
+
+
+class MarketUniverse(Mapping):
+    """Alle Symbole aller Märkte in Spaltenform; Mapping Markt -> Einträge."""
+
+    def __init__(
+        self,
+        symbols: Tuple[str, ...],
+        names: Tuple[str, ...],
+        sources: array,
+        source_names: Tuple[str, ...],
+        markets: array,
+        market_names: Tuple[str, ...],
+        extras: Dict[int, Dict[str, Any]],
+    ) -> None:
+        self.symbols = tuple(sys.intern(symbol) for symbol in symbols)
+        self.names = names
+        self.sources = sources
+        self.source_names = source_names
+        self.markets = markets
+        self.market_names = market_names
+        self.extras = extras
+
+        self.market_slices: Dict[str, Tuple[int, int]] = {}
+        start = 0
+        for code, market in enumerate(market_names):
+            end = start
+            while end < len(markets) and markets[end] == code:
+                end += 1
+            self.market_slices[market] = (start, end)
+            start = end
+
+        self._by_symbol: Dict[str, List[int]] = {}
+        for idx, symbol in enumerate(self.symbols):
+            self._by_symbol.setdefault(symbol, []).append(idx)
+
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+
+    # ------------------------------------------------------------------
+    # Mapping Markt -> Einträge (kompatibel zu load_markets)
+    # ------------------------------------------------------------------
+    def __getitem__(self, market: str) -> List[Dict[str, Any]]:
+        entries = self._entries.get(market)
+        if entries is None:
+            start, end = self.market_slices[market]
+            entries = [self.entry(idx) for idx in range(start, end)]
+            self._entries[market] = entries
+        return entries
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.market_names)
+
+    def __len__(self) -> int:
+        return len(self.market_names)
+
+    # ------------------------------------------------------------------
+    # Abfragen
+    # ------------------------------------------------------------------
+    @property
+    def size(self) -> int:
+        """Anzahl Einträge über alle Märkte."""
+        return len(self.symbols)
+
+    def entry(self, idx: int) -> Dict[str, Any]:
+        """Eintrag wie in markets.yaml (ohne leere Felder)."""
+        entry: Dict[str, Any] = {"symbol": self.symbols[idx]}
+        source = self.source_names[self.sources[idx]]
+        if source:
+            entry["source"] = source
+        if self.names[idx]:
+            entry["name"] = self.names[idx]
+        if idx in self.extras:
+            entry.update(self.extras[idx])
+        return entry
+
+    def lookup(self, symbol: str) -> List[Dict[str, Any]]:
+        """Alle Einträge eines Symbols, jeweils mit Schlüssel `market`."""
+        return [
+            {**self.entry(idx), "market": self.market_names[self.markets[idx]]}
+            for idx in self._by_symbol.get(symbol, ())
+        ]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.market_slices
+
+    def has_symbol(self, symbol: str) -> bool:
+        return symbol in self._by_symbol
+
+    def symbols_of(self, market: Optional[str] = None, source: Optional[str] = None) -> List[str]:
+        """Symbole eines Marktes und/oder einer Quelle (ohne Filter: alle)."""
+        start, end = self.market_slices.get(market, (0, 0)) if market else (0, len(self.symbols))
+        if source is None:
+            return list(self.symbols[start:end])
+        if source not in self.source_names:
+            return []
+        code = self.source_names.index(source)
+        sources = self.sources
+        return [self.symbols[idx] for idx in range(start, end) if sources[idx] == code]
+
+    def markets_of(self, symbol: str) -> List[str]:
+        return [self.market_names[self.markets[idx]] for idx in self._by_symbol.get(symbol, ())]
+
+    def to_dict(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Verschachtelte Form wie der Bereich `markets` der YAML-Datei."""
+        return {market: [dict(entry) for entry in self[market]] for market in self.market_names}
+
+    # ------------------------------------------------------------------
+    # (De-)Serialisierung
+    # ------------------------------------------------------------------
+    def _columns(self) -> Dict[str, Any]:
+        return {
+            "symbols": self.symbols,
+            "names": self.names,
+            "sources": self.sources.tobytes(),
+            "source_names": self.source_names,
+            "markets": self.markets.tobytes(),
+            "market_names": self.market_names,
+            "extras": self.extras,
+        }
+
+    @classmethod
+    def _from_columns(cls, columns: Dict[str, Any]) -> "MarketUniverse":
+        sources = array("H")
+        sources.frombytes(columns["sources"])
+        markets = array("H")
+        markets.frombytes(columns["markets"])
+        return cls(
+            symbols=columns["symbols"],
+            names=columns["names"],
+            sources=sources,
+            source_names=columns["source_names"],
+            markets=markets,
+            market_names=columns["market_names"],
+            extras=columns["extras"],
+        )
+
+    @classmethod
+    def from_markets(cls, markets: Dict[str, Any]) -> "MarketUniverse":
+        """Kompiliert den Bereich `markets` (Markt -> Liste von Einträgen)."""
+        symbols: List[str] = []
+        names: List[str] = []
+        sources = array("H")
+        market_codes = array("H")
+        source_names: List[str] = [""]
+        market_names: List[str] = []
+        extras: Dict[int, Dict[str, Any]] = {}
+
+        for market, entries in markets.items():
+            market = str(market)
+            market_names.append(market)
+            for entry in entries or []:
+                if not isinstance(entry, dict) or not entry.get("symbol"):
+                    continue
+                # von config/get_all_markets.py als nicht mehr gelistet markiert
+                if entry.get("status") == "delisted":
+                    continue
+                source = str(entry.get("source") or "")
+                if source not in source_names:
+                    source_names.append(source)
+
+                extra = {key: value for key, value in entry.items() if key not in _ENTRY_KEYS}
+                if extra:
+                    extras[len(symbols)] = extra
+                symbols.append(str(entry["symbol"]))
+                names.append(str(entry.get("name") or ""))
+                sources.append(source_names.index(source))
+                market_codes.append(len(market_names) - 1)
+
+        return cls(
+            tuple(symbols),
+            tuple(names),
+            sources,
+            tuple(source_names),
+            market_codes,
+            tuple(market_names),
+            extras,
+        )
+
+
+def _file_stamp(path: Path) -> Tuple[int, int]:
+    stat = path.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _file_hash(data: bytes) -> str:
+    # nur bei geändertem Zeitstempel nötig; hashlib lädt OpenSSL (Startzeit)
+    import hashlib
+
+    return hashlib.sha1(data).hexdigest()
+
+
+def cache_path_for(path: Path, cache_dir: str | Path = DEFAULT_CACHE_DIR) -> Path:
+    return Path(cache_dir) / f"{path.stem}.universe"
+
+
+def _parse_yaml(path: Path, data: bytes) -> MarketUniverse:
+    import yaml
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    try:
+        parsed = yaml.load(data, Loader=loader)
+    except yaml.YAMLError as exc:
+        raise UniverseError(f"Konnte Maerkte-Datei nicht einlesen: {exc}") from exc
+
+    if not isinstance(parsed, dict):
+        raise UniverseError(f"Ungueltige Struktur in {path}.")
+    markets = parsed.get("markets", {})
+    if not isinstance(markets, dict):
+        raise UniverseError(f"Bereich 'markets' fehlt oder ist ungueltig in {path}.")
+    return MarketUniverse.from_markets(markets)
+
+
+def _write_cache(cache_path: Path, universe: MarketUniverse, stamp: Tuple[int, int], digest: str) -> None:
+    payload = {
+        "version": FORMAT_VERSION,
+        "size": stamp[0],
+        "mtime_ns": stamp[1],
+        "sha1": digest,
+        "columns": universe._columns(),
+    }
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(f".{cache_path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(marshal.dumps(payload))
+        os.replace(tmp_path, cache_path)
+    except (OSError, ValueError) as exc:
+        print(f"[WARN] Markt-Index konnte nicht gespeichert werden: {exc}")
+
+
+def _read_cache(cache_path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        payload = marshal.loads(cache_path.read_bytes())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(payload, dict) or payload.get("version") != FORMAT_VERSION:
+        return None
+    return payload
+
+
+def compile_universe(
+    path: str | Path,
+    cache_dir: str | Path = DEFAULT_CACHE_DIR,
+    data: Optional[bytes] = None,
+) -> MarketUniverse:
+    """Parst die YAML-Datei (oder `data`, ihren bereits gelesenen Inhalt) und schreibt den Index."""
+    path = Path(path)
+    if data is None:
+        data = path.read_bytes()
+    universe = _parse_yaml(path, data)
+    _write_cache(cache_path_for(path, cache_dir), universe, _file_stamp(path), _file_hash(data))
+    _LOADED[str(path)] = universe
+    return universe
+
+
+def load_universe(
+    path: str | Path,
+    cache_dir: str | Path = DEFAULT_CACHE_DIR,
+    reload: bool = False,
+) -> MarketUniverse:
+    """
+    Liefert das Universe zu `path`: aus dem Prozess, aus dem Binär-Cache oder
+    frisch kompiliert. Wirft FileNotFoundError bzw. UniverseError.
+    """
+    path = Path(path)
+    key = str(path)
+    if not reload and key in _LOADED:
+        return _LOADED[key]
+
+    stamp = _file_stamp(path)
+    cache_path = cache_path_for(path, cache_dir)
+    payload = _read_cache(cache_path)
+
+    if payload is not None and (payload["size"], payload["mtime_ns"]) == stamp:
+        universe = MarketUniverse._from_columns(payload["columns"])
+    else:
+        data = path.read_bytes()
+        digest = _file_hash(data)
+        if payload is not None and payload["sha1"] == digest:
+            # nur mtime geändert (touch, checkout): Index gültig, Stempel erneuern
+            universe = MarketUniverse._from_columns(payload["columns"])
+            _write_cache(cache_path, universe, stamp, digest)
+        else:
+            universe = compile_universe(path, cache_dir, data=data)
+
+    _LOADED[key] = universe
+    return universe
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Markt-Index kompilieren und abfragen")
+    parser.add_argument("--markets-file", default="config/markets.yaml")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--symbol", help="Einträge eines Symbols anzeigen")
+    args = parser.parse_args()
+
+    try:
+        if args.symbol:
+            universe = load_universe(args.markets_file, args.cache_dir)
+        else:
+            universe = compile_universe(args.markets_file, args.cache_dir)
+    except (FileNotFoundError, UniverseError) as exc:
+        print(f"[ERROR] {exc}")
+        return
+
+    if args.symbol:
+        entries = universe.lookup(args.symbol)
+        if not entries:
+            print(f"{args.symbol} ist in keinem Markt enthalten.")
+        for entry in entries:
+            print(f"{entry['market']:<28} {entry.get('source', '-'):<10} {entry['symbol']:<16} {entry.get('name', '')}")
+        return
+
+    print(f"[OK] Markt-Index geschrieben: {cache_path_for(Path(args.markets_file), args.cache_dir)}")
+    print(f"{universe.size} Einträge in {len(universe)} Märkten")
+    for market in universe:
+        start, end = universe.market_slices[market]
+        print(f"  {market:<28} {end - start:>4}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+utils/profiling.py
+
+Profiling eines kompletten Scanner-Laufs (`python main.py --profile`).
+
+Der gewählte Scan läuft unter cProfile; optional (`--trace-memory`)
+zeichnet tracemalloc die Allokationen auf. Weil die großen Kopien in den
+Detektoren (`df.copy()` in DivergenceDetector / LiquidityGrabDetector.analyze)
+am Scan-Ende längst freigegeben sind, wird zusätzlich nach jeder
+`indicator`/`detection`-Stufe (utils/timing.py) ein Snapshot genommen,
+sobald der belegte Speicher einen neuen Höchststand erreicht.
+
+Pro Lauf entsteht ein Ordner `outputs/profiles/<timestamp>/` mit:
+
+    <scanner>.pstats               Rohdaten (z. B. für snakeviz / pstats)
+    <scanner>_cumulative.txt       Funktionen sortiert nach kumulierter Zeit
+    <scanner>_tottime.txt          Funktionen sortiert nach Eigenzeit
+    <scanner>_tracemalloc.txt      Allokationsstellen am Höchststand + Zuwachs
+"""
+
+from __future__ import annotations
+
+import cProfile
+import io
+import pstats
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional
+
+from utils import timing
+
+DEFAULT_PROFILE_DIR = "outputs/profiles"
+TOP_FUNCTIONS = 60
+TOP_ALLOCATIONS = 30
+
+# Stufen, nach denen ein Höchststand-Snapshot geprüft wird
+_SNAPSHOT_STAGES = {"indicator", "detection"}
+# neuer Snapshot erst ab 10 % mehr belegtem Speicher (Snapshots sind teuer)
+_SNAPSHOT_GROWTH = 1.10
+
+# Interne Frames, die die Allokationsstatistik nur verrauschen
+_TRACEMALLOC_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def _create_profile_dir(base_dir: str | Path) -> Path:
+    out_dir = Path(base_dir) / datetime.now().strftime("%Y%m%d_%H%M%S")
+    out_dir.mkdir(parents=True, exist_ok=True)
+    return out_dir
+
+
+def _write_sorted_stats(profiler: cProfile.Profile, path: Path, sort_key: str) -> None:
+    buffer = io.StringIO()
+    stats = pstats.Stats(profiler, stream=buffer)
+    stats.strip_dirs().sort_stats(sort_key).print_stats(TOP_FUNCTIONS)
+    path.write_text(buffer.getvalue(), encoding="utf-8")
+
+
+class _PeakSnapshots:
+    """
+    Stage-Hook: hält den Snapshot mit dem höchsten belegten Speicher.
+    """
+
+    def __init__(self) -> None:
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+        self.stage: Optional[str] = None
+        self.current_bytes = 0
+
+    def __call__(self, stage: str) -> None:
+        if stage not in _SNAPSHOT_STAGES or not tracemalloc.is_tracing():
+            return
+        current, _ = tracemalloc.get_traced_memory()
+        if current > self.current_bytes * _SNAPSHOT_GROWTH:
+            self.snapshot = tracemalloc.take_snapshot()
+            self.stage = stage
+            self.current_bytes = current
+
+
+def _write_tracemalloc_report(
+    start: tracemalloc.Snapshot,
+    end: tracemalloc.Snapshot,
+    peak: _PeakSnapshots,
+    peak_bytes: int,
+    path: Path,
+) -> None:
+    start = start.filter_traces(_TRACEMALLOC_FILTERS)
+    end = end.filter_traces(_TRACEMALLOC_FILTERS)
+
+    lines = [f"Peak: {peak_bytes / 1024 / 1024:.1f} MiB", ""]
+
+    if peak.snapshot is not None:
+        high = peak.snapshot.filter_traces(_TRACEMALLOC_FILTERS)
+        lines.append(
+            f"Top {TOP_ALLOCATIONS} Allokationsstellen am Höchststand "
+            f"({peak.current_bytes / 1024 / 1024:.1f} MiB nach Stufe '{peak.stage}'):"
+        )
+        for stat in high.statistics("lineno")[:TOP_ALLOCATIONS]:
+            lines.append(f"  {stat}")
+
+        lines.append("")
+        lines.append("Größte Allokationen am Höchststand mit Aufrufkette:")
+        for stat in high.statistics("traceback")[:5]:
+            lines.append(f"  {stat.count} Blöcke, {stat.size / 1024:.1f} KiB")
+            lines.extend(f"    {line}" for line in stat.traceback.format(limit=8))
+        lines.append("")
+
+    lines.append(f"Top {TOP_ALLOCATIONS} Allokationsstellen (am Scan-Ende belegt):")
+    for stat in end.statistics("lineno")[:TOP_ALLOCATIONS]:
+        lines.append(f"  {stat}")
+
+    lines.append("")
+    lines.append(f"Top {TOP_ALLOCATIONS} Zuwächse gegenüber Scan-Start:")
+    for stat in end.compare_to(start, "lineno")[:TOP_ALLOCATIONS]:
+        lines.append(f"  {stat}")
+
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+@contextmanager
+def profile_scan(
+    scanner: str,
+    enabled: bool = True,
+    trace_memory: bool = False,
+    base_dir: str | Path = DEFAULT_PROFILE_DIR,
+) -> Iterator[Optional[Path]]:
+    """
+    Profilt den Block mit cProfile (und optional tracemalloc).
+
+    Liefert den Ausgabeordner bzw. None, wenn Profiling deaktiviert ist.
+    Die Reports werden auch bei Abbruch (Strg+C, Fehler) geschrieben.
+    """
+    if not enabled:
+        yield None
+        return
+
+    out_dir = _create_profile_dir(base_dir)
+
+    start_snapshot = None
+    peak_snapshots = _PeakSnapshots()
+    if trace_memory:
+        tracemalloc.start(25)
+        start_snapshot = tracemalloc.take_snapshot()
+        timing.add_stage_hook(peak_snapshots)
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield out_dir
+    finally:
+        profiler.disable()
+
+        if start_snapshot is not None:
+            timing.remove_stage_hook(peak_snapshots)
+            end_snapshot = tracemalloc.take_snapshot()
+            _, peak_bytes = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            _write_tracemalloc_report(
+                start_snapshot,
+                end_snapshot,
+                peak_snapshots,
+                peak_bytes,
+                out_dir / f"{scanner}_tracemalloc.txt",
+            )
+
+        profiler.dump_stats(out_dir / f"{scanner}.pstats")
+        _write_sorted_stats(profiler, out_dir / f"{scanner}_cumulative.txt", "cumulative")
+        _write_sorted_stats(profiler, out_dir / f"{scanner}_tottime.txt", "tottime")
+
+        print(f"[INFO] Profil gespeichert in: {out_dir}")
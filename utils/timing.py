@@ -0,0 +1,328 @@
+"""
+utils/timing.py
+
+Leichtgewichtige Zeitmessung für Markt-Scans.
+
+Ein Scan startet einen `ScanTimer`; Lade-, Analyse- und Chart-Code meldet
+seine Abschnitte über `stage("fetch")`, `stage("render")` usw. Ohne aktiven
+Timer sind diese Aufrufe wirkungslos, der Code bleibt also auch außerhalb
+von Scans (Einzelanalyse, Watch-Modus) unverändert nutzbar.
+
+Stufen:
+    fetch      Download (yfinance / OANDA)
+    parse      Umwandeln der Rohdaten in einen DataFrame
+    indicator  RSI, SMA, Donchian, Liquidity-Levels
+    detection  Divergenzen, Liquidity Grabs, Setups
+    render     Chart aufbauen
+    save       PNG / ZIP schreiben
+    sleep      feste Pausen zwischen Requests
+    display    offene Chart-Fenster (Wartezeit auf den Nutzer)
+
+Verschachtelte Stufen zählen nur ihre eigene Zeit (z. B. `indicator`
+innerhalb von `detection`). Am Scan-Ende schreibt `finish_scan_timer()`
+je einen JSON- und CSV-Report nach `outputs/timings/`.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+DEFAULT_TIMING_DIR = "outputs/timings"
+
+STAGES = (
+    "fetch",
+    "parse",
+    "indicator",
+    "detection",
+    "render",
+    "save",
+    "sleep",
+    "display",
+)
+
+# Interaktive Wartezeit zählt nicht zur Scan-Geschwindigkeit
+_IDLE_STAGES = {"display"}
+
+_ACTIVE: Optional["ScanTimer"] = None
+
+# Werden nach jeder Stufe mit deren Namen aufgerufen (z. B. Speicher-Snapshots)
+_STAGE_HOOKS: List[Callable[[str], None]] = []
+
+# Werden am Ende jedes Scans aufgerufen, auch ohne aktive Zeitmessung
+# (z. B. Quarantäne-Bericht)
+_FINISH_HOOKS: List[Callable[[], None]] = []
+
+
+def _percentile(values: List[float], q: float) -> float:
+    """Perzentil mit linearer Interpolation (q in 0..100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * q / 100.0
+    lower = int(pos)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (pos - lower)
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000.0, 3)
+
+
+class ScanTimer:
+    """
+    Sammelt Stufenzeiten pro Symbol und über den gesamten Scan.
+    """
+
+    def __init__(
+        self,
+        scanner: str,
+        timeframe: str | None = None,
+        output_dir: str | Path = DEFAULT_TIMING_DIR,
+    ):
+        self.scanner = scanner
+        self.timeframe = timeframe
+        self.output_dir = Path(output_dir)
+        self.started_at = datetime.now()
+        self._t0 = time.perf_counter()
+
+        # Einzelmessungen je Stufe (Sekunden, ohne verschachtelte Stufen)
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        # Symbol -> Stufe -> Sekunden
+        self.per_symbol: Dict[str, Dict[str, float]] = {}
+        self.counters: Dict[str, int] = defaultdict(int)
+
+        self._symbol: Optional[str] = None
+        # offene Stufen: [name, start, Zeit der Unterstufen]
+        self._stack: List[List[Any]] = []
+
+    @contextmanager
+    def symbol(self, key: str) -> Iterator[None]:
+        """
+        Ordnet alle Stufen im Block dem Symbol `key` zu.
+        """
+        previous = self._symbol
+        self._symbol = key
+        self.per_symbol.setdefault(key, {})
+        try:
+            yield
+        finally:
+            self._symbol = previous
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Misst einen Abschnitt; Zeit verschachtelter Stufen wird abgezogen.
+        """
+        frame = [name, time.perf_counter(), 0.0]
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            elapsed = time.perf_counter() - frame[1]
+            own = max(elapsed - frame[2], 0.0)
+            if self._stack:
+                self._stack[-1][2] += elapsed
+
+            self.samples[name].append(own)
+            if self._symbol is not None:
+                stages = self.per_symbol[self._symbol]
+                stages[name] = stages.get(name, 0.0) + own
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] += n
+
+    def summary(self) -> Dict[str, Any]:
+        wall = time.perf_counter() - self._t0
+        idle = sum(sum(self.samples.get(name, [])) for name in _IDLE_STAGES)
+        active = max(wall - idle, 1e-9)
+
+        symbol_totals = [
+            sum(value for stage, value in stages.items()
+                if stage not in _IDLE_STAGES)
+            for stages in self.per_symbol.values()
+        ]
+
+        stage_names = [name for name in STAGES if name in self.samples]
+        stage_names += sorted(set(self.samples) - set(STAGES))
+
+        return {
+            "scanner": self.scanner,
+            "timeframe": self.timeframe,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "wall_seconds": round(wall, 3),
+            "active_seconds": round(active, 3),
+            "symbols": len(self.per_symbol),
+            "symbols_per_second": round(len(self.per_symbol) / active, 3),
+            "symbol_latency_ms": {
+                "p50": _ms(_percentile(symbol_totals, 50)),
+                "p95": _ms(_percentile(symbol_totals, 95)),
+                "max": _ms(max(symbol_totals, default=0.0)),
+            },
+            "stages": {
+                name: {
+                    "calls": len(self.samples[name]),
+                    "total_ms": _ms(sum(self.samples[name])),
+                    "share": round(sum(self.samples[name]) / wall, 4) if wall else 0.0,
+                    "p50_ms": _ms(_percentile(self.samples[name], 50)),
+                    "p95_ms": _ms(_percentile(self.samples[name], 95)),
+                }
+                for name in stage_names
+            },
+            "counters": dict(self.counters),
+        }
+
+    def write_report(self, base_dir: str | Path | None = None) -> Path:
+        """
+        Schreibt <scanner>_<timestamp>.json (Aggregat + pro Symbol) und
+        eine CSV mit einer Zeile pro Symbol. Liefert den JSON-Pfad.
+        """
+        base = Path(base_dir) if base_dir is not None else self.output_dir
+        base.mkdir(parents=True, exist_ok=True)
+        stem = f"{self.scanner}_{self.started_at.strftime('%Y%m%d_%H%M%S')}"
+
+        report = self.summary()
+        report["per_symbol_ms"] = {
+            key: {stage: _ms(value) for stage, value in stages.items()}
+            for key, stages in self.per_symbol.items()
+        }
+
+        json_path = base / f"{stem}.json"
+        json_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+        columns = [name for name in STAGES if name in self.samples]
+        columns += sorted(set(self.samples) - set(STAGES))
+        with open(base / f"{stem}.csv", "w", newline="", encoding="utf-8") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(["symbol", "total_ms"] + [f"{c}_ms" for c in columns])
+            for key, stages in self.per_symbol.items():
+                total = sum(v for s, v in stages.items() if s not in _IDLE_STAGES)
+                writer.writerow(
+                    [key, _ms(total)] + [_ms(stages.get(c, 0.0)) for c in columns]
+                )
+
+        return json_path
+
+
+def start_scan_timer(
+    scanner: str,
+    timeframe: str | None = None,
+    cfg: Dict[str, Any] | None = None,
+) -> Optional[ScanTimer]:
+    """
+    Aktiviert die Zeitmessung für einen Scan (Abschnitt `timing` der Config).
+    """
+    global _ACTIVE
+
+    timing_cfg = (cfg or {}).get("timing", {}) if isinstance(cfg, dict) else {}
+    if not timing_cfg.get("enabled", True):
+        _ACTIVE = None
+        return None
+
+    _ACTIVE = ScanTimer(
+        scanner,
+        timeframe,
+        output_dir=timing_cfg.get("output_dir", DEFAULT_TIMING_DIR),
+    )
+    return _ACTIVE
+
+
+def finish_scan_timer() -> Optional[Path]:
+    """
+    Schreibt den Report des aktiven Timers, gibt eine Kurzfassung aus
+    und deaktiviert die Zeitmessung. Danach laufen die Scan-Ende-Hooks.
+    """
+    global _ACTIVE
+
+    timer = _ACTIVE
+    _ACTIVE = None
+    path = _print_timer_report(timer) if timer is not None else None
+
+    for hook in list(_FINISH_HOOKS):
+        hook()
+    return path
+
+
+def _print_timer_report(timer: ScanTimer) -> Path:
+    path = timer.write_report()
+    summary = timer.summary()
+
+    print("\n================ LAUFZEITEN ================")
+    print(
+        f"{summary['symbols']} Symbole in {summary['active_seconds']:.1f} s "
+        f"({summary['symbols_per_second']:.2f} Symbole/s) | "
+        f"p50={summary['symbol_latency_ms']['p50']:.0f} ms "
+        f"p95={summary['symbol_latency_ms']['p95']:.0f} ms"
+    )
+    for name, stats in summary["stages"].items():
+        print(
+            f"  {name:<10} {stats['total_ms'] / 1000.0:>8.2f} s "
+            f"({stats['share'] * 100:>5.1f}%) | {stats['calls']:>5}x | "
+            f"p50={stats['p50_ms']:.1f} ms p95={stats['p95_ms']:.1f} ms"
+        )
+    print(f"[INFO] Timing-Report: {path}")
+    return path
+
+
+def active_timer() -> Optional[ScanTimer]:
+    return _ACTIVE
+
+
+def add_stage_hook(hook: Callable[[str], None]) -> None:
+    _STAGE_HOOKS.append(hook)
+
+
+def remove_stage_hook(hook: Callable[[str], None]) -> None:
+    if hook in _STAGE_HOOKS:
+        _STAGE_HOOKS.remove(hook)
+
+
+def add_finish_hook(hook: Callable[[], None]) -> None:
+    _FINISH_HOOKS.append(hook)
+
+
+def remove_finish_hook(hook: Callable[[], None]) -> None:
+    if hook in _FINISH_HOOKS:
+        _FINISH_HOOKS.remove(hook)
+
+
+@contextmanager
+def _hooked_stage(name: str) -> Iterator[None]:
+    try:
+        with (_ACTIVE.stage(name) if _ACTIVE is not None else nullcontext()):
+            yield
+    finally:
+        for hook in list(_STAGE_HOOKS):
+            hook(name)
+
+
+def stage(name: str):
+    """
+    Context-Manager für eine Stufe; ohne aktiven Scan ein No-op.
+    """
+    if _STAGE_HOOKS:
+        return _hooked_stage(name)
+    if _ACTIVE is None:
+        return nullcontext()
+    return _ACTIVE.stage(name)
+
+
+def symbol(key: str):
+    """
+    Ordnet Stufen im Block einem Symbol zu; ohne aktiven Scan ein No-op.
+    """
+    if _ACTIVE is None:
+        return nullcontext()
+    return _ACTIVE.symbol(key)
+
+
+def count(name: str, n: int = 1) -> None:
+    if _ACTIVE is not None:
+        _ACTIVE.count(name, n)